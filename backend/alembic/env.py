@@ -14,7 +14,7 @@ from app.notifications.models import Notification  # noqa: F401
 from app.pitstops.models import PitStop, RaceStrategy  # noqa: F401
 from app.roles.models import Permission, Role, role_permissions, user_roles  # noqa: F401
 from app.teams.models import Team  # noqa: F401
-from app.telemetry.models import CarSetup, LapTime  # noqa: F401
+from app.telemetry.models import CarSetup, LapTime, LapTrace, RaceDriverLapStats  # noqa: F401
 
 # Import all models so they are registered with Base.metadata
 # Importa todos os modelos para que sejam registrados no Base.metadata
@@ -0,0 +1,59 @@
+"""Backfill lap flags and add partial index on personal best laps.
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Personal best = fastest valid lap per driver and race, earliest on ties
+    # Melhor pessoal = volta valida mais rapida por piloto e corrida, a mais antiga em empate
+    op.execute(
+        """
+        UPDATE lap_times SET is_personal_best = (id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY race_id, driver_id ORDER BY lap_time_ms, lap_number
+                ) AS driver_rank
+                FROM lap_times
+                WHERE is_valid
+            ) AS ranked
+            WHERE driver_rank = 1
+        ))
+        """
+    )
+    op.create_index(
+        "ix_lap_times_personal_best",
+        "lap_times",
+        ["race_id", "lap_time_ms"],
+        postgresql_where=sa.text("is_personal_best"),
+    )
+    # Fastest lap result flag, for races with lap data / Flag de volta mais rapida, em corridas com voltas
+    op.execute(
+        """
+        UPDATE race_results SET fastest_lap = COALESCE(driver_id = (
+            SELECT lt.driver_id FROM lap_times AS lt
+            WHERE lt.race_id = race_results.race_id AND lt.is_personal_best
+            ORDER BY lt.lap_time_ms, lt.lap_number
+            LIMIT 1
+        ), false)
+        WHERE EXISTS (SELECT 1 FROM lap_times AS lt WHERE lt.race_id = race_results.race_id)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lap_times_personal_best", table_name="lap_times")
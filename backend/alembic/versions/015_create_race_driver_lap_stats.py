@@ -0,0 +1,52 @@
+"""Create race_driver_lap_stats rollup table.
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "race_driver_lap_stats",
+        sa.Column("race_id", sa.Uuid(), sa.ForeignKey("races.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("driver_id", sa.Uuid(), sa.ForeignKey("drivers.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("lap_count", sa.Integer(), nullable=False),
+        sa.Column("lap_time_sum_ms", sa.BigInteger(), nullable=False),
+        sa.Column("lap_time_sum_sq", sa.BigInteger(), nullable=False),
+        sa.Column("fastest_lap_ms", sa.Integer(), nullable=False),
+        sa.Column("best_sector_1_ms", sa.Integer(), nullable=True),
+        sa.Column("best_sector_2_ms", sa.Integer(), nullable=True),
+        sa.Column("best_sector_3_ms", sa.Integer(), nullable=True),
+        sa.Column("last_lap_number", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    # Backfill from existing laps / Preenche a partir das voltas existentes
+    op.execute(
+        """
+        INSERT INTO race_driver_lap_stats (
+            race_id, driver_id, lap_count, lap_time_sum_ms, lap_time_sum_sq, fastest_lap_ms,
+            best_sector_1_ms, best_sector_2_ms, best_sector_3_ms, last_lap_number
+        )
+        SELECT race_id, driver_id, count(*), sum(lap_time_ms), sum(CAST(lap_time_ms AS BIGINT) * lap_time_ms),
+               min(lap_time_ms), min(sector_1_ms), min(sector_2_ms), min(sector_3_ms), max(lap_number)
+        FROM lap_times
+        GROUP BY race_id, driver_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("race_driver_lap_stats")
@@ -0,0 +1,40 @@
+"""Create lap_traces table.
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "lap_traces",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("lap_id", sa.Uuid(), sa.ForeignKey("lap_times.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("channel", sa.String(32), nullable=False),
+        sa.Column("dtype", sa.String(8), nullable=False),
+        sa.Column("encoding", sa.String(16), nullable=False),
+        sa.Column("sample_rate_hz", sa.Float(), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("lap_id", "channel", name="uq_lap_trace_channel"),
+    )
+    # Blobs are already compressed: skip TOAST compression / Blobs ja comprimidos: sem compressao TOAST
+    op.execute("ALTER TABLE lap_traces ALTER COLUMN data SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    op.drop_table("lap_traces")
@@ -0,0 +1,134 @@
+"""Partition lap_times and lap_positions by race.
+
+Both tables are rebuilt as PARTITION BY HASH (race_id) with PARTITIONS partitions. Every query filters by
+race_id, so the planner prunes to one partition, and vacuum / analyze work per partition instead of on
+one table that grows forever. Indexes, per partition:
+
+- unique (race_id, driver_id, lap_number), covering lap_time_ms / is_valid (laps) and position (positions)
+- driver_id, for driver history and FK cascades
+- lap_times: the personal-best partial index; lap_positions: (race_id, lap_number, position), the replay order
+- the single-column race_id indexes are dropped: the unique index already leads with race_id
+
+A partitioned table's keys must include race_id, so the primary key becomes (id, race_id) and
+lap_traces.lap_id can no longer reference lap_times.id alone. That foreign key is replaced by a trigger
+that deletes a lap's traces with it. The rebuild copies both tables under an exclusive lock: plan
+downtime on large databases.
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "017"
+down_revision: Union[str, None] = "016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Hash partitions per table; changing it later means another rebuild
+# Particoes hash por tabela; mudar depois exige outra recriacao
+PARTITIONS = 16
+
+_FOREIGN_KEYS = (("race_id", "races"), ("driver_id", "drivers"), ("team_id", "teams"))
+
+# table -> (unique constraint, INCLUDE columns, extra indexes)
+_TABLES = {
+    "lap_times": (
+        "uq_lap_race_driver_lap",
+        "lap_time_ms, is_valid",
+        ["CREATE INDEX ix_lap_times_personal_best ON lap_times (race_id, lap_time_ms) WHERE is_personal_best"],
+    ),
+    "lap_positions": (
+        "uq_lapposition_race_driver_lap",
+        "position",
+        ["CREATE INDEX ix_lap_positions_race_lap ON lap_positions (race_id, lap_number, position)"],
+    ),
+}
+
+
+def _copy(table: str, old: str, partitioned: bool) -> list[str]:
+    """Rename `table` to `old`, recreate it empty, copy the rows back and drop `old`."""
+    statements = [
+        f"ALTER TABLE {table} RENAME TO {old}",
+        f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING STORAGE)"
+        + (" PARTITION BY HASH (race_id)" if partitioned else ""),
+    ]
+    if partitioned:
+        statements += [
+            f"CREATE TABLE {table}_p{remainder:02d} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+            for remainder in range(PARTITIONS)
+        ]
+    # Constraints and indexes are built after the copy, which is faster / Constraints e indices apos a copia
+    statements += [f"INSERT INTO {table} SELECT * FROM {old}", f"DROP TABLE {old}"]
+    statements += [
+        f"ALTER TABLE {table} ADD CONSTRAINT fk_{table}_{column}_{referred} "
+        f"FOREIGN KEY ({column}) REFERENCES {referred} (id) ON DELETE CASCADE"
+        for column, referred in _FOREIGN_KEYS
+    ]
+    statements.append(f"CREATE INDEX ix_{table}_driver_id ON {table} (driver_id)")
+    return statements
+
+
+def upgrade_statements() -> list[str]:
+    """DDL of the upgrade, also run by benchmarks/bench_partitioning.py."""
+    statements = ["ALTER TABLE lap_traces DROP CONSTRAINT fk_lap_traces_lap_id_lap_times"]
+    for table, (unique, include, indexes) in _TABLES.items():
+        statements += _copy(table, f"{table}_unpartitioned", partitioned=True)
+        statements += [
+            f"ALTER TABLE {table} ADD CONSTRAINT pk_{table} PRIMARY KEY (id, race_id)",
+            f"ALTER TABLE {table} ADD CONSTRAINT {unique} UNIQUE (race_id, driver_id, lap_number) INCLUDE ({include})",
+            *indexes,
+            f"ANALYZE {table}",
+        ]
+    # Deleting a lap (or its race) deletes its traces / Remover uma volta (ou a corrida) remove seus tracados
+    statements += [
+        """
+        CREATE FUNCTION lap_times_delete_traces() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            DELETE FROM lap_traces WHERE lap_id = OLD.id;
+            RETURN NULL;
+        END
+        $$
+        """,
+        "CREATE TRIGGER trg_lap_times_delete_traces AFTER DELETE ON lap_times "
+        "FOR EACH ROW EXECUTE FUNCTION lap_times_delete_traces()",
+    ]
+    return statements
+
+
+def downgrade_statements() -> list[str]:
+    """DDL of the downgrade: plain tables with the 010 / 012 / 014 constraints and indexes."""
+    statements = [
+        "DROP TRIGGER trg_lap_times_delete_traces ON lap_times",
+        "DROP FUNCTION lap_times_delete_traces()",
+    ]
+    for table, (unique, _, _) in _TABLES.items():
+        statements += _copy(table, f"{table}_partitioned", partitioned=False)
+        statements += [
+            f"ALTER TABLE {table} ADD CONSTRAINT pk_{table} PRIMARY KEY (id)",
+            f"ALTER TABLE {table} ADD CONSTRAINT {unique} UNIQUE (race_id, driver_id, lap_number)",
+            f"CREATE INDEX ix_{table}_race_id ON {table} (race_id)",
+        ]
+    statements += [
+        "CREATE INDEX ix_lap_times_personal_best ON lap_times (race_id, lap_time_ms) WHERE is_personal_best",
+        "DELETE FROM lap_traces WHERE lap_id NOT IN (SELECT id FROM lap_times)",
+        "ALTER TABLE lap_traces ADD CONSTRAINT fk_lap_traces_lap_id_lap_times "
+        "FOREIGN KEY (lap_id) REFERENCES lap_times (id) ON DELETE CASCADE",
+    ]
+    return statements
+
+
+def upgrade() -> None:
+    for statement in upgrade_statements():
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in downgrade_statements():
+        op.execute(statement)
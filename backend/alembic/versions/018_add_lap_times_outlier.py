@@ -0,0 +1,28 @@
+"""Add outlier reason to lap_times.
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "018"
+down_revision: Union[str, None] = "017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by the outlier pass on the next ingest or POST /races/{id}/laps/outliers
+    # Preenchido pela analise de voltas atipicas na proxima ingestao ou POST /races/{id}/laps/outliers
+    op.add_column("lap_times", sa.Column("outlier", sa.String(20), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("lap_times", "outlier")
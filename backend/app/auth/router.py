@@ -7,7 +7,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.schemas import LoginRequest, RefreshRequest, RegisterRequest, TokenResponse
-from app.auth.service import authenticate_user, create_tokens, refresh_access_token, register_user
+from app.auth.service import authenticate_user, create_tokens, refresh_access_token, register_user, token_claims
 from app.db.session import get_db
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
@@ -20,7 +20,7 @@ async def login(body: LoginRequest, db: AsyncSession = Depends(get_db)) -> dict[
     Autentica usuario e retorna tokens JWT.
     """
     user = await authenticate_user(db, body.email, body.password)
-    return create_tokens(str(user.id))
+    return create_tokens(str(user.id), await token_claims(db, user.id))
 
 
 @router.post("/register", response_model=TokenResponse, status_code=201)
@@ -30,7 +30,7 @@ async def register(body: RegisterRequest, db: AsyncSession = Depends(get_db)) ->
     Registra um novo usuario e retorna tokens JWT.
     """
     user = await register_user(db, body.email, body.password, body.full_name)
-    return create_tokens(str(user.id))
+    return create_tokens(str(user.id), await token_claims(db, user.id))
 
 
 @router.post("/refresh", response_model=TokenResponse)
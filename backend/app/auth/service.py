@@ -8,14 +8,17 @@ import uuid as uuid_mod
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.core.exceptions import ConflictException, CredentialsException
+from app.core.principal import Principal, authz_versions
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
 )
+from app.db.loaders import load_profile
 from app.users.models import User
 
 
@@ -26,7 +29,7 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> User
     """
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
-    if user is None or not verify_password(password, user.hashed_password):
+    if user is None or not await verify_password_async(password, user.hashed_password):
         raise CredentialsException("Incorrect email or password")
     if not user.is_active:
         raise CredentialsException("Inactive user")
@@ -44,7 +47,7 @@ async def register_user(db: AsyncSession, email: str, password: str, full_name:
 
     user = User(
         email=email,
-        hashed_password=hash_password(password),
+        hashed_password=await hash_password_async(password),
         full_name=full_name,
     )
     db.add(user)
@@ -53,13 +56,26 @@ async def register_user(db: AsyncSession, email: str, password: str, full_name:
     return user
 
 
-def create_tokens(user_id: str) -> dict[str, str]:
+async def token_claims(db: AsyncSession, user_id: uuid_mod.UUID) -> dict[str, object] | None:
+    """
+    Permission claims for a new access token, if JWT_PERMISSION_CLAIMS is on.
+    Claims de permissao para um novo token de acesso, se JWT_PERMISSION_CLAIMS estiver ativo.
+    """
+    if not settings.JWT_PERMISSION_CLAIMS:
+        return None
+    result = await db.execute(select(User).where(User.id == user_id).options(*load_profile(User, "auth")))
+    user = result.scalar_one()
+    authz_versions.set(user.id, user.authz_version)
+    return Principal.from_user(user).to_claims()
+
+
+def create_tokens(user_id: str, claims: dict[str, object] | None = None) -> dict[str, str]:
     """
     Create access and refresh tokens for a user.
     Cria tokens de acesso e atualizacao para um usuario.
     """
     return {
-        "access_token": create_access_token(subject=user_id),
+        "access_token": create_access_token(subject=user_id, claims=claims),
         "refresh_token": create_refresh_token(subject=user_id),
         "token_type": "bearer",
     }
@@ -91,4 +107,4 @@ async def refresh_access_token(db: AsyncSession, refresh_token: str) -> dict[str
     if user is None or not user.is_active:
         raise CredentialsException("User not found or inactive")
 
-    return create_tokens(str(user.id))
+    return create_tokens(str(user.id), await token_claims(db, user.id))
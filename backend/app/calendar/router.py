@@ -12,8 +12,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.calendar.schemas import CalendarRaceResponse
 from app.calendar.service import list_calendar_races
 from app.core.dependencies import require_permissions
-from app.db.session import get_db
-from app.users.models import User
+from app.core.principal import Principal
+from app.db.session import get_read_db
 
 router = APIRouter(prefix="/api/v1/calendar", tags=["calendar"])
 
@@ -40,8 +40,8 @@ async def read_calendar_races(
         default=None,
         description="Filter by championship / Filtrar por campeonato",
     ),
-    _current_user: User = Depends(require_permissions("races:read")),
-    db: AsyncSession = Depends(get_db),
+    _current_user: Principal = Depends(require_permissions("races:read")),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[CalendarRaceResponse]:
     """
     List races for a given year/month across all or filtered championships.
@@ -29,8 +29,8 @@ from app.championships.service import (
     update_championship,
 )
 from app.core.dependencies import require_permissions
+from app.core.principal import Principal
 from app.db.session import get_db
-from app.users.models import User
 
 router = APIRouter(prefix="/api/v1/championships", tags=["championships"])
 
@@ -40,7 +40,7 @@ async def read_championships(
     status: ChampionshipStatus | None = Query(default=None, description="Filter by status / Filtrar por status"),
     season_year: int | None = Query(default=None, description="Filter by season year / Filtrar por ano da temporada"),
     is_active: bool | None = Query(default=None, description="Filter by active status / Filtrar por status ativo"),
-    _current_user: User = Depends(require_permissions("championships:read")),
+    _current_user: Principal = Depends(require_permissions("championships:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[ChampionshipListResponse]:
     """
@@ -53,7 +53,7 @@ async def read_championships(
 @router.get("/{championship_id}", response_model=ChampionshipDetailResponse)
 async def read_championship(
     championship_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("championships:read")),
+    _current_user: Principal = Depends(require_permissions("championships:read")),
     db: AsyncSession = Depends(get_db),
 ) -> ChampionshipDetailResponse:
     """
@@ -66,7 +66,7 @@ async def read_championship(
 @router.post("/", response_model=ChampionshipResponse, status_code=201)
 async def create_new_championship(
     body: ChampionshipCreateRequest,
-    _current_user: User = Depends(require_permissions("championships:create")),
+    _current_user: Principal = Depends(require_permissions("championships:create")),
     db: AsyncSession = Depends(get_db),
 ) -> ChampionshipResponse:
     """
@@ -89,7 +89,7 @@ async def create_new_championship(
 async def update_existing_championship(
     championship_id: uuid.UUID,
     body: ChampionshipUpdateRequest,
-    _current_user: User = Depends(require_permissions("championships:update")),
+    _current_user: Principal = Depends(require_permissions("championships:update")),
     db: AsyncSession = Depends(get_db),
 ) -> ChampionshipResponse:
     """
@@ -113,7 +113,7 @@ async def update_existing_championship(
 @router.delete("/{championship_id}", status_code=204)
 async def delete_existing_championship(
     championship_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("championships:delete")),
+    _current_user: Principal = Depends(require_permissions("championships:delete")),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
@@ -131,7 +131,7 @@ async def delete_existing_championship(
 @router.get("/{championship_id}/entries", response_model=list[ChampionshipEntryResponse])
 async def read_championship_entries(
     championship_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("championships:read")),
+    _current_user: Principal = Depends(require_permissions("championships:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[dict]:  # type: ignore[type-arg]
     """
@@ -145,7 +145,7 @@ async def read_championship_entries(
 async def add_entry(
     championship_id: uuid.UUID,
     body: ChampionshipEntryRequest,
-    _current_user: User = Depends(require_permissions("championships:manage_entries")),
+    _current_user: Principal = Depends(require_permissions("championships:manage_entries")),
     db: AsyncSession = Depends(get_db),
 ) -> list[dict]:  # type: ignore[type-arg]
     """
@@ -159,7 +159,7 @@ async def add_entry(
 async def remove_entry(
     championship_id: uuid.UUID,
     team_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("championships:manage_entries")),
+    _current_user: Principal = Depends(require_permissions("championships:manage_entries")),
     db: AsyncSession = Depends(get_db),
 ) -> list[dict]:  # type: ignore[type-arg]
     """
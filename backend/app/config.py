@@ -29,6 +29,24 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "changeme"
     POSTGRES_DB: str = "team_principal"
 
+    # Read replica (optional) / Replica de leitura (opcional)
+    POSTGRES_READ_HOST: str | None = None
+    POSTGRES_READ_PORT: int | None = None
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # primary reads after a user's write / leituras no primario apos escrita
+    READ_REPLICA_RETRY_SECONDS: float = 30.0  # cooldown after a replica failure / espera apos falha da replica
+
+    # Connection pool (per worker process) / Pool de conexoes (por processo worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # SQLAlchemy and asyncpg statement caches per connection; 0 behind PgBouncer (transaction mode) also
+    # turns on unique statement names
+    # Caches de statements do SQLAlchemy e do asyncpg por conexao; 0 atras do PgBouncer (modo transaction)
+    # tambem ativa nomes unicos de statement
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
     @property
     def DATABASE_URL(self) -> str:
         """Async database URL / URL assincrona do banco de dados."""
@@ -37,6 +55,16 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def DATABASE_READ_URL(self) -> str | None:
+        """Async read-replica URL, if configured / URL assincrona da replica de leitura, se configurada."""
+        if not self.POSTGRES_READ_HOST:
+            return None
+        return (
+            f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"@{self.POSTGRES_READ_HOST}:{self.POSTGRES_READ_PORT or self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+        )
+
     @property
     def DATABASE_URL_SYNC(self) -> str:
         """Sync database URL for Alembic / URL sincrona do banco para Alembic."""
@@ -45,11 +73,70 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    # SQL instrumentation / Instrumentacao SQL
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_QUERY_BUDGET: int = 25  # statements per request / statements por requisicao
+    SQL_TIME_BUDGET_MS: float = 200.0  # DB time per request / tempo de banco por requisicao
+
+    # Metrics / Metricas (Prometheus; set PROMETHEUS_MULTIPROC_DIR for multi-worker aggregation)
+    METRICS_ENABLED: bool = True
+
     # Auth / Autenticacao
     SECRET_KEY: str = "change-this-to-a-random-secret-key"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Principal cache per worker; TTL bounds staleness across workers (0 disables)
+    # Cache de principais por worker; o TTL limita a defasagem entre workers (0 desativa)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_SIZE: int = 4096
+    # authz_version lookups per worker: how long other workers may honour revoked permissions (0 reads every request)
+    # Consultas de authz_version por worker: por quanto tempo outros workers aceitam permissoes revogadas (0 le sempre)
+    AUTHZ_VERSION_TTL_SECONDS: float = 5.0
+    # Embed a permission bitset and authz_version in access tokens / Embute bitset de permissoes e authz_version
+    JWT_PERMISSION_CLAIMS: bool = False
+    # bcrypt threads per worker, also the cap on concurrent hashes
+    # Threads bcrypt por worker, tambem o limite de hashes simultaneos
+    PASSWORD_HASH_WORKERS: int = 2
+
+    # Lap traces / Tracados de volta
+    TRACE_MAX_SAMPLES: int = 60 * 60 * 10  # per channel: 10 min at 60 Hz / por canal: 10 min a 60 Hz
+    TRACE_COMPRESSION_LEVEL: int = 6  # zlib, 1 (fast) to 9 (small) / zlib, 1 (rapido) a 9 (menor)
+    # Downsampled chart series per worker; uploads invalidate locally, the TTL bounds other workers (0 disables)
+    # Series reduzidas por worker; uploads invalidam localmente, o TTL limita os demais workers (0 desativa)
+    TRACE_CACHE_TTL_SECONDS: float = 300.0
+    TRACE_CACHE_SIZE: int = 512
+
+    # Columnar exports / Exportacoes colunares
+    EXPORT_CHUNK_ROWS: int = 10_000  # rows per Arrow batch / Parquet row group; bounds memory / limita a memoria
+    EXPORT_PARQUET_COMPRESSION: str = "zstd"  # zstd, snappy, gzip, lz4 or none / ou none
+
+    # File imports (CSV / Parquet) / Importacoes de arquivo (CSV / Parquet)
+    IMPORT_CHUNK_ROWS: int = 5_000  # rows validated and inserted together / linhas validadas e inseridas juntas
+    IMPORT_MAX_SIZE_BYTES: int = 512 * 1024 * 1024  # 512 MB, spooled to disk / gravado em disco
+    IMPORT_MAX_ERRORS: int = 1000  # row errors listed per import / erros de linha listados por importacao
+
+    # UDP telemetry ingester (python -m app.telemetry.ingest) / Ingestor de telemetria UDP
+    TELEMETRY_UDP_HOST: str = "0.0.0.0"
+    TELEMETRY_UDP_PORT: int = 20777
+    TELEMETRY_UDP_RCVBUF_BYTES: int = 4 * 1024 * 1024  # socket buffer for bursts / buffer do socket para rajadas
+    TELEMETRY_INGEST_FLUSH_MS: int = 500  # micro-batch interval / intervalo dos micro-lotes
+    TELEMETRY_INGEST_BATCH_ROWS: int = 1000  # flush early past this many rows / grava antes com tantas linhas
+
+    # Live lap ingest (write-behind buffer per worker) / Ingestao de voltas ao vivo (buffer write-behind por worker)
+    LIVE_LAPS_FLUSH_MS: int = 200  # max time a lap waits in memory / tempo maximo de uma volta em memoria
+    LIVE_LAPS_BATCH_ROWS: int = 500  # flush a race early at this many laps / grava uma corrida antes com tantas voltas
+    LIVE_LAPS_MAX_PENDING: int = 20_000  # 503 beyond this, e.g. database down / 503 acima disso, ex. banco fora
+
+    # Lap outliers (median / MAD per driver stint) / Voltas atipicas (mediana / MAD por stint do piloto)
+    LAP_OUTLIER_THRESHOLD: float = 3.5  # robust z-score beyond which a lap is slow / fast / z-score robusto limite
+    LAP_OUTLIER_MIN_STINT_LAPS: int = 5  # clean laps a stint needs to be scored / voltas limpas para avaliar o stint
+    LAP_OUTLIER_REFRESH_SECONDS: float = 30.0  # live ingest re-flags a race at most this often / intervalo ao vivo
+
+    # Sector heatmap per race and worker; lap writes invalidate locally, the TTL bounds other workers (0 disables)
+    # Mapa de setores por corrida e worker; gravacoes de volta invalidam localmente, o TTL limita os demais (0 desativa)
+    SECTOR_CACHE_TTL_SECONDS: float = 30.0
+    SECTOR_CACHE_SIZE: int = 64
 
     # Uploads / Uploads
     UPLOAD_DIR: str = "uploads"
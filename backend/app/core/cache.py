@@ -0,0 +1,62 @@
+"""
+In-process LRU map with a per-entry TTL, shared by the per-worker caches.
+Mapa LRU em processo com TTL por entrada, compartilhado pelos caches por worker.
+
+Entries live in one worker process. Invalidation only reaches the worker that calls it; the TTL bounds
+how long other workers may serve a stale value.
+As entradas vivem em um processo worker. A invalidacao so alcanca o worker que a chama; o TTL limita
+por quanto tempo os demais workers podem servir um valor desatualizado.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+
+class TTLCache[K: Hashable, V]:
+    """
+    LRU map with a per-entry TTL. maxsize or ttl_seconds <= 0 disables it.
+    Mapa LRU com TTL por entrada. maxsize ou ttl_seconds <= 0 o desativa.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        """Cached value, or None if missing/expired / Valor em cache, ou None se ausente/expirado."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store a value, evicting the least recently used / Armazena, removendo o menos usado."""
+        if self.maxsize <= 0 or self.ttl_seconds <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        """Drop one entry / Remove uma entrada."""
+        self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[K], bool]) -> None:
+        """Drop every entry whose key matches, O(size) / Remove as entradas cuja chave corresponde, O(tamanho)."""
+        for key in [key for key in self._entries if predicate(key)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop every entry / Remove todas as entradas."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -13,20 +13,19 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import CredentialsException, ForbiddenException
+from app.core.principal import Principal, authz_versions, principal_cache
 from app.core.security import decode_token
+from app.db.loaders import load_profile
 from app.db.session import get_db
 from app.users.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
+def _decode_access_token(token: str) -> tuple[uuid.UUID, dict[str, object]]:
     """
-    Decode JWT token and return the current user.
-    Decodifica o token JWT e retorna o usuario atual.
+    Validate an access token and return its user id and payload.
+    Valida um token de acesso e retorna o id do usuario e o payload.
     """
     payload = decode_token(token)
     if payload is None:
@@ -41,18 +40,62 @@ async def get_current_user(
         raise CredentialsException()
 
     try:
-        user_id = uuid.UUID(raw_sub)
+        return uuid.UUID(raw_sub), payload
     except ValueError as err:
         raise CredentialsException() from err
 
-    result = await db.execute(select(User).where(User.id == user_id))
+
+async def _load_auth_user(db: AsyncSession, user_id: uuid.UUID) -> User:
+    """
+    Load a user with the auth profile and refresh its cached principal and authz_version.
+    Carrega um usuario com o perfil auth e atualiza seu principal e authz_version em cache.
+    """
+    result = await db.execute(select(User).where(User.id == user_id).options(*load_profile(User, "auth")))
     user = result.scalar_one_or_none()
     if user is None:
         raise CredentialsException()
-
+    principal_cache.put(Principal.from_user(user))
+    authz_versions.set(user.id, user.authz_version)
     return user
 
 
+async def _cached_principal(db: AsyncSession, user_id: uuid.UUID) -> Principal:
+    """
+    Principal from the cache, loading the user on a miss or when its authz_version is no longer current.
+    Principal do cache, carregando o usuario em caso de falta ou quando seu authz_version nao e mais o atual.
+    """
+    principal = principal_cache.get(user_id)
+    if principal is None or principal.authz_version != await _current_authz_version(db, user_id):
+        principal = Principal.from_user(await _load_auth_user(db, user_id))
+    return principal
+
+
+async def _current_authz_version(db: AsyncSession, user_id: uuid.UUID) -> int:
+    """
+    User's current authz_version from the version map, reading only that column on a miss.
+    authz_version atual do usuario pelo mapa de versoes, lendo apenas essa coluna em caso de falta.
+    """
+    version = authz_versions.get(user_id)
+    if version is None:
+        version = (await db.execute(select(User.authz_version).where(User.id == user_id))).scalar_one_or_none()
+        if version is None:
+            raise CredentialsException()
+        authz_versions.set(user_id, version)
+    return version
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """
+    Decode JWT token and return the current user.
+    Decodifica o token JWT e retorna o usuario atual.
+    """
+    user_id, _ = _decode_access_token(token)
+    return await _load_auth_user(db, user_id)
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -65,27 +108,72 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """
+    Return the current principal from the cache, loading the user only on a miss.
+    Retorna o principal atual do cache, carregando o usuario apenas em caso de falta.
+    """
+    user_id, _ = _decode_access_token(token)
+    return await _cached_principal(db, user_id)
+
+
+async def get_token_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """
+    Return the principal carried by the token's permission claims, rejecting outdated ones.
+    Tokens without claims fall back to the cached principal. The result has no roles.
+
+    Retorna o principal das claims de permissao do token, rejeitando as desatualizadas.
+    Tokens sem claims usam o principal em cache. O resultado nao tem papeis.
+    """
+    user_id, payload = _decode_access_token(token)
+    claimed = Principal.from_claims(user_id, payload)
+    if claimed is None:
+        return await _cached_principal(db, user_id)
+    if claimed.authz_version != await _current_authz_version(db, user_id):
+        raise CredentialsException("Token permissions are outdated")
+    return claimed
+
+
+async def get_current_active_principal(
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
+    """
+    Return the current principal if active, otherwise raise Forbidden.
+    Retorna o principal atual se ativo, caso contrario lanca Forbidden.
+    """
+    if not current_user.is_active:
+        raise ForbiddenException("Inactive user")
+    return current_user
+
+
 def require_permissions(
     *codenames: str,
-) -> Callable[..., Coroutine[Any, Any, User]]:
+) -> Callable[..., Coroutine[Any, Any, Principal]]:
     """
     Dependency factory: require ALL listed permissions (AND logic).
-    Superuser bypasses all checks.
+    Superuser bypasses all checks. Checks the token's permission claims when present.
+    A permission revoked or a user deactivated through another worker is still accepted here for up to
+    AUTHZ_VERSION_TTL_SECONDS; through this worker, it is refused at once.
 
     Fabrica de dependencia: requer TODAS as permissoes listadas (logica AND).
-    Superusuario ignora todas as verificacoes.
+    Superusuario ignora todas as verificacoes. Usa as claims de permissao do token quando presentes.
+    Uma permissao revogada ou um usuario desativado por outro worker ainda e aceito aqui por ate
+    AUTHZ_VERSION_TTL_SECONDS; por este worker, e recusado na hora.
     """
 
-    async def _check(current_user: User = Depends(get_current_active_user)) -> User:
+    async def _check(current_user: Principal = Depends(get_token_principal)) -> Principal:
+        if not current_user.is_active:
+            raise ForbiddenException("Inactive user")
         if current_user.is_superuser:
             return current_user
 
-        user_permissions: set[str] = set()
-        for role in current_user.roles:
-            for perm in role.permissions:
-                user_permissions.add(perm.codename)
-
-        missing = set(codenames) - user_permissions
+        missing = set(codenames) - current_user.permissions
         if missing:
             raise ForbiddenException(f"Missing permissions: {', '.join(sorted(missing))}")
 
@@ -96,21 +184,22 @@ def require_permissions(
 
 def require_role(
     *role_names: str,
-) -> Callable[..., Coroutine[Any, Any, User]]:
+) -> Callable[..., Coroutine[Any, Any, Principal]]:
     """
     Dependency factory: require ANY of the listed roles (OR logic).
-    Superuser bypasses all checks.
+    Superuser bypasses all checks. Role changes made through another worker apply within
+    AUTHZ_VERSION_TTL_SECONDS, as in require_permissions.
 
     Fabrica de dependencia: requer QUALQUER dos papeis listados (logica OR).
-    Superusuario ignora todas as verificacoes.
+    Superusuario ignora todas as verificacoes. Mudancas de papel feitas por outro worker valem em ate
+    AUTHZ_VERSION_TTL_SECONDS, como em require_permissions.
     """
 
-    async def _check(current_user: User = Depends(get_current_active_user)) -> User:
+    async def _check(current_user: Principal = Depends(get_current_active_principal)) -> Principal:
         if current_user.is_superuser:
             return current_user
 
-        user_roles = {r.name for r in current_user.roles}
-        if not user_roles & set(role_names):
+        if not current_user.roles & set(role_names):
             raise ForbiddenException(f"Required role: {' or '.join(role_names)}")
 
         return current_user
@@ -58,3 +58,17 @@ class ValidationException(HTTPException):
 
     def __init__(self, detail: str = "Validation error") -> None:
         super().__init__(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+
+
+class ServiceUnavailableException(HTTPException):
+    """
+    Raised when the server is temporarily saturated; the client should retry after Retry-After seconds.
+    Lancada quando o servidor esta temporariamente saturado; o cliente deve tentar apos Retry-After segundos.
+    """
+
+    def __init__(self, detail: str = "Service temporarily unavailable", retry_after_seconds: int = 1) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after_seconds)},
+        )
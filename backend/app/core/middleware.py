@@ -0,0 +1,58 @@
+"""
+ASGI middleware.
+Middlewares ASGI.
+"""
+
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.instrumentation import track_queries
+
+logger = logging.getLogger("app.db.queries")
+
+
+class QueryStatsMiddleware:
+    """
+    Count SQL statements, DB time and rows per request.
+    Adds `Server-Timing` and `X-DB-Queries` response headers and logs requests over budget.
+
+    Conta statements SQL, tempo de banco e linhas por requisicao.
+    Adiciona os headers `Server-Timing` e `X-DB-Queries` e registra requisicoes acima do orcamento.
+    """
+
+    def __init__(self, app: ASGIApp, query_budget: int, time_budget_ms: float) -> None:
+        self.app = app
+        self.query_budget = query_budget
+        self.time_budget_ms = time_budget_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_stats(message: Message) -> None:
+                # Headers reflect statements issued before the response starts
+                # Headers refletem statements emitidos antes do inicio da resposta
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", stats.server_timing())
+                    headers["X-DB-Queries"] = str(stats.queries)
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+        if stats.queries > self.query_budget or stats.db_time_ms > self.time_budget_ms:
+            logger.warning(
+                "SQL budget exceeded: %s %s issued %d queries in %.1f ms (%d rows); budget %d queries / %.0f ms",
+                scope["method"],
+                scope["path"],
+                stats.queries,
+                stats.db_time_ms,
+                stats.rows,
+                self.query_budget,
+                self.time_budget_ms,
+            )
@@ -0,0 +1,162 @@
+"""
+Authenticated principal, its in-process TTL/LRU cache and the token permission claims.
+Principal autenticado, seu cache TTL/LRU em processo e as claims de permissao do token.
+
+Every authorization change (roles, role permissions, user activation) bumps users.authz_version in the
+database. Each worker keeps the versions it read for AUTHZ_VERSION_TTL_SECONDS only, and a cached principal
+or a token's permission claims with an older version are not used. The worker that handled the change sees
+it at once; other workers see it within AUTHZ_VERSION_TTL_SECONDS, at the cost of one single-column read
+per user and interval. PRINCIPAL_CACHE_TTL_SECONDS only bounds how long the roles and permissions loaded for
+a version are kept.
+Toda mudanca de autorizacao (papeis, permissoes de papel, ativacao do usuario) incrementa users.authz_version
+no banco. Cada worker mantem as versoes lidas por apenas AUTHZ_VERSION_TTL_SECONDS, e um principal em cache
+ou as claims de permissao de um token com versao anterior nao sao usados. O worker que tratou a mudanca a ve
+na hora; os demais a veem em ate AUTHZ_VERSION_TTL_SECONDS, ao custo de uma leitura de uma coluna por
+usuario e intervalo. PRINCIPAL_CACHE_TTL_SECONDS so limita por quanto tempo os papeis e permissoes
+carregados para uma versao sao mantidos.
+
+With JWT_PERMISSION_CLAIMS, access tokens also carry the user's system permissions as a bitset and the
+user's authz_version; tokens with an older version are rejected.
+Com JWT_PERMISSION_CLAIMS, os tokens de acesso tambem carregam as permissoes de sistema do usuario como
+bitset e o authz_version do usuario; tokens com versao anterior sao rejeitados.
+"""
+
+import uuid
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from sqlalchemy import ColumnElement, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.db.seed import SYSTEM_PERMISSIONS
+from app.users.models import User
+
+# Bit positions follow SYSTEM_PERMISSIONS order: only append to that list
+# Posicoes dos bits seguem a ordem de SYSTEM_PERMISSIONS: apenas acrescente a essa lista
+PERMISSION_BITS: dict[str, int] = {str(perm["codename"]): bit for bit, perm in enumerate(SYSTEM_PERMISSIONS)}
+
+
+def encode_permissions(codenames: frozenset[str]) -> str | None:
+    """
+    Hex bitset of system permissions, or None if any codename has no bit.
+    Bitset hexadecimal das permissoes de sistema, ou None se algum codename nao tiver bit.
+    """
+    mask = 0
+    for codename in codenames:
+        bit = PERMISSION_BITS.get(codename)
+        if bit is None:
+            return None
+        mask |= 1 << bit
+    return format(mask, "x")
+
+
+def decode_permissions(bitset: str) -> frozenset[str]:
+    """Codenames set in a hex bitset / Codenames presentes em um bitset hexadecimal."""
+    mask = int(bitset, 16)
+    return frozenset(codename for codename, bit in PERMISSION_BITS.items() if mask >> bit & 1)
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    Immutable authorization snapshot of a user.
+    Retrato imutavel de autorizacao de um usuario.
+    """
+
+    id: uuid.UUID
+    is_active: bool
+    is_superuser: bool
+    permissions: frozenset[str]
+    roles: frozenset[str]
+    authz_version: int = 0
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        """Build from a user loaded with the auth profile / Monta a partir de usuario com perfil auth."""
+        return cls(
+            id=user.id,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            permissions=frozenset(perm.codename for role in user.roles for perm in role.permissions),
+            roles=frozenset(role.name for role in user.roles),
+            authz_version=user.authz_version,
+        )
+
+    @classmethod
+    def from_claims(cls, user_id: uuid.UUID, payload: Mapping[str, object]) -> "Principal | None":
+        """
+        Build from an access token's permission claims, or None if it has none. Roles are not carried.
+        Monta a partir das claims de permissao do token de acesso, ou None se nao houver. Papeis nao vao.
+        """
+        bitset, version, superuser = payload.get("perms"), payload.get("av"), payload.get("su")
+        if not isinstance(bitset, str) or not isinstance(version, int) or not isinstance(superuser, bool):
+            return None
+        try:
+            permissions = decode_permissions(bitset)
+        except ValueError:
+            return None
+        return cls(
+            id=user_id,
+            is_active=True,  # deactivation bumps authz_version / desativacao incrementa authz_version
+            is_superuser=superuser,
+            permissions=permissions,
+            roles=frozenset(),
+            authz_version=version,
+        )
+
+    def to_claims(self) -> dict[str, object] | None:
+        """
+        Permission claims for an access token, or None if a permission has no bit.
+        Claims de permissao para um token de acesso, ou None se alguma permissao nao tiver bit.
+        """
+        bitset = encode_permissions(self.permissions)
+        if bitset is None or not self.is_active:
+            return None
+        return {"perms": bitset, "av": self.authz_version, "su": self.is_superuser}
+
+
+class PrincipalCache(TTLCache[uuid.UUID, Principal]):
+    """
+    LRU cache of principals by user id, with a per-entry TTL.
+    Cache LRU de principais por id de usuario, com TTL por entrada.
+    """
+
+    def put(self, principal: Principal) -> None:
+        """Store a principal under its id / Armazena um principal pelo seu id."""
+        self.set(principal.id, principal)
+
+
+class AuthzVersionMap(TTLCache[uuid.UUID, int]):
+    """
+    Current authz_version by user id, checked against token claims.
+    authz_version atual por id de usuario, comparado com as claims do token.
+    """
+
+    def update(self, versions: Mapping[uuid.UUID, int]) -> None:
+        """Record new versions after a committed change / Registra novas versoes apos mudanca confirmada."""
+        for user_id, version in versions.items():
+            self.set(user_id, version)
+
+
+async def bump_authz_versions(db: AsyncSession, *criteria: ColumnElement[bool]) -> dict[uuid.UUID, int]:
+    """
+    Increment authz_version for the matching users, inside the caller's transaction.
+    Pass the result to authz_versions.update() after the commit.
+
+    Incrementa o authz_version dos usuarios correspondentes, na transacao de quem chama.
+    Passe o resultado para authz_versions.update() apos o commit.
+    """
+    result = await db.execute(
+        update(User)
+        .where(*criteria)
+        .values(authz_version=User.authz_version + 1)
+        .returning(User.id, User.authz_version)
+        .execution_options(synchronize_session="fetch")
+    )
+    return {user_id: version for user_id, version in result}
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+authz_versions = AuthzVersionMap(settings.PRINCIPAL_CACHE_SIZE, settings.AUTHZ_VERSION_TTL_SECONDS)
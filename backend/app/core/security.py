@@ -3,6 +3,9 @@ Security utilities: JWT token management and password hashing.
 Utilitarios de seguranca: gerenciamento de tokens JWT e hashing de senha.
 """
 
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 
 import bcrypt
@@ -27,14 +30,73 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
-def create_access_token(subject: str, expires_delta: timedelta | None = None) -> str:
+# --- Async hashing / Hashing assincrono ---
+# bcrypt releases the GIL, so a small thread pool keeps the event loop free while it runs. The limiter
+# holds excess callers on the loop (cheap, cancellable) instead of queueing them in the executor.
+# bcrypt libera o GIL, entao um pool pequeno de threads mantem o event loop livre durante o calculo. O
+# limitador segura o excedente no loop (barato, cancelavel) em vez de enfileira-lo no executor.
+
+_hash_executor: ThreadPoolExecutor | None = None
+_hash_limiters: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+
+
+def _executor() -> ThreadPoolExecutor:
+    """Shared hashing pool, created on first use / Pool de hashing compartilhado, criado no primeiro uso."""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+        )
+    return _hash_executor
+
+
+def _limiter() -> asyncio.Semaphore:
+    """Per-event-loop concurrency limiter / Limitador de concorrencia por event loop."""
+    loop = asyncio.get_running_loop()
+    limiter = _hash_limiters.get(loop)
+    if limiter is None:
+        limiter = _hash_limiters[loop] = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS)
+    return limiter
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password in the bounded hashing pool.
+    Gera o hash de uma senha no pool de hashing limitado.
+    """
+    async with _limiter():
+        return await asyncio.get_running_loop().run_in_executor(_executor(), hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password in the bounded hashing pool.
+    Verifica uma senha no pool de hashing limitado.
+    """
+    async with _limiter():
+        return await asyncio.get_running_loop().run_in_executor(
+            _executor(), verify_password, plain_password, hashed_password
+        )
+
+
+def shutdown_password_hashing() -> None:
+    """Stop the hashing pool (app shutdown) / Encerra o pool de hashing (desligamento da aplicacao)."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+
+
+def create_access_token(
+    subject: str, expires_delta: timedelta | None = None, claims: dict[str, object] | None = None
+) -> str:
     """
-    Create a JWT access token.
-    Cria um token de acesso JWT.
+    Create a JWT access token, optionally with extra claims (e.g. permission claims).
+    Cria um token de acesso JWT, opcionalmente com claims extras (ex.: claims de permissao).
     """
     now = datetime.now(UTC)
     expire = now + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode = {"sub": subject, "exp": expire, "type": "access"}
+    to_encode: dict[str, object] = {**(claims or {}), "sub": subject, "exp": expire, "type": "access"}
     encoded: str = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded
 
@@ -7,18 +7,18 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import require_permissions
+from app.core.principal import Principal
 from app.dashboard.schemas import DashboardSummaryResponse
 from app.dashboard.service import get_dashboard_summary
-from app.db.session import get_db
-from app.users.models import User
+from app.db.session import get_read_db
 
 router = APIRouter(prefix="/api/v1/dashboard", tags=["dashboard"])
 
 
 @router.get("/summary", response_model=DashboardSummaryResponse)
 async def read_dashboard_summary(
-    _current_user: User = Depends(require_permissions("championships:read", "results:read")),
-    db: AsyncSession = Depends(get_db),
+    _current_user: Principal = Depends(require_permissions("championships:read", "results:read")),
+    db: AsyncSession = Depends(get_read_db),
 ) -> DashboardSummaryResponse:
     """
     Get dashboard summary: active championships, upcoming races, and partial standings.
@@ -0,0 +1,146 @@
+"""
+Per-request SQL instrumentation: statement count, DB time and rows fetched.
+Instrumentacao SQL por requisicao: quantidade de statements, tempo de banco e linhas lidas.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Key used to stash the statement start time on the execution context
+# Chave usada para guardar o inicio do statement no contexto de execucao
+_START_KEY = "_query_stats_start"
+
+
+@dataclass
+class QueryStats:
+    """
+    Accumulated SQL activity for one unit of work (usually an HTTP request).
+    Atividade SQL acumulada para uma unidade de trabalho (geralmente uma requisicao HTTP).
+    """
+
+    queries: int = 0
+    db_time_ms: float = 0.0
+    rows: int = 0
+    # SQL text, only kept when requested / Texto SQL, guardado apenas quando solicitado
+    statements: list[str] | None = None
+
+    def server_timing(self) -> str:
+        """Render as a Server-Timing header value / Renderiza como valor do header Server-Timing."""
+        return f'db;dur={self.db_time_ms:.2f};desc="{self.queries} queries, {self.rows} rows"'
+
+    def merge(self, other: "QueryStats") -> None:
+        """Add another collector's totals / Soma os totais de outro coletor."""
+        self.queries += other.queries
+        self.db_time_ms += other.db_time_ms
+        self.rows += other.rows
+        if self.statements is not None and other.statements is not None:
+            self.statements.extend(other.statements)
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> QueryStats | None:
+    """Stats collector for the running context, if any / Coletor do contexto atual, se houver."""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(keep_statements: bool = False) -> Iterator[QueryStats]:
+    """
+    Collect stats for every statement executed inside the block on an instrumented engine.
+    With keep_statements=True the SQL text is kept as well (useful in tests).
+    Nested blocks roll their totals up into the enclosing one on exit.
+
+    Coleta estatisticas de todo statement executado dentro do bloco em uma engine instrumentada.
+    Com keep_statements=True o texto SQL tambem e guardado (util em testes).
+    Blocos aninhados somam seus totais ao bloco externo na saida.
+    """
+    parent = _current_stats.get()
+    stats = QueryStats(statements=[] if keep_statements or _keeps_statements(parent) else None)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        if parent is not None:
+            parent.merge(stats)
+
+
+def _keeps_statements(stats: QueryStats | None) -> bool:
+    """Whether a collector records SQL text / Se um coletor guarda o texto SQL."""
+    return stats is not None and stats.statements is not None
+
+
+def instrument_engine(engine: AsyncEngine | Engine) -> None:
+    """
+    Attach the counting listeners to an engine (idempotent).
+    Anexa os listeners de contagem a uma engine (idempotente).
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# --- Listeners / Listeners ---
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    """Record statement start time / Registra o inicio do statement."""
+    if context is not None and _current_stats.get() is not None:
+        setattr(context, _START_KEY, time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    """Accumulate count, elapsed time and rows / Acumula contagem, tempo e linhas."""
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    started = getattr(context, _START_KEY, None)
+    if started is not None:
+        stats.db_time_ms += (time.perf_counter() - started) * 1000
+    stats.queries += 1
+    stats.rows += _row_count(cursor)
+    if stats.statements is not None:
+        stats.statements.append(statement)
+
+
+def _row_count(cursor: Any) -> int:
+    """
+    Rows returned or affected by the statement.
+    The async adapters (asyncpg, aiosqlite) buffer SELECT results at execute time, so the
+    buffer length is exact; otherwise fall back to the DBAPI rowcount.
+
+    Linhas retornadas ou afetadas pelo statement.
+    Os adaptadores async (asyncpg, aiosqlite) carregam o resultado do SELECT na execucao, entao
+    o tamanho do buffer e exato; caso contrario usa o rowcount da DBAPI.
+    """
+    buffered = getattr(cursor, "_rows", None)
+    if buffered:
+        return len(buffered)
+    rowcount = getattr(cursor, "rowcount", -1)
+    return rowcount if isinstance(rowcount, int) and rowcount > 0 else 0
@@ -0,0 +1,74 @@
+"""
+Named loader profiles for the user, role and team models.
+Perfis de carregamento nomeados para os modelos de usuario, papel e equipe.
+
+Relationships on these models default to lazy="raise": nothing is loaded unless a query asks for it,
+and touching an unloaded relationship raises instead of issuing hidden SQL. Services pick a profile:
+Relacionamentos nestes modelos usam lazy="raise" por padrao: nada e carregado sem a query pedir, e
+acessar um relacionamento nao carregado lanca erro em vez de emitir SQL oculto. Servicos escolhem um perfil:
+
+- auth:   what permission checks need (user -> roles -> permissions) / o que as checagens de permissao usam
+- list:   columns only / apenas colunas
+- detail: the relationships the detail response serializes / os relacionamentos serializados no detalhe
+"""
+
+from typing import Any, Literal
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import QueryableAttribute, selectinload
+from sqlalchemy.sql.base import ExecutableOption
+
+from app.roles.models import Role
+from app.teams.models import Team
+from app.users.models import User
+
+LoaderProfile = Literal["auth", "list", "detail"]
+
+# Relationship chains selectin-loaded by each profile; options are built on use, after all mappers exist
+# Cadeias de relacionamentos carregadas por perfil; as opcoes sao montadas no uso, com todos os mappers prontos
+_PROFILES: dict[tuple[type, LoaderProfile], tuple[tuple[QueryableAttribute[Any], ...], ...]] = {
+    (User, "auth"): ((User.roles, Role.permissions),),
+    (User, "list"): (),
+    # User responses carry no relationships / Respostas de usuario nao tem relacionamentos
+    (User, "detail"): (),
+    (Role, "list"): (),
+    (Role, "detail"): ((Role.permissions,),),
+    (Team, "list"): (),
+    (Team, "detail"): ((Team.members,),),
+}
+
+
+def load_profile[ModelT: (User, Role, Team)](
+    model: type[ModelT], profile: LoaderProfile
+) -> tuple[ExecutableOption, ...]:
+    """
+    Loader options for a model and profile, for use with `select(...).options(*...)`.
+    Opcoes de carregamento de um modelo e perfil, para uso com `select(...).options(*...)`.
+    """
+    options: list[ExecutableOption] = []
+    for first, *rest in _PROFILES[(model, profile)]:
+        option = selectinload(first)
+        for attr in rest:
+            option = option.selectinload(attr)
+        options.append(option)
+    return tuple(options)
+
+
+async def refresh_profile[ModelT: (User, Role, Team)](
+    db: AsyncSession, instance: ModelT, profile: LoaderProfile
+) -> ModelT:
+    """
+    Reload an instance's columns and its profile's relationships (replaces `db.refresh`, which
+    skips lazy="raise" relationships).
+    Recarrega as colunas de uma instancia e os relacionamentos do perfil (substitui `db.refresh`,
+    que ignora relacionamentos lazy="raise").
+    """
+    model = type(instance)
+    await db.execute(
+        select(model)
+        .where(model.id == instance.id)
+        .options(*load_profile(model, profile))
+        .execution_options(populate_existing=True)
+    )
+    return instance
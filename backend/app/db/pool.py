@@ -0,0 +1,70 @@
+"""
+Connection pool instrumented with checkout wait time, and pool saturation stats.
+Pool de conexoes instrumentado com tempo de espera de checkout, e estatisticas de saturacao.
+"""
+
+import time
+from typing import Any
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, PoolProxiedConnection, QueuePool
+
+from app.metrics.collectors import DB_POOL_CHECKOUT_WAIT
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that observes how long each checkout takes.
+    Totals are also kept on the instance (per worker process) for /health/db.
+
+    AsyncAdaptedQueuePool que observa quanto tempo cada checkout leva.
+    Os totais tambem ficam na instancia (por processo worker) para o /health/db.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+
+    def connect(self) -> PoolProxiedConnection:
+        """Check out a connection, timing the wait / Obtem uma conexao, medindo a espera."""
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            waited = time.perf_counter() - start
+            DB_POOL_CHECKOUT_WAIT.observe(waited)
+            self.checkouts += 1
+            self.checkout_wait_total += waited
+            self.checkout_wait_max = max(self.checkout_wait_max, waited)
+
+
+def pool_stats(pool: Pool) -> dict[str, Any]:
+    """
+    Saturation snapshot of a pool; counters are None for pools that do not queue (e.g. SQLite StaticPool).
+    Retrato de saturacao de um pool; contadores sao None para pools sem fila (ex.: StaticPool do SQLite).
+    """
+    stats: dict[str, Any] = {
+        "pool_class": type(pool).__name__,
+        "size": None,
+        "checked_out": None,
+        "checked_in": None,
+        "overflow": None,
+        "checkouts": None,
+        "avg_wait_ms": None,
+        "max_wait_ms": None,
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, TimedAsyncAdaptedQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            avg_wait_ms=round(pool.checkout_wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            max_wait_ms=round(pool.checkout_wait_max * 1000, 3),
+        )
+    return stats
@@ -0,0 +1,113 @@
+"""
+Read-replica routing state: replica health and per-user read-your-writes windows.
+Estado de roteamento da replica de leitura: saude da replica e janelas read-your-writes por usuario.
+
+State is per worker process. A user whose write landed on another worker may still read from the
+replica; clients that need strict consistency send `X-Read-Primary: true`.
+O estado e por processo worker. Um usuario cuja escrita caiu em outro worker ainda pode ler da
+replica; clientes que precisam de consistencia estrita enviam `X-Read-Primary: true`.
+"""
+
+import time
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+
+from app.config import settings
+from app.core.security import decode_token
+
+# Header forcing a primary read / Header que forca leitura no primario
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+# Session.info flag set when a session issued a write / Flag em Session.info quando a sessao escreveu
+HAS_WRITES_KEY = "has_writes"
+
+# user id -> monotonic deadline of its read-your-writes window / id do usuario -> fim da janela
+_recent_writers: dict[str, float] = {}
+_replica_down_until = 0.0
+
+
+def request_user_key(request: Request) -> str | None:
+    """
+    Subject of the bearer token, without hitting the database.
+    Subject do token bearer, sem acessar o banco.
+    """
+    auth = request.headers.get("Authorization", "")
+    scheme, _, token = auth.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_token(token)
+    sub = payload.get("sub") if payload else None
+    return sub if isinstance(sub, str) else None
+
+
+def record_write(user_key: str) -> None:
+    """Open a read-your-writes window for a user / Abre uma janela read-your-writes para um usuario."""
+    now = time.monotonic()
+    _recent_writers[user_key] = now + settings.READ_YOUR_WRITES_SECONDS
+    # Drop expired windows so the map stays small / Remove janelas expiradas para o mapa ficar pequeno
+    if len(_recent_writers) > 1024:
+        for key in [k for k, deadline in _recent_writers.items() if deadline <= now]:
+            del _recent_writers[key]
+
+
+def in_write_window(user_key: str | None) -> bool:
+    """Whether a user wrote recently / Se o usuario escreveu recentemente."""
+    return user_key is not None and _recent_writers.get(user_key, 0.0) > time.monotonic()
+
+
+def mark_replica_down() -> None:
+    """Send reads to the primary for a cooldown / Envia leituras ao primario durante um intervalo."""
+    global _replica_down_until
+    _replica_down_until = time.monotonic() + settings.READ_REPLICA_RETRY_SECONDS
+
+
+def replica_available() -> bool:
+    """Whether the replica is outside its cooldown / Se a replica esta fora do intervalo de espera."""
+    return time.monotonic() >= _replica_down_until
+
+
+def wants_primary(request: Request) -> bool:
+    """
+    Whether this read must go to the primary (explicit header or the user's write window).
+    Se esta leitura deve ir ao primario (header explicito ou janela de escrita do usuario).
+    """
+    if request.headers.get(READ_PRIMARY_HEADER, "").lower() in {"1", "true", "yes"}:
+        return True
+    return in_write_window(request_user_key(request))
+
+
+def note_session_writes(session: AsyncSession, request: Request) -> None:
+    """
+    Open the caller's write window if the session wrote anything.
+    Abre a janela de escrita do usuario se a sessao gravou algo.
+    """
+    if session.sync_session.info.get(HAS_WRITES_KEY):
+        user_key = request_user_key(request)
+        if user_key is not None:
+            record_write(user_key)
+
+
+# --- Write detection / Deteccao de escrita ---
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flush(session: Session, flush_context: UOWTransaction) -> None:
+    """ORM unit-of-work writes / Escritas via unit of work do ORM."""
+    session.info[HAS_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_dml(orm_execute_state: ORMExecuteState) -> None:
+    """INSERT/UPDATE/DELETE statements run through the session / Statements DML executados pela sessao."""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[HAS_WRITES_KEY] = True
+
+
+def reset() -> None:
+    """Clear all routing state (tests) / Limpa todo o estado de roteamento (testes)."""
+    global _replica_down_until
+    _recent_writers.clear()
+    _replica_down_until = 0.0
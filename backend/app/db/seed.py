@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 
 from app.config import settings
 from app.db.base import Base  # noqa: F401
+from app.db.loaders import load_profile
 from app.roles.models import Permission, Role
 
 # System roles / Papeis do sistema
@@ -318,7 +319,9 @@ async def seed_role_permissions(session: AsyncSession) -> None:
     Popula atribuicoes de permissao a papel se nao existirem.
     """
     for role_name, codenames in ROLE_PERMISSIONS.items():
-        result = await session.execute(select(Role).where(Role.name == role_name))
+        result = await session.execute(
+            select(Role).where(Role.name == role_name).options(*load_profile(Role, "detail"))
+        )
         role = result.scalar_one_or_none()
         if role is None:
             print(f"  Role not found, skipping / Papel nao encontrado: {role_name}")
@@ -3,17 +3,63 @@ Database session management (async engine + sessionmaker).
 Gerenciamento de sessao do banco de dados (engine async + sessionmaker).
 """
 
+import uuid
 from collections.abc import AsyncGenerator
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Depends, Request
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config import settings
+from app.db import replica
+from app.db.instrumentation import instrument_engine
+from app.db.pool import TimedAsyncAdaptedQueuePool
+
+
+def _connect_args() -> dict[str, Any]:
+    """
+    asyncpg statement cache arguments. DB_STATEMENT_CACHE_SIZE sizes both SQLAlchemy's prepared statement cache
+    and asyncpg's own statement cache. At 0 (PgBouncer in transaction mode) both are off and each statement
+    gets a unique name: consecutive transactions may run on different server connections, where asyncpg's
+    sequential names would collide.
+
+    Argumentos de cache de statements do asyncpg. DB_STATEMENT_CACHE_SIZE dimensiona o cache de prepared
+    statements do SQLAlchemy e o cache proprio do asyncpg. Com 0 (PgBouncer em modo transaction) ambos ficam
+    desligados e cada statement recebe um nome unico: transacoes seguidas podem rodar em conexoes diferentes
+    do servidor, onde os nomes sequenciais do asyncpg colidiriam.
+    """
+    size = settings.DB_STATEMENT_CACHE_SIZE
+    args: dict[str, Any] = {"prepared_statement_cache_size": size, "statement_cache_size": size}
+    if size == 0:
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    return args
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    """
+    Create an async engine with the configured pool.
+    Cria uma engine async com o pool configurado.
+    """
+    new_engine = create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        future=True,
+        # Default async queue pool, plus checkout wait tracking / Pool padrao async, com medicao de espera de checkout
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args(),
+    )
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        instrument_engine(new_engine)
+    return new_engine
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-)
+
+engine = _create_engine(settings.DATABASE_URL)
 
 async_session = async_sessionmaker(
     engine,
@@ -21,14 +67,60 @@ async_session = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Optional read replica (POSTGRES_READ_HOST) / Replica de leitura opcional (POSTGRES_READ_HOST)
+read_engine: AsyncEngine | None = None
+read_async_session: async_sessionmaker[AsyncSession] | None = None
+if settings.DATABASE_READ_URL:
+    read_engine = _create_engine(settings.DATABASE_READ_URL)
+    read_async_session = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     FastAPI dependency that yields an async database session.
+    A write opens the caller's read-your-writes window, so their next replica reads hit the primary.
+
     Dependencia FastAPI que fornece uma sessao assincrona do banco de dados.
+    Uma escrita abre a janela read-your-writes do usuario, e suas proximas leituras vao ao primario.
     """
     async with async_session() as session:
         try:
             yield session
         finally:
+            replica.note_session_writes(session, request)
             await session.close()
+
+
+async def get_read_db(
+    request: Request,
+    primary: AsyncSession = Depends(get_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI dependency for read-only endpoints: a replica session when one is configured and healthy,
+    else the request's primary session (shared with auth, so no extra connection). Falls back to the
+    primary when the replica cannot be reached, and while the caller is inside a read-your-writes
+    window or sends `X-Read-Primary: true`.
+
+    Dependencia FastAPI para endpoints somente leitura: sessao na replica quando configurada e saudavel,
+    senao a sessao primaria da requisicao (compartilhada com a autenticacao, sem conexao extra). Volta ao
+    primario quando a replica esta inacessivel, e enquanto o usuario esta numa janela read-your-writes
+    ou envia `X-Read-Primary: true`.
+    """
+    if read_async_session is None or not replica.replica_available() or replica.wants_primary(request):
+        yield primary
+        return
+
+    async with read_async_session() as session:
+        try:
+            # Check out now so an unreachable replica is detected before the endpoint runs
+            # Faz o checkout agora para detectar replica inacessivel antes do endpoint rodar
+            await session.connection()
+        except (DBAPIError, OSError):
+            replica.mark_replica_down()
+        else:
+            try:
+                yield session
+            finally:
+                await session.close()
+            return
+    yield primary
@@ -0,0 +1,98 @@
+"""
+Dialect-native bulk upserts (INSERT ... ON CONFLICT) for PostgreSQL and SQLite.
+Upserts em lote nativos do dialeto (INSERT ... ON CONFLICT) para PostgreSQL e SQLite.
+"""
+
+import enum
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.base import ReadOnlyColumnCollection
+from sqlalchemy.sql.dml import Insert
+from sqlalchemy.sql.elements import KeyedColumnElement
+
+# Columns never overwritten by an upsert / Colunas nunca sobrescritas por um upsert
+_IMMUTABLE_COLUMNS = {"id", "created_at"}
+
+# Builds the SET clause from the EXCLUDED columns / Monta o SET a partir das colunas EXCLUDED
+type Excluded = ReadOnlyColumnCollection[str, KeyedColumnElement[Any]]
+type MergeValues = Callable[[Excluded], Mapping[str, object]]
+
+
+class ConflictMode(str, enum.Enum):
+    """
+    Behaviour when a bulk row hits a unique constraint.
+    Comportamento quando uma linha do lote viola uma constraint de unicidade.
+    """
+
+    update = "update"
+    ignore = "ignore"
+
+
+def upsert_statement(
+    db: AsyncSession,
+    table: Table,
+    conflict_columns: Sequence[str],
+    mode: ConflictMode,
+    merge: MergeValues | None = None,
+) -> Insert:
+    """
+    Build an INSERT ... ON CONFLICT statement for the session's dialect.
+    `update` overwrites every non-key column with the incoming value, or applies `merge(excluded)`
+    when given (e.g. to add counters); `ignore` keeps the stored row.
+
+    Monta um INSERT ... ON CONFLICT para o dialeto da sessao.
+    `update` sobrescreve toda coluna nao-chave com o valor recebido, ou aplica `merge(excluded)`
+    quando informado (ex.: somar contadores); `ignore` mantem a linha existente.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        pg_stmt = postgresql.insert(table)
+        if mode is ConflictMode.ignore:
+            return pg_stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+        return pg_stmt.on_conflict_do_update(
+            index_elements=list(conflict_columns),
+            set_=_set_clause(table, conflict_columns, pg_stmt.excluded, merge),
+        )
+    if dialect == "sqlite":
+        lite_stmt = sqlite.insert(table)
+        if mode is ConflictMode.ignore:
+            return lite_stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+        return lite_stmt.on_conflict_do_update(
+            index_elements=list(conflict_columns),
+            set_=_set_clause(table, conflict_columns, lite_stmt.excluded, merge),
+        )
+    raise NotImplementedError(f"Upsert not supported for dialect: {dialect}")
+
+
+def dedupe_rows(rows: list[dict[str, object]], key_columns: Sequence[str]) -> list[dict[str, object]]:
+    """
+    Collapse rows sharing the same key, keeping the last occurrence.
+    Postgres rejects an ON CONFLICT DO UPDATE that touches the same row twice in one statement.
+
+    Colapsa linhas com a mesma chave, mantendo a ultima ocorrencia.
+    O Postgres rejeita um ON CONFLICT DO UPDATE que afeta a mesma linha duas vezes no mesmo statement.
+    """
+    unique: dict[tuple[object, ...], dict[str, object]] = {}
+    for row in rows:
+        unique[tuple(row[col] for col in key_columns)] = row
+    return list(unique.values())
+
+
+def _set_clause(
+    table: Table,
+    conflict_columns: Sequence[str],
+    excluded: Excluded,
+    merge: MergeValues | None,
+) -> Mapping[str, object]:
+    """
+    Map every mutable column to its EXCLUDED value, unless a merge is given.
+    Mapeia cada coluna mutavel ao valor EXCLUDED, a menos que haja um merge.
+    """
+    if merge is not None:
+        return merge(excluded)
+    skip = _IMMUTABLE_COLUMNS | set(conflict_columns)
+    return {col.name: excluded[col.name] for col in table.c if col.name not in skip}
@@ -0,0 +1,33 @@
+"""
+Set-based foreign-key checks shared by the bulk write services (laps, positions, pit stops).
+Checagens de FK baseadas em conjunto compartilhadas pelos servicos de gravacao em lote (voltas, posicoes, pit stops).
+"""
+
+import uuid
+
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import NotFoundException
+from app.drivers.models import Driver
+from app.teams.models import Team
+
+
+async def validate_drivers_and_teams(db: AsyncSession, driver_ids: set[uuid.UUID], team_ids: set[uuid.UUID]) -> None:
+    """
+    Validate a batch of driver and team FKs with one set-based query.
+    Valida um lote de FKs de piloto e equipe com uma unica consulta baseada em conjunto.
+    """
+    stmt = union_all(
+        select(literal("driver").label("kind"), Driver.id.label("id")).where(Driver.id.in_(driver_ids)),
+        select(literal("team").label("kind"), Team.id.label("id")).where(Team.id.in_(team_ids)),
+    )
+    result = await db.execute(stmt)
+    found: dict[str, set[uuid.UUID]] = {"driver": set(), "team": set()}
+    for row in result.all():
+        found[row.kind].add(row.id)
+
+    if driver_ids - found["driver"]:
+        raise NotFoundException("Driver not found / Piloto nao encontrado")
+    if team_ids - found["team"]:
+        raise NotFoundException("Team not found / Equipe nao encontrada")
@@ -9,6 +9,7 @@ from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import require_permissions
+from app.core.principal import Principal
 from app.db.session import get_db
 from app.drivers.schemas import (
     DriverCreateRequest,
@@ -24,7 +25,6 @@ from app.drivers.service import (
     list_drivers,
     update_driver,
 )
-from app.users.models import User
 
 router = APIRouter(prefix="/api/v1/drivers", tags=["drivers"])
 
@@ -33,7 +33,7 @@ router = APIRouter(prefix="/api/v1/drivers", tags=["drivers"])
 async def read_drivers(
     is_active: bool | None = Query(default=None, description="Filter by active status / Filtrar por status ativo"),
     team_id: uuid.UUID | None = Query(default=None, description="Filter by team / Filtrar por equipe"),
-    _current_user: User = Depends(require_permissions("drivers:read")),
+    _current_user: Principal = Depends(require_permissions("drivers:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[DriverListResponse]:
     """
@@ -46,7 +46,7 @@ async def read_drivers(
 @router.get("/{driver_id}", response_model=DriverDetailResponse)
 async def read_driver(
     driver_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("drivers:read")),
+    _current_user: Principal = Depends(require_permissions("drivers:read")),
     db: AsyncSession = Depends(get_db),
 ) -> DriverDetailResponse:
     """
@@ -59,7 +59,7 @@ async def read_driver(
 @router.post("/", response_model=DriverResponse, status_code=201)
 async def create_new_driver(
     body: DriverCreateRequest,
-    _current_user: User = Depends(require_permissions("drivers:create")),
+    _current_user: Principal = Depends(require_permissions("drivers:create")),
     db: AsyncSession = Depends(get_db),
 ) -> DriverResponse:
     """
@@ -83,7 +83,7 @@ async def create_new_driver(
 async def update_existing_driver(
     driver_id: uuid.UUID,
     body: DriverUpdateRequest,
-    _current_user: User = Depends(require_permissions("drivers:update")),
+    _current_user: Principal = Depends(require_permissions("drivers:update")),
     db: AsyncSession = Depends(get_db),
 ) -> DriverResponse:
     """
@@ -107,7 +107,7 @@ async def update_existing_driver(
 @router.delete("/{driver_id}", status_code=204)
 async def delete_existing_driver(
     driver_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("drivers:delete")),
+    _current_user: Principal = Depends(require_permissions("drivers:delete")),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
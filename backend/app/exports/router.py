@@ -0,0 +1,94 @@
+"""
+Export API router: columnar race and championship data (Arrow IPC / Parquet).
+Router da API de exportacao: dados colunares de corridas e campeonatos (Arrow IPC / Parquet).
+"""
+
+import uuid
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_token_principal, require_permissions
+from app.core.principal import Principal
+from app.db.session import get_read_db
+from app.exports.service import (
+    DATASET_PERMISSIONS,
+    FILE_EXTENSIONS,
+    MEDIA_TYPES,
+    ExportDataset,
+    ExportFormat,
+    championship_export_statement,
+    race_export_statement,
+    stream_export,
+)
+
+router = APIRouter(tags=["exports"])
+
+_EXPORT_RESPONSES: dict[int | str, dict[str, object]] = {
+    200: {"content": {media_type: {} for media_type in MEDIA_TYPES.values()}},
+}
+
+
+async def require_dataset_permission(
+    dataset: ExportDataset,
+    current_user: Principal = Depends(get_token_principal),
+) -> Principal:
+    """
+    Require the read permission of the exported dataset (e.g. telemetry:read for laps).
+    Requer a permissao de leitura do dataset exportado (ex. telemetry:read para voltas).
+    """
+    return await require_permissions(DATASET_PERMISSIONS[dataset])(current_user)
+
+
+def _export_response(db: AsyncSession, stmt: Select[Any], export_format: ExportFormat, name: str) -> StreamingResponse:
+    """Stream the export as a file download / Transmite a exportacao como download de arquivo."""
+    body: AsyncIterator[bytes] = stream_export(db, stmt, export_format)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{FILE_EXTENSIONS[export_format]}"'},
+    )
+
+
+@router.get(
+    "/api/v1/races/{race_id}/export/{dataset}",
+    response_class=StreamingResponse,
+    responses=_EXPORT_RESPONSES,
+)
+async def export_race(
+    race_id: uuid.UUID,
+    dataset: ExportDataset,
+    format: ExportFormat = Query(default=ExportFormat.parquet, description="arrow or parquet / arrow ou parquet"),
+    _current_user: Principal = Depends(require_dataset_permission),
+    db: AsyncSession = Depends(get_read_db),
+) -> StreamingResponse:
+    """
+    Download a race's laps, positions, pit stops or events as an Arrow IPC stream or a Parquet file.
+    Baixa as voltas, posicoes, pit stops ou eventos de uma corrida como stream Arrow IPC ou arquivo Parquet.
+    """
+    stmt = await race_export_statement(db, race_id, dataset)
+    return _export_response(db, stmt, format, f"{dataset.value}_race_{race_id}")
+
+
+@router.get(
+    "/api/v1/championships/{championship_id}/export/{dataset}",
+    response_class=StreamingResponse,
+    responses=_EXPORT_RESPONSES,
+)
+async def export_championship(
+    championship_id: uuid.UUID,
+    dataset: ExportDataset,
+    format: ExportFormat = Query(default=ExportFormat.parquet, description="arrow or parquet / arrow ou parquet"),
+    _current_user: Principal = Depends(require_dataset_permission),
+    db: AsyncSession = Depends(get_read_db),
+) -> StreamingResponse:
+    """
+    Download a dataset for every race of a championship (a whole season), in round order.
+    Baixa um dataset de todas as corridas de um campeonato (uma temporada inteira), na ordem das etapas.
+    """
+    stmt = await championship_export_statement(db, championship_id, dataset)
+    return _export_response(db, stmt, format, f"{dataset.value}_championship_{championship_id}")
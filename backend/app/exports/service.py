@@ -0,0 +1,244 @@
+"""
+Columnar export business logic: race data streamed as Arrow IPC or Parquet.
+Logica de negocios de exportacao colunar: dados de corrida transmitidos como Arrow IPC ou Parquet.
+
+Rows are fetched with Core statements in chunks of EXPORT_CHUNK_ROWS (server-side cursor) and each chunk
+becomes one Arrow record batch (one Parquet row group), written out before the next chunk is fetched.
+No ORM object or pydantic model is built per row, and memory stays bounded by the chunk size.
+
+As linhas sao buscadas com statements Core em blocos de EXPORT_CHUNK_ROWS (cursor no servidor) e cada
+bloco vira um record batch Arrow (um row group Parquet), gravado antes do proximo bloco ser buscado.
+Nenhum objeto ORM ou modelo pydantic e criado por linha, e a memoria fica limitada pelo tamanho do bloco.
+"""
+
+import enum
+import io
+import uuid
+from collections.abc import AsyncIterator, Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, cast
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    Integer,
+    Select,
+    String,
+    Table,
+    Uuid,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.championships.models import Championship
+from app.config import settings
+from app.core.exceptions import NotFoundException
+from app.pitstops.models import PitStop
+from app.races.models import Race
+from app.replay.models import LapPosition, RaceEvent
+from app.telemetry.models import LapTime
+
+
+class ExportDataset(str, enum.Enum):
+    """
+    Exportable race tables.
+    Tabelas de corrida exportaveis.
+    """
+
+    laps = "laps"
+    positions = "positions"
+    pitstops = "pitstops"
+    events = "events"
+
+
+class ExportFormat(str, enum.Enum):
+    """
+    Export file format.
+    Formato do arquivo de exportacao.
+    """
+
+    arrow = "arrow"  # Arrow IPC stream / Stream Arrow IPC
+    parquet = "parquet"
+
+
+# Read permission each dataset requires / Permissao de leitura exigida por cada dataset
+DATASET_PERMISSIONS: dict[ExportDataset, str] = {
+    ExportDataset.laps: "telemetry:read",
+    ExportDataset.positions: "replay:read",
+    ExportDataset.pitstops: "pitstops:read",
+    ExportDataset.events: "replay:read",
+}
+
+MEDIA_TYPES: dict[ExportFormat, str] = {
+    ExportFormat.arrow: "application/vnd.apache.arrow.stream",
+    ExportFormat.parquet: "application/vnd.apache.parquet",
+}
+
+FILE_EXTENSIONS: dict[ExportFormat, str] = {
+    ExportFormat.arrow: "arrows",
+    ExportFormat.parquet: "parquet",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class _Source:
+    """Table of a dataset and its row order within a race / Tabela de um dataset e a ordem das linhas na corrida."""
+
+    table: Table
+    order_by: tuple[str, ...]
+
+
+_SOURCES: dict[ExportDataset, _Source] = {
+    ExportDataset.laps: _Source(cast(Table, LapTime.__table__), ("driver_id", "lap_number")),
+    ExportDataset.positions: _Source(cast(Table, LapPosition.__table__), ("lap_number", "position")),
+    ExportDataset.pitstops: _Source(cast(Table, PitStop.__table__), ("lap_number", "driver_id")),
+    ExportDataset.events: _Source(cast(Table, RaceEvent.__table__), ("lap_number", "created_at")),
+}
+
+# --- Helpers / Auxiliares ---
+
+type _Converter = Callable[[Sequence[Any]], list[Any]] | None
+
+
+def _uuid_strings(values: Sequence[Any]) -> list[str | None]:
+    """UUIDs as canonical strings / UUIDs como strings canonicas."""
+    return [None if value is None else str(value) for value in values]
+
+
+def _enum_values(values: Sequence[Any]) -> list[str | None]:
+    """Enum members as their values / Membros de enum como seus valores."""
+    return [None if value is None else value.value for value in values]
+
+
+def _arrow_column(column: Column[Any]) -> tuple[pa.Field, _Converter]:
+    """
+    Arrow field for a table column, plus the conversion its Python values need (None if pyarrow takes them as is).
+    Campo Arrow de uma coluna, mais a conversao que seus valores Python precisam (None se o pyarrow os aceita).
+    """
+    sa_type = column.type
+    converter: _Converter = None
+    if isinstance(sa_type, Uuid):
+        arrow_type = pa.string()
+        converter = _uuid_strings
+    elif isinstance(sa_type, Enum):
+        arrow_type = pa.dictionary(pa.int8(), pa.string())
+        converter = _enum_values
+    elif isinstance(sa_type, Boolean):
+        arrow_type = pa.bool_()
+    elif isinstance(sa_type, BigInteger):
+        arrow_type = pa.int64()
+    elif isinstance(sa_type, Integer):
+        arrow_type = pa.int32()
+    elif isinstance(sa_type, Float):
+        arrow_type = pa.float64()
+    elif isinstance(sa_type, DateTime):
+        arrow_type = pa.timestamp("us", tz="UTC" if sa_type.timezone else None)
+    elif isinstance(sa_type, String):  # also Text / tambem Text
+        arrow_type = pa.string()
+    else:
+        raise TypeError(f"No Arrow type for column {column.name} ({sa_type!r})")
+    return pa.field(column.name, arrow_type, nullable=bool(column.nullable)), converter
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file collecting what the Arrow/Parquet writers emit, drained after each batch.
+    Arquivo somente escrita que junta o que os writers Arrow/Parquet emitem, esvaziado apos cada batch.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        """Bytes written since the last drain / Bytes gravados desde o ultimo esvaziamento."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# --- Export services / Servicos de exportacao ---
+
+
+async def race_export_statement(db: AsyncSession, race_id: uuid.UUID, dataset: ExportDataset) -> Select[Any]:
+    """
+    Statement selecting a race's rows of a dataset. Raises NotFoundException if the race does not exist.
+    Statement que seleciona as linhas de um dataset de uma corrida. Lanca NotFoundException se nao existir.
+    """
+    if (await db.execute(select(Race.id).where(Race.id == race_id))).scalar_one_or_none() is None:
+        raise NotFoundException("Race not found / Corrida nao encontrada")
+    source = _SOURCES[dataset]
+    return (
+        select(*source.table.c)
+        .where(source.table.c.race_id == race_id)
+        .order_by(*(source.table.c[name] for name in source.order_by))
+    )
+
+
+async def championship_export_statement(
+    db: AsyncSession, championship_id: uuid.UUID, dataset: ExportDataset
+) -> Select[Any]:
+    """
+    Statement selecting a dataset's rows for every race of a championship, in round order.
+    Statement que seleciona as linhas de um dataset de todas as corridas de um campeonato, na ordem das etapas.
+    """
+    found = await db.execute(select(Championship.id).where(Championship.id == championship_id))
+    if found.scalar_one_or_none() is None:
+        raise NotFoundException("Championship not found / Campeonato nao encontrado")
+    source = _SOURCES[dataset]
+    return (
+        select(*source.table.c)
+        .join(Race, Race.id == source.table.c.race_id)
+        .where(Race.championship_id == championship_id)
+        .order_by(Race.round_number, source.table.c.race_id, *(source.table.c[name] for name in source.order_by))
+    )
+
+
+async def stream_export(
+    db: AsyncSession,
+    stmt: Select[Any],
+    export_format: ExportFormat,
+    chunk_rows: int | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Run `stmt` with a server-side cursor and yield the encoded file piece by piece, one piece per chunk.
+    Executa `stmt` com cursor no servidor e gera o arquivo codificado em partes, uma parte por bloco.
+    """
+    columns = [_arrow_column(cast(Column[Any], column)) for column in stmt.selected_columns]
+    schema = pa.schema([field for field, _ in columns])
+    sink = _ChunkSink()
+    if export_format is ExportFormat.parquet:
+        writer: Any = pq.ParquetWriter(sink, schema, compression=settings.EXPORT_PARQUET_COMPRESSION)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    result = await db.stream(stmt.execution_options(yield_per=chunk_rows or settings.EXPORT_CHUNK_ROWS))
+    async for rows in result.partitions():
+        arrays = [
+            pa.array(converter(values) if converter else values, type=field.type)
+            for (field, converter), values in zip(columns, zip(*rows, strict=True), strict=True)
+        ]
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+        yield sink.drain()
+    # Footer (Parquet) or end-of-stream marker (Arrow) / Rodape (Parquet) ou marcador de fim (Arrow)
+    writer.close()
+    yield sink.drain()
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.pool import pool_stats
 from app.db.session import get_db
+from app.health.schemas import DatabaseHealthResponse
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -20,10 +22,12 @@ async def health_check() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@router.get("/db")
-async def health_check_db(db: AsyncSession = Depends(get_db)) -> dict[str, str]:
+@router.get("/db", response_model=DatabaseHealthResponse)
+async def health_check_db(db: AsyncSession = Depends(get_db)) -> DatabaseHealthResponse:
     """
-    Database health check / Verificacao de saude do banco de dados.
+    Database health check with connection pool stats (per worker process).
+    Verificacao de saude do banco com estatisticas do pool de conexoes (por processo worker).
     """
     await db.execute(text("SELECT 1"))
-    return {"status": "ok", "database": "connected"}
+    pool = pool_stats(db.get_bind().engine.pool)
+    return {"status": "ok", "database": "connected", "pool": pool}  # type: ignore[return-value]
@@ -0,0 +1,27 @@
+"""
+Health check response schemas.
+Schemas de resposta da verificacao de saude.
+"""
+
+from pydantic import BaseModel
+
+
+class PoolStatsResponse(BaseModel):
+    """Connection pool saturation for this worker / Saturacao do pool de conexoes deste worker."""
+
+    pool_class: str
+    size: int | None
+    checked_out: int | None
+    checked_in: int | None
+    overflow: int | None
+    checkouts: int | None
+    avg_wait_ms: float | None
+    max_wait_ms: float | None
+
+
+class DatabaseHealthResponse(BaseModel):
+    """Database health with pool stats / Saude do banco com estatisticas do pool."""
+
+    status: str
+    database: str
+    pool: PoolStatsResponse
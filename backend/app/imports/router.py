@@ -0,0 +1,89 @@
+"""
+Import API router: lap times and lap positions from CSV or Parquet files.
+Router da API de importacao: tempos de volta e posicoes por volta de arquivos CSV ou Parquet.
+"""
+
+import uuid
+
+from fastapi import APIRouter, Depends, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.dependencies import get_token_principal, require_permissions
+from app.core.exceptions import ValidationException
+from app.core.principal import Principal
+from app.db.session import get_db
+from app.db.upsert import ConflictMode
+from app.imports.schemas import ImportReport
+from app.imports.service import (
+    DATASET_PERMISSIONS,
+    ImportDataset,
+    ImportFormat,
+    import_championship_file,
+    import_format_for,
+    import_race_file,
+)
+
+router = APIRouter(tags=["imports"])
+
+_ON_CONFLICT_DESCRIPTION = (
+    "Upsert (update) or skip (ignore) existing rows; by default they are reported as errors / "
+    "Atualiza (update) ou ignora (ignore) existentes; por padrao sao reportadas como erros"
+)
+
+
+async def require_dataset_permission(
+    dataset: ImportDataset,
+    current_user: Principal = Depends(get_token_principal),
+) -> Principal:
+    """
+    Require the create permission of the imported dataset (e.g. telemetry:create for laps).
+    Requer a permissao de criacao do dataset importado (ex. telemetry:create para voltas).
+    """
+    return await require_permissions(DATASET_PERMISSIONS[dataset])(current_user)
+
+
+def _upload_format(file: UploadFile, requested: ImportFormat | None) -> ImportFormat:
+    """Check the upload size and resolve its format / Verifica o tamanho do upload e resolve o formato."""
+    if file.size is not None and file.size > settings.IMPORT_MAX_SIZE_BYTES:
+        max_mb = settings.IMPORT_MAX_SIZE_BYTES / (1024 * 1024)
+        raise ValidationException(f"File too large. Maximum size: {max_mb:.0f} MB")
+    return requested or import_format_for(file.filename, file.content_type)
+
+
+@router.post("/api/v1/races/{race_id}/import/{dataset}", response_model=ImportReport)
+async def import_race(
+    race_id: uuid.UUID,
+    dataset: ImportDataset,
+    file: UploadFile,
+    format: ImportFormat | None = Query(default=None, description="csv or parquet; default from the file name"),
+    on_conflict: ConflictMode | None = Query(default=None, description=_ON_CONFLICT_DESCRIPTION),
+    _current_user: Principal = Depends(require_dataset_permission),
+    db: AsyncSession = Depends(get_db),
+) -> ImportReport:
+    """
+    Import a race's laps or positions from a CSV or Parquet file; invalid rows are listed in the report.
+    Importa voltas ou posicoes de uma corrida de um arquivo CSV ou Parquet; linhas invalidas vao no relatorio.
+    """
+    import_format = _upload_format(file, format)
+    return await import_race_file(db, race_id, dataset, file.file, import_format, on_conflict)  # type: ignore[return-value]
+
+
+@router.post("/api/v1/championships/{championship_id}/import/{dataset}", response_model=ImportReport)
+async def import_championship(
+    championship_id: uuid.UUID,
+    dataset: ImportDataset,
+    file: UploadFile,
+    format: ImportFormat | None = Query(default=None, description="csv or parquet; default from the file name"),
+    on_conflict: ConflictMode | None = Query(default=None, description=_ON_CONFLICT_DESCRIPTION),
+    _current_user: Principal = Depends(require_dataset_permission),
+    db: AsyncSession = Depends(get_db),
+) -> ImportReport:
+    """
+    Import a season file of laps or positions; each row names its race in a race_id column.
+    Importa um arquivo de temporada de voltas ou posicoes; cada linha indica sua corrida na coluna race_id.
+    """
+    import_format = _upload_format(file, format)
+    return await import_championship_file(  # type: ignore[return-value]
+        db, championship_id, dataset, file.file, import_format, on_conflict
+    )
@@ -0,0 +1,32 @@
+"""
+Import request/response schemas.
+Schemas de requisicao/resposta de importacao.
+"""
+
+from pydantic import BaseModel
+
+
+class ImportRowError(BaseModel):
+    """
+    A rejected row: 1-based data row (CSV line number minus the header) and the failing column, if any.
+    Uma linha rejeitada: linha de dados a partir de 1 (linha do CSV menos o cabecalho) e a coluna com erro, se houver.
+    """
+
+    row: int
+    field: str | None
+    message: str
+
+
+class ImportReport(BaseModel):
+    """
+    Outcome of a file import; invalid rows are reported, not fatal.
+    Resultado de uma importacao de arquivo; linhas invalidas sao reportadas, nao fatais.
+    """
+
+    dataset: str
+    rows: int  # data rows read, blank lines excluded / linhas de dados lidas, sem linhas em branco
+    imported: int  # rows inserted or updated / linhas inseridas ou atualizadas
+    skipped: int  # existing rows left as is (on_conflict=ignore) / linhas existentes mantidas
+    failed: int  # rejected rows / linhas rejeitadas
+    errors: list[ImportRowError]
+    errors_truncated: bool  # more than IMPORT_MAX_ERRORS errors / mais de IMPORT_MAX_ERRORS erros
@@ -0,0 +1,577 @@
+"""
+File import business logic: lap times and lap positions from CSV or Parquet, streamed in chunks.
+Logica de negocios de importacao: tempos de volta e posicoes por volta de CSV ou Parquet, em blocos.
+
+The file is read as Arrow record batches of up to IMPORT_CHUNK_ROWS rows. Each chunk is checked column by
+column with array operations (types, ranges, foreign keys, duplicate keys), its valid rows go straight to
+the dataset's bulk insert (one transaction per chunk, no second round of checks), and invalid rows are
+reported by row number instead of failing the file. Lap outliers are flagged once per race at the end, for
+the drivers written. Memory is bounded by the chunk size, plus 8 bytes per row for the duplicate-key check.
+
+O arquivo e lido como record batches Arrow de ate IMPORT_CHUNK_ROWS linhas. Cada bloco e verificado coluna
+a coluna com operacoes vetoriais (tipos, intervalos, chaves estrangeiras, chaves duplicadas), suas linhas
+validas vao direto ao insert em lote do dataset (uma transacao por bloco, sem segunda rodada de verificacoes)
+e as linhas invalidas sao reportadas pelo numero, sem falhar o arquivo. Voltas atipicas sao marcadas uma vez
+por corrida no final, para os pilotos gravados. A memoria fica limitada pelo bloco, mais 8 bytes por linha para as
+chaves duplicadas.
+"""
+
+import csv
+import enum
+import itertools
+import uuid
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import PurePath
+from typing import Any, BinaryIO, Literal
+
+import numpy as np
+import numpy.typing as npt
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.championships.models import Championship
+from app.config import settings
+from app.core.exceptions import NotFoundException, ValidationException
+from app.db.upsert import ConflictMode
+from app.drivers.models import Driver
+from app.races.models import Race
+from app.replay.service import insert_positions
+from app.teams.models import Team
+from app.telemetry.service import PendingOutliers, insert_lap_times
+
+
+class ImportDataset(str, enum.Enum):
+    """
+    Importable race tables.
+    Tabelas de corrida importaveis.
+    """
+
+    laps = "laps"
+    positions = "positions"
+
+
+class ImportFormat(str, enum.Enum):
+    """
+    Import file format.
+    Formato do arquivo de importacao.
+    """
+
+    csv = "csv"
+    parquet = "parquet"
+
+
+# Create permission each dataset requires / Permissao de criacao exigida por cada dataset
+DATASET_PERMISSIONS: dict[ImportDataset, str] = {
+    ImportDataset.laps: "telemetry:create",
+    ImportDataset.positions: "replay:create",
+}
+
+# Format by file extension or content type / Formato por extensao ou content type
+_FORMAT_HINTS: dict[str, ImportFormat] = {
+    ".csv": ImportFormat.csv,
+    ".parquet": ImportFormat.parquet,
+    ".pq": ImportFormat.parquet,
+    "text/csv": ImportFormat.csv,
+    "application/vnd.apache.parquet": ImportFormat.parquet,
+}
+
+# Integer columns are INTEGER (int32) / Colunas inteiras sao INTEGER (int32)
+_INT_MAX = 2**31 - 1
+
+type _Kind = Literal["uuid", "int", "bool"]
+type _Mask = npt.NDArray[np.bool_]
+type _Rows = npt.NDArray[np.int64]
+
+_TRUE = ("true", "t", "yes", "y", "1")
+_FALSE = ("false", "f", "no", "n", "0")
+
+_INVALID: dict[_Kind, str] = {
+    "uuid": "Not a UUID / Nao e um UUID",
+    "int": "Not an integer / Nao e um inteiro",
+    "bool": "Not a boolean / Nao e um booleano",
+}
+_NOT_FOUND: dict[str, str] = {
+    "race": "Race not part of this import / Corrida fora desta importacao",
+    "driver": "Driver not found / Piloto nao encontrado",
+    "team": "Team not found / Equipe nao encontrada",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class _Field:
+    """Importable column and its checks / Coluna importavel e suas verificacoes."""
+
+    name: str
+    kind: _Kind
+    required: bool = False
+    minimum: int = 0
+    default: object = None  # stored for empty cells / gravado para celulas vazias
+    references: Literal["race", "driver", "team"] | None = None
+
+
+_RACE = _Field("race_id", "uuid", references="race")
+_DRIVER = _Field("driver_id", "uuid", required=True, references="driver")
+_TEAM = _Field("team_id", "uuid", required=True, references="team")
+
+type _Writer = Callable[[AsyncSession, uuid.UUID, list[dict[str, object]], ConflictMode], Awaitable[Sequence[Any]]]
+
+_FIELDS: dict[ImportDataset, tuple[_Field, ...]] = {
+    ImportDataset.laps: (
+        _RACE,
+        _DRIVER,
+        _TEAM,
+        _Field("lap_number", "int", required=True, minimum=1),
+        _Field("lap_time_ms", "int", required=True, minimum=1),
+        _Field("sector_1_ms", "int", minimum=1),
+        _Field("sector_2_ms", "int", minimum=1),
+        _Field("sector_3_ms", "int", minimum=1),
+        _Field("is_valid", "bool", default=True),
+    ),
+    ImportDataset.positions: (
+        _RACE,
+        _DRIVER,
+        _TEAM,
+        _Field("lap_number", "int", required=True),
+        _Field("position", "int", required=True, minimum=1),
+        _Field("gap_to_leader_ms", "int"),
+        _Field("interval_ms", "int"),
+    ),
+}
+
+# Rows reach these already validated by the chunk checks / As linhas chegam ja validadas pelo bloco
+_WRITERS: dict[ImportDataset, _Writer] = {
+    ImportDataset.laps: partial(insert_lap_times, flag_outliers=False),
+    ImportDataset.positions: insert_positions,
+}
+
+# --- Column parsing / Leitura de colunas ---
+
+
+@dataclass(slots=True)
+class _Column:
+    """
+    A parsed chunk column. UUID columns hold codes into `ids` (-1 when empty).
+    Uma coluna lida de um bloco. Colunas UUID guardam codigos em `ids` (-1 quando vazia).
+    """
+
+    values: npt.NDArray[Any]
+    missing: _Mask
+    invalid: _Mask
+    ids: list[uuid.UUID | None] = field(default_factory=list)
+
+    def take(self, keep: _Mask) -> "_Column":
+        return _Column(self.values[keep], self.missing[keep], self.invalid[keep], self.ids)
+
+    def objects(self, default: object) -> npt.NDArray[np.object_]:
+        """Python values, `default` for empty cells / Valores Python, `default` para celulas vazias."""
+        values: npt.NDArray[np.object_]
+        if self.ids:
+            values = np.array([*self.ids, default], dtype=object)[self.values]
+            return values
+        values = self.values.astype(object)
+        values[self.missing] = default
+        return values
+
+
+def _as_uuid(text: str | None) -> uuid.UUID | None:
+    try:
+        return None if text is None else uuid.UUID(text)
+    except ValueError:
+        return None
+
+
+def _text(array: pa.Array) -> pa.Array:
+    """Trimmed text, empty cells as nulls / Texto sem espacos nas pontas, celulas vazias como nulos."""
+    text = pc.utf8_trim_whitespace(array.cast(pa.string()))
+    return pc.if_else(pc.equal(text, ""), pa.scalar(None, pa.string()), text)
+
+
+def _is_text(array: pa.Array) -> bool:
+    return bool(pa.types.is_string(array.type) or pa.types.is_large_string(array.type))
+
+
+def _to_numpy(array: pa.Array, fill: object) -> npt.NDArray[Any]:
+    return np.asarray(array.fill_null(fill).to_numpy(zero_copy_only=False))
+
+
+def _parse(column: _Field, array: pa.Array) -> _Column:
+    """
+    Parse one column of a chunk without a per-row Python loop. Raises ValidationException for column types
+    that can never hold the field (e.g. floats in a UUID column).
+    Le uma coluna de um bloco sem laco Python por linha. Lanca ValidationException para tipos de coluna que
+    nunca servem ao campo (ex. floats em uma coluna UUID).
+    """
+    if pa.types.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    if pa.types.is_null(array.type):
+        array = array.cast(pa.string())
+    n = len(array)
+    no_rows: _Mask = np.zeros(n, dtype=np.bool_)
+
+    if column.kind == "uuid" and _is_text(array):
+        encoded = pc.dictionary_encode(_text(array))
+        codes = _to_numpy(encoded.indices, -1).astype(np.intp)
+        ids = [_as_uuid(text) for text in encoded.dictionary.to_pylist()]
+        bad_ids = np.array([parsed is None for parsed in ids] + [False])
+        return _Column(codes, codes < 0, bad_ids[codes], ids)
+
+    if column.kind == "int" and _is_text(array):
+        text = _text(array)
+        missing = _to_numpy(text.is_null(), False)
+        digits = pc.match_substring_regex(text, r"^[+-]?\d{1,10}$")
+        values = _to_numpy(pc.if_else(digits, text, pa.scalar(None, pa.string())).cast(pa.int64()), 0)
+        return _Column(values, missing, ~missing & ~_to_numpy(digits, False))
+    if column.kind == "int" and pa.types.is_integer(array.type):
+        return _Column(_to_numpy(array.cast(pa.int64()), 0), _to_numpy(array.is_null(), False), no_rows)
+    if column.kind == "int" and pa.types.is_floating(array.type):
+        # e.g. pandas int columns with NaN / ex. colunas inteiras do pandas com NaN
+        raw = _to_numpy(array, np.nan).astype(np.float64)
+        missing = np.isnan(raw)
+        invalid = ~missing & ((np.abs(raw) > _INT_MAX + 1) | (raw != np.trunc(raw)) | np.isinf(raw))
+        return _Column(np.where(missing | invalid, 0, raw).astype(np.int64), missing, invalid)
+
+    if column.kind == "bool" and _is_text(array):
+        text = pc.utf8_lower(_text(array))
+        missing = _to_numpy(text.is_null(), False)
+        truthy = _to_numpy(pc.is_in(text, pa.array(_TRUE)), False)
+        falsy = _to_numpy(pc.is_in(text, pa.array(_FALSE)), False)
+        return _Column(truthy, missing, ~missing & ~truthy & ~falsy)
+    if column.kind == "bool" and pa.types.is_boolean(array.type):
+        return _Column(_to_numpy(array, False), _to_numpy(array.is_null(), False), no_rows)
+    if column.kind == "bool" and pa.types.is_integer(array.type):
+        values = _to_numpy(array.cast(pa.int64()), 0)
+        missing = _to_numpy(array.is_null(), False)
+        return _Column(values == 1, missing, ~missing & (values != 0) & (values != 1))
+
+    raise ValidationException(f"Column {column.name} has unsupported type {array.type} / Tipo de coluna nao suportado")
+
+
+# --- File readers / Leitores de arquivo ---
+
+type _Chunks = Iterator[tuple[pa.RecordBatch, _Rows]]
+
+
+def import_format_for(filename: str | None, content_type: str | None) -> ImportFormat:
+    """
+    Format from the file extension, then the content type. Raises ValidationException if neither is known.
+    Formato pela extensao do arquivo, depois pelo content type. Lanca ValidationException se nenhum for conhecido.
+    """
+    hint = _FORMAT_HINTS.get(PurePath(filename or "").suffix.lower()) or _FORMAT_HINTS.get(content_type or "")
+    if hint is None:
+        raise ValidationException(
+            "Unknown file format, use .csv or .parquet / Formato desconhecido, use .csv ou .parquet"
+        )
+    return hint
+
+
+# --- Import / Importacao ---
+
+
+class _Import:
+    """
+    One running import: counters, reported errors and the state kept across chunks.
+    Uma importacao em andamento: contadores, erros reportados e o estado mantido entre blocos.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        dataset: ImportDataset,
+        race_ids: set[uuid.UUID],
+        default_race_id: uuid.UUID | None,
+        on_conflict: ConflictMode | None,
+    ) -> None:
+        self.db = db
+        self.dataset = dataset
+        self.fields = _FIELDS[dataset]
+        self.race_ids = race_ids
+        # Race of rows without a race_id; championship imports require the column
+        # Corrida das linhas sem race_id; importacoes de campeonato exigem a coluna
+        self.default_race_id = default_race_id
+        self.on_conflict = on_conflict
+        self.required = {f.name for f in self.fields if f.required or (f is _RACE and default_race_id is None)}
+        self.rows = self.imported = self.skipped = self.failed = 0
+        self.errors: list[dict[str, Any]] = []
+        self.errors_truncated = False
+        self._exists: dict[str, dict[uuid.UUID, bool]] = {"driver": {}, "team": {}}
+        # Small codes for race/driver ids and the sorted (driver, lap) keys seen per race, for the duplicate check
+        # Codigos pequenos para ids de corrida/piloto e as chaves (piloto, volta) vistas por corrida, para duplicatas
+        self._codes: dict[str, dict[uuid.UUID | None, int]] = {"race": {}, "driver": {}}
+        self._seen: dict[int, _Rows] = {}
+        # Drivers with written laps per race, flagged once at the end / Pilotos com voltas gravadas, avaliados no final
+        self._outliers = PendingOutliers()
+
+    def report(self) -> dict[str, object]:
+        return {
+            "dataset": self.dataset.value,
+            "rows": self.rows,
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+            "errors_truncated": self.errors_truncated,
+        }
+
+    def _reject(self, rows: _Rows, column: str | None, message: str) -> None:
+        room = settings.IMPORT_MAX_ERRORS - len(self.errors)
+        if len(rows) > room:
+            self.errors_truncated = True
+        self.errors.extend({"row": int(row), "field": column, "message": message} for row in rows[: max(room, 0)])
+
+    def _check_columns(self, names: Sequence[str]) -> list[str]:
+        """Known columns present in the file; 422 if a required one is missing / Colunas conhecidas no arquivo."""
+        if len(set(names)) != len(names):
+            raise ValidationException("Duplicate column names / Nomes de coluna duplicados")
+        missing = sorted(self.required - set(names))
+        if missing:
+            raise ValidationException(f"Missing columns: {', '.join(missing)} / Colunas ausentes")
+        return [f.name for f in self.fields if f.name in names]
+
+    # --- Readers / Leitores ---
+
+    def _csv_chunks(self, source: BinaryIO) -> _Chunks:
+        """
+        Parse IMPORT_CHUNK_ROWS lines at a time. The file is fed to the parser by this loop, since pyarrow's
+        streaming reader reads ahead of a slow consumer, up to the whole file.
+        Le IMPORT_CHUNK_ROWS linhas por vez. O arquivo e entregue ao parser por este laco, pois o leitor em
+        streaming do pyarrow le adiante de um consumidor lento, ate o arquivo inteiro.
+        """
+        header = next(csv.reader([source.readline().decode("utf-8-sig", errors="replace")]), [])
+        header = [name.strip() for name in header]
+        columns = self._check_columns(header)
+        invalid: list[tuple[int, str]] = []
+
+        def on_invalid_row(row: Any) -> str:
+            # Wrong column count: report the row and keep reading / Numero de colunas errado: reporta e segue
+            message = f"Expected {row.expected_columns} columns, got {row.actual_columns} / Numero de colunas incorreto"
+            invalid.append((row.number, message))
+            return "skip"
+
+        read_options = pa_csv.ReadOptions(column_names=header, use_threads=False)
+        # Blank lines become empty rows, so every line is a row or an invalid row
+        # Linhas em branco viram linhas vazias, assim cada linha e uma linha valida ou invalida
+        parse_options = pa_csv.ParseOptions(invalid_row_handler=on_invalid_row, ignore_empty_lines=False)
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=columns, column_types=dict.fromkeys(columns, pa.string())
+        )
+        first = 1
+        while lines := list(itertools.islice(source, settings.IMPORT_CHUNK_ROWS)):
+            invalid.clear()
+            try:
+                table = pa_csv.read_csv(
+                    pa.py_buffer(b"".join(lines)),
+                    read_options=read_options,
+                    parse_options=parse_options,
+                    convert_options=convert_options,
+                )
+            except pa.ArrowInvalid as err:
+                raise ValidationException(f"Unreadable CSV from row {first}: {err} / CSV ilegivel") from err
+            if table.num_rows + len(invalid) != len(lines):
+                raise ValidationException(f"Unsupported line breaks from row {first} / Quebras de linha nao suportadas")
+            numbers = np.arange(first, first + len(lines))
+            first += len(lines)
+            if invalid:
+                self.rows += len(invalid)
+                self.failed += len(invalid)
+                for number, message in invalid:
+                    self._reject(numbers[number - 1 : number], None, message)
+                numbers = np.delete(numbers, [number - 1 for number, _ in invalid])
+            offset = 0
+            for batch in table.to_batches():
+                yield batch, numbers[offset : offset + batch.num_rows]
+                offset += batch.num_rows
+
+    def _parquet_chunks(self, source: BinaryIO) -> _Chunks:
+        try:
+            parquet = pq.ParquetFile(source)
+        except pa.ArrowInvalid as err:
+            raise ValidationException("Not a Parquet file / Nao e um arquivo Parquet") from err
+        columns = self._check_columns(parquet.schema_arrow.names)
+        first = 1
+        for batch in parquet.iter_batches(batch_size=settings.IMPORT_CHUNK_ROWS, columns=columns):
+            yield batch, np.arange(first, first + batch.num_rows)
+            first += batch.num_rows
+
+    # --- Chunk / Bloco ---
+
+    def _codes_of(self, kind: str, column: _Column | None, default: uuid.UUID | None, n: int) -> _Rows:
+        """Small integer code per row of a UUID column, `default` for empty cells / Codigo inteiro por linha."""
+        codes = self._codes[kind]
+        ids = column.ids if column is not None else []
+        lookup = np.array([codes.setdefault(value, len(codes)) for value in [*ids, default]], dtype=np.int64)
+        return lookup[column.values] if column is not None else np.full(n, lookup[-1])
+
+    async def _unknown_ids(self, reference: str, column: _Column) -> npt.NDArray[np.bool_]:
+        """Per id of the chunk dictionary: not found / Por id do dicionario do bloco: nao encontrado."""
+        if reference == "race":
+            return np.array([value is not None and value not in self.race_ids for value in column.ids] + [False])
+        known = self._exists[reference]
+        new_ids = {value for value in column.ids if value is not None and value not in known}
+        if new_ids:
+            model = Driver if reference == "driver" else Team
+            found = set((await self.db.execute(select(model.id).where(model.id.in_(new_ids)))).scalars())
+            known.update((new_id, new_id in found) for new_id in new_ids)
+        return np.array([value is not None and not known[value] for value in column.ids] + [False])
+
+    async def add_chunk(self, batch: pa.RecordBatch, rows: _Rows) -> None:
+        """Validate a chunk, write its valid rows, report the rest / Valida um bloco, grava as linhas validas."""
+        names = batch.schema.names
+        present = [f for f in self.fields if f.name in names]
+        parsed = {f.name: _parse(f, batch.column(f.name)) for f in present}
+        # Blank lines are not rows / Linhas em branco nao sao linhas
+        blank = np.logical_and.reduce([column.missing for column in parsed.values()])
+        if blank.any():
+            parsed = {name: column.take(~blank) for name, column in parsed.items()}
+            rows = rows[~blank]
+        if not len(rows):
+            return
+        self.rows += len(rows)
+
+        failed = np.zeros(len(rows), dtype=np.bool_)
+        for f in present:
+            column = parsed[f.name]
+            checks = [
+                (column.missing & (f.name in self.required), "Required / Obrigatorio"),
+                (column.invalid, _INVALID[f.kind]),
+            ]
+            if f.kind == "int":
+                out_of_range = ~column.missing & ~column.invalid
+                out_of_range &= (column.values < f.minimum) | (column.values > _INT_MAX)
+                checks.append((out_of_range, f"Out of range ({f.minimum} to {_INT_MAX}) / Fora do intervalo"))
+            if f.references is not None:
+                unknown = await self._unknown_ids(f.references, column)
+                checks.append((unknown[column.values], _NOT_FOUND[f.references]))
+            for mask, message in checks:
+                if mask.any():
+                    self._reject(rows[mask], f.name, message)
+                    failed |= mask
+
+        # Duplicate (race, driver, lap) keys in the file; the first occurrence wins
+        # Chaves (corrida, piloto, volta) duplicadas no arquivo; a primeira ocorrencia vale
+        values = {f.name: parsed[f.name].objects(self.default_race_id if f is _RACE else f.default) for f in present}
+        if _RACE.name in values:
+            race_ids = values.pop(_RACE.name)
+        else:
+            race_ids = np.full(len(rows), self.default_race_id, dtype=object)
+        candidates = np.flatnonzero(~failed)
+        race_codes = self._codes_of("race", parsed.get(_RACE.name), self.default_race_id, len(rows))[candidates]
+        # driver code < 2**32, lap number < 2**31 / codigo do piloto < 2**32, volta < 2**31
+        keys = self._codes_of("driver", parsed["driver_id"], None, len(rows))[candidates] << 31
+        keys |= parsed["lap_number"].values[candidates]
+        duplicate = np.ones(len(candidates), dtype=np.bool_)
+        for race_code in np.unique(race_codes):
+            in_race = np.flatnonzero(race_codes == race_code)
+            race_keys, first = np.unique(keys[in_race], return_index=True)
+            seen = self._seen.get(int(race_code), np.empty(0, dtype=np.int64))
+            duplicate[in_race[first]] = np.isin(race_keys, seen, assume_unique=True)
+            self._seen[int(race_code)] = np.union1d(seen, race_keys)
+        if duplicate.any():
+            self._reject(rows[candidates[duplicate]], None, "Duplicate driver/lap in file / Piloto/volta duplicado")
+            failed[candidates[duplicate]] = True
+        self.failed += int(failed.sum())
+
+        await self._write(np.flatnonzero(~failed), rows, race_ids, values)
+
+    async def _write(
+        self,
+        accepted: npt.NDArray[np.intp],
+        rows: _Rows,
+        race_ids: npt.NDArray[np.object_],
+        values: dict[str, npt.NDArray[np.object_]],
+    ) -> None:
+        """One bulk insert per race of the chunk / Um insert em lote por corrida do bloco."""
+        names = list(values)
+        by_race: dict[uuid.UUID, list[dict[str, object]]] = defaultdict(list)
+        row_of: dict[tuple[object, ...], int] = {}
+        for row, race_id, *row_values in zip(
+            rows[accepted].tolist(), race_ids[accepted], *(values[name][accepted] for name in names), strict=True
+        ):
+            data = dict(zip(names, row_values, strict=True))
+            by_race[race_id].append(data)
+            row_of[(race_id, data["driver_id"], data["lap_number"])] = row
+
+        write = _WRITERS[self.dataset]
+        for race_id, race_rows in by_race.items():
+            written = await write(self.db, race_id, race_rows, self.on_conflict or ConflictMode.ignore)
+            self.imported += len(written)
+            if self.dataset is ImportDataset.laps:
+                self._outliers.add(race_id, (w["driver_id"] for w in map(_mapping, written)))
+            if len(written) == len(race_rows):
+                continue
+            if self.on_conflict is ConflictMode.ignore:
+                self.skipped += len(race_rows) - len(written)
+                continue
+            # No on_conflict: existing rows are errors, as the 409 of the JSON bulk endpoints
+            # Sem on_conflict: linhas existentes sao erros, como o 409 dos endpoints JSON em lote
+            done = {(race_id, w["driver_id"], w["lap_number"]) for w in map(_mapping, written)}
+            existing = np.array(sorted(row_of[key] for key in row_of.keys() - done if key[0] == race_id))
+            self.failed += len(existing)
+            self._reject(existing, None, "Already exists / Ja existe")
+
+    async def run(self, source: BinaryIO, import_format: ImportFormat) -> dict[str, object]:
+        chunks = self._csv_chunks(source) if import_format is ImportFormat.csv else self._parquet_chunks(source)
+        try:
+            for batch, rows in chunks:
+                await self.add_chunk(batch, rows)
+        except ValidationException:
+            # Chunks before a fatal file error stay imported / Blocos anteriores a um erro fatal ficam
+            await self._outliers.flag(self.db, force=True)
+            raise
+        await self._outliers.flag(self.db, force=True)
+        return self.report()
+
+
+def _mapping(row: Any) -> Mapping[str, Any]:
+    return row if isinstance(row, Mapping) else row._mapping
+
+
+# --- Import services / Servicos de importacao ---
+
+
+async def import_race_file(
+    db: AsyncSession,
+    race_id: uuid.UUID,
+    dataset: ImportDataset,
+    source: BinaryIO,
+    import_format: ImportFormat,
+    on_conflict: ConflictMode | None = None,
+) -> dict[str, object]:
+    """
+    Import a race's laps or positions from a CSV/Parquet file. A race_id column is optional and must match.
+    Without on_conflict, rows that already exist are reported as errors; with it, they are upserted (update)
+    or skipped (ignore). Each chunk commits on its own, so rows of chunks before a fatal error stay imported.
+
+    Importa voltas ou posicoes de uma corrida de um arquivo CSV/Parquet. A coluna race_id e opcional e deve
+    coincidir. Sem on_conflict, linhas existentes sao reportadas como erros; com ele, sao atualizadas (update)
+    ou ignoradas (ignore). Cada bloco faz seu proprio commit, entao blocos anteriores a um erro fatal ficam.
+    """
+    if (await db.execute(select(Race.id).where(Race.id == race_id))).scalar_one_or_none() is None:
+        raise NotFoundException("Race not found / Corrida nao encontrada")
+    return await _Import(db, dataset, {race_id}, race_id, on_conflict).run(source, import_format)
+
+
+async def import_championship_file(
+    db: AsyncSession,
+    championship_id: uuid.UUID,
+    dataset: ImportDataset,
+    source: BinaryIO,
+    import_format: ImportFormat,
+    on_conflict: ConflictMode | None = None,
+) -> dict[str, object]:
+    """
+    Import a season file: like import_race_file, with a required race_id column naming a championship race.
+    Importa um arquivo de temporada: como import_race_file, com coluna race_id obrigatoria de uma corrida do
+    campeonato.
+    """
+    found = await db.execute(select(Championship.id).where(Championship.id == championship_id))
+    if found.scalar_one_or_none() is None:
+        raise NotFoundException("Championship not found / Campeonato nao encontrado")
+    race_ids = set((await db.execute(select(Race.id).where(Race.championship_id == championship_id))).scalars())
+    return await _Import(db, dataset, race_ids, None, on_conflict).run(source, import_format)
@@ -3,6 +3,7 @@ FastAPI application factory.
 Fabrica da aplicacao FastAPI.
 """
 
+import os
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -10,14 +11,21 @@ from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from prometheus_client import multiprocess
 
 from app.auth.router import router as auth_router
 from app.calendar.router import router as calendar_router
 from app.championships.router import router as championships_router
 from app.config import settings
+from app.core.middleware import QueryStatsMiddleware
+from app.core.security import shutdown_password_hashing
 from app.dashboard.router import router as dashboard_router
 from app.drivers.router import router as drivers_router
+from app.exports.router import router as exports_router
 from app.health.router import router as health_router
+from app.imports.router import router as imports_router
+from app.metrics.middleware import PrometheusMiddleware
+from app.metrics.router import router as metrics_router
 from app.notifications.router import router as notifications_router
 from app.pitstops.router import router as pitstops_router
 from app.races.router import router as races_router
@@ -26,6 +34,7 @@ from app.results.router import router as results_router
 from app.roles.router import permissions_router, roles_router, user_roles_router
 from app.teams.router import router as teams_router
 from app.telemetry.router import router as telemetry_router
+from app.telemetry.write_behind import lap_write_behind
 from app.uploads.router import router as uploads_router
 from app.users.router import router as users_router
 
@@ -39,7 +48,12 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     # Startup: create uploads directory / Inicializacao: criar diretorio de uploads
     Path(settings.UPLOAD_DIR).mkdir(exist_ok=True)
     yield
-    # Shutdown / Encerramento
+    # Shutdown: write acknowledged live laps before exiting / Encerramento: grava voltas ao vivo confirmadas
+    await lap_write_behind.close()
+    shutdown_password_hashing()
+    # Shutdown: drop this worker's live gauges / Encerramento: remove gauges deste worker
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
 
 
 def create_app() -> FastAPI:
@@ -61,10 +75,26 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Server-Timing", "X-DB-Queries"],
     )
 
+    # SQL instrumentation: per-request query count and DB time
+    # Instrumentacao SQL: contagem de queries e tempo de banco por requisicao
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        app.add_middleware(
+            QueryStatsMiddleware,
+            query_budget=settings.SQL_QUERY_BUDGET,
+            time_budget_ms=settings.SQL_TIME_BUDGET_MS,
+        )
+
+    # Prometheus request metrics / Metricas de requisicao do Prometheus
+    if settings.METRICS_ENABLED:
+        app.add_middleware(PrometheusMiddleware)
+
     # Routers
     app.include_router(health_router)
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics_router)
     app.include_router(auth_router)
     app.include_router(users_router)
     app.include_router(permissions_router)
@@ -82,6 +112,8 @@ def create_app() -> FastAPI:
     app.include_router(telemetry_router)
     app.include_router(pitstops_router)
     app.include_router(replay_router)
+    app.include_router(exports_router)
+    app.include_router(imports_router)
 
     # Static files: serve uploaded images / Arquivos estaticos: servir imagens enviadas
     upload_path = Path(settings.UPLOAD_DIR)
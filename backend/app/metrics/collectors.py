@@ -0,0 +1,61 @@
+"""
+Prometheus metric definitions.
+Definicoes de metricas Prometheus.
+
+When PROMETHEUS_MULTIPROC_DIR is set (one process per uvicorn worker), every worker writes its
+samples to that directory and /metrics aggregates them; gauges use `livesum` so dead workers drop out.
+
+Quando PROMETHEUS_MULTIPROC_DIR esta definido (um processo por worker do uvicorn), cada worker grava
+suas amostras nesse diretorio e /metrics agrega todas; gauges usam `livesum` para ignorar workers mortos.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Latency buckets in seconds / Buckets de latencia em segundos
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Response size buckets in bytes / Buckets de tamanho de resposta em bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "HTTP response body size by route template",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+HTTP_REQUESTS_TOTAL = Counter(
+    "http_requests",
+    "HTTP requests served by route template",
+    ["method", "route", "status"],
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled DB connection (includes connecting when the pool is empty)",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections",
+    "Open notification WebSocket connections",
+    multiprocess_mode="livesum",
+)
+LIVE_LAPS_PENDING = Gauge(
+    "live_laps_pending",
+    "Live-ingest laps acknowledged but not yet written",
+    multiprocess_mode="livesum",
+)
+LIVE_LAPS_FLUSHED = Counter(
+    "live_laps_flushed",
+    "Live-ingest laps by flush outcome (written, skipped, dropped)",
+    ["outcome"],
+)
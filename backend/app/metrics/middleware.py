@@ -0,0 +1,67 @@
+"""
+ASGI middleware recording Prometheus request metrics.
+Middleware ASGI que registra metricas Prometheus de requisicoes.
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics.collectors import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_PROGRESS,
+    HTTP_REQUESTS_TOTAL,
+    HTTP_RESPONSE_SIZE,
+)
+
+# Label for requests that matched no route (keeps label cardinality bounded)
+# Label para requisicoes sem rota (mantem a cardinalidade dos labels limitada)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class PrometheusMiddleware:
+    """
+    Record latency, in-flight count and response size per route template.
+    Registra latencia, requisicoes em andamento e tamanho da resposta por template de rota.
+    """
+
+    def __init__(self, app: ASGIApp, skip_paths: frozenset[str] = frozenset({"/metrics"})) -> None:
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            route = _route_template(scope)
+            HTTP_REQUEST_DURATION.labels(method, route, str(status)).observe(elapsed)
+            HTTP_REQUESTS_TOTAL.labels(method, route, str(status)).inc()
+            HTTP_RESPONSE_SIZE.labels(method, route).observe(size)
+
+
+def _route_template(scope: Scope) -> str:
+    """Matched route path template, e.g. /api/v1/races/{race_id} / Template da rota casada."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if isinstance(path, str) else UNMATCHED_ROUTE
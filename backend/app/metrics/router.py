@@ -0,0 +1,32 @@
+"""
+Prometheus scrape endpoint.
+Endpoint de coleta do Prometheus.
+"""
+
+import os
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+
+router = APIRouter(tags=["metrics"])
+
+
+def _registry() -> CollectorRegistry:
+    """
+    Registry to expose: a fresh multiprocess aggregate when workers share a directory, else the default one.
+    Registry a expor: um agregado multiprocesso quando os workers compartilham um diretorio, senao o padrao.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+        return registry
+    return REGISTRY
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Expose metrics in the Prometheus text format.
+    Expoe metricas no formato texto do Prometheus.
+    """
+    return Response(content=generate_latest(_registry()), media_type=CONTENT_TYPE_LATEST)
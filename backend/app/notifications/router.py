@@ -10,6 +10,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import get_current_active_user, require_permissions
+from app.core.principal import Principal
 from app.core.security import decode_token
 from app.db.session import async_session as get_async_session
 from app.db.session import get_db
@@ -148,7 +149,7 @@ async def delete_own_notification(
 @router.post("/", response_model=list[NotificationResponse], status_code=201)
 async def create_new_notification(
     body: NotificationCreateRequest,
-    _current_user: User = Depends(require_permissions("notifications:create")),
+    _current_user: Principal = Depends(require_permissions("notifications:create")),
     db: AsyncSession = Depends(get_db),
 ) -> list[NotificationResponse]:
     """
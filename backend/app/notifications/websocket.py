@@ -8,6 +8,8 @@ from collections import defaultdict
 
 from fastapi import WebSocket
 
+from app.metrics.collectors import WEBSOCKET_CONNECTIONS
+
 
 class ConnectionManager:
     """
@@ -25,6 +27,7 @@ class ConnectionManager:
         """
         await websocket.accept()
         self._connections[user_id].append(websocket)
+        WEBSOCKET_CONNECTIONS.inc()
 
     def disconnect(self, user_id: uuid.UUID, websocket: WebSocket) -> None:
         """
@@ -34,6 +37,7 @@ class ConnectionManager:
         conns = self._connections.get(user_id, [])
         if websocket in conns:
             conns.remove(websocket)
+            WEBSOCKET_CONNECTIONS.dec()
         if not conns and user_id in self._connections:
             del self._connections[user_id]
 
@@ -9,8 +9,11 @@ from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import require_permissions
+from app.core.principal import Principal
 from app.db.session import get_db
+from app.db.upsert import ConflictMode
 from app.pitstops.schemas import (
+    PitStopBulkCreateRequest,
     PitStopCreateRequest,
     PitStopDetailResponse,
     PitStopResponse,
@@ -22,6 +25,7 @@ from app.pitstops.schemas import (
     RaceStrategyUpdateRequest,
 )
 from app.pitstops.service import (
+    bulk_create_pit_stops,
     create_pit_stop,
     create_strategy,
     delete_pit_stop,
@@ -34,7 +38,6 @@ from app.pitstops.service import (
     update_pit_stop,
     update_strategy,
 )
-from app.users.models import User
 
 router = APIRouter(tags=["pitstops"])
 
@@ -47,7 +50,7 @@ async def read_pit_stops(
     race_id: uuid.UUID,
     driver_id: uuid.UUID | None = Query(default=None, description="Filter by driver / Filtrar por piloto"),
     team_id: uuid.UUID | None = Query(default=None, description="Filter by team / Filtrar por equipe"),
-    _current_user: User = Depends(require_permissions("pitstops:read")),
+    _current_user: Principal = Depends(require_permissions("pitstops:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[PitStopResponse]:
     """
@@ -61,7 +64,7 @@ async def read_pit_stops(
 async def create_new_pit_stop(
     race_id: uuid.UUID,
     body: PitStopCreateRequest,
-    _current_user: User = Depends(require_permissions("pitstops:create")),
+    _current_user: Principal = Depends(require_permissions("pitstops:create")),
     db: AsyncSession = Depends(get_db),
 ) -> PitStopResponse:
     """
@@ -81,10 +84,29 @@ async def create_new_pit_stop(
     )
 
 
+@router.post("/api/v1/races/{race_id}/pitstops/bulk", response_model=list[PitStopResponse], status_code=201)
+async def bulk_create_new_pit_stops(
+    race_id: uuid.UUID,
+    body: PitStopBulkCreateRequest,
+    on_conflict: ConflictMode | None = Query(
+        default=None,
+        description="Upsert (update) or skip (ignore) existing pit stops / Atualiza ou ignora existentes",
+    ),
+    _current_user: Principal = Depends(require_permissions("pitstops:create")),
+    db: AsyncSession = Depends(get_db),
+) -> list[PitStopResponse]:
+    """
+    Bulk create pit stops, optionally upserting existing ones.
+    Cria pit stops em lote, opcionalmente com upsert.
+    """
+    pit_stops_data = [p.model_dump() for p in body.pit_stops]
+    return await bulk_create_pit_stops(db, race_id, pit_stops_data, on_conflict=on_conflict)  # type: ignore[return-value]
+
+
 @router.get("/api/v1/races/{race_id}/pitstops/summary", response_model=PitStopSummaryResponse)
 async def read_pit_stop_summary(
     race_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("pitstops:read")),
+    _current_user: Principal = Depends(require_permissions("pitstops:read")),
     db: AsyncSession = Depends(get_db),
 ) -> PitStopSummaryResponse:
     """
@@ -97,7 +119,7 @@ async def read_pit_stop_summary(
 @router.get("/api/v1/pitstops/{pit_stop_id}", response_model=PitStopDetailResponse)
 async def read_pit_stop(
     pit_stop_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("pitstops:read")),
+    _current_user: Principal = Depends(require_permissions("pitstops:read")),
     db: AsyncSession = Depends(get_db),
 ) -> PitStopDetailResponse:
     """
@@ -111,7 +133,7 @@ async def read_pit_stop(
 async def update_existing_pit_stop(
     pit_stop_id: uuid.UUID,
     body: PitStopUpdateRequest,
-    _current_user: User = Depends(require_permissions("pitstops:update")),
+    _current_user: Principal = Depends(require_permissions("pitstops:update")),
     db: AsyncSession = Depends(get_db),
 ) -> PitStopResponse:
     """
@@ -132,7 +154,7 @@ async def update_existing_pit_stop(
 @router.delete("/api/v1/pitstops/{pit_stop_id}", status_code=204)
 async def delete_existing_pit_stop(
     pit_stop_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("pitstops:delete")),
+    _current_user: Principal = Depends(require_permissions("pitstops:delete")),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
@@ -152,7 +174,7 @@ async def read_strategies(
     race_id: uuid.UUID,
     driver_id: uuid.UUID | None = Query(default=None, description="Filter by driver / Filtrar por piloto"),
     team_id: uuid.UUID | None = Query(default=None, description="Filter by team / Filtrar por equipe"),
-    _current_user: User = Depends(require_permissions("strategies:read")),
+    _current_user: Principal = Depends(require_permissions("strategies:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[RaceStrategyResponse]:
     """
@@ -166,7 +188,7 @@ async def read_strategies(
 async def create_new_strategy(
     race_id: uuid.UUID,
     body: RaceStrategyCreateRequest,
-    _current_user: User = Depends(require_permissions("strategies:create")),
+    _current_user: Principal = Depends(require_permissions("strategies:create")),
     db: AsyncSession = Depends(get_db),
 ) -> RaceStrategyResponse:
     """
@@ -189,7 +211,7 @@ async def create_new_strategy(
 @router.get("/api/v1/strategies/{strategy_id}", response_model=RaceStrategyDetailResponse)
 async def read_strategy(
     strategy_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("strategies:read")),
+    _current_user: Principal = Depends(require_permissions("strategies:read")),
     db: AsyncSession = Depends(get_db),
 ) -> RaceStrategyDetailResponse:
     """
@@ -203,7 +225,7 @@ async def read_strategy(
 async def update_existing_strategy(
     strategy_id: uuid.UUID,
     body: RaceStrategyUpdateRequest,
-    _current_user: User = Depends(require_permissions("strategies:update")),
+    _current_user: Principal = Depends(require_permissions("strategies:update")),
     db: AsyncSession = Depends(get_db),
 ) -> RaceStrategyResponse:
     """
@@ -226,7 +248,7 @@ async def update_existing_strategy(
 @router.delete("/api/v1/strategies/{strategy_id}", status_code=204)
 async def delete_existing_strategy(
     strategy_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("strategies:delete")),
+    _current_user: Principal = Depends(require_permissions("strategies:delete")),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
@@ -49,6 +49,12 @@ class PitStopCreateRequest(BaseModel):
     notes: str | None = None
 
 
+class PitStopBulkCreateRequest(BaseModel):
+    """Bulk pit stop creation / Criacao em lote de pit stops."""
+
+    pit_stops: list[PitStopCreateRequest]
+
+
 class PitStopUpdateRequest(BaseModel):
     """Pit stop update / Atualizacao de pit stop."""
 
@@ -4,16 +4,24 @@ Logica de negocios de pit stop e estrategia de corrida.
 """
 
 import uuid
+from collections.abc import Sequence
+from typing import Any, cast
 
-from sqlalchemy import func, select
+from sqlalchemy import Row, Table, func, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import ConflictException, NotFoundException
+from app.db.upsert import ConflictMode, dedupe_rows, upsert_statement
+from app.db.validation import validate_drivers_and_teams
 from app.drivers.models import Driver
 from app.pitstops.models import PitStop, RaceStrategy, TireCompound
 from app.races.models import Race
 from app.teams.models import Team
 
+# Natural key of a pit stop (uq_pitstop_race_driver_lap) / Chave natural de um pit stop
+_PIT_STOP_KEY = ("race_id", "driver_id", "lap_number")
+
 # --- Helpers / Auxiliares ---
 
 
@@ -125,6 +133,65 @@ async def create_pit_stop(
     return pit_stop
 
 
+async def bulk_create_pit_stops(
+    db: AsyncSession,
+    race_id: uuid.UUID,
+    pit_stops_data: list[dict[str, object]],
+    on_conflict: ConflictMode | None = None,
+) -> Sequence[Row[Any]]:
+    """
+    Bulk create pit stops with one multi-row INSERT ... RETURNING.
+    Validates race and all driver/team FKs of the batch. With on_conflict, existing
+    pit stops are upserted (update) or skipped (ignore) by ON CONFLICT.
+
+    Cria pit stops em lote com um unico INSERT ... RETURNING multi-linha.
+    Valida corrida e todas as FKs de piloto/equipe do lote. Com on_conflict, pit stops
+    existentes sao atualizados (update) ou ignorados (ignore) via ON CONFLICT.
+    """
+    await _validate_race(db, race_id)
+    if not pit_stops_data:
+        return []
+
+    keys = {(data["driver_id"], data["lap_number"]) for data in pit_stops_data}
+    if on_conflict is None and len(keys) != len(pit_stops_data):
+        raise ConflictException("Duplicate driver/lap number in batch")
+
+    await validate_drivers_and_teams(
+        db,
+        {cast(uuid.UUID, data["driver_id"]) for data in pit_stops_data},
+        {cast(uuid.UUID, data["team_id"]) for data in pit_stops_data},
+    )
+
+    rows: list[dict[str, object]] = [
+        {
+            "race_id": race_id,
+            "driver_id": data["driver_id"],
+            "team_id": data["team_id"],
+            "lap_number": data["lap_number"],
+            "duration_ms": data["duration_ms"],
+            "tire_from": data.get("tire_from"),
+            "tire_to": data.get("tire_to"),
+            "notes": data.get("notes"),
+        }
+        for data in pit_stops_data
+    ]
+
+    table = cast(Table, PitStop.__table__)
+    if on_conflict is None:
+        stmt = insert(table).returning(*table.c, sort_by_parameter_order=True)
+    else:
+        rows = dedupe_rows(rows, _PIT_STOP_KEY)
+        stmt = upsert_statement(db, table, _PIT_STOP_KEY, on_conflict).returning(*table.c)
+    try:
+        result = await db.execute(stmt, rows)
+        created = result.all()
+        await db.commit()
+    except IntegrityError as err:
+        await db.rollback()
+        raise ConflictException("Pit stop already exists for this driver/race/lap number") from err
+    return created
+
+
 async def update_pit_stop(
     db: AsyncSession,
     pit_stop: PitStop,
@@ -9,6 +9,7 @@ from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import require_permissions
+from app.core.principal import Principal
 from app.db.session import get_db
 from app.races.models import RaceStatus
 from app.races.schemas import (
@@ -30,7 +31,6 @@ from app.races.service import (
     remove_race_entry,
     update_race,
 )
-from app.users.models import User
 
 router = APIRouter(tags=["races"])
 
@@ -40,7 +40,7 @@ async def read_races(
     championship_id: uuid.UUID,
     status: RaceStatus | None = Query(default=None, description="Filter by status / Filtrar por status"),
     is_active: bool | None = Query(default=None, description="Filter by active status / Filtrar por status ativo"),
-    _current_user: User = Depends(require_permissions("races:read")),
+    _current_user: Principal = Depends(require_permissions("races:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[RaceListResponse]:
     """
@@ -54,7 +54,7 @@ async def read_races(
 async def create_new_race(
     championship_id: uuid.UUID,
     body: RaceCreateRequest,
-    _current_user: User = Depends(require_permissions("races:create")),
+    _current_user: Principal = Depends(require_permissions("races:create")),
     db: AsyncSession = Depends(get_db),
 ) -> RaceResponse:
     """
@@ -79,7 +79,7 @@ async def create_new_race(
 @router.get("/api/v1/races/{race_id}", response_model=RaceDetailResponse)
 async def read_race(
     race_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("races:read")),
+    _current_user: Principal = Depends(require_permissions("races:read")),
     db: AsyncSession = Depends(get_db),
 ) -> RaceDetailResponse:
     """
@@ -93,7 +93,7 @@ async def read_race(
 async def update_existing_race(
     race_id: uuid.UUID,
     body: RaceUpdateRequest,
-    _current_user: User = Depends(require_permissions("races:update")),
+    _current_user: Principal = Depends(require_permissions("races:update")),
     db: AsyncSession = Depends(get_db),
 ) -> RaceResponse:
     """
@@ -119,7 +119,7 @@ async def update_existing_race(
 @router.delete("/api/v1/races/{race_id}", status_code=204)
 async def delete_existing_race(
     race_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("races:delete")),
+    _current_user: Principal = Depends(require_permissions("races:delete")),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
@@ -137,7 +137,7 @@ async def delete_existing_race(
 @router.get("/api/v1/races/{race_id}/entries", response_model=list[RaceEntryResponse])
 async def read_race_entries(
     race_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("races:read")),
+    _current_user: Principal = Depends(require_permissions("races:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[dict]:  # type: ignore[type-arg]
     """
@@ -151,7 +151,7 @@ async def read_race_entries(
 async def add_entry(
     race_id: uuid.UUID,
     body: RaceEntryRequest,
-    _current_user: User = Depends(require_permissions("races:manage_entries")),
+    _current_user: Principal = Depends(require_permissions("races:manage_entries")),
     db: AsyncSession = Depends(get_db),
 ) -> list[dict]:  # type: ignore[type-arg]
     """
@@ -165,7 +165,7 @@ async def add_entry(
 async def remove_entry(
     race_id: uuid.UUID,
     team_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("races:manage_entries")),
+    _current_user: Principal = Depends(require_permissions("races:manage_entries")),
     db: AsyncSession = Depends(get_db),
 ) -> list[dict]:  # type: ignore[type-arg]
     """
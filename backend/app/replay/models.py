@@ -7,7 +7,7 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, Text, UniqueConstraint, Uuid, func
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, Text, UniqueConstraint, Uuid, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -37,12 +37,21 @@ class LapPosition(Base):
     """
 
     __tablename__ = "lap_positions"
-    __table_args__ = (UniqueConstraint("race_id", "driver_id", "lap_number", name="uq_lapposition_race_driver_lap"),)
+    # Hash-partitioned by race_id on PostgreSQL (migration 017) / Particionada por race_id no PostgreSQL
+    __table_args__ = (
+        UniqueConstraint(
+            "race_id",
+            "driver_id",
+            "lap_number",
+            name="uq_lapposition_race_driver_lap",
+            postgresql_include=["position"],
+        ),
+        # Replay order; also serves race_id lookups / Ordem do replay; tambem atende buscas por race_id
+        Index("ix_lap_positions_race_lap", "race_id", "lap_number", "position"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
-    race_id: Mapped[uuid.UUID] = mapped_column(
-        Uuid, ForeignKey("races.id", ondelete="CASCADE"), nullable=False, index=True
-    )
+    race_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("races.id", ondelete="CASCADE"), nullable=False)
     driver_id: Mapped[uuid.UUID] = mapped_column(
         Uuid, ForeignKey("drivers.id", ondelete="CASCADE"), nullable=False, index=True
     )
@@ -9,10 +9,13 @@ from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import require_permissions
-from app.db.session import get_db
+from app.core.principal import Principal
+from app.db.session import get_db, get_read_db
+from app.db.upsert import ConflictMode
 from app.replay.models import RaceEventType
 from app.replay.schemas import (
     FullReplayResponse,
+    GapChartResponse,
     LapPositionBulkCreateRequest,
     LapPositionCreateRequest,
     LapPositionDetailResponse,
@@ -32,8 +35,10 @@ from app.replay.service import (
     create_position,
     delete_event,
     delete_position,
+    derive_positions,
     get_event_by_id,
     get_full_replay,
+    get_gap_chart,
     get_overtakes,
     get_position_by_id,
     get_race_summary,
@@ -43,7 +48,6 @@ from app.replay.service import (
     update_event,
     update_position,
 )
-from app.users.models import User
 
 router = APIRouter(tags=["replay"])
 
@@ -57,7 +61,7 @@ async def read_positions(
     driver_id: uuid.UUID | None = Query(default=None, description="Filter by driver / Filtrar por piloto"),
     team_id: uuid.UUID | None = Query(default=None, description="Filter by team / Filtrar por equipe"),
     lap_number: int | None = Query(default=None, description="Filter by lap / Filtrar por volta"),
-    _current_user: User = Depends(require_permissions("replay:read")),
+    _current_user: Principal = Depends(require_permissions("replay:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[LapPositionResponse]:
     """
@@ -71,7 +75,7 @@ async def read_positions(
 async def create_new_position(
     race_id: uuid.UUID,
     body: LapPositionCreateRequest,
-    _current_user: User = Depends(require_permissions("replay:create")),
+    _current_user: Principal = Depends(require_permissions("replay:create")),
     db: AsyncSession = Depends(get_db),
 ) -> LapPositionResponse:
     """
@@ -94,12 +98,16 @@ async def create_new_position(
 async def bulk_create_new_positions(
     race_id: uuid.UUID,
     body: LapPositionBulkCreateRequest,
-    _current_user: User = Depends(require_permissions("replay:create")),
+    on_conflict: ConflictMode | None = Query(
+        default=None,
+        description="Upsert (update) or skip (ignore) existing positions / Atualiza ou ignora existentes",
+    ),
+    _current_user: Principal = Depends(require_permissions("replay:create")),
     db: AsyncSession = Depends(get_db),
 ) -> list[LapPositionResponse]:
     """
-    Bulk create lap positions.
-    Cria posicoes por volta em massa.
+    Bulk create lap positions, optionally upserting existing ones.
+    Cria posicoes por volta em massa, opcionalmente com upsert.
     """
     positions_data: list[dict[str, object]] = [
         {
@@ -112,13 +120,26 @@ async def bulk_create_new_positions(
         }
         for p in body.positions
     ]
-    return await bulk_create_positions(db, race_id, positions_data)  # type: ignore[return-value]
+    return await bulk_create_positions(db, race_id, positions_data, on_conflict=on_conflict)  # type: ignore[return-value]
+
+
+@router.post("/api/v1/races/{race_id}/positions/derive", response_model=list[LapPositionResponse], status_code=201)
+async def derive_race_positions(
+    race_id: uuid.UUID,
+    _current_user: Principal = Depends(require_permissions("replay:create")),
+    db: AsyncSession = Depends(get_db),
+) -> list[LapPositionResponse]:
+    """
+    Replace the race's lap positions with positions, gaps and intervals derived from its lap times.
+    Substitui as posicoes por volta da corrida por posicoes, gaps e intervalos derivados dos tempos de volta.
+    """
+    return await derive_positions(db, race_id)  # type: ignore[return-value]
 
 
 @router.get("/api/v1/positions/{position_id}", response_model=LapPositionDetailResponse)
 async def read_position(
     position_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("replay:read")),
+    _current_user: Principal = Depends(require_permissions("replay:read")),
     db: AsyncSession = Depends(get_db),
 ) -> LapPositionDetailResponse:
     """
@@ -132,7 +153,7 @@ async def read_position(
 async def update_existing_position(
     position_id: uuid.UUID,
     body: LapPositionUpdateRequest,
-    _current_user: User = Depends(require_permissions("replay:update")),
+    _current_user: Principal = Depends(require_permissions("replay:update")),
     db: AsyncSession = Depends(get_db),
 ) -> LapPositionResponse:
     """
@@ -152,7 +173,7 @@ async def update_existing_position(
 @router.delete("/api/v1/positions/{position_id}", status_code=204)
 async def delete_existing_position(
     position_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("replay:delete")),
+    _current_user: Principal = Depends(require_permissions("replay:delete")),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
@@ -173,7 +194,7 @@ async def read_events(
     event_type: RaceEventType | None = Query(default=None, description="Filter by event type / Filtrar por tipo"),
     driver_id: uuid.UUID | None = Query(default=None, description="Filter by driver / Filtrar por piloto"),
     lap_number: int | None = Query(default=None, description="Filter by lap / Filtrar por volta"),
-    _current_user: User = Depends(require_permissions("replay:read")),
+    _current_user: Principal = Depends(require_permissions("replay:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[RaceEventResponse]:
     """
@@ -187,7 +208,7 @@ async def read_events(
 async def create_new_event(
     race_id: uuid.UUID,
     body: RaceEventCreateRequest,
-    _current_user: User = Depends(require_permissions("replay:create")),
+    _current_user: Principal = Depends(require_permissions("replay:create")),
     db: AsyncSession = Depends(get_db),
 ) -> RaceEventResponse:
     """
@@ -207,7 +228,7 @@ async def create_new_event(
 @router.get("/api/v1/events/{event_id}", response_model=RaceEventDetailResponse)
 async def read_event(
     event_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("replay:read")),
+    _current_user: Principal = Depends(require_permissions("replay:read")),
     db: AsyncSession = Depends(get_db),
 ) -> RaceEventDetailResponse:
     """
@@ -221,7 +242,7 @@ async def read_event(
 async def update_existing_event(
     event_id: uuid.UUID,
     body: RaceEventUpdateRequest,
-    _current_user: User = Depends(require_permissions("replay:update")),
+    _current_user: Principal = Depends(require_permissions("replay:update")),
     db: AsyncSession = Depends(get_db),
 ) -> RaceEventResponse:
     """
@@ -242,7 +263,7 @@ async def update_existing_event(
 @router.delete("/api/v1/events/{event_id}", status_code=204)
 async def delete_existing_event(
     event_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("replay:delete")),
+    _current_user: Principal = Depends(require_permissions("replay:delete")),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
@@ -260,8 +281,8 @@ async def delete_existing_event(
 @router.get("/api/v1/races/{race_id}/replay", response_model=FullReplayResponse)
 async def read_full_replay(
     race_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("replay:read")),
-    db: AsyncSession = Depends(get_db),
+    _current_user: Principal = Depends(require_permissions("replay:read")),
+    db: AsyncSession = Depends(get_read_db),
 ) -> FullReplayResponse:
     """
     Get full race replay: positions + events + pit stops grouped by lap.
@@ -273,8 +294,8 @@ async def read_full_replay(
 @router.get("/api/v1/races/{race_id}/analysis/stints", response_model=StintAnalysisResponse)
 async def read_stint_analysis(
     race_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("replay:read")),
-    db: AsyncSession = Depends(get_db),
+    _current_user: Principal = Depends(require_permissions("replay:read")),
+    db: AsyncSession = Depends(get_read_db),
 ) -> StintAnalysisResponse:
     """
     Get stint analysis: avg pace, best lap, degradation per tire stint.
@@ -283,10 +304,25 @@ async def read_stint_analysis(
     return await get_stint_analysis(db, race_id)  # type: ignore[return-value]
 
 
+@router.get("/api/v1/races/{race_id}/analysis/gaps", response_model=GapChartResponse)
+async def read_gap_chart(
+    race_id: uuid.UUID,
+    _current_user: Principal = Depends(require_permissions("replay:read")),
+    db: AsyncSession = Depends(get_read_db),
+) -> GapChartResponse:
+    """
+    Get the gap chart: cumulative time, position, gap to the leader and interval per driver and lap,
+    derived from lap times.
+    Retorna o grafico de gaps: tempo acumulado, posicao, gap para o lider e intervalo por piloto e volta,
+    derivados dos tempos de volta.
+    """
+    return await get_gap_chart(db, race_id)  # type: ignore[return-value]
+
+
 @router.get("/api/v1/races/{race_id}/analysis/overtakes", response_model=OvertakesResponse)
 async def read_overtakes(
     race_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("replay:read")),
+    _current_user: Principal = Depends(require_permissions("replay:read")),
     db: AsyncSession = Depends(get_db),
 ) -> OvertakesResponse:
     """
@@ -299,7 +335,7 @@ async def read_overtakes(
 @router.get("/api/v1/races/{race_id}/analysis/summary", response_model=RaceSummaryResponse)
 async def read_race_summary(
     race_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("replay:read")),
+    _current_user: Principal = Depends(require_permissions("replay:read")),
     db: AsyncSession = Depends(get_db),
 ) -> RaceSummaryResponse:
     """
@@ -9,6 +9,7 @@ from datetime import datetime
 from pydantic import BaseModel
 
 from app.replay.models import RaceEventType
+from app.telemetry.schemas import ComparedDriver, LapSeries
 
 # --- Shared helpers / Schemas auxiliares compartilhados ---
 
@@ -244,3 +245,20 @@ class RaceSummaryResponse(BaseModel):
     safety_car_laps: int
     dnf_count: int
     fastest_lap: FastestLapData | None
+
+
+class GapChartResponse(BaseModel):
+    """
+    Gap chart derived from lap times: every series is drivers x laps, aligned with `drivers` and
+    `lap_numbers`, null from a driver's first missing lap.
+    Grafico de gaps derivado dos tempos de volta: cada serie e pilotos x voltas, alinhada com `drivers` e
+    `lap_numbers`, null a partir da primeira volta ausente do piloto.
+    """
+
+    race_id: uuid.UUID
+    lap_numbers: list[int]
+    drivers: list[ComparedDriver]
+    cumulative_ms: LapSeries
+    position: list[list[int | None]]
+    gap_to_leader_ms: LapSeries  # 0 for the leader / 0 para o lider
+    interval_ms: LapSeries  # to the car ahead, 0 for the leader / para o carro a frente, 0 para o lider
@@ -5,19 +5,31 @@ Logica de negocios de replay de corrida.
 
 import uuid
 from collections import defaultdict
+from collections.abc import Sequence
+from typing import Any, cast
 
-from sqlalchemy import select
+import numpy as np
+from sqlalchemy import Row, Table, delete, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import ConflictException, NotFoundException
+from app.db.upsert import ConflictMode, dedupe_rows, upsert_statement
+from app.db.validation import validate_drivers_and_teams
 from app.drivers.models import Driver
 from app.pitstops.models import PitStop
 from app.races.models import Race
 from app.replay.models import LapPosition, RaceEvent, RaceEventType
 from app.results.models import RaceResult
 from app.teams.models import Team
+from app.telemetry.analysis import GapChart, LapMatrix, to_json
 from app.telemetry.models import LapTime
 
+# Natural key of a lap position (uq_lapposition_race_driver_lap) / Chave natural de uma posicao
+_POSITION_KEY = ("race_id", "driver_id", "lap_number")
+# (driver_id, display_name, team_id, lap_number, lap_time_ms)
+type _GapLapRow = Row[uuid.UUID, str, uuid.UUID, int, int]
+
 # --- Helpers / Auxiliares ---
 
 
@@ -136,30 +148,73 @@ async def bulk_create_positions(
     db: AsyncSession,
     race_id: uuid.UUID,
     positions_data: list[dict[str, object]],
-) -> list[LapPosition]:
+    on_conflict: ConflictMode | None = None,
+) -> Sequence[Row[Any]]:
     """
-    Bulk create lap positions. Validates race FK.
-    Cria posicoes por volta em massa. Valida FK da corrida.
+    Bulk create lap positions with one multi-row INSERT ... RETURNING.
+    Validates race and all driver/team FKs of the batch. With on_conflict, existing
+    positions are upserted (update) or skipped (ignore) by ON CONFLICT.
+
+    Cria posicoes por volta em massa com um unico INSERT ... RETURNING multi-linha.
+    Valida corrida e todas as FKs de piloto/equipe do lote. Com on_conflict, posicoes
+    existentes sao atualizadas (update) ou ignoradas (ignore) via ON CONFLICT.
     """
     await _validate_race(db, race_id)
+    if not positions_data:
+        return []
 
-    created: list[LapPosition] = []
-    for data in positions_data:
-        lap_position = LapPosition(
-            race_id=race_id,
-            driver_id=data["driver_id"],
-            team_id=data["team_id"],
-            lap_number=data["lap_number"],
-            position=data["position"],
-            gap_to_leader_ms=data.get("gap_to_leader_ms"),
-            interval_ms=data.get("interval_ms"),
-        )
-        db.add(lap_position)
-        created.append(lap_position)
+    keys = {(data["driver_id"], data["lap_number"]) for data in positions_data}
+    if on_conflict is None and len(keys) != len(positions_data):
+        raise ConflictException("Duplicate driver/lap number in batch")
 
-    await db.commit()
-    for pos in created:
-        await db.refresh(pos)
+    await validate_drivers_and_teams(
+        db,
+        {cast(uuid.UUID, data["driver_id"]) for data in positions_data},
+        {cast(uuid.UUID, data["team_id"]) for data in positions_data},
+    )
+    return await insert_positions(db, race_id, positions_data, on_conflict)
+
+
+async def insert_positions(
+    db: AsyncSession,
+    race_id: uuid.UUID,
+    positions_data: list[dict[str, object]],
+    on_conflict: ConflictMode | None = None,
+) -> Sequence[Row[Any]]:
+    """
+    The write half of bulk_create_positions, for callers that already checked the race, the driver/team
+    FKs and the batch keys (file imports).
+    A metade de gravacao de bulk_create_positions, para quem ja verificou a corrida, as FKs de piloto/equipe
+    e as chaves do lote (importacoes de arquivo).
+    """
+    if not positions_data:
+        return []
+    rows: list[dict[str, object]] = [
+        {
+            "race_id": race_id,
+            "driver_id": data["driver_id"],
+            "team_id": data["team_id"],
+            "lap_number": data["lap_number"],
+            "position": data["position"],
+            "gap_to_leader_ms": data.get("gap_to_leader_ms"),
+            "interval_ms": data.get("interval_ms"),
+        }
+        for data in positions_data
+    ]
+
+    table = cast(Table, LapPosition.__table__)
+    if on_conflict is None:
+        stmt = insert(table).returning(*table.c, sort_by_parameter_order=True)
+    else:
+        rows = dedupe_rows(rows, _POSITION_KEY)
+        stmt = upsert_statement(db, table, _POSITION_KEY, on_conflict).returning(*table.c)
+    try:
+        result = await db.execute(stmt, rows)
+        created = result.all()
+        await db.commit()
+    except IntegrityError as err:
+        await db.rollback()
+        raise ConflictException("Lap position already exists for this driver/race/lap number") from err
     return created
 
 
@@ -450,7 +505,10 @@ async def get_stint_analysis(db: AsyncSession, race_id: uuid.UUID) -> dict[str,
         # Calculate stint stats / Calcula estatisticas de stint
         stints_data = []
         for stint_num, (start_lap, end_lap, compound) in enumerate(stint_boundaries, 1):
-            stint_laps = [lt for lt in laps if start_lap <= lt.lap_number <= end_lap and lt.is_valid]
+            # Flagged in / out / safety-car / outlier laps are left out / Voltas marcadas ficam de fora
+            stint_laps = [
+                lt for lt in laps if start_lap <= lt.lap_number <= end_lap and lt.is_valid and lt.outlier is None
+            ]
             if not stint_laps:
                 stints_data.append(
                     {
@@ -594,12 +652,13 @@ async def get_race_summary(db: AsyncSession, race_id: uuid.UUID) -> dict[str, ob
     dnf_result = await db.execute(select(RaceResult).where(RaceResult.race_id == race_id, RaceResult.dnf.is_(True)))
     dnf_count = len(list(dnf_result.scalars().all()))
 
-    # Fastest lap / Volta mais rapida
+    # Fastest lap: the fastest personal best, read from the partial index
+    # Volta mais rapida: o melhor pessoal mais rapido, lido do indice parcial
     fastest_lap_data = None
     lap_result = await db.execute(
         select(LapTime)
-        .where(LapTime.race_id == race_id, LapTime.is_valid.is_(True))
-        .order_by(LapTime.lap_time_ms)
+        .where(LapTime.race_id == race_id, LapTime.is_personal_best == True)  # noqa: E712
+        .order_by(LapTime.lap_time_ms, LapTime.lap_number)
         .limit(1)
     )
     fastest = lap_result.scalar_one_or_none()
@@ -620,3 +679,92 @@ async def get_race_summary(db: AsyncSession, race_id: uuid.UUID) -> dict[str, ob
         "dnf_count": dnf_count,
         "fastest_lap": fastest_lap_data,
     }
+
+
+# --- Gap chart / Grafico de gaps ---
+
+
+async def _gap_chart(
+    db: AsyncSession, race_id: uuid.UUID
+) -> tuple[Sequence[_GapLapRow], dict[uuid.UUID, str], LapMatrix, GapChart]:
+    """
+    The race's laps (one Core query) and the running order they give at every lap.
+    As voltas da corrida (uma consulta Core) e a ordem de corrida que elas dao em cada volta.
+    """
+    stmt = (
+        select(LapTime.driver_id, Driver.display_name, LapTime.team_id, LapTime.lap_number, LapTime.lap_time_ms)
+        .join(Driver, Driver.id == LapTime.driver_id)
+        .where(LapTime.race_id == race_id)
+        .order_by(Driver.display_name, Driver.id)
+    )
+    rows = (await db.execute(stmt)).all()
+    drivers: dict[uuid.UUID, str] = {}
+    for row in rows:
+        drivers.setdefault(row.driver_id, row.display_name)
+    index = {driver_id: i for i, driver_id in enumerate(drivers)}
+    matrix = LapMatrix.build(
+        len(drivers),
+        [index[row.driver_id] for row in rows],
+        [row.lap_number for row in rows],
+        [row.lap_time_ms for row in rows],
+    )
+    return rows, drivers, matrix, matrix.gap_chart()
+
+
+async def get_gap_chart(db: AsyncSession, race_id: uuid.UUID) -> dict[str, object]:
+    """
+    Cumulative race time, position, gap to the leader and interval of every driver at every lap, derived
+    from lap times as drivers x laps matrices. A driver drops out of the order at its first missing lap.
+    Tempo de corrida acumulado, posicao, gap para o lider e intervalo de cada piloto em cada volta, derivados
+    dos tempos de volta como matrizes pilotos x voltas. Um piloto sai da ordem na sua primeira volta ausente.
+    """
+    await _validate_race(db, race_id)
+    _, drivers, matrix, chart = await _gap_chart(db, race_id)
+    positions = chart.position.astype(object)
+    positions[chart.position == 0] = None
+    return {
+        "race_id": race_id,
+        "lap_numbers": matrix.lap_numbers.tolist(),
+        "drivers": [{"driver_id": driver_id, "driver_display_name": name} for driver_id, name in drivers.items()],
+        "cumulative_ms": to_json(chart.cumulative_ms),
+        "position": positions.tolist(),
+        "gap_to_leader_ms": to_json(chart.gap_to_leader_ms),
+        "interval_ms": to_json(chart.interval_ms),
+    }
+
+
+async def derive_positions(db: AsyncSession, race_id: uuid.UUID) -> Sequence[Row[Any]]:
+    """
+    Replace the race's lap positions with the ones derived from its lap times, in one transaction
+    (a delete and one multi-row insert). The leader's gap and interval are None, as from the UDP ingester.
+    Substitui as posicoes por volta da corrida pelas derivadas dos tempos de volta, em uma transacao
+    (um delete e um insert multi-linha). Gap e intervalo do lider sao None, como no ingestor UDP.
+    """
+    rows, drivers, matrix, chart = await _gap_chart(db, race_id)
+    index = {driver_id: i for i, driver_id in enumerate(drivers)}
+    columns = np.searchsorted(matrix.lap_numbers, [row.lap_number for row in rows])
+    positions: list[dict[str, object]] = []
+    for row, column in zip(rows, columns.tolist(), strict=True):
+        i = index[row.driver_id]
+        position = int(chart.position[i, column])
+        if position == 0:
+            continue
+        leader = position == 1
+        positions.append(
+            {
+                "driver_id": row.driver_id,
+                "team_id": row.team_id,
+                "lap_number": row.lap_number,
+                "position": position,
+                "gap_to_leader_ms": None if leader else round(float(chart.gap_to_leader_ms[i, column])),
+                "interval_ms": None if leader else round(float(chart.interval_ms[i, column])),
+            }
+        )
+    if not positions:
+        await _validate_race(db, race_id)
+        await db.execute(delete(LapPosition).where(LapPosition.race_id == race_id))
+        await db.commit()
+        return []
+    await db.execute(delete(LapPosition).where(LapPosition.race_id == race_id))
+    # Validates the race and commits the delete with the insert / Valida a corrida e confirma o delete com o insert
+    return await bulk_create_positions(db, race_id, positions)
@@ -9,7 +9,8 @@ from fastapi import APIRouter, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import require_permissions
-from app.db.session import get_db
+from app.core.principal import Principal
+from app.db.session import get_db, get_read_db
 from app.results.schemas import (
     ChampionshipStandingResponse,
     DriverStandingResponse,
@@ -30,7 +31,6 @@ from app.results.service import (
     list_race_results,
     update_result,
 )
-from app.users.models import User
 
 router = APIRouter(tags=["results"])
 
@@ -38,7 +38,7 @@ router = APIRouter(tags=["results"])
 @router.get("/api/v1/races/{race_id}/results", response_model=list[RaceResultListResponse])
 async def read_race_results(
     race_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("results:read")),
+    _current_user: Principal = Depends(require_permissions("results:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[RaceResultListResponse]:
     """
@@ -52,7 +52,7 @@ async def read_race_results(
 async def create_new_result(
     race_id: uuid.UUID,
     body: RaceResultCreateRequest,
-    _current_user: User = Depends(require_permissions("results:create")),
+    _current_user: Principal = Depends(require_permissions("results:create")),
     db: AsyncSession = Depends(get_db),
 ) -> RaceResultResponse:
     """
@@ -77,7 +77,7 @@ async def create_new_result(
 @router.get("/api/v1/results/{result_id}", response_model=RaceResultDetailResponse)
 async def read_result(
     result_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("results:read")),
+    _current_user: Principal = Depends(require_permissions("results:read")),
     db: AsyncSession = Depends(get_db),
 ) -> RaceResultDetailResponse:
     """
@@ -91,7 +91,7 @@ async def read_result(
 async def update_existing_result(
     result_id: uuid.UUID,
     body: RaceResultUpdateRequest,
-    _current_user: User = Depends(require_permissions("results:update")),
+    _current_user: Principal = Depends(require_permissions("results:update")),
     db: AsyncSession = Depends(get_db),
 ) -> RaceResultResponse:
     """
@@ -116,7 +116,7 @@ async def update_existing_result(
 @router.get("/api/v1/championships/{championship_id}/standings", response_model=list[ChampionshipStandingResponse])
 async def read_championship_standings(
     championship_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("results:read")),
+    _current_user: Principal = Depends(require_permissions("results:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[dict]:  # type: ignore[type-arg]
     """
@@ -132,7 +132,7 @@ async def read_championship_standings(
 )
 async def read_driver_championship_standings(
     championship_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("results:read")),
+    _current_user: Principal = Depends(require_permissions("results:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[dict]:  # type: ignore[type-arg]
     """
@@ -148,8 +148,8 @@ async def read_driver_championship_standings(
 )
 async def read_standings_breakdown(
     championship_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("results:read")),
-    db: AsyncSession = Depends(get_db),
+    _current_user: Principal = Depends(require_permissions("results:read")),
+    db: AsyncSession = Depends(get_read_db),
 ) -> dict:  # type: ignore[type-arg]
     """
     Get full standings breakdown with per-race points for teams and drivers.
@@ -161,7 +161,7 @@ async def read_standings_breakdown(
 @router.delete("/api/v1/results/{result_id}", status_code=204)
 async def delete_existing_result(
     result_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("results:delete")),
+    _current_user: Principal = Depends(require_permissions("results:delete")),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
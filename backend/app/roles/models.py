@@ -48,9 +48,9 @@ class Role(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
-    # Relationships / Relacionamentos
+    # Relationships, loaded via app.db.loaders profiles / Relacionamentos, carregados via perfis de app.db.loaders
     permissions: Mapped[list["Permission"]] = relationship(
-        "Permission", secondary=role_permissions, back_populates="roles", lazy="selectin"
+        "Permission", secondary=role_permissions, back_populates="roles", lazy="raise"
     )
     users: Mapped[list["User"]] = relationship(  # type: ignore[name-defined]  # noqa: F821
         "User",
@@ -58,7 +58,7 @@ class Role(Base):
         primaryjoin="Role.id == user_roles.c.role_id",
         secondaryjoin="User.id == user_roles.c.user_id",
         back_populates="roles",
-        lazy="selectin",
+        lazy="raise",
     )
 
     def __repr__(self) -> str:
@@ -82,9 +82,9 @@ class Permission(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
-    # Relationships / Relacionamentos
+    # Relationships, loaded via app.db.loaders profiles / Relacionamentos, carregados via perfis de app.db.loaders
     roles: Mapped[list["Role"]] = relationship(
-        "Role", secondary=role_permissions, back_populates="permissions", lazy="selectin"
+        "Role", secondary=role_permissions, back_populates="permissions", lazy="raise"
     )
 
     def __repr__(self) -> str:
@@ -9,6 +9,7 @@ from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import require_permissions
+from app.core.principal import Principal
 from app.db.session import get_db
 from app.roles.models import Permission, Role
 from app.roles.schemas import (
@@ -36,7 +37,6 @@ from app.roles.service import (
     revoke_role_from_user,
     update_role,
 )
-from app.users.models import User
 
 permissions_router = APIRouter(prefix="/api/v1/permissions", tags=["permissions"])
 roles_router = APIRouter(prefix="/api/v1/roles", tags=["roles"])
@@ -49,7 +49,7 @@ user_roles_router = APIRouter(prefix="/api/v1/users", tags=["user-roles"])
 @permissions_router.get("/", response_model=list[PermissionResponse])
 async def read_permissions(
     module: str | None = Query(default=None, description="Filter by module / Filtrar por modulo"),
-    _current_user: User = Depends(require_permissions("permissions:read")),
+    _current_user: Principal = Depends(require_permissions("permissions:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[Permission]:
     """
@@ -62,7 +62,7 @@ async def read_permissions(
 @permissions_router.get("/{permission_id}", response_model=PermissionResponse)
 async def read_permission(
     permission_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("permissions:read")),
+    _current_user: Principal = Depends(require_permissions("permissions:read")),
     db: AsyncSession = Depends(get_db),
 ) -> PermissionResponse:
     """
@@ -75,7 +75,7 @@ async def read_permission(
 @permissions_router.post("/", response_model=PermissionResponse, status_code=201)
 async def create_new_permission(
     body: PermissionCreateRequest,
-    _current_user: User = Depends(require_permissions("permissions:create")),
+    _current_user: Principal = Depends(require_permissions("permissions:create")),
     db: AsyncSession = Depends(get_db),
 ) -> PermissionResponse:
     """
@@ -92,7 +92,7 @@ async def create_new_permission(
 
 @roles_router.get("/", response_model=list[RoleListResponse])
 async def read_roles(
-    _current_user: User = Depends(require_permissions("roles:read")),
+    _current_user: Principal = Depends(require_permissions("roles:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[Role]:
     """
@@ -105,7 +105,7 @@ async def read_roles(
 @roles_router.get("/{role_id}", response_model=RoleResponse)
 async def read_role(
     role_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("roles:read")),
+    _current_user: Principal = Depends(require_permissions("roles:read")),
     db: AsyncSession = Depends(get_db),
 ) -> RoleResponse:
     """
@@ -118,7 +118,7 @@ async def read_role(
 @roles_router.post("/", response_model=RoleResponse, status_code=201)
 async def create_new_role(
     body: RoleCreateRequest,
-    _current_user: User = Depends(require_permissions("roles:create")),
+    _current_user: Principal = Depends(require_permissions("roles:create")),
     db: AsyncSession = Depends(get_db),
 ) -> RoleResponse:
     """
@@ -134,14 +134,14 @@ async def create_new_role(
 async def update_existing_role(
     role_id: uuid.UUID,
     body: RoleUpdateRequest,
-    _current_user: User = Depends(require_permissions("roles:update")),
+    _current_user: Principal = Depends(require_permissions("roles:update")),
     db: AsyncSession = Depends(get_db),
 ) -> RoleResponse:
     """
     Update a role's display name or description.
     Atualiza o nome de exibicao ou descricao de um papel.
     """
-    role = await get_role_by_id(db, role_id)
+    role = await get_role_by_id(db, role_id, profile="list")
     return await update_role(  # type: ignore[return-value]
         db, role, display_name=body.display_name, description=body.description
     )
@@ -150,14 +150,14 @@ async def update_existing_role(
 @roles_router.delete("/{role_id}", status_code=204)
 async def delete_existing_role(
     role_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("roles:delete")),
+    _current_user: Principal = Depends(require_permissions("roles:delete")),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
     Delete a non-system role.
     Exclui um papel que nao e do sistema.
     """
-    role = await get_role_by_id(db, role_id)
+    role = await get_role_by_id(db, role_id, profile="list")
     await delete_role(db, role)
     return Response(status_code=204)
 
@@ -166,7 +166,7 @@ async def delete_existing_role(
 async def assign_permission(
     role_id: uuid.UUID,
     body: RolePermissionRequest,
-    _current_user: User = Depends(require_permissions("permissions:assign")),
+    _current_user: Principal = Depends(require_permissions("permissions:assign")),
     db: AsyncSession = Depends(get_db),
 ) -> RoleResponse:
     """
@@ -180,7 +180,7 @@ async def assign_permission(
 async def revoke_permission(
     role_id: uuid.UUID,
     permission_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("permissions:revoke")),
+    _current_user: Principal = Depends(require_permissions("permissions:revoke")),
     db: AsyncSession = Depends(get_db),
 ) -> RoleResponse:
     """
@@ -196,7 +196,7 @@ async def revoke_permission(
 @user_roles_router.get("/{user_id}/roles", response_model=list[RoleListResponse])
 async def read_user_roles(
     user_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("roles:read")),
+    _current_user: Principal = Depends(require_permissions("roles:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[Role]:
     """
@@ -210,7 +210,7 @@ async def read_user_roles(
 async def assign_user_role(
     user_id: uuid.UUID,
     body: UserRoleAssignRequest,
-    current_user: User = Depends(require_permissions("roles:assign")),
+    current_user: Principal = Depends(require_permissions("roles:assign")),
     db: AsyncSession = Depends(get_db),
 ) -> list[Role]:
     """
@@ -225,7 +225,7 @@ async def assign_user_role(
 async def revoke_user_role(
     user_id: uuid.UUID,
     role_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("roles:revoke")),
+    _current_user: Principal = Depends(require_permissions("roles:revoke")),
     db: AsyncSession = Depends(get_db),
 ) -> list[Role]:
     """
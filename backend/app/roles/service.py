@@ -5,14 +5,21 @@ Logica de negocios de papeis e permissoes.
 
 import uuid
 
-from sqlalchemy import delete, insert, select
+from sqlalchemy import ColumnElement, delete, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import ConflictException, ForbiddenException, NotFoundException
+from app.core.principal import authz_versions, bump_authz_versions, principal_cache
+from app.db.loaders import LoaderProfile, load_profile, refresh_profile
 from app.roles.models import Permission, Role, user_roles
 from app.users.models import User
 
 
+def _role_holders(role_id: uuid.UUID) -> ColumnElement[bool]:
+    """Criterion matching the users holding a role / Criterio dos usuarios que possuem um papel."""
+    return User.id.in_(select(user_roles.c.user_id).where(user_roles.c.role_id == role_id))
+
+
 async def list_permissions(db: AsyncSession, module: str | None = None) -> list[Permission]:
     """
     List all permissions, optionally filtered by module.
@@ -61,16 +68,16 @@ async def list_roles(db: AsyncSession) -> list[Role]:
     List all roles.
     Lista todos os papeis.
     """
-    result = await db.execute(select(Role).order_by(Role.name))
+    result = await db.execute(select(Role).options(*load_profile(Role, "list")).order_by(Role.name))
     return list(result.scalars().all())
 
 
-async def get_role_by_id(db: AsyncSession, role_id: uuid.UUID) -> Role:
+async def get_role_by_id(db: AsyncSession, role_id: uuid.UUID, profile: LoaderProfile = "detail") -> Role:
     """
     Get a role by ID. Raises NotFoundException if not found.
     Busca um papel por ID. Lanca NotFoundException se nao encontrado.
     """
-    result = await db.execute(select(Role).where(Role.id == role_id))
+    result = await db.execute(select(Role).where(Role.id == role_id).options(*load_profile(Role, profile)))
     role = result.scalar_one_or_none()
     if role is None:
         raise NotFoundException("Role not found")
@@ -89,8 +96,7 @@ async def create_role(db: AsyncSession, name: str, display_name: str, descriptio
     role = Role(name=name, display_name=display_name, description=description)
     db.add(role)
     await db.commit()
-    await db.refresh(role)
-    return role
+    return await refresh_profile(db, role, "detail")
 
 
 async def update_role(
@@ -105,8 +111,7 @@ async def update_role(
     if description is not None:
         role.description = description
     await db.commit()
-    await db.refresh(role)
-    return role
+    return await refresh_profile(db, role, "detail")
 
 
 async def delete_role(db: AsyncSession, role: Role) -> None:
@@ -116,8 +121,12 @@ async def delete_role(db: AsyncSession, role: Role) -> None:
     """
     if role.is_system:
         raise ForbiddenException("Cannot delete system role")
+    versions = await bump_authz_versions(db, _role_holders(role.id))
     await db.delete(role)
     await db.commit()
+    # Holders of the role lose its permissions / Portadores do papel perdem suas permissoes
+    principal_cache.clear()
+    authz_versions.update(versions)
 
 
 async def assign_permission_to_role(db: AsyncSession, role_id: uuid.UUID, permission_id: uuid.UUID) -> Role:
@@ -132,9 +141,11 @@ async def assign_permission_to_role(db: AsyncSession, role_id: uuid.UUID, permis
         raise ConflictException("Permission already assigned to role")
 
     role.permissions.append(permission)
+    versions = await bump_authz_versions(db, _role_holders(role.id))
     await db.commit()
-    await db.refresh(role)
-    return role
+    principal_cache.clear()
+    authz_versions.update(versions)
+    return await refresh_profile(db, role, "detail")
 
 
 async def revoke_permission_from_role(db: AsyncSession, role_id: uuid.UUID, permission_id: uuid.UUID) -> Role:
@@ -149,9 +160,11 @@ async def revoke_permission_from_role(db: AsyncSession, role_id: uuid.UUID, perm
         raise NotFoundException("Permission not assigned to role")
 
     role.permissions.remove(permission)
+    versions = await bump_authz_versions(db, _role_holders(role.id))
     await db.commit()
-    await db.refresh(role)
-    return role
+    principal_cache.clear()
+    authz_versions.update(versions)
+    return await refresh_profile(db, role, "detail")
 
 
 # --- User-role services / Servicos de usuario-papel ---
@@ -187,7 +200,7 @@ async def assign_role_to_user(
         raise NotFoundException("User not found")
 
     # Validate role exists / Validar que papel existe
-    await get_role_by_id(db, role_id)
+    await get_role_by_id(db, role_id, profile="list")
 
     # Check if already assigned / Verificar se ja atribuido
     result = await db.execute(
@@ -199,7 +212,10 @@ async def assign_role_to_user(
     # Insert directly into user_roles to set assigned_by / Inserir na tabela user_roles com assigned_by
     stmt = insert(user_roles).values(user_id=user_id, role_id=role_id, assigned_by=assigned_by)
     await db.execute(stmt)
+    versions = await bump_authz_versions(db, User.id == user_id)
     await db.commit()
+    principal_cache.invalidate(user_id)
+    authz_versions.update(versions)
 
 
 async def revoke_role_from_user(db: AsyncSession, user_id: uuid.UUID, role_id: uuid.UUID) -> None:
@@ -213,7 +229,7 @@ async def revoke_role_from_user(db: AsyncSession, user_id: uuid.UUID, role_id: u
         raise NotFoundException("User not found")
 
     # Validate role exists / Validar que papel existe
-    await get_role_by_id(db, role_id)
+    await get_role_by_id(db, role_id, profile="list")
 
     # Check if assigned / Verificar se atribuido
     result = await db.execute(
@@ -224,4 +240,7 @@ async def revoke_role_from_user(db: AsyncSession, user_id: uuid.UUID, role_id: u
 
     stmt = delete(user_roles).where(user_roles.c.user_id == user_id, user_roles.c.role_id == role_id)
     await db.execute(stmt)
+    versions = await bump_authz_versions(db, User.id == user_id)
     await db.commit()
+    principal_cache.invalidate(user_id)
+    authz_versions.update(versions)
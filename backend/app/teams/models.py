@@ -31,24 +31,24 @@ class Team(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
-    # Relationships / Relacionamentos
+    # Relationships, loaded via app.db.loaders profiles / Relacionamentos, carregados via perfis de app.db.loaders
     members: Mapped[list["User"]] = relationship(  # type: ignore[name-defined]  # noqa: F821
-        "User", back_populates="team", lazy="selectin"
+        "User", back_populates="team", lazy="raise"
     )
     championships: Mapped[list["Championship"]] = relationship(  # type: ignore[name-defined]  # noqa: F821
         "Championship",
         secondary="championship_entries",
         back_populates="teams",
-        lazy="selectin",
+        lazy="raise",
     )
     races: Mapped[list["Race"]] = relationship(  # type: ignore[name-defined]  # noqa: F821
         "Race",
         secondary="race_entries",
         back_populates="teams",
-        lazy="selectin",
+        lazy="raise",
     )
     drivers: Mapped[list["Driver"]] = relationship(  # type: ignore[name-defined]  # noqa: F821
-        "Driver", back_populates="team", cascade="all, delete-orphan", lazy="selectin"
+        "Driver", back_populates="team", cascade="all, delete-orphan", lazy="raise"
     )
 
     def __repr__(self) -> str:
@@ -9,6 +9,7 @@ from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import require_permissions
+from app.core.principal import Principal
 from app.db.session import get_db
 from app.teams.schemas import (
     TeamAddMemberRequest,
@@ -29,7 +30,6 @@ from app.teams.service import (
     remove_member,
     update_team,
 )
-from app.users.models import User
 
 router = APIRouter(prefix="/api/v1/teams", tags=["teams"])
 
@@ -37,7 +37,7 @@ router = APIRouter(prefix="/api/v1/teams", tags=["teams"])
 @router.get("/", response_model=list[TeamListResponse])
 async def read_teams(
     is_active: bool | None = Query(default=None, description="Filter by active status / Filtrar por status ativo"),
-    _current_user: User = Depends(require_permissions("teams:read")),
+    _current_user: Principal = Depends(require_permissions("teams:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[TeamListResponse]:
     """
@@ -50,7 +50,7 @@ async def read_teams(
 @router.get("/{team_id}", response_model=TeamDetailResponse)
 async def read_team(
     team_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("teams:read")),
+    _current_user: Principal = Depends(require_permissions("teams:read")),
     db: AsyncSession = Depends(get_db),
 ) -> TeamDetailResponse:
     """
@@ -63,7 +63,7 @@ async def read_team(
 @router.post("/", response_model=TeamResponse, status_code=201)
 async def create_new_team(
     body: TeamCreateRequest,
-    _current_user: User = Depends(require_permissions("teams:create")),
+    _current_user: Principal = Depends(require_permissions("teams:create")),
     db: AsyncSession = Depends(get_db),
 ) -> TeamResponse:
     """
@@ -79,14 +79,14 @@ async def create_new_team(
 async def update_existing_team(
     team_id: uuid.UUID,
     body: TeamUpdateRequest,
-    _current_user: User = Depends(require_permissions("teams:update")),
+    _current_user: Principal = Depends(require_permissions("teams:update")),
     db: AsyncSession = Depends(get_db),
 ) -> TeamResponse:
     """
     Update a team's fields.
     Atualiza campos de uma equipe.
     """
-    team = await get_team_by_id(db, team_id)
+    team = await get_team_by_id(db, team_id, profile="list")
     return await update_team(  # type: ignore[return-value]
         db,
         team,
@@ -100,7 +100,7 @@ async def update_existing_team(
 @router.delete("/{team_id}", status_code=204)
 async def delete_existing_team(
     team_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("teams:delete")),
+    _current_user: Principal = Depends(require_permissions("teams:delete")),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
@@ -118,7 +118,7 @@ async def delete_existing_team(
 @router.get("/{team_id}/members", response_model=list[TeamMemberResponse])
 async def read_team_members(
     team_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("teams:read")),
+    _current_user: Principal = Depends(require_permissions("teams:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[TeamMemberResponse]:
     """
@@ -132,7 +132,7 @@ async def read_team_members(
 async def add_team_member(
     team_id: uuid.UUID,
     body: TeamAddMemberRequest,
-    _current_user: User = Depends(require_permissions("teams:manage_members")),
+    _current_user: Principal = Depends(require_permissions("teams:manage_members")),
     db: AsyncSession = Depends(get_db),
 ) -> list[TeamMemberResponse]:
     """
@@ -146,7 +146,7 @@ async def add_team_member(
 async def remove_team_member(
     team_id: uuid.UUID,
     user_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("teams:manage_members")),
+    _current_user: Principal = Depends(require_permissions("teams:manage_members")),
     db: AsyncSession = Depends(get_db),
 ) -> list[TeamMemberResponse]:
     """
@@ -9,6 +9,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import ConflictException, NotFoundException
+from app.db.loaders import LoaderProfile, load_profile, refresh_profile
 from app.teams.models import Team
 from app.users.models import User
 
@@ -18,19 +19,19 @@ async def list_teams(db: AsyncSession, is_active: bool | None = None) -> list[Te
     List all teams, optionally filtered by active status.
     Lista todas as equipes, opcionalmente filtradas por status ativo.
     """
-    stmt = select(Team).order_by(Team.name)
+    stmt = select(Team).options(*load_profile(Team, "list")).order_by(Team.name)
     if is_active is not None:
         stmt = stmt.where(Team.is_active == is_active)
     result = await db.execute(stmt)
     return list(result.scalars().all())
 
 
-async def get_team_by_id(db: AsyncSession, team_id: uuid.UUID) -> Team:
+async def get_team_by_id(db: AsyncSession, team_id: uuid.UUID, profile: LoaderProfile = "detail") -> Team:
     """
     Get a team by ID. Raises NotFoundException if not found.
     Busca uma equipe por ID. Lanca NotFoundException se nao encontrada.
     """
-    result = await db.execute(select(Team).where(Team.id == team_id))
+    result = await db.execute(select(Team).where(Team.id == team_id).options(*load_profile(Team, profile)))
     team = result.scalar_one_or_none()
     if team is None:
         raise NotFoundException("Team not found")
@@ -86,8 +87,8 @@ async def update_team(
 
 async def delete_team(db: AsyncSession, team: Team) -> None:
     """
-    Delete a team. Nullifies team_id for all members before deleting.
-    Exclui uma equipe. Anula team_id de todos os membros antes de excluir.
+    Delete a team (loaded with the detail profile). Nullifies team_id for all members before deleting.
+    Exclui uma equipe (carregada com o perfil detail). Anula team_id de todos os membros antes de excluir.
     """
     for member in team.members:
         member.team_id = None
@@ -104,7 +105,7 @@ async def list_team_members(db: AsyncSession, team_id: uuid.UUID) -> list[User]:
     List all members of a team.
     Lista todos os membros de uma equipe.
     """
-    team = await get_team_by_id(db, team_id)
+    team = await get_team_by_id(db, team_id, profile="detail")
     return list(team.members)
 
 
@@ -116,7 +117,7 @@ async def add_member(db: AsyncSession, team_id: uuid.UUID, user_id: uuid.UUID) -
     Adiciona um usuario a uma equipe. Lanca NotFoundException se usuario/equipe nao encontrado.
     Lanca ConflictException se o usuario ja pertence a uma equipe.
     """
-    team = await get_team_by_id(db, team_id)
+    team = await get_team_by_id(db, team_id, profile="list")
 
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
@@ -130,7 +131,7 @@ async def add_member(db: AsyncSession, team_id: uuid.UUID, user_id: uuid.UUID) -
 
     user.team_id = team_id
     await db.commit()
-    await db.refresh(team)
+    await refresh_profile(db, team, "detail")
     return list(team.members)
 
 
@@ -139,7 +140,7 @@ async def remove_member(db: AsyncSession, team_id: uuid.UUID, user_id: uuid.UUID
     Remove a user from a team. Raises NotFoundException if user is not a member.
     Remove um usuario de uma equipe. Lanca NotFoundException se o usuario nao e membro.
     """
-    team = await get_team_by_id(db, team_id)
+    team = await get_team_by_id(db, team_id, profile="list")
 
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
@@ -151,5 +152,5 @@ async def remove_member(db: AsyncSession, team_id: uuid.UUID, user_id: uuid.UUID
 
     user.team_id = None
     await db.commit()
-    await db.refresh(team)
+    await refresh_profile(db, team, "detail")
     return list(team.members)
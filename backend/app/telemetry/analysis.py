@@ -0,0 +1,191 @@
+"""
+Vectorized lap analysis on drivers x laps matrices (NumPy).
+Analise vetorizada de voltas em matrizes pilotos x voltas (NumPy).
+
+Missing laps are NaN. NaN propagates through cumulative sums and rolling windows, so a driver's
+cumulative time and gaps stop at its first missing lap, and the JSON output turns NaN into null.
+Voltas ausentes sao NaN. NaN se propaga por somas acumuladas e janelas moveis, entao o tempo
+acumulado e os gaps de um piloto param na primeira volta ausente, e a saida JSON converte NaN em null.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+type Matrix = npt.NDArray[np.float64]
+
+SECTORS = 3
+
+
+@dataclass(frozen=True, slots=True)
+class SectorBests:
+    """
+    Best sectors of a LapMatrix, NaN where a driver (or the session) has no time for a sector.
+    Melhores setores de uma LapMatrix, NaN onde um piloto (ou a sessao) nao tem tempo no setor.
+    """
+
+    driver_best_ms: Matrix  # drivers x sectors / pilotos x setores
+    theoretical_best_ms: npt.NDArray[np.float64]  # per driver, sum of its best sectors / soma dos seus melhores setores
+    session_best_ms: npt.NDArray[np.float64]  # per sector / por setor
+    session_best_at: npt.NDArray[np.intp]  # sectors x (driver row, lap column), -1 without a time / -1 sem tempo
+    gap_ms: Matrix  # drivers x laps x sectors, each sector minus the session best / cada setor menos o melhor
+
+
+@dataclass(frozen=True, slots=True)
+class GapChart:
+    """
+    Running order at the end of every lap, drivers x laps; NaN / 0 where a driver has no race time.
+    Ordem de corrida ao fim de cada volta, pilotos x voltas; NaN / 0 onde um piloto nao tem tempo de corrida.
+    """
+
+    cumulative_ms: Matrix
+    position: npt.NDArray[np.int64]  # 1-based, 0 without a race time / a partir de 1, 0 sem tempo
+    gap_to_leader_ms: Matrix  # 0 for the leader / 0 para o lider
+    interval_ms: Matrix  # to the car ahead, 0 for the leader / para o carro a frente, 0 para o lider
+
+
+@dataclass(frozen=True, slots=True)
+class LapMatrix:
+    """
+    Lap and sector times laid out as drivers x laps, NaN where a lap is missing.
+    Tempos de volta e setor dispostos como pilotos x voltas, NaN onde falta a volta.
+    """
+
+    lap_numbers: npt.NDArray[np.int64]
+    lap_time_ms: Matrix
+    sector_ms: Matrix  # sectors x drivers x laps / setores x pilotos x voltas
+
+    @classmethod
+    def build(
+        cls,
+        n_drivers: int,
+        driver_index: Sequence[int],
+        lap_numbers: Sequence[int],
+        lap_time_ms: Sequence[float],
+        sector_ms: Sequence[Sequence[float | None]] | None = None,
+    ) -> "LapMatrix":
+        """
+        Scatter flat per-lap columns (one list per sector, or None for no sectors) into the matrix;
+        missing sectors are None.
+        Espalha colunas planas por volta (uma lista por setor, ou None sem setores) na matriz;
+        setores ausentes sao None.
+        """
+        laps = np.asarray(lap_numbers, dtype=np.int64)
+        columns = np.unique(laps)
+        rows = np.asarray(driver_index, dtype=np.intp)
+        cols = np.searchsorted(columns, laps)
+        times = np.full((n_drivers, columns.size), np.nan)
+        times[rows, cols] = lap_time_ms
+        sectors = np.full((SECTORS, n_drivers, columns.size), np.nan)
+        if sector_ms is not None:
+            sectors[:, rows, cols] = np.asarray(sector_ms, dtype=np.float64).reshape(SECTORS, -1)
+        return cls(lap_numbers=columns, lap_time_ms=times, sector_ms=sectors)
+
+    def cumulative_ms(self) -> Matrix:
+        """Race time at the end of each lap / Tempo de corrida ao fim de cada volta."""
+        return np.cumsum(self.lap_time_ms, axis=1)
+
+    def leader_index(self) -> int | None:
+        """
+        Row of the race leader: most laps completed, then lowest total time.
+        Linha do lider: mais voltas completadas, depois menor tempo total.
+        """
+        completed = np.count_nonzero(~np.isnan(self.lap_time_ms), axis=1)
+        if completed.size == 0 or completed.max() == 0:
+            return None
+        total = np.nansum(self.lap_time_ms, axis=1)
+        # lexsort sorts by the last key first / lexsort ordena pela ultima chave primeiro
+        return int(np.lexsort((total, -completed))[0])
+
+    def gap_chart(self) -> GapChart:
+        """
+        Positions, gap to the leader and interval at each lap, ordered by cumulative time among the drivers
+        that completed every lap so far. Ties keep row order.
+        Posicoes, gap para o lider e intervalo em cada volta, ordenados pelo tempo acumulado entre os pilotos
+        que completaram todas as voltas ate ali. Empates mantem a ordem das linhas.
+        """
+        cumulative = self.cumulative_ms()
+        timed = ~np.isnan(cumulative)
+        order = np.argsort(np.where(timed, cumulative, np.inf), axis=0, kind="stable")
+        ranked = np.take_along_axis(cumulative, order, axis=0)
+        # Car ahead of each ranked row; the leader is its own / Carro a frente de cada linha; o lider e ele mesmo
+        ahead = np.concatenate((ranked[:1], ranked[:-1]))
+        position = np.zeros(cumulative.shape, dtype=np.int64)
+        interval = np.full_like(cumulative, np.nan)
+        ranks = np.broadcast_to(np.arange(1, cumulative.shape[0] + 1)[:, None], cumulative.shape)
+        np.put_along_axis(position, order, ranks, axis=0)
+        np.put_along_axis(interval, order, ranked - ahead, axis=0)
+        position[~timed] = 0
+        return GapChart(
+            cumulative_ms=cumulative,
+            position=position,
+            gap_to_leader_ms=cumulative - ranked[:1],
+            interval_ms=interval,
+        )
+
+    def rolling_avg_ms(self, window: int) -> Matrix:
+        """
+        Mean of the last `window` laps at each lap, NaN until the window is full.
+        Media das ultimas `window` voltas em cada volta, NaN ate a janela encher.
+        """
+        rolling = np.full_like(self.lap_time_ms, np.nan)
+        if window <= self.lap_time_ms.shape[1]:
+            windows = np.lib.stride_tricks.sliding_window_view(self.lap_time_ms, window, axis=1)
+            rolling[:, window - 1 :] = windows.mean(axis=2)
+        return rolling
+
+    def sector_bests(self) -> SectorBests:
+        """
+        Best sectors per driver and for the session, and every lap's sector gaps to the session bests.
+        A tie for a session best goes to the earliest lap.
+        Melhores setores por piloto e da sessao, e os gaps de setor de cada volta para os melhores da sessao.
+        Um empate no melhor da sessao fica com a volta mais cedo.
+        """
+        times = np.moveaxis(self.sector_ms, 0, -1)  # drivers x laps x sectors / pilotos x voltas x setores
+        n_drivers, n_laps, _ = times.shape
+        filled = np.where(np.isnan(times), np.inf, times)
+        driver_best = filled.min(axis=1, initial=np.inf)
+        # Laps first, so argmin finds the earliest lap / Voltas primeiro, para o argmin achar a volta mais cedo
+        by_lap = filled.transpose(1, 0, 2).reshape(-1, SECTORS)
+        session_best = by_lap.min(axis=0, initial=np.inf)
+        at = np.full((SECTORS, 2), -1, dtype=np.intp)
+        timed = np.isfinite(session_best)
+        if timed.any():
+            lap, driver = np.unravel_index(by_lap.argmin(axis=0), (n_laps, n_drivers))
+            at[timed] = np.column_stack((driver, lap))[timed]
+        driver_best[np.isinf(driver_best)] = np.nan
+        session_best[~timed] = np.nan
+        return SectorBests(
+            driver_best_ms=driver_best,
+            theoretical_best_ms=driver_best.sum(axis=1),
+            session_best_ms=session_best,
+            session_best_at=at,
+            gap_ms=times - session_best,
+        )
+
+    def compare(self, reference: int, window: int) -> dict[str, Matrix]:
+        """
+        Cumulative time, gaps and deltas to the reference row, rolling pace and sector deltas.
+        Tempo acumulado, gaps e deltas para a linha de referencia, ritmo movel e deltas de setor.
+        """
+        cumulative = self.cumulative_ms()
+        return {
+            "lap_time_ms": self.lap_time_ms,
+            "cumulative_ms": cumulative,
+            "gap_to_reference_ms": cumulative - cumulative[reference],
+            "lap_delta_ms": self.lap_time_ms - self.lap_time_ms[reference],
+            "rolling_avg_ms": self.rolling_avg_ms(window),
+            "sector_delta_ms": self.sector_ms - self.sector_ms[:, reference : reference + 1, :],
+        }
+
+
+def to_json(matrix: Matrix) -> list[object]:
+    """
+    Nested lists rounded to 0.1 ms, with NaN as None.
+    Listas aninhadas arredondadas a 0,1 ms, com NaN como None.
+    """
+    values = np.round(matrix, 1).astype(object)
+    values[np.isnan(matrix)] = None
+    return list(values.tolist())
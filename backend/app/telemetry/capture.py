@@ -0,0 +1,211 @@
+"""
+Packet-capture tools for the UDP ingester: record a live session, replay it faster than real time,
+or synthesize a race offline.
+Ferramentas de captura de pacotes para o ingestor UDP: gravar uma sessao ao vivo, reproduzi-la mais
+rapido que o tempo real, ou sintetizar uma corrida offline.
+
+Usage / Uso (from backend/):
+    python -m app.telemetry.capture record session.cap --port 20777
+    python -m app.telemetry.capture replay session.cap --port 20777 --speed 10
+    python -m app.telemetry.capture replay session.cap --speed 0  # as fast as possible / o mais rapido possivel
+    python -m app.telemetry.capture synth race.cap --cars 20 --laps 10
+"""
+
+import argparse
+import asyncio
+import contextlib
+import signal
+import socket
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import numpy as np
+
+from app.config import settings
+from app.telemetry.packets import (
+    CAR_RECORDS,
+    PacketKind,
+    encode,
+    read_capture,
+    write_capture_header,
+    write_capture_record,
+)
+
+# Synthetic race / Corrida sintetica
+_SECTOR_SPLITS = (0.32, 0.35)  # share of the lap in sectors 1 and 2 / fracao da volta nos setores 1 e 2
+_PIT_ENTRY_S = 10.0  # pit lane before the line / pit lane antes da linha
+_PIT_EXIT_S = 12.0  # pit lane after the line / pit lane depois da linha
+_PARTICIPANTS_EVERY_S = 5.0
+
+
+@dataclass
+class ReplayStats:
+    """What a replay sent / O que uma reproducao enviou."""
+
+    packets: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+class _Recorder(asyncio.DatagramProtocol):
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.packets = 0
+        self._start: float | None = None
+
+    def datagram_received(self, data: bytes, addr: tuple[str | Any, int]) -> None:
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        write_capture_record(self.file, now - self._start, data)
+        self.packets += 1
+
+
+async def record(path: Path, host: str, port: int, seconds: float | None = None) -> int:
+    """
+    Write every datagram received on (host, port) to a capture file, until SIGINT or `seconds`.
+    Grava cada datagrama recebido em (host, porta) num arquivo de captura, ate SIGINT ou `seconds`.
+    """
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    loop.add_signal_handler(signal.SIGINT, stop.set)
+    with path.open("wb") as file:
+        write_capture_header(file)
+        recorder = _Recorder(file)
+        transport, _ = await loop.create_datagram_endpoint(lambda: recorder, local_addr=(host, port))
+        try:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(stop.wait(), seconds)
+        finally:
+            transport.close()
+    return recorder.packets
+
+
+def replay(path: Path, host: str, port: int, speed: float) -> ReplayStats:
+    """
+    Send a capture to (host, port), `speed` times faster than recorded; 0 sends without pauses.
+    Envia uma captura para (host, porta), `speed` vezes mais rapido que o gravado; 0 envia sem pausas.
+    """
+    stats = ReplayStats()
+    with path.open("rb") as file, socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        start = time.perf_counter()
+        first: float | None = None
+        for received_at, data in read_capture(file):
+            if speed > 0:
+                first = received_at if first is None else first
+                delay = (received_at - first) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            sock.sendto(data, (host, port))
+            stats.packets += 1
+            stats.bytes += len(data)
+        stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def synthesize(
+    path: Path, cars: int = 20, laps: int = 5, lap_time_s: float = 90.0, rate_hz: int = 20, seed: int = 0
+) -> int:
+    """
+    Write a capture of a synthetic race: car i carries race number i + 1, every car pits once (from
+    lap 2 on), about 5% of laps are invalidated. Lap data and car status are sent at `rate_hz`.
+    Returns the number of packets.
+
+    Grava uma captura de uma corrida sintetica: o carro i tem o numero i + 1, cada carro para uma vez
+    (a partir da volta 2), cerca de 5% das voltas sao invalidadas. Dados de volta e status do carro sao
+    enviados a `rate_hz`. Retorna o numero de pacotes.
+    """
+    rng = np.random.default_rng(seed)
+    grid = np.arange(cars)
+    pace = lap_time_s * (1 + rng.uniform(0, 0.02, cars))
+    lap_times = pace[:, None] * (1 + rng.normal(0, 0.003, (cars, laps)))
+    invalid = rng.random((cars, laps)) < 0.05
+    start_tyre = np.where(grid % 2 == 0, 1, 2)  # soft / medium
+    pit_lap = rng.integers(1, laps, cars) if laps > 1 else np.full(cars, laps + 1)
+    pitted = pit_lap <= laps
+    lap_times[grid[pitted], pit_lap[pitted] - 1] += _PIT_ENTRY_S / 2
+    lap_times[grid[pitted], np.minimum(pit_lap[pitted], laps - 1)] += _PIT_EXIT_S
+    ends = np.cumsum(lap_times, axis=1)
+    pit_at = np.where(pitted, ends[grid, np.minimum(pit_lap, laps) - 1], np.inf)
+    # Finished cars rank ahead of running ones, by finish time / Carros que terminaram a frente, por chegada
+    finish_rank = laps + 2 - ends[:, -1] / (ends[:, -1].max() + 1)
+
+    lap_data = np.zeros(cars, dtype=CAR_RECORDS[PacketKind.lap_data])
+    car_status = np.zeros(cars, dtype=CAR_RECORDS[PacketKind.car_status])
+    participants = np.zeros(cars, dtype=CAR_RECORDS[PacketKind.participants])
+    participants["race_number"] = grid + 1
+    packets = 0
+    next_participants = 0.0
+    with path.open("wb") as file:
+        write_capture_header(file)
+        for frame in range(int((ends.max() + 1) * rate_hz)):
+            now = frame / rate_hz
+            done = (ends <= now).sum(axis=1)
+            running = np.minimum(done, laps - 1)
+            lap_start = np.where(done > 0, ends[grid, np.maximum(done - 1, 0)], 0.0)
+            fraction = np.clip((now - lap_start) / lap_times[grid, running], 0.0, 1.0)
+            progress = np.where(done >= laps, finish_rank, done + fraction)
+            position = np.empty(cars, dtype=np.int64)
+            position[np.argsort(-progress, kind="stable")] = grid + 1
+            lap_ms = lap_times[grid, running] * 1000
+            on_lap = done < laps
+
+            lap_data["position"] = position
+            lap_data["current_lap"] = done + 1
+            lap_data["last_lap_time_ms"] = np.where(done > 0, lap_times[grid, np.maximum(done - 1, 0)] * 1000, 0)
+            lap_data["sector_1_ms"] = np.where(on_lap & (fraction >= _SECTOR_SPLITS[0]), lap_ms * _SECTOR_SPLITS[0], 0)
+            lap_data["sector_2_ms"] = np.where(
+                on_lap & (fraction >= sum(_SECTOR_SPLITS)), lap_ms * _SECTOR_SPLITS[1], 0
+            )
+            lap_data["lap_invalid"] = on_lap & invalid[grid, running] & (fraction >= 0.5)
+            lap_data["pit_status"] = (now >= pit_at - _PIT_ENTRY_S) & (now < pit_at + _PIT_EXIT_S)
+            car_status["tyre"] = np.where(now >= pit_at, 3, start_tyre)  # hard after the stop / duro apos a parada
+
+            if now >= next_participants:
+                write_capture_record(file, now, encode(PacketKind.participants, frame, now, participants))
+                next_participants += _PARTICIPANTS_EVERY_S
+                packets += 1
+            write_capture_record(file, now, encode(PacketKind.car_status, frame, now, car_status))
+            write_capture_record(file, now, encode(PacketKind.lap_data, frame, now, lap_data))
+            packets += 2
+    return packets
+
+
+def main() -> None:
+    """CLI entry point / Ponto de entrada da CLI."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_cmd = commands.add_parser("record", help="record live packets / grava pacotes ao vivo")
+    record_cmd.add_argument("path", type=Path)
+    record_cmd.add_argument("--host", default=settings.TELEMETRY_UDP_HOST)
+    record_cmd.add_argument("--port", type=int, default=settings.TELEMETRY_UDP_PORT)
+    record_cmd.add_argument("--seconds", type=float, default=None)
+    replay_cmd = commands.add_parser("replay", help="send a capture / envia uma captura")
+    replay_cmd.add_argument("path", type=Path)
+    replay_cmd.add_argument("--host", default="127.0.0.1")
+    replay_cmd.add_argument("--port", type=int, default=settings.TELEMETRY_UDP_PORT)
+    replay_cmd.add_argument("--speed", type=float, default=1.0)
+    synth_cmd = commands.add_parser("synth", help="write a synthetic race / grava uma corrida sintetica")
+    synth_cmd.add_argument("path", type=Path)
+    synth_cmd.add_argument("--cars", type=int, default=20)
+    synth_cmd.add_argument("--laps", type=int, default=5)
+    synth_cmd.add_argument("--lap-time", type=float, default=90.0)
+    synth_cmd.add_argument("--rate", type=int, default=20)
+    synth_cmd.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        packets = asyncio.run(record(args.path, args.host, args.port, args.seconds))
+        print(f"{packets} packets recorded / pacotes gravados")
+    elif args.command == "replay":
+        stats = replay(args.path, args.host, args.port, args.speed)
+        print(f"{stats.packets} packets in {stats.seconds:.2f} s ({stats.packets / stats.seconds:.0f} packets/s)")
+    else:
+        packets = synthesize(args.path, args.cars, args.laps, args.lap_time, args.rate, args.seed)
+        print(f"{packets} packets written / pacotes gravados")
+
+
+if __name__ == "__main__":
+    main()
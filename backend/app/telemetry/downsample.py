@@ -0,0 +1,110 @@
+"""
+Trace downsampling for charts: Largest-Triangle-Three-Buckets (LTTB) and min/max bucketing (NumPy).
+Reducao de tracados para graficos: Largest-Triangle-Three-Buckets (LTTB) e buckets de min/max (NumPy).
+
+Both return sample indices, so the client can place points on the time axis (index / sample_rate_hz)
+and overlay laps sampled at different rates. Samples are evenly spaced, so the index is the x axis.
+Ambos retornam indices de amostra, para o cliente posicionar os pontos no eixo de tempo
+(indice / sample_rate_hz) e sobrepor voltas com taxas diferentes. As amostras sao equiespacadas,
+entao o indice e o eixo x.
+
+- lttb: keeps the visual shape of smooth signals (speed, throttle) / mantem a forma de sinais suaves
+- minmax: keeps every local extreme, e.g. brake spikes / mantem todos os extremos locais, ex. picos de freio
+"""
+
+import enum
+import math
+from collections import defaultdict
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+type Indices = npt.NDArray[np.intp]
+
+
+class DownsampleMethod(str, enum.Enum):
+    """
+    Point selection algorithm.
+    Algoritmo de selecao de pontos.
+    """
+
+    lttb = "lttb"
+    minmax = "minmax"
+
+
+def lttb(values: npt.NDArray[np.generic], points: int) -> Indices:
+    """
+    Indices of `points` samples chosen by LTTB; first and last samples are always kept.
+    `values` is one series (n,) or equally long series stacked as (k, n); the result has the same rank.
+    Indices de `points` amostras escolhidas por LTTB; primeira e ultima amostras sempre mantidas.
+    `values` e uma serie (n,) ou series de mesmo tamanho empilhadas como (k, n); o resultado tem o mesmo rank.
+    """
+    y = np.atleast_2d(values).astype(np.float64)
+    k, n = y.shape
+    if points >= n or points < 3:
+        kept = np.tile(np.arange(n, dtype=np.intp), (k, 1))
+        return kept if values.ndim > 1 else kept[0]
+    # points - 2 inner buckets over samples [1, n - 1) / points - 2 buckets internos sobre [1, n - 1)
+    edges = (np.arange(points - 1) * ((n - 2) / (points - 2))).astype(np.intp) + 1
+    edges[-1] = n - 1
+    # Average point of each bucket, then the last sample as the "next bucket" of the last one
+    # Ponto medio de cada bucket, depois a ultima amostra como "proximo bucket" do ultimo
+    avg_x = np.append((edges[:-1] + edges[1:] - 1) / 2, n - 1)
+    avg_y = np.concatenate((np.add.reduceat(y, edges[:-1], axis=1) / np.diff(edges), y[:, -1:]), axis=1)
+    x = np.arange(n, dtype=np.float64)
+    rows = np.arange(k)
+
+    kept = np.empty((k, points), dtype=np.intp)
+    kept[:, 0], kept[:, -1] = 0, n - 1
+    anchor = np.zeros(k, dtype=np.intp)
+    # Each bucket depends on the previous pick, so buckets run in order; the triangle areas of a bucket
+    # are computed for every candidate of every series at once.
+    # Cada bucket depende da escolha anterior, entao os buckets rodam em ordem; as areas dos triangulos
+    # de um bucket sao calculadas para todos os candidatos de todas as series de uma vez.
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ay = y[rows, anchor]
+        # area(b) = |(ax - cx)(by - ay) - (ax - bx)(cy - ay)| = |dx * by + dy * bx + c|
+        dx = anchor - avg_x[i + 1]
+        dy = avg_y[:, i + 1] - ay
+        c = -dx * ay - anchor * dy
+        area = np.abs(dx[:, None] * y[:, lo:hi] + dy[:, None] * x[lo:hi] + c[:, None])
+        anchor = lo + area.argmax(axis=1)
+        kept[:, i + 1] = anchor
+    return kept if values.ndim > 1 else kept[0]
+
+
+def minmax(values: npt.NDArray[np.generic], points: int) -> Indices:
+    """
+    Indices of each bucket's minimum and maximum plus the first and last samples, at most `points`.
+    Indices do minimo e maximo de cada bucket mais a primeira e ultima amostras, no maximo `points`.
+    """
+    n = values.size
+    if points >= n or points < 4:
+        return np.arange(n, dtype=np.intp)
+    buckets = (points - 2) // 2
+    size = math.ceil(n / buckets)
+    # Pad with the last sample so buckets reshape evenly / Completa com a ultima amostra para o reshape
+    grid = np.pad(values, (0, buckets * size - n), mode="edge").reshape(buckets, size)
+    base = np.arange(buckets) * size
+    picks = np.concatenate(([0, n - 1], base + grid.argmin(axis=1), base + grid.argmax(axis=1)))
+    return np.unique(np.minimum(picks, n - 1)).astype(np.intp)
+
+
+def downsample(series: Sequence[npt.NDArray[np.generic]], method: DownsampleMethod, points: int) -> list[Indices]:
+    """
+    Indices kept by `method` for each series. LTTB runs once per group of equally long series.
+    Indices mantidos pelo `method` para cada serie. LTTB roda uma vez por grupo de series de mesmo tamanho.
+    """
+    if method is DownsampleMethod.minmax:
+        return [minmax(values, points) for values in series]
+    kept: list[Indices] = [np.empty(0, dtype=np.intp)] * len(series)
+    by_length: dict[int, list[int]] = defaultdict(list)
+    for position, values in enumerate(series):
+        by_length[values.size].append(position)
+    for positions in by_length.values():
+        group = lttb(np.stack([series[p] for p in positions]), points)
+        for p, indices in zip(positions, group, strict=True):
+            kept[p] = indices
+    return kept
@@ -0,0 +1,427 @@
+"""
+UDP telemetry ingester: sim packets become LapTime, LapPosition and PitStop rows, written in timed micro-batches.
+Ingestor de telemetria UDP: pacotes do simulador viram linhas LapTime, LapPosition e PitStop, gravadas em
+micro-lotes temporizados.
+
+The datagram callback only decodes the packet and updates per-car NumPy state; a lap, position or pit
+stop row is produced when a car crosses the line or leaves the pit lane. A flusher task writes the
+pending rows through the bulk services every TELEMETRY_INGEST_FLUSH_MS, or as soon as
+TELEMETRY_INGEST_BATCH_ROWS are pending. Rows are written with ON CONFLICT DO NOTHING, so a resent or
+replayed session is idempotent. Cars are matched to drivers by race number among the race's entered teams.
+Outlier flags of the written drivers are refreshed at most every LAP_OUTLIER_REFRESH_SECONDS and on stop.
+
+O callback do datagrama so le o pacote e atualiza o estado NumPy por carro; uma linha de volta, posicao
+ou pit stop e gerada quando um carro cruza a linha ou sai do pit lane. Uma task de flush grava as linhas
+pendentes pelos servicos em lote a cada TELEMETRY_INGEST_FLUSH_MS, ou assim que houver
+TELEMETRY_INGEST_BATCH_ROWS pendentes. As linhas sao gravadas com ON CONFLICT DO NOTHING, entao uma sessao
+reenviada ou reproduzida e idempotente. Carros sao ligados a pilotos pelo numero entre as equipes inscritas.
+As voltas atipicas dos pilotos gravados sao reavaliadas no maximo a cada LAP_OUTLIER_REFRESH_SECONDS e ao parar.
+
+Usage / Uso (from backend/):
+    python -m app.telemetry.ingest --race-id <uuid>
+    python -m app.telemetry.ingest --race-id <uuid> --host 127.0.0.1 --port 20777
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import signal
+import socket
+import time
+import uuid
+from collections import Counter
+from collections.abc import AsyncIterator, Mapping
+from dataclasses import dataclass
+from typing import Any, cast
+
+import numpy as np
+import numpy.typing as npt
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.db.session import async_session
+from app.db.upsert import ConflictMode
+from app.drivers.models import Driver
+from app.pitstops.service import bulk_create_pit_stops
+from app.races.models import Race, race_entries
+from app.replay.service import bulk_create_positions
+from app.telemetry.packets import TYRE_COMPOUNDS, Packet, PacketError, PacketKind, decode
+from app.telemetry.service import PendingOutliers, bulk_create_lap_times
+
+logger = logging.getLogger("app.telemetry.ingest")
+
+type Entries = Mapping[int, tuple[uuid.UUID, uuid.UUID]]  # race number -> (driver_id, team_id)
+type Rows = list[dict[str, object]]
+
+# Line crossings kept per lap for gaps and intervals / Cruzamentos mantidos por volta para gaps e intervalos
+_CROSSING_LAPS = 4
+
+
+@dataclass
+class IngestStats:
+    """Counters of one ingester / Contadores de um ingestor."""
+
+    packets: int = 0
+    bad_packets: int = 0
+    unmatched_rows: int = 0  # rows of cars without a known driver / linhas de carros sem piloto conhecido
+    laps: int = 0
+    positions: int = 0
+    pit_stops: int = 0
+    flushes: int = 0
+    flush_seconds: float = 0.0
+    max_flush_seconds: float = 0.0
+
+
+class LapAggregator:
+    """
+    Per-car state across packets; completed laps, positions and pit stops pile up as bulk-service rows.
+    Estado por carro entre pacotes; voltas, posicoes e pit stops completos acumulam como linhas do servico em lote.
+    """
+
+    def __init__(self, entries: Entries, stats: IngestStats | None = None) -> None:
+        self.entries = entries
+        self.stats = stats or IngestStats()
+        self.laps: Rows = []
+        self.positions: Rows = []
+        self.pit_stops: Rows = []
+        self._size = 0
+        self._lap = np.zeros(0, dtype=np.int64)
+        self._sector_1 = np.zeros(0, dtype=np.int64)
+        self._sector_2 = np.zeros(0, dtype=np.int64)
+        self._invalid = np.zeros(0, dtype=bool)
+        self._pitting = np.zeros(0, dtype=bool)
+        self._pit_since = np.zeros(0, dtype=np.float64)
+        self._pit_lap = np.zeros(0, dtype=np.int64)
+        self._pit_tyre = np.zeros(0, dtype=np.int64)
+        self._tyre = np.zeros(0, dtype=np.int64)
+        self._number = np.zeros(0, dtype=np.int64)
+        self._crossings: dict[int, dict[int, float]] = {}  # lap -> position -> session time
+
+    @property
+    def pending(self) -> int:
+        """Rows waiting for the next flush / Linhas aguardando o proximo flush."""
+        return len(self.laps) + len(self.positions) + len(self.pit_stops)
+
+    def take(self) -> tuple[Rows, Rows, Rows]:
+        """Hand over the pending rows / Entrega as linhas pendentes."""
+        pending = self.laps, self.positions, self.pit_stops
+        self.laps, self.positions, self.pit_stops = [], [], []
+        return pending
+
+    def restore(self, laps: Rows, positions: Rows, pit_stops: Rows) -> None:
+        """Put back rows of a failed flush, ahead of newer ones / Devolve linhas de um flush que falhou."""
+        self.laps[:0], self.positions[:0], self.pit_stops[:0] = laps, positions, pit_stops
+
+    def feed(self, packet: Packet) -> None:
+        """Apply one decoded packet / Aplica um pacote lido."""
+        n = len(packet.cars)
+        self._grow(n)
+        if packet.kind is PacketKind.lap_data:
+            self._lap_data(packet.session_time, packet.cars)
+        elif packet.kind is PacketKind.car_status:
+            self._tyre[:n] = packet.cars["tyre"]
+        else:
+            self._number[:n] = packet.cars["race_number"]
+
+    def _grow(self, n: int) -> None:
+        if n <= self._size:
+            return
+        for name in (
+            "_lap",
+            "_sector_1",
+            "_sector_2",
+            "_invalid",
+            "_pitting",
+            "_pit_since",
+            "_pit_lap",
+            "_pit_tyre",
+            "_tyre",
+            "_number",
+        ):
+            current = getattr(self, name)
+            setattr(self, name, np.concatenate((current, np.zeros(n - self._size, dtype=current.dtype))))
+        self._size = n
+
+    def _lap_data(self, now: float, cars: npt.NDArray[np.void]) -> None:
+        n = len(cars)
+        lap = cars["current_lap"].astype(np.int64)
+        sector_1 = cars["sector_1_ms"].astype(np.int64)
+        sector_2 = cars["sector_2_ms"].astype(np.int64)
+        invalid = cars["lap_invalid"].astype(bool)
+        pitting = cars["pit_status"] > 0
+
+        new_lap = lap != self._lap[:n]
+        completed = np.flatnonzero(new_lap & (self._lap[:n] > 0) & (lap > self._lap[:n]))
+        # In crossing order, so the leader's and the car ahead's times are known first
+        # Na ordem de cruzamento, para os tempos do lider e do carro a frente ja serem conhecidos
+        for car in completed[np.argsort(cars["position"][completed], kind="stable")]:
+            self._complete_lap(int(car), now, cars[car])
+        left = np.flatnonzero(~pitting & self._pitting[:n])
+        for car in left:
+            self._complete_pit_stop(int(car), now)
+        entered = pitting & ~self._pitting[:n]
+        self._pit_since[:n][entered] = now
+        self._pit_lap[:n][entered] = lap[entered]
+        self._pit_tyre[:n][entered] = self._tyre[:n][entered]
+
+        # Sector times and the invalid flag carry over within a lap / Setores e invalidacao valem durante a volta
+        self._sector_1[:n] = np.where(new_lap, sector_1, np.maximum(self._sector_1[:n], sector_1))
+        self._sector_2[:n] = np.where(new_lap, sector_2, np.maximum(self._sector_2[:n], sector_2))
+        self._invalid[:n] = np.where(new_lap, invalid, self._invalid[:n] | invalid)
+        self._pitting[:n] = pitting
+        self._lap[:n] = lap
+
+    def _complete_lap(self, car: int, now: float, record: np.void) -> None:
+        lap_number = int(self._lap[car])
+        position = int(record["position"])
+        crossings = self._crossings.setdefault(lap_number, {})
+        if len(self._crossings) > _CROSSING_LAPS:
+            del self._crossings[min(self._crossings)]
+        ahead = crossings.get(position - 1)
+        leader = min(crossings.values(), default=None)
+        crossings[position] = now
+
+        entry = self.entries.get(int(self._number[car]))
+        if entry is None:
+            self.stats.unmatched_rows += 1
+            return
+        driver_id, team_id = entry
+        lap_time = int(record["last_lap_time_ms"])
+        if lap_time > 0:
+            sector_1, sector_2 = int(self._sector_1[car]) or None, int(self._sector_2[car]) or None
+            sector_3 = lap_time - sector_1 - sector_2 if sector_1 and sector_2 else None
+            self.laps.append(
+                {
+                    "driver_id": driver_id,
+                    "team_id": team_id,
+                    "lap_number": lap_number,
+                    "lap_time_ms": lap_time,
+                    "sector_1_ms": sector_1,
+                    "sector_2_ms": sector_2,
+                    "sector_3_ms": sector_3 if sector_3 and sector_3 > 0 else None,
+                    "is_valid": not self._invalid[car],
+                }
+            )
+        if position > 0:
+            self.positions.append(
+                {
+                    "driver_id": driver_id,
+                    "team_id": team_id,
+                    "lap_number": lap_number,
+                    "position": position,
+                    "gap_to_leader_ms": None if leader is None else round((now - leader) * 1000),
+                    "interval_ms": None if ahead is None else round((now - ahead) * 1000),
+                }
+            )
+
+    def _complete_pit_stop(self, car: int, now: float) -> None:
+        entry = self.entries.get(int(self._number[car]))
+        if entry is None:
+            self.stats.unmatched_rows += 1
+            return
+        tyre_from, tyre_to = int(self._pit_tyre[car]), int(self._tyre[car])
+        self.pit_stops.append(
+            {
+                "driver_id": entry[0],
+                "team_id": entry[1],
+                "lap_number": int(self._pit_lap[car]),
+                "duration_ms": round((now - self._pit_since[car]) * 1000),
+                "tire_from": TYRE_COMPOUNDS[tyre_from - 1] if 0 < tyre_from <= len(TYRE_COMPOUNDS) else None,
+                "tire_to": TYRE_COMPOUNDS[tyre_to - 1] if 0 < tyre_to <= len(TYRE_COMPOUNDS) else None,
+            }
+        )
+
+
+class Ingester:
+    """
+    Aggregates datagrams of one race and flushes them through the bulk services.
+    Agrega datagramas de uma corrida e os grava pelos servicos em lote.
+    """
+
+    def __init__(self, sessions: async_sessionmaker[AsyncSession], race_id: uuid.UUID, entries: Entries) -> None:
+        self.sessions = sessions
+        self.race_id = race_id
+        self.stats = IngestStats()
+        self.aggregator = LapAggregator(entries, self.stats)
+        self._outliers = PendingOutliers()
+        self._wake = asyncio.Event()
+        self._stopped = False
+
+    def receive(self, data: bytes) -> None:
+        """Datagram callback; never blocks on the database / Callback do datagrama; nunca espera o banco."""
+        try:
+            packet = decode(data)
+        except PacketError:
+            self.stats.bad_packets += 1
+            return
+        self.stats.packets += 1
+        self.aggregator.feed(packet)
+        if self.aggregator.pending >= settings.TELEMETRY_INGEST_BATCH_ROWS:
+            self._wake.set()
+
+    async def run(self) -> None:
+        """
+        Flush on every tick or full batch until stopped, then flush what is left.
+        Grava a cada intervalo ou lote cheio ate ser parado, depois grava o que restou.
+        """
+        while not self._stopped:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), settings.TELEMETRY_INGEST_FLUSH_MS / 1000)
+            self._wake.clear()
+            await self.flush()
+        await self.flush(final=True)
+
+    def stop(self) -> None:
+        """Ask run() to finish after a final flush / Pede a run() que termine apos um flush final."""
+        self._stopped = True
+        self._wake.set()
+
+    async def flush(self, final: bool = False) -> None:
+        """
+        Write pending rows, one bulk call per table, then the outlier pass if it is due (always on final).
+        Rows of a failed write, on the database or unexpectedly, are retried on the next flush, unless the
+        service rejects them (e.g. the race was deleted).
+        Grava as linhas pendentes, uma chamada em lote por tabela, depois a analise de voltas atipicas se
+        vencida (sempre no final). Linhas de uma gravacao que falhou, no banco ou de forma inesperada, sao
+        repetidas no proximo flush, a menos que o servico as rejeite (ex. a corrida foi removida).
+        """
+        laps, positions, pit_stops = self.aggregator.take()
+        if laps or positions or pit_stops:
+            await self._write(laps, positions, pit_stops)
+        async with self.sessions() as db:
+            try:
+                await self._outliers.flag(db, force=final)
+            except Exception:
+                logger.exception("Outlier pass failed, retrying / Analise de voltas atipicas falhou, repetindo")
+
+    async def _write(self, laps: Rows, positions: Rows, pit_stops: Rows) -> None:
+        start = time.perf_counter()
+        async with self.sessions() as db:
+            try:
+                if laps:
+                    written = await bulk_create_lap_times(
+                        db, self.race_id, laps, ConflictMode.ignore, flag_outliers=False
+                    )
+                    self.stats.laps += len(written)
+                    self._outliers.add(self.race_id, (lap["driver_id"] for lap in written))
+                if positions:
+                    self.stats.positions += len(
+                        await bulk_create_positions(db, self.race_id, positions, ConflictMode.ignore)
+                    )
+                if pit_stops:
+                    self.stats.pit_stops += len(
+                        await bulk_create_pit_stops(db, self.race_id, pit_stops, ConflictMode.ignore)
+                    )
+                    # A pit stop turns its lap into an in-lap / Um pit stop torna a sua volta uma in-lap
+                    self._outliers.add(self.race_id, (cast(uuid.UUID, stop["driver_id"]) for stop in pit_stops))
+            except (SQLAlchemyError, OSError):
+                logger.exception("Flush failed, retrying / Flush falhou, repetindo")
+                self.aggregator.restore(laps, positions, pit_stops)
+            except HTTPException as err:
+                logger.error("Rows rejected / Linhas rejeitadas: %s", err.detail)
+            except Exception:
+                # Keep the rows and the flush loop / Mantem as linhas e o loop de flush
+                logger.exception("Unexpected flush failure, retrying / Falha inesperada no flush, repetindo")
+                self.aggregator.restore(laps, positions, pit_stops)
+        elapsed = time.perf_counter() - start
+        self.stats.flushes += 1
+        self.stats.flush_seconds += elapsed
+        self.stats.max_flush_seconds = max(self.stats.max_flush_seconds, elapsed)
+
+
+class IngestProtocol(asyncio.DatagramProtocol):
+    """asyncio UDP endpoint feeding an Ingester / Endpoint UDP asyncio que alimenta um Ingester."""
+
+    def __init__(self, ingester: Ingester) -> None:
+        self.ingester = ingester
+
+    def datagram_received(self, data: bytes, addr: tuple[str | Any, int]) -> None:
+        self.ingester.receive(data)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.warning("UDP error / Erro UDP: %s", exc)
+
+
+async def load_entries(db: AsyncSession, race_id: uuid.UUID) -> dict[int, tuple[uuid.UUID, uuid.UUID]]:
+    """
+    Race number -> (driver_id, team_id) for active drivers of the race's entered teams.
+    Numbers shared by two entered drivers are left out, as their cars cannot be told apart.
+
+    Numero -> (driver_id, team_id) dos pilotos ativos das equipes inscritas na corrida.
+    Numeros repetidos entre dois pilotos inscritos ficam de fora, pois os carros nao se distinguem.
+    """
+    if await db.get(Race, race_id) is None:
+        raise LookupError(f"Race not found / Corrida nao encontrada: {race_id}")
+    result = await db.execute(
+        select(Driver.number, Driver.id, Driver.team_id)
+        .join(race_entries, race_entries.c.team_id == Driver.team_id)
+        .where(race_entries.c.race_id == race_id, Driver.is_active.is_(True))
+    )
+    drivers = result.all()
+    counts = Counter(number for number, _, _ in drivers)
+    for number, count in counts.items():
+        if count > 1:
+            logger.warning("Race number %d is not unique, ignored / Numero repetido, ignorado", number)
+    return {number: (driver_id, team_id) for number, driver_id, team_id in drivers if counts[number] == 1}
+
+
+@contextlib.asynccontextmanager
+async def listen(ingester: Ingester, host: str, port: int) -> AsyncIterator[tuple[str, int]]:
+    """
+    Receive datagrams on (host, port) and flush in the background; yields the bound address.
+    Recebe datagramas em (host, porta) e grava em segundo plano; retorna o endereco vinculado.
+    """
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: IngestProtocol(ingester), local_addr=(host, port))
+    sock = transport.get_extra_info("socket")
+    # Room for bursts while a flush holds the loop / Espaco para rajadas enquanto um flush ocupa o loop
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, settings.TELEMETRY_UDP_RCVBUF_BYTES)
+    if sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) < settings.TELEMETRY_UDP_RCVBUF_BYTES:
+        # Linux caps it at net.core.rmem_max / O Linux limita a net.core.rmem_max
+        logger.warning("UDP receive buffer capped / Buffer UDP limitado: raise net.core.rmem_max")
+    flusher = asyncio.create_task(ingester.run())
+    try:
+        yield sock.getsockname()[:2]
+    finally:
+        transport.close()
+        ingester.stop()
+        await flusher
+
+
+async def serve(race_id: uuid.UUID, host: str, port: int) -> IngestStats:
+    """Ingest until SIGINT / SIGTERM / Ingere ate SIGINT / SIGTERM."""
+    async with async_session() as db:
+        entries = await load_entries(db, race_id)
+    logger.info("Matched %d drivers / %d pilotos encontrados", len(entries))
+    ingester = Ingester(async_session, race_id, entries)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    async with listen(ingester, host, port) as address:
+        logger.info("Listening on / Escutando em %s:%d", *address)
+        await stop.wait()
+    return ingester.stats
+
+
+def main() -> None:
+    """CLI entry point / Ponto de entrada da CLI."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--race-id", type=uuid.UUID, required=True)
+    parser.add_argument("--host", default=settings.TELEMETRY_UDP_HOST)
+    parser.add_argument("--port", type=int, default=settings.TELEMETRY_UDP_PORT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        stats = asyncio.run(serve(args.race_id, args.host, args.port))
+    except LookupError as err:
+        parser.exit(1, f"{err}\n")
+    logger.info("Stopped / Parado: %s", stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,47 @@
 """
-Telemetry models: lap times and car setups.
-Modelos de telemetria: tempos de volta e setups de carro.
+Telemetry models: lap times, lap traces, per-driver lap aggregates and car setups.
+Modelos de telemetria: tempos de volta, tracados de volta, agregados de volta por piloto e setups de carro.
 """
 
+import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint, Uuid, func
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+    Uuid,
+    func,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 
 
+class LapOutlier(str, enum.Enum):
+    """
+    Why a lap is left out of stint pace and degradation (see outliers.py).
+    Por que uma volta fica fora do ritmo e da degradacao do stint (ver outliers.py).
+    """
+
+    in_lap = "in_lap"
+    out_lap = "out_lap"
+    safety_car = "safety_car"
+    slow = "slow"
+    fast = "fast"
+
+
 class LapTime(Base):
     """
     Lap time record for a driver in a race.
@@ -19,11 +49,29 @@ class LapTime(Base):
     """
 
     __tablename__ = "lap_times"
-    __table_args__ = (UniqueConstraint("race_id", "driver_id", "lap_number", name="uq_lap_race_driver_lap"),)
+    # Hash-partitioned by race_id on PostgreSQL (migration 017) / Particionada por race_id no PostgreSQL
+    __table_args__ = (
+        # Leads with race_id, so no separate race_id index / Comeca por race_id, sem indice proprio de race_id
+        UniqueConstraint(
+            "race_id",
+            "driver_id",
+            "lap_number",
+            name="uq_lap_race_driver_lap",
+            postgresql_include=["lap_time_ms", "is_valid"],
+        ),
+        # One row per driver and race, maintained on ingest / Uma linha por piloto e corrida, mantida na ingestao
+        Index(
+            "ix_lap_times_personal_best",
+            "race_id",
+            "lap_time_ms",
+            postgresql_where=text("is_personal_best"),
+            sqlite_where=text("is_personal_best = 1"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
     race_id: Mapped[uuid.UUID] = mapped_column(
-        Uuid, ForeignKey("races.id", ondelete="CASCADE"), nullable=False, index=True
+        Uuid, ForeignKey("races.id", ondelete="CASCADE"), nullable=False
     )
     driver_id: Mapped[uuid.UUID] = mapped_column(
         Uuid, ForeignKey("drivers.id", ondelete="CASCADE"), nullable=False, index=True
@@ -38,6 +86,8 @@ class LapTime(Base):
     sector_3_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
     is_valid: Mapped[bool] = mapped_column(Boolean, default=True, server_default="true", nullable=False)
     is_personal_best: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false", nullable=False)
+    # Set by the outlier pass on ingest, None for a clean lap / Definido na ingestao, None para volta limpa
+    outlier: Mapped[LapOutlier | None] = mapped_column(Enum(LapOutlier, native_enum=False, length=20), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships / Relacionamentos
@@ -55,6 +105,62 @@ class LapTime(Base):
         return f"<LapTime(id={self.id}, race_id={self.race_id}, driver_id={self.driver_id}, lap={self.lap_number})>"
 
 
+class LapTrace(Base):
+    """
+    One channel of a lap's high-frequency trace, stored as a compressed typed array (see traces.py).
+    Um canal do tracado de alta frequencia de uma volta, gravado como array tipado comprimido (ver traces.py).
+    """
+
+    __tablename__ = "lap_traces"
+    __table_args__ = (UniqueConstraint("lap_id", "channel", name="uq_lap_trace_channel"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    # On PostgreSQL a trigger replaces this key, lap_times being partitioned (migration 017)
+    # No PostgreSQL um trigger substitui esta chave, pois lap_times e particionada (migracao 017)
+    lap_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("lap_times.id", ondelete="CASCADE"), nullable=False
+    )
+    channel: Mapped[str] = mapped_column(String(32), nullable=False)
+    dtype: Mapped[str] = mapped_column(String(8), nullable=False)
+    encoding: Mapped[str] = mapped_column(String(16), nullable=False)
+    sample_rate_hz: Mapped[float] = mapped_column(Float, nullable=False)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<LapTrace(lap_id={self.lap_id}, channel={self.channel}, samples={self.sample_count})>"
+
+
+class RaceDriverLapStats(Base):
+    """
+    Running lap aggregates of a driver in a race, kept in step with lap_times by the telemetry service.
+    Agregados correntes de volta de um piloto em uma corrida, mantidos junto com lap_times pelo servico.
+    """
+
+    __tablename__ = "race_driver_lap_stats"
+
+    race_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("races.id", ondelete="CASCADE"), primary_key=True
+    )
+    driver_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("drivers.id", ondelete="CASCADE"), primary_key=True
+    )
+    lap_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    lap_time_sum_ms: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Sum of squares, for the std-dev / Soma dos quadrados, para o desvio padrao
+    lap_time_sum_sq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    fastest_lap_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    best_sector_1_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    best_sector_2_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    best_sector_3_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    last_lap_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<RaceDriverLapStats(race_id={self.race_id}, driver_id={self.driver_id}, laps={self.lap_count})>"
+
+
 class CarSetup(Base):
     """
     Car setup configuration for a driver in a race.
@@ -0,0 +1,134 @@
+"""
+Lap outlier detection for one race in a single vectorized pass (NumPy).
+Deteccao de voltas atipicas de uma corrida em uma unica passada vetorizada (NumPy).
+
+A driver's stints are split by its pit stops: the pit lap closes a stint (in-lap) and the next lap
+opens the following one (out-lap). Laps on which a safety car or VSC was called are neutralized. Every
+other lap is scored against its stint with a robust z-score, (lap - median) / (1.4826 x MAD), where MAD
+is the median absolute deviation of the stint's clean laps (client-valid, not in / out / neutralized).
+Stints with fewer than `min_laps` clean laps are not scored. The spread has a floor of 0.2% of the
+median, so a stint of near-identical laps does not flag tenths of a second.
+
+Os stints de um piloto sao separados pelos pit stops: a volta do pit fecha um stint (in-lap) e a
+seguinte abre o proximo (out-lap). Voltas em que o safety car ou VSC foi acionado sao neutralizadas.
+As demais voltas sao avaliadas contra o stint por um z-score robusto, (volta - mediana) / (1,4826 x MAD),
+com MAD o desvio absoluto mediano das voltas limpas do stint (validas pelo cliente, sem in / out /
+neutralizadas). Stints com menos de `min_laps` voltas limpas nao sao avaliados. O desvio tem piso de
+0,2% da mediana, para um stint de voltas quase iguais nao marcar decimos de segundo.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from app.telemetry.models import LapOutlier
+
+# Reason codes; 0 is a clean lap, the rest in order of precedence / Codigos; 0 e volta limpa, demais por precedencia
+REASONS: tuple[LapOutlier | None, ...] = (
+    None,
+    LapOutlier.in_lap,
+    LapOutlier.out_lap,
+    LapOutlier.safety_car,
+    LapOutlier.slow,
+    LapOutlier.fast,
+)
+_IN, _OUT, _NEUTRALIZED, _SLOW, _FAST = range(1, len(REASONS))
+
+_MAD_TO_SIGMA = 1.4826  # MAD of a normal distribution x this = its standard deviation / MAD normal x isto = desvio
+_MIN_SPREAD = 0.002  # fraction of the stint median / fracao da mediana do stint
+
+
+@dataclass(frozen=True, slots=True)
+class OutlierPass:
+    """
+    Per-lap result, aligned with the input laps; NaN where a stint is not scored.
+    Resultado por volta, alinhado com as voltas de entrada; NaN onde o stint nao e avaliado.
+    """
+
+    reason: npt.NDArray[np.int8]  # index into REASONS / indice em REASONS
+    stint: npt.NDArray[np.int64]  # 1-based per driver / a partir de 1 por piloto
+    stint_median_ms: npt.NDArray[np.float64]
+    score: npt.NDArray[np.float64]
+
+    def reasons(self) -> list[LapOutlier | None]:
+        """Reason of each lap / Motivo de cada volta."""
+        return [REASONS[code] for code in self.reason.tolist()]
+
+
+def _group_median(
+    values: npt.NDArray[np.float64], groups: npt.NDArray[np.intp], n_groups: int, mask: npt.NDArray[np.bool_]
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.int64]]:
+    """
+    Median of the masked values of each group (NaN when empty) and the group sizes, from one sort.
+    Mediana dos valores mascarados de cada grupo (NaN quando vazio) e o tamanho dos grupos, com uma ordenacao.
+    """
+    picked = np.flatnonzero(mask)
+    # lexsort sorts by the last key first / lexsort ordena pela ultima chave primeiro
+    order = picked[np.lexsort((values[picked], groups[picked]))]
+    counts = np.bincount(groups[order], minlength=n_groups).astype(np.int64)
+    starts = np.cumsum(counts) - counts
+    medians = np.full(n_groups, np.nan)
+    filled = counts > 0
+    ordered = values[order]
+    low = starts[filled] + (counts[filled] - 1) // 2
+    high = starts[filled] + counts[filled] // 2
+    medians[filled] = (ordered[low] + ordered[high]) / 2
+    return medians, counts
+
+
+def detect_outliers(
+    driver_index: Sequence[int],
+    lap_numbers: Sequence[int],
+    lap_time_ms: Sequence[float],
+    is_valid: Sequence[bool],
+    pit_driver_index: Sequence[int],
+    pit_laps: Sequence[int],
+    neutralized_laps: Sequence[int],
+    threshold: float,
+    min_laps: int,
+) -> OutlierPass:
+    """
+    Flag the laps of one race (flat columns, one entry per lap) given its pit stops and neutralized laps.
+    Marca as voltas de uma corrida (colunas planas, uma entrada por volta) dados os pit stops e voltas neutralizadas.
+    """
+    drivers = np.asarray(driver_index, dtype=np.int64)
+    laps = np.asarray(lap_numbers, dtype=np.int64)
+    times = np.asarray(lap_time_ms, dtype=np.float64)
+    valid = np.asarray(is_valid, dtype=np.bool_)
+    if laps.size == 0:
+        empty = np.empty(0)
+        return OutlierPass(np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int64), empty, empty)
+
+    # (driver, lap) packed in one integer, so pit stops match laps with sorted searches
+    # (piloto, volta) num unico inteiro, para casar pit stops e voltas com buscas ordenadas
+    stride = max(int(laps.max()), max(pit_laps, default=0)) + 2
+    keys = drivers * stride + laps
+    pit_keys = np.sort(np.asarray(pit_driver_index, dtype=np.int64) * stride + np.asarray(pit_laps, dtype=np.int64))
+    # Pit stops of the driver before this lap / Pit stops do piloto antes desta volta
+    stint = np.searchsorted(pit_keys, keys, side="left") - np.searchsorted(pit_keys, drivers * stride) + 1
+
+    reason = np.zeros(laps.size, dtype=np.int8)
+    neutralized = np.isin(laps, np.asarray(neutralized_laps, dtype=np.int64))
+    # Lowest code wins: assign from the last precedence to the first / Menor codigo vence: atribui do ultimo ao primeiro
+    reason[neutralized] = _NEUTRALIZED
+    reason[np.isin(keys, pit_keys + 1)] = _OUT
+    reason[np.isin(keys, pit_keys)] = _IN
+
+    groups_key = drivers * (int(stint.max()) + 1) + stint
+    _, groups = np.unique(groups_key, return_inverse=True)
+    groups = groups.astype(np.intp)
+    n_groups = int(groups.max()) + 1
+    clean = valid & (reason == 0)
+    medians, counts = _group_median(times, groups, n_groups, clean)
+    mads, _ = _group_median(np.abs(times - medians[groups]), groups, n_groups, clean)
+    spread = np.maximum(mads * _MAD_TO_SIGMA, medians * _MIN_SPREAD)
+    scored = counts >= min_laps
+    stint_median = np.where(scored, medians, np.nan)[groups]
+    with np.errstate(invalid="ignore"):
+        score = (times - stint_median) / np.where(scored, spread, np.nan)[groups]
+        free = reason == 0
+        reason[free & (score > threshold)] = _SLOW
+        reason[free & (score < -threshold)] = _FAST
+    return OutlierPass(reason=reason, stint=stint, stint_median_ms=stint_median, score=score)
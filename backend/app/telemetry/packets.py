@@ -0,0 +1,152 @@
+"""
+Sim UDP telemetry packets and packet-capture files.
+Pacotes de telemetria UDP do simulador e arquivos de captura de pacotes.
+
+Every packet is a 12-byte header followed by one fixed-size record per car slot, little-endian.
+Records are decoded with a NumPy structured dtype straight from the datagram, so a packet costs
+one `np.frombuffer` call whatever the grid size.
+Cada pacote e um cabecalho de 12 bytes seguido de um registro de tamanho fixo por vaga de carro,
+little-endian. Os registros sao lidos com um dtype estruturado NumPy direto do datagrama, entao
+um pacote custa uma chamada `np.frombuffer` qualquer que seja o tamanho do grid.
+
+Header / Cabecalho: packet_format u16, kind u8, frame u32, session_time f32 (s), car_count u8
+
+- lap_data: position u8, current_lap u16, last_lap_time_ms u32, sector_1_ms u32, sector_2_ms u32,
+  lap_invalid u8, pit_status u8 (0 on track / na pista, 1 pit lane / pit lane, 2 pit box / box)
+- car_status: tyre u8 (0 unknown / desconhecido, then / depois TYRE_COMPOUNDS)
+- participants: race_number u8 (0 empty slot / vaga vazia)
+
+A capture file is a magic line followed by (received_at f64, length u32, datagram) records.
+Um arquivo de captura e uma linha magica seguida de registros (received_at f64, tamanho u32, datagrama).
+"""
+
+import enum
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import BinaryIO
+
+import numpy as np
+import numpy.typing as npt
+
+from app.pitstops.models import TireCompound
+
+PACKET_FORMAT = 2026
+
+HEADER = struct.Struct("<HBIfB")
+
+
+class PacketKind(enum.IntEnum):
+    """
+    Packet type id carried in the header.
+    Id do tipo de pacote no cabecalho.
+    """
+
+    lap_data = 1
+    car_status = 2
+    participants = 3
+
+
+CAR_RECORDS: dict[PacketKind, np.dtype[np.void]] = {
+    PacketKind.lap_data: np.dtype(
+        [
+            ("position", "u1"),
+            ("current_lap", "<u2"),
+            ("last_lap_time_ms", "<u4"),
+            ("sector_1_ms", "<u4"),
+            ("sector_2_ms", "<u4"),
+            ("lap_invalid", "u1"),
+            ("pit_status", "u1"),
+        ]
+    ),
+    PacketKind.car_status: np.dtype([("tyre", "u1")]),
+    PacketKind.participants: np.dtype([("race_number", "u1")]),
+}
+
+# Tyre code n is TYRE_COMPOUNDS[n - 1] / Codigo de pneu n e TYRE_COMPOUNDS[n - 1]
+TYRE_COMPOUNDS = (
+    TireCompound.soft,
+    TireCompound.medium,
+    TireCompound.hard,
+    TireCompound.intermediate,
+    TireCompound.wet,
+)
+
+CAPTURE_MAGIC = b"TPCAP1\n"
+_RECORD = struct.Struct("<dI")
+
+
+class PacketError(ValueError):
+    """Datagram that is not a valid packet / Datagrama que nao e um pacote valido."""
+
+
+@dataclass(frozen=True, slots=True)
+class Packet:
+    """Decoded packet; `cars` holds one record per car slot / Pacote lido; `cars` tem um registro por vaga."""
+
+    kind: PacketKind
+    frame: int
+    session_time: float  # seconds since the session started / segundos desde o inicio da sessao
+    cars: npt.NDArray[np.void]
+
+
+def decode(data: bytes) -> Packet:
+    """
+    Decode one datagram; raises PacketError on a wrong format, kind or length.
+    Le um datagrama; gera PacketError com formato, tipo ou tamanho errado.
+    """
+    if len(data) < HEADER.size:
+        raise PacketError(f"Short packet: {len(data)} bytes / Pacote curto")
+    packet_format, kind, frame, session_time, car_count = HEADER.unpack_from(data)
+    if packet_format != PACKET_FORMAT:
+        raise PacketError(f"Unknown packet format {packet_format} / Formato de pacote desconhecido")
+    try:
+        packet_kind = PacketKind(kind)
+    except ValueError:
+        raise PacketError(f"Unknown packet kind {kind} / Tipo de pacote desconhecido") from None
+    record = CAR_RECORDS[packet_kind]
+    if len(data) != HEADER.size + car_count * record.itemsize:
+        raise PacketError(f"Bad {packet_kind.name} length: {len(data)} bytes / Tamanho incorreto")
+    cars = np.frombuffer(data, dtype=record, count=car_count, offset=HEADER.size)
+    return Packet(kind=packet_kind, frame=frame, session_time=session_time, cars=cars)
+
+
+def encode(kind: PacketKind, frame: int, session_time: float, cars: npt.NDArray[np.void]) -> bytes:
+    """
+    Encode a packet; `cars` must have the kind's record dtype.
+    Codifica um pacote; `cars` deve ter o dtype de registro do tipo.
+    """
+    if cars.dtype != CAR_RECORDS[kind]:
+        raise PacketError(f"Records are not {kind.name} records / Registros nao sao do tipo {kind.name}")
+    return HEADER.pack(PACKET_FORMAT, kind, frame, session_time, len(cars)) + cars.tobytes()
+
+
+# --- Capture files / Arquivos de captura ---
+
+
+def write_capture_header(file: BinaryIO) -> None:
+    """Start a capture file / Inicia um arquivo de captura."""
+    file.write(CAPTURE_MAGIC)
+
+
+def write_capture_record(file: BinaryIO, received_at: float, data: bytes) -> None:
+    """Append one datagram with its receive time in seconds / Adiciona um datagrama com o instante em segundos."""
+    file.write(_RECORD.pack(received_at, len(data)))
+    file.write(data)
+
+
+def read_capture(file: BinaryIO) -> Iterator[tuple[float, bytes]]:
+    """
+    Yield (received_at, datagram) from a capture file, in recording order.
+    Gera (received_at, datagrama) de um arquivo de captura, na ordem de gravacao.
+    """
+    if file.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+        raise PacketError("Not a packet capture file / Nao e um arquivo de captura")
+    while head := file.read(_RECORD.size):
+        if len(head) < _RECORD.size:
+            raise PacketError("Truncated capture file / Arquivo de captura truncado")
+        received_at, length = _RECORD.unpack(head)
+        data = file.read(length)
+        if len(data) < length:
+            raise PacketError("Truncated capture file / Arquivo de captura truncado")
+        yield received_at, data
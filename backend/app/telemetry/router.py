@@ -1,45 +1,78 @@
 """
-Telemetry API router: lap times, car setups, driver comparison.
-Router da API de telemetria: tempos de volta, setups de carro, comparacao de pilotos.
+Telemetry API router: lap times, lap traces, car setups, driver comparison.
+Router da API de telemetria: tempos de volta, tracados de volta, setups de carro, comparacao de pilotos.
 """
 
+import enum
 import uuid
 
 from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import require_permissions
-from app.db.session import get_db
+from app.core.exceptions import ValidationException
+from app.core.principal import Principal
+from app.db.session import get_db, get_read_db
+from app.db.upsert import ConflictMode
+from app.telemetry.downsample import DownsampleMethod
 from app.telemetry.schemas import (
     CarSetupCreateRequest,
     CarSetupDetailResponse,
     CarSetupResponse,
     CarSetupUpdateRequest,
     DriverComparison,
+    DriverLapStatsResponse,
+    FieldComparisonResponse,
+    LapOutlierReport,
+    LapTimeAcceptedResponse,
     LapTimeBulkCreateRequest,
     LapTimeCreateRequest,
     LapTimeResponse,
     LapTimeSummaryResponse,
+    LapTraceChannelResponse,
+    LapTraceDownsampledResponse,
+    LapTraceResponse,
+    LapTraceUploadRequest,
+    SectorHeatmapResponse,
 )
 from app.telemetry.service import (
     bulk_create_lap_times,
     compare_drivers,
+    compare_field,
     create_lap_time,
     create_setup,
     delete_lap_time,
     delete_setup,
+    flag_lap_outliers,
+    get_downsampled_traces,
+    get_lap_outliers,
+    get_lap_stats,
     get_lap_summary,
     get_lap_time_by_id,
+    get_lap_traces,
+    get_sector_heatmap,
     get_setup_by_id,
     list_lap_times,
     list_setups,
     update_setup,
+    upload_lap_traces,
 )
-from app.users.models import User
+from app.telemetry.traces import to_npz
+from app.telemetry.write_behind import lap_write_behind
 
 router = APIRouter(tags=["telemetry"])
 
 
+class TraceFormat(str, enum.Enum):
+    """
+    Lap trace response body: JSON lists or a NumPy .npz archive.
+    Corpo da resposta de tracado: listas JSON ou arquivo .npz do NumPy.
+    """
+
+    json = "json"
+    npz = "npz"
+
+
 # --- Lap Time endpoints / Endpoints de tempo de volta ---
 
 
@@ -48,7 +81,7 @@ async def read_laps(
     race_id: uuid.UUID,
     driver_id: uuid.UUID | None = Query(default=None, description="Filter by driver / Filtrar por piloto"),
     team_id: uuid.UUID | None = Query(default=None, description="Filter by team / Filtrar por equipe"),
-    _current_user: User = Depends(require_permissions("telemetry:read")),
+    _current_user: Principal = Depends(require_permissions("telemetry:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[LapTimeResponse]:
     """
@@ -62,7 +95,7 @@ async def read_laps(
 async def create_single_lap(
     race_id: uuid.UUID,
     body: LapTimeCreateRequest,
-    _current_user: User = Depends(require_permissions("telemetry:create")),
+    _current_user: Principal = Depends(require_permissions("telemetry:create")),
     db: AsyncSession = Depends(get_db),
 ) -> LapTimeResponse:
     """
@@ -80,7 +113,25 @@ async def create_single_lap(
         sector_2_ms=body.sector_2_ms,
         sector_3_ms=body.sector_3_ms,
         is_valid=body.is_valid,
-        is_personal_best=body.is_personal_best,
+    )
+
+
+@router.post("/api/v1/races/{race_id}/laps/live", response_model=LapTimeAcceptedResponse, status_code=202)
+async def create_live_lap(
+    race_id: uuid.UUID,
+    body: LapTimeCreateRequest,
+    _current_user: Principal = Depends(require_permissions("telemetry:create")),
+    db: AsyncSession = Depends(get_db),
+) -> LapTimeAcceptedResponse:
+    """
+    Queue a single lap time for a write-behind bulk insert (live timing). 202 means buffered, not stored:
+    see app/telemetry/write_behind.py for the durability rules.
+    Enfileira um tempo de volta para insercao em lote write-behind (cronometragem ao vivo). 202 significa
+    no buffer, nao gravado: veja app/telemetry/write_behind.py para as regras de durabilidade.
+    """
+    pending = await lap_write_behind.add(db, race_id, body)
+    return LapTimeAcceptedResponse(
+        race_id=race_id, driver_id=body.driver_id, lap_number=body.lap_number, pending=pending
     )
 
 
@@ -88,34 +139,99 @@ async def create_single_lap(
 async def create_bulk_laps(
     race_id: uuid.UUID,
     body: LapTimeBulkCreateRequest,
-    _current_user: User = Depends(require_permissions("telemetry:create")),
+    on_conflict: ConflictMode | None = Query(
+        default=None,
+        description="Upsert (update) or skip (ignore) existing laps / Atualiza (update) ou ignora (ignore) existentes",
+    ),
+    _current_user: Principal = Depends(require_permissions("telemetry:create")),
     db: AsyncSession = Depends(get_db),
 ) -> list[LapTimeResponse]:
     """
-    Bulk create lap times for a race.
-    Cria tempos de volta em lote para uma corrida.
+    Bulk create lap times for a race, optionally upserting existing laps.
+    Cria tempos de volta em lote para uma corrida, opcionalmente com upsert.
     """
     laps_data = [lap.model_dump() for lap in body.laps]
-    return await bulk_create_lap_times(db, race_id, laps_data)  # type: ignore[return-value]
+    return await bulk_create_lap_times(db, race_id, laps_data, on_conflict=on_conflict)  # type: ignore[return-value]
 
 
 @router.get("/api/v1/races/{race_id}/laps/summary", response_model=LapTimeSummaryResponse)
 async def read_lap_summary(
     race_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("telemetry:read")),
-    db: AsyncSession = Depends(get_db),
+    _current_user: Principal = Depends(require_permissions("telemetry:read")),
+    db: AsyncSession = Depends(get_read_db),
 ) -> LapTimeSummaryResponse:
     """
-    Get lap time summary for a race (fastest/avg per driver, overall fastest).
-    Retorna resumo de tempos de volta (mais rapido/media por piloto, mais rapido geral).
+    Get lap time summary for a race (fastest/avg/median/std-dev/theoretical best per driver, overall fastest).
+    Retorna resumo de tempos de volta (mais rapido/media/mediana/desvio/melhor teorico por piloto, mais rapido geral).
     """
     return await get_lap_summary(db, race_id)  # type: ignore[return-value]
 
 
+@router.get("/api/v1/races/{race_id}/laps/stats", response_model=list[DriverLapStatsResponse])
+async def read_lap_stats(
+    race_id: uuid.UUID,
+    _current_user: Principal = Depends(require_permissions("telemetry:read")),
+    db: AsyncSession = Depends(get_db),
+) -> list[DriverLapStatsResponse]:
+    """
+    Get running per-driver lap stats for a race, read from the rollup table (cheap enough for live polling).
+    Served by the primary: live timing must not lag behind ingest.
+    Retorna estatisticas correntes de volta por piloto, lidas da tabela de agregados (leve para polling ao vivo).
+    Servido pelo primario: o live timing nao pode ficar atras da ingestao.
+    """
+    return await get_lap_stats(db, race_id)  # type: ignore[return-value]
+
+
+@router.get("/api/v1/races/{race_id}/laps/outliers", response_model=LapOutlierReport)
+async def read_lap_outliers(
+    race_id: uuid.UUID,
+    _current_user: Principal = Depends(require_permissions("telemetry:read")),
+    db: AsyncSession = Depends(get_read_db),
+) -> LapOutlierReport:
+    """
+    Review a race's outlier laps (in / out laps, safety-car laps, robust z-score per driver stint), recomputed
+    from the current laps, pit stops and race events without storing them.
+    Revisa as voltas atipicas de uma corrida (in / out laps, voltas de safety car, z-score robusto por stint),
+    refeitas a partir das voltas, pit stops e eventos atuais sem grava-las.
+    """
+    return await get_lap_outliers(db, race_id)  # type: ignore[return-value]
+
+
+@router.post("/api/v1/races/{race_id}/laps/outliers", response_model=LapOutlierReport)
+async def flag_race_lap_outliers(
+    race_id: uuid.UUID,
+    _current_user: Principal = Depends(require_permissions("telemetry:create")),
+    db: AsyncSession = Depends(get_db),
+) -> LapOutlierReport:
+    """
+    Recompute and store a race's outlier flags, e.g. after its pit stops or safety-car events were entered.
+    Refaz e grava as voltas atipicas de uma corrida, ex. apos registrar seus pit stops ou eventos de safety car.
+    """
+    return await flag_lap_outliers(db, race_id)  # type: ignore[return-value]
+
+
+@router.get("/api/v1/races/{race_id}/laps/sectors", response_model=SectorHeatmapResponse)
+async def read_sector_heatmap(
+    race_id: uuid.UUID,
+    _current_user: Principal = Depends(require_permissions("telemetry:read")),
+    db: AsyncSession = Depends(get_db),
+) -> SectorHeatmapResponse:
+    """
+    Get best sectors, theoretical best laps and each lap's sector gaps to the session bests (a drivers x
+    laps x sectors heatmap). Cached per race until one of its laps is written. Read from the primary: the
+    cache is shared by every user of the worker, so a lagging replica must not refill it with old laps.
+    Retorna melhores setores, melhores voltas teoricas e os gaps de setor de cada volta para os melhores da
+    sessao (mapa pilotos x voltas x setores). Em cache por corrida ate uma de suas voltas ser gravada. Lido
+    do primario: o cache e compartilhado por todos os usuarios do worker, entao uma replica atrasada nao
+    pode preenche-lo com voltas antigas.
+    """
+    return await get_sector_heatmap(db, race_id)  # type: ignore[return-value]
+
+
 @router.delete("/api/v1/laps/{lap_id}", status_code=204)
 async def delete_existing_lap(
     lap_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("telemetry:delete")),
+    _current_user: Principal = Depends(require_permissions("telemetry:delete")),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
@@ -127,6 +243,98 @@ async def delete_existing_lap(
     return Response(status_code=204)
 
 
+# --- Lap Trace endpoints / Endpoints de tracado de volta ---
+
+
+@router.put(
+    "/api/v1/races/{race_id}/laps/{lap_number}/traces",
+    response_model=list[LapTraceChannelResponse],
+)
+async def upload_traces(
+    race_id: uuid.UUID,
+    lap_number: int,
+    body: LapTraceUploadRequest,
+    _current_user: Principal = Depends(require_permissions("telemetry:create")),
+    db: AsyncSession = Depends(get_db),
+) -> list[LapTraceChannelResponse]:
+    """
+    Upload a lap's high-frequency channels (speed, throttle, brake, steering, gear, rpm), replacing stored ones.
+    Envia os canais de alta frequencia de uma volta, substituindo os gravados.
+    """
+    return await upload_lap_traces(  # type: ignore[return-value]
+        db, race_id, lap_number, body.driver_id, body.sample_rate_hz, body.channels
+    )
+
+
+@router.get(
+    "/api/v1/races/{race_id}/laps/{lap_number}/traces",
+    response_model=LapTraceResponse,
+    responses={200: {"content": {"application/octet-stream": {}}}},
+)
+async def read_traces(
+    race_id: uuid.UUID,
+    lap_number: int,
+    driver_id: uuid.UUID = Query(description="Driver of the lap / Piloto da volta"),
+    channels: str | None = Query(
+        default=None, description="Comma-separated channels, default all / Canais separados por virgula, padrao todos"
+    ),
+    start: int = Query(default=0, ge=0, description="First sample / Primeira amostra"),
+    stop: int | None = Query(default=None, ge=0, description="End sample, exclusive / Amostra final, exclusiva"),
+    format: TraceFormat = Query(default=TraceFormat.json, description="json or npz / json ou npz"),
+    _current_user: Principal = Depends(require_permissions("telemetry:read")),
+    db: AsyncSession = Depends(get_read_db),
+) -> LapTraceResponse | Response:
+    """
+    Read a sample range of a lap's channels, as JSON or as a NumPy .npz archive (one array per channel).
+    Le um intervalo de amostras dos canais de uma volta, em JSON ou arquivo .npz do NumPy (um array por canal).
+    """
+    names = [c.strip() for c in channels.split(",") if c.strip()] if channels else None
+    traces = await get_lap_traces(db, race_id, lap_number, driver_id, names, start, stop)
+    if format is TraceFormat.npz:
+        return Response(
+            content=to_npz({channel["channel"]: channel["values"] for channel in traces["channels"]}),
+            media_type="application/octet-stream",
+            headers={"X-Trace-Start": str(traces["start"]), "X-Trace-Stop": str(traces["stop"])},
+        )
+    for channel in traces["channels"]:
+        channel["values"] = channel["values"].tolist()
+    return traces  # type: ignore[return-value]
+
+
+@router.get(
+    "/api/v1/races/{race_id}/laps/{lap_number}/traces/downsampled",
+    response_model=LapTraceDownsampledResponse,
+)
+async def read_downsampled_traces(
+    race_id: uuid.UUID,
+    lap_number: int,
+    driver_id: uuid.UUID = Query(description="Driver of the lap / Piloto da volta"),
+    channels: str | None = Query(
+        default=None, description="Comma-separated channels, default all / Canais separados por virgula, padrao todos"
+    ),
+    points: int = Query(
+        default=1000, ge=4, le=10_000, description="Max points per channel / Maximo de pontos por canal"
+    ),
+    method: DownsampleMethod = Query(default=DownsampleMethod.lttb, description="lttb or minmax / lttb ou minmax"),
+    _current_user: Principal = Depends(require_permissions("telemetry:read")),
+    db: AsyncSession = Depends(get_db),
+) -> LapTraceDownsampledResponse:
+    """
+    Read a lap's channels downsampled for charts (LTTB or min/max per bucket), with the kept sample indices.
+    Read from the primary, as the series cache is shared by the worker and a lagging replica would refill
+    it with a replaced blob.
+    Le os canais de uma volta reduzidos para graficos (LTTB ou min/max por bucket), com os indices mantidos.
+    Lido do primario, pois o cache de series e compartilhado pelo worker e uma replica atrasada o
+    preencheria com um blob substituido.
+    """
+    names = [c.strip() for c in channels.split(",") if c.strip()] if channels else None
+    traces = await get_downsampled_traces(db, race_id, lap_number, driver_id, names, points, method)
+    for channel in traces["channels"]:
+        channel["indices"] = channel["indices"].tolist()
+        channel["values"] = channel["values"].tolist()
+    return traces  # type: ignore[return-value]
+
+
 # --- Car Setup endpoints / Endpoints de setup de carro ---
 
 
@@ -135,7 +343,7 @@ async def read_setups(
     race_id: uuid.UUID,
     driver_id: uuid.UUID | None = Query(default=None, description="Filter by driver / Filtrar por piloto"),
     team_id: uuid.UUID | None = Query(default=None, description="Filter by team / Filtrar por equipe"),
-    _current_user: User = Depends(require_permissions("telemetry:read")),
+    _current_user: Principal = Depends(require_permissions("telemetry:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[CarSetupResponse]:
     """
@@ -149,7 +357,7 @@ async def read_setups(
 async def create_new_setup(
     race_id: uuid.UUID,
     body: CarSetupCreateRequest,
-    _current_user: User = Depends(require_permissions("telemetry:create")),
+    _current_user: Principal = Depends(require_permissions("telemetry:create")),
     db: AsyncSession = Depends(get_db),
 ) -> CarSetupResponse:
     """
@@ -179,7 +387,7 @@ async def create_new_setup(
 @router.get("/api/v1/setups/{setup_id}", response_model=CarSetupDetailResponse)
 async def read_setup(
     setup_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("telemetry:read")),
+    _current_user: Principal = Depends(require_permissions("telemetry:read")),
     db: AsyncSession = Depends(get_db),
 ) -> CarSetupDetailResponse:
     """
@@ -193,7 +401,7 @@ async def read_setup(
 async def update_existing_setup(
     setup_id: uuid.UUID,
     body: CarSetupUpdateRequest,
-    _current_user: User = Depends(require_permissions("telemetry:update")),
+    _current_user: Principal = Depends(require_permissions("telemetry:update")),
     db: AsyncSession = Depends(get_db),
 ) -> CarSetupResponse:
     """
@@ -223,7 +431,7 @@ async def update_existing_setup(
 @router.delete("/api/v1/setups/{setup_id}", status_code=204)
 async def delete_existing_setup(
     setup_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("telemetry:delete")),
+    _current_user: Principal = Depends(require_permissions("telemetry:delete")),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
@@ -244,7 +452,7 @@ async def compare_race_drivers(
     driver_ids: str = Query(
         description="Comma-separated driver UUIDs (max 3) / UUIDs separados por virgula"
     ),
-    _current_user: User = Depends(require_permissions("telemetry:read")),
+    _current_user: Principal = Depends(require_permissions("telemetry:read")),
     db: AsyncSession = Depends(get_db),
 ) -> list[DriverComparison]:
     """
@@ -253,3 +461,30 @@ async def compare_race_drivers(
     """
     ids = [uuid.UUID(d.strip()) for d in driver_ids.split(",") if d.strip()]
     return await compare_drivers(db, race_id, ids)  # type: ignore[return-value]
+
+
+@router.get("/api/v1/races/{race_id}/telemetry/compare/field", response_model=FieldComparisonResponse)
+async def compare_race_field(
+    race_id: uuid.UUID,
+    driver_ids: str | None = Query(
+        default=None,
+        description="Comma-separated driver UUIDs, default all / UUIDs separados por virgula, padrao todos",
+    ),
+    reference_driver_id: uuid.UUID | None = Query(
+        default=None, description="Reference driver, default the leader / Piloto de referencia, padrao o lider"
+    ),
+    window: int = Query(default=3, ge=1, le=20, description="Rolling pace window in laps / Janela do ritmo movel"),
+    _current_user: Principal = Depends(require_permissions("telemetry:read")),
+    db: AsyncSession = Depends(get_read_db),
+) -> FieldComparisonResponse:
+    """
+    Compare the whole field (or the given drivers) lap by lap as columnar drivers x laps matrices.
+    Compara o grid inteiro (ou os pilotos informados) volta a volta em matrizes colunares pilotos x voltas.
+    """
+    try:
+        ids = [uuid.UUID(d.strip()) for d in driver_ids.split(",") if d.strip()] if driver_ids else None
+    except ValueError as err:
+        raise ValidationException("Invalid driver id / Id de piloto invalido") from err
+    return await compare_field(  # type: ignore[return-value]
+        db, race_id, driver_ids=ids, reference_driver_id=reference_driver_id, window=window
+    )
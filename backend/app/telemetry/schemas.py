@@ -6,13 +6,19 @@ Schemas de requisicao/resposta de telemetria.
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+
+from app.telemetry.models import LapOutlier
+from app.telemetry.traces import CHANNELS
 
 # --- Lap Time schemas / Schemas de tempo de volta ---
 
 
 class LapTimeCreateRequest(BaseModel):
-    """Single lap time creation / Criacao de tempo de volta."""
+    """
+    Single lap time creation; is_personal_best is computed by the server.
+    Criacao de tempo de volta; is_personal_best e calculado pelo servidor.
+    """
 
     driver_id: uuid.UUID
     team_id: uuid.UUID
@@ -22,7 +28,6 @@ class LapTimeCreateRequest(BaseModel):
     sector_2_ms: int | None = None
     sector_3_ms: int | None = None
     is_valid: bool = True
-    is_personal_best: bool = False
 
 
 class LapTimeBulkCreateRequest(BaseModel):
@@ -45,11 +50,21 @@ class LapTimeResponse(BaseModel):
     sector_3_ms: int | None
     is_valid: bool
     is_personal_best: bool
+    outlier: LapOutlier | None = None  # set by the outlier pass / definido pela analise de voltas atipicas
     created_at: datetime
 
     model_config = {"from_attributes": True}
 
 
+class LapTimeAcceptedResponse(BaseModel):
+    """Lap queued by the live-ingest buffer, written on its next flush / Volta enfileirada, gravada no proximo flush."""
+
+    race_id: uuid.UUID
+    driver_id: uuid.UUID
+    lap_number: int
+    pending: int  # laps of this race waiting for the flush / voltas desta corrida aguardando o flush
+
+
 class LapTimeSummaryDriver(BaseModel):
     """Per-driver lap time summary / Resumo de tempos de volta por piloto."""
 
@@ -57,8 +72,11 @@ class LapTimeSummaryDriver(BaseModel):
     driver_display_name: str
     fastest_lap_ms: int
     avg_lap_ms: int
+    median_lap_ms: float
+    stddev_lap_ms: float | None  # sample, needs 2+ laps / amostral, requer 2+ voltas
     total_laps: int
     personal_best_lap: int | None
+    theoretical_best_ms: int | None  # sum of best sectors / soma dos melhores setores
 
 
 class LapTimeSummaryResponse(BaseModel):
@@ -68,6 +86,129 @@ class LapTimeSummaryResponse(BaseModel):
     overall_fastest: LapTimeResponse | None
 
 
+class DriverLapStatsResponse(BaseModel):
+    """Running lap stats of a driver in a race / Estatisticas correntes de volta de um piloto na corrida."""
+
+    driver_id: uuid.UUID
+    driver_display_name: str
+    total_laps: int
+    fastest_lap_ms: int
+    avg_lap_ms: int
+    stddev_lap_ms: float | None  # sample, needs 2+ laps / amostral, requer 2+ voltas
+    best_sector_1_ms: int | None
+    best_sector_2_ms: int | None
+    best_sector_3_ms: int | None
+    theoretical_best_ms: int | None  # sum of best sectors / soma dos melhores setores
+    last_lap_number: int
+    updated_at: datetime
+
+
+class LapOutlierEntry(BaseModel):
+    """Flagged lap with its stint figures / Volta marcada com os numeros do stint."""
+
+    lap_id: uuid.UUID
+    driver_id: uuid.UUID
+    lap_number: int
+    lap_time_ms: int
+    is_valid: bool
+    reason: LapOutlier
+    stint_number: int
+    stint_median_ms: float | None  # None when the stint is too short to score / None se o stint e curto demais
+    score: float | None  # robust z-score against the stint / z-score robusto contra o stint
+
+
+class LapOutlierReport(BaseModel):
+    """Outlier pass of a race / Analise de voltas atipicas de uma corrida."""
+
+    race_id: uuid.UUID
+    threshold: float
+    min_stint_laps: int
+    total_laps: int
+    laps: list[LapOutlierEntry]
+
+
+# --- Lap Trace schemas / Schemas de tracado de volta ---
+
+
+class LapTraceUploadRequest(BaseModel):
+    """
+    High-frequency samples of one lap, one equally long list per channel.
+    Amostras de alta frequencia de uma volta, uma lista de mesmo tamanho por canal.
+    """
+
+    driver_id: uuid.UUID
+    sample_rate_hz: float
+    channels: dict[str, list[float]]
+
+    @field_validator("sample_rate_hz")
+    @classmethod
+    def validate_sample_rate(cls, v: float) -> float:
+        """Validate rate is in (0, 1000] Hz / Valida que a taxa esta em (0, 1000] Hz."""
+        if not 0 < v <= 1000:
+            raise ValueError("Sample rate must be in (0, 1000] Hz")
+        return v
+
+    @field_validator("channels")
+    @classmethod
+    def validate_channels(cls, v: dict[str, list[float]]) -> dict[str, list[float]]:
+        """Validate names and equal lengths / Valida nomes e tamanhos iguais."""
+        if not v:
+            raise ValueError("At least one channel is required")
+        unknown = v.keys() - CHANNELS.keys()
+        if unknown:
+            raise ValueError(f"Unknown channels: {', '.join(sorted(unknown))}. Allowed: {', '.join(CHANNELS)}")
+        if len({len(samples) for samples in v.values()}) != 1:
+            raise ValueError("All channels must have the same number of samples")
+        return v
+
+
+class LapTraceChannelResponse(BaseModel):
+    """Stored channel metadata / Metadados de canal gravado."""
+
+    channel: str
+    unit: str
+    dtype: str
+    encoding: str
+    sample_rate_hz: float
+    sample_count: int
+    size_bytes: int  # compressed / comprimido
+
+
+class LapTraceChannelData(LapTraceChannelResponse):
+    """Stored channel with the requested sample range / Canal gravado com o intervalo de amostras pedido."""
+
+    values: list[float]
+
+
+class LapTraceResponse(BaseModel):
+    """Trace range of a lap; values cover samples [start, stop) / Intervalo do tracado; amostras [start, stop)."""
+
+    lap_id: uuid.UUID
+    start: int
+    stop: int
+    channels: list[LapTraceChannelData]
+
+
+class LapTraceSeries(BaseModel):
+    """Downsampled channel: kept sample indices and their values / Canal reduzido: indices mantidos e valores."""
+
+    channel: str
+    unit: str
+    sample_rate_hz: float
+    sample_count: int  # before downsampling / antes da reducao
+    indices: list[int]
+    values: list[float]
+
+
+class LapTraceDownsampledResponse(BaseModel):
+    """Lap channels reduced to at most `points` samples each / Canais da volta reduzidos a no maximo `points`."""
+
+    lap_id: uuid.UUID
+    method: str
+    points: int
+    channels: list[LapTraceSeries]
+
+
 # --- Car Setup schemas / Schemas de setup de carro ---
 
 
@@ -171,3 +312,67 @@ class DriverComparison(BaseModel):
     driver_id: uuid.UUID
     driver_display_name: str
     laps: list[LapTimeResponse]
+
+
+class ComparedDriver(BaseModel):
+    """A row of the comparison matrices / Uma linha das matrizes de comparacao."""
+
+    driver_id: uuid.UUID
+    driver_display_name: str
+
+
+# drivers x laps, null where a lap is missing / pilotos x voltas, null onde falta a volta
+type LapSeries = list[list[float | None]]
+
+
+class FieldComparisonResponse(BaseModel):
+    """
+    Columnar comparison: every series is drivers x laps, aligned with `drivers` and `lap_numbers`.
+    Comparacao colunar: cada serie e pilotos x voltas, alinhada com `drivers` e `lap_numbers`.
+    """
+
+    reference_driver_id: uuid.UUID | None
+    window: int
+    lap_numbers: list[int]
+    drivers: list[ComparedDriver]
+    lap_time_ms: LapSeries
+    cumulative_ms: LapSeries
+    gap_to_reference_ms: LapSeries  # cumulative gap, + = behind / gap acumulado, + = atras
+    lap_delta_ms: LapSeries
+    rolling_avg_ms: LapSeries
+    sector_delta_ms: list[LapSeries]  # one matrix per sector / uma matriz por setor
+
+
+class SessionBestSector(BaseModel):
+    """Fastest time of a sector in the race and who set it / Tempo mais rapido de um setor e quem o fez."""
+
+    sector: int
+    sector_ms: int | None  # None when no lap has this sector / None se nenhuma volta tem o setor
+    driver_id: uuid.UUID | None
+    lap_number: int | None
+
+
+class SectorDriver(BaseModel):
+    """A row of the sector heatmap / Uma linha do mapa de setores."""
+
+    driver_id: uuid.UUID
+    driver_display_name: str
+    best_sector_ms: list[int | None]  # one per sector / um por setor
+    theoretical_best_ms: int | None  # sum of best sectors / soma dos melhores setores
+    gap_to_ideal_ms: int | None  # theoretical best minus ideal lap / melhor teorico menos volta ideal
+
+
+class SectorHeatmapResponse(BaseModel):
+    """
+    Sector heatmap: `gap_to_session_best_ms` is drivers x laps x sectors, aligned with `drivers` and
+    `lap_numbers`, null where a sector time is missing.
+    Mapa de setores: `gap_to_session_best_ms` e pilotos x voltas x setores, alinhado com `drivers` e
+    `lap_numbers`, null onde falta o tempo de setor.
+    """
+
+    race_id: uuid.UUID
+    lap_numbers: list[int]
+    session_best: list[SessionBestSector]
+    ideal_lap_ms: int | None  # sum of session-best sectors / soma dos melhores setores da sessao
+    drivers: list[SectorDriver]
+    gap_to_session_best_ms: list[LapSeries]
@@ -1,29 +1,90 @@
 """
-Telemetry business logic: lap times, car setups, driver comparison.
-Logica de negocios de telemetria: tempos de volta, setups de carro, comparacao de pilotos.
+Telemetry business logic: lap times, lap traces, car setups, driver comparison.
+Logica de negocios de telemetria: tempos de volta, tracados de volta, setups de carro, comparacao de pilotos.
 """
 
+import math
+import time
 import uuid
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any, cast
 
-from sqlalchemy import func, select
+import numpy as np
+import numpy.typing as npt
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    Row,
+    Table,
+    and_,
+    bindparam,
+    case,
+    delete,
+    exists,
+    false,
+    func,
+    insert,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy import cast as sa_cast
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.exceptions import ConflictException, NotFoundException
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.exceptions import ConflictException, NotFoundException, ValidationException
+from app.db.upsert import ConflictMode, Excluded, dedupe_rows, upsert_statement
+from app.db.validation import validate_drivers_and_teams
 from app.drivers.models import Driver
+from app.pitstops.models import PitStop
 from app.races.models import Race
+from app.replay.models import RaceEvent, RaceEventType
+from app.results.models import RaceResult
 from app.teams.models import Team
-from app.telemetry.models import CarSetup, LapTime
+from app.telemetry.analysis import SECTORS, LapMatrix, to_json
+from app.telemetry.downsample import DownsampleMethod, Indices, downsample
+from app.telemetry.models import CarSetup, LapOutlier, LapTime, LapTrace, RaceDriverLapStats
+from app.telemetry.outliers import OutlierPass, detect_outliers
+from app.telemetry.traces import CHANNELS, TraceEncoding, decode_channel, encode_channel
+
+# Natural key of a lap (uq_lap_race_driver_lap) / Chave natural de uma volta
+_LAP_KEY = ("race_id", "driver_id", "lap_number")
+# Primary key of the per-driver rollup / Chave primaria do agregado por piloto
+_STATS_KEY = ("race_id", "driver_id")
+_SECTORS = tuple(range(1, SECTORS + 1))
+# Lap columns the rollup is built from / Colunas de volta usadas pelo agregado
+_STATS_INPUT = ("driver_id", "lap_number", "lap_time_ms", "sector_1_ms", "sector_2_ms", "sector_3_ms")
+# One stored array per lap and channel (uq_lap_trace_channel) / Um array por volta e canal
+_TRACE_KEY = ("lap_id", "channel")
+# Events that neutralize the lap they are called on / Eventos que neutralizam a volta em que sao acionados
+_NEUTRALIZING_EVENTS = (RaceEventType.safety_car, RaceEventType.virtual_safety_car, RaceEventType.red_flag)
+# Drivers x laps series of a field comparison / Series pilotos x voltas de uma comparacao de grid
+_COMPARE_SERIES = ("lap_time_ms", "cumulative_ms", "gap_to_reference_ms", "lap_delta_ms", "rolling_avg_ms")
+# (id, driver_id, lap_number, lap_time_ms, is_valid, outlier)
+type _OutlierLapRow = Row[uuid.UUID, uuid.UUID, int, int, bool, LapOutlier | None]
+
+# Downsampled series by (lap_id, channel, method, points); uploads drop their lap's entries
+# Series reduzidas por (lap_id, canal, metodo, pontos); uploads removem as entradas da sua volta
+type _SeriesKey = tuple[uuid.UUID, str, DownsampleMethod, int]
+downsample_cache: TTLCache[_SeriesKey, tuple[Indices, npt.NDArray[np.generic]]] = TTLCache(
+    settings.TRACE_CACHE_SIZE, settings.TRACE_CACHE_TTL_SECONDS
+)
+# Sector heatmap responses by race; lap writes drop their race's entry
+# Respostas do mapa de setores por corrida; gravacoes de volta removem a entrada da sua corrida
+sector_cache: TTLCache[uuid.UUID, dict[str, object]] = TTLCache(
+    settings.SECTOR_CACHE_SIZE, settings.SECTOR_CACHE_TTL_SECONDS
+)
 
 # --- Helpers / Auxiliares ---
 
 
-async def _validate_race(db: AsyncSession, race_id: uuid.UUID) -> Race:
-    """Validate race exists / Valida que a corrida existe."""
-    result = await db.execute(select(Race).where(Race.id == race_id))
-    race = result.scalar_one_or_none()
-    if race is None:
+async def _validate_race(db: AsyncSession, race_id: uuid.UUID) -> None:
+    """Validate race exists, without loading it / Valida que a corrida existe, sem carrega-la."""
+    result = await db.execute(select(Race.id).where(Race.id == race_id))
+    if result.scalar_one_or_none() is None:
         raise NotFoundException("Race not found / Corrida nao encontrada")
-    return race
 
 
 async def _validate_driver(db: AsyncSession, driver_id: uuid.UUID) -> Driver:
@@ -44,6 +105,174 @@ async def _validate_team(db: AsyncSession, team_id: uuid.UUID) -> Team:
     return team
 
 
+async def _refresh_lap_flags(db: AsyncSession, race_id: uuid.UUID, driver_ids: set[uuid.UUID]) -> set[uuid.UUID]:
+    """
+    Recompute is_personal_best for the given drivers (their fastest valid lap, earliest on ties) and
+    RaceResult.fastest_lap for the race, with one UPDATE each. Only rows whose flag can change are written.
+    Returns the ids of those drivers' personal best laps.
+
+    Recalcula is_personal_best dos pilotos informados (a volta valida mais rapida, a mais antiga em empate)
+    e RaceResult.fastest_lap da corrida, com um UPDATE cada. So linhas cujo flag pode mudar sao gravadas.
+    Retorna os ids das voltas de melhor pessoal desses pilotos.
+    """
+    table = cast(Table, LapTime.__table__)
+    ranked = (
+        select(
+            table.c.id,
+            func.row_number()
+            .over(partition_by=table.c.driver_id, order_by=(table.c.lap_time_ms, table.c.lap_number))
+            .label("driver_rank"),
+        )
+        .where(table.c.race_id == race_id, table.c.driver_id.in_(driver_ids), table.c.is_valid == True)  # noqa: E712
+        .subquery()
+    )
+    best_ids = select(ranked.c.id).where(ranked.c.driver_rank == 1)
+    result = await db.execute(
+        update(table)
+        .where(
+            table.c.race_id == race_id,
+            table.c.driver_id.in_(driver_ids),
+            or_(table.c.is_personal_best == True, table.c.id.in_(best_ids)),  # noqa: E712
+        )
+        .values(is_personal_best=table.c.id.in_(best_ids))
+        .returning(table.c.id, table.c.is_personal_best)
+    )
+    personal_bests = {lap_id for lap_id, is_personal_best in result if is_personal_best}
+
+    # The race's fastest lap is its fastest personal best (partial index)
+    # A volta mais rapida da corrida e o melhor pessoal mais rapido (indice parcial)
+    fastest_driver = (
+        select(table.c.driver_id)
+        .where(table.c.race_id == race_id, table.c.is_personal_best == True)  # noqa: E712
+        .order_by(table.c.lap_time_ms, table.c.lap_number)
+        .limit(1)
+        .scalar_subquery()
+    )
+    holds_fastest = RaceResult.driver_id == fastest_driver
+    await db.execute(
+        update(RaceResult)
+        .where(RaceResult.race_id == race_id, or_(RaceResult.fastest_lap == True, holds_fastest))  # noqa: E712
+        .values(fastest_lap=func.coalesce(holds_fastest, false()))
+        .execution_options(synchronize_session=False)
+    )
+    return personal_bests
+
+
+def _sample_stddev(n: int, total: int, total_sq: int) -> float | None:
+    """
+    Sample std-dev from exact integer sums, None below 2 laps.
+    Desvio padrao amostral a partir de somas inteiras exatas, None com menos de 2 voltas.
+    """
+    return math.sqrt((n * total_sq - total * total) / (n * (n - 1))) if n > 1 else None
+
+
+def _least(a: int | None, b: int | None) -> int | None:
+    """Smaller of two optional values / Menor de dois valores opcionais."""
+    return b if a is None else a if b is None else min(a, b)
+
+
+def _sql_least(a: ColumnElement[Any], b: ColumnElement[Any]) -> ColumnElement[Any]:
+    """
+    NULL-skipping LEAST(a, b); SQLite has no LEAST and its MIN(a, b) returns NULL on a NULL argument.
+    LEAST(a, b) ignorando NULL; o SQLite nao tem LEAST e seu MIN(a, b) retorna NULL com argumento NULL.
+    """
+    return func.coalesce(case((b < a, b), else_=a), b)
+
+
+def _merge_lap_stats(excluded: Excluded) -> dict[str, object]:
+    """
+    Fold a batch's aggregates into the stored row / Incorpora os agregados do lote a linha existente.
+    """
+    stats = cast(Table, RaceDriverLapStats.__table__).c
+    merged: dict[str, object] = {
+        name: stats[name] + excluded[name] for name in ("lap_count", "lap_time_sum_ms", "lap_time_sum_sq")
+    }
+    merged["fastest_lap_ms"] = _sql_least(stats.fastest_lap_ms, excluded.fastest_lap_ms)
+    for sector in _SECTORS:
+        name = f"best_sector_{sector}_ms"
+        merged[name] = _sql_least(stats[name], excluded[name])
+    last_lap = excluded.last_lap_number
+    merged["last_lap_number"] = case((last_lap > stats.last_lap_number, last_lap), else_=stats.last_lap_number)
+    merged["updated_at"] = func.now()
+    return merged
+
+
+async def _add_lap_stats(db: AsyncSession, race_id: uuid.UUID, laps: Iterable[Mapping[Any, Any]]) -> None:
+    """
+    Add newly inserted laps to the per-driver rollup: the batch is aggregated in Python and merged
+    with one INSERT ... ON CONFLICT DO UPDATE row per driver, without reading existing laps.
+    Only valid for laps that did not exist before (overwritten laps need _rebuild_lap_stats).
+
+    Soma voltas recem-inseridas ao agregado por piloto: o lote e agregado em Python e incorporado
+    com uma linha INSERT ... ON CONFLICT DO UPDATE por piloto, sem ler as voltas existentes.
+    So vale para voltas que nao existiam antes (voltas sobrescritas exigem _rebuild_lap_stats).
+    """
+    deltas: dict[uuid.UUID, dict[str, Any]] = {}
+    for lap in laps:
+        lap_ms = lap["lap_time_ms"]
+        delta = deltas.get(lap["driver_id"])
+        if delta is None:
+            deltas[lap["driver_id"]] = {
+                "race_id": race_id,
+                "driver_id": lap["driver_id"],
+                "lap_count": 1,
+                "lap_time_sum_ms": lap_ms,
+                "lap_time_sum_sq": lap_ms * lap_ms,
+                "fastest_lap_ms": lap_ms,
+                **{f"best_sector_{sector}_ms": lap[f"sector_{sector}_ms"] for sector in _SECTORS},
+                "last_lap_number": lap["lap_number"],
+            }
+            continue
+        delta["lap_count"] += 1
+        delta["lap_time_sum_ms"] += lap_ms
+        delta["lap_time_sum_sq"] += lap_ms * lap_ms
+        delta["fastest_lap_ms"] = min(delta["fastest_lap_ms"], lap_ms)
+        for sector in _SECTORS:
+            name = f"best_sector_{sector}_ms"
+            delta[name] = _least(delta[name], lap[f"sector_{sector}_ms"])
+        delta["last_lap_number"] = max(delta["last_lap_number"], lap["lap_number"])
+    if not deltas:
+        return
+    table = cast(Table, RaceDriverLapStats.__table__)
+    stmt = upsert_statement(db, table, _STATS_KEY, ConflictMode.update, merge=_merge_lap_stats)
+    await db.execute(stmt, list(deltas.values()))
+
+
+async def _rebuild_lap_stats(db: AsyncSession, race_id: uuid.UUID, driver_ids: set[uuid.UUID]) -> None:
+    """
+    Recompute the rollup rows of the given drivers from their laps (after deletes or overwrites),
+    dropping rows of drivers left without laps.
+    Recalcula as linhas do agregado dos pilotos informados a partir das voltas (apos exclusoes ou
+    sobrescritas), removendo linhas de pilotos sem voltas.
+    """
+    laps = cast(Table, LapTime.__table__)
+    stats = cast(Table, RaceDriverLapStats.__table__)
+    aggregates = (
+        select(
+            laps.c.race_id,
+            laps.c.driver_id,
+            func.count(),
+            func.sum(laps.c.lap_time_ms),
+            func.sum(sa_cast(laps.c.lap_time_ms, BigInteger) * laps.c.lap_time_ms),
+            func.min(laps.c.lap_time_ms),
+            *(func.min(laps.c[f"sector_{sector}_ms"]) for sector in _SECTORS),
+            func.max(laps.c.lap_number),
+            func.now(),
+        )
+        .where(laps.c.race_id == race_id, laps.c.driver_id.in_(driver_ids))
+        .group_by(laps.c.race_id, laps.c.driver_id)
+    )
+    upsert = upsert_statement(db, stats, _STATS_KEY, ConflictMode.update)
+    await db.execute(upsert.from_select([column.name for column in stats.c], aggregates))
+    await db.execute(
+        delete(stats).where(
+            stats.c.race_id == race_id,
+            stats.c.driver_id.in_(driver_ids),
+            ~exists().where(laps.c.race_id == stats.c.race_id, laps.c.driver_id == stats.c.driver_id),
+        )
+    )
+
+
 # --- Lap Time services / Servicos de tempo de volta ---
 
 
@@ -90,11 +319,11 @@ async def create_lap_time(
     sector_2_ms: int | None = None,
     sector_3_ms: int | None = None,
     is_valid: bool = True,
-    is_personal_best: bool = False,
 ) -> LapTime:
     """
-    Create a single lap time. Validates FKs and uniqueness.
-    Cria um tempo de volta. Valida FKs e unicidade.
+    Create a single lap time. Validates FKs and uniqueness, then refreshes the driver's lap flags, lap stats
+    and outlier flags.
+    Cria um tempo de volta. Valida FKs e unicidade, depois atualiza os flags, agregados e voltas atipicas do piloto.
     """
     await _validate_race(db, race_id)
     await _validate_driver(db, driver_id)
@@ -121,10 +350,14 @@ async def create_lap_time(
         sector_2_ms=sector_2_ms,
         sector_3_ms=sector_3_ms,
         is_valid=is_valid,
-        is_personal_best=is_personal_best,
     )
     db.add(lap)
+    await db.flush()
+    await _refresh_lap_flags(db, race_id, {driver_id})
+    await _add_lap_stats(db, race_id, [{column: getattr(lap, column) for column in _STATS_INPUT}])
+    await _flag_outliers(db, race_id, {driver_id})
     await db.commit()
+    sector_cache.invalidate(race_id)
     await db.refresh(lap)
     return lap
 
@@ -133,104 +366,588 @@ async def bulk_create_lap_times(
     db: AsyncSession,
     race_id: uuid.UUID,
     laps: list[dict[str, object]],
-) -> list[LapTime]:
+    on_conflict: ConflictMode | None = None,
+    flag_outliers: bool = True,
+) -> list[dict[str, Any]]:
     """
-    Bulk create lap times for a race. Validates race exists.
-    Cria tempos de volta em lote para uma corrida. Valida que a corrida existe.
+    Bulk create lap times for a race in a single multi-row INSERT ... RETURNING.
+    Validates the race, then all driver/team FKs of the batch with one set-based query.
+    Without on_conflict, existing laps raise 409; with it, laps are upserted (update)
+    or skipped (ignore) by ON CONFLICT and only written rows are returned.
+    Lap flags and lap stats of the batch's drivers are refreshed in the same transaction, and so are
+    their outlier flags unless flag_outliers is False (batch callers then run the pass themselves, see
+    PendingOutliers).
+
+    Cria tempos de volta em lote com um unico INSERT ... RETURNING multi-linha.
+    Valida a corrida e depois todas as FKs de piloto/equipe do lote com uma unica consulta.
+    Sem on_conflict, voltas existentes geram 409; com ele, voltas sao atualizadas (update)
+    ou ignoradas (ignore) via ON CONFLICT e apenas as linhas gravadas sao retornadas.
+    Os flags e agregados de volta dos pilotos do lote sao atualizados na mesma transacao, assim como
+    suas voltas atipicas, a menos que flag_outliers seja False (quem grava em lotes faz a analise, ver
+    PendingOutliers).
     """
     await _validate_race(db, race_id)
+    if not laps:
+        return []
 
-    created: list[LapTime] = []
-    for lap_data in laps:
-        lap = LapTime(
-            race_id=race_id,
-            driver_id=lap_data["driver_id"],
-            team_id=lap_data["team_id"],
-            lap_number=lap_data["lap_number"],
-            lap_time_ms=lap_data["lap_time_ms"],
-            sector_1_ms=lap_data.get("sector_1_ms"),
-            sector_2_ms=lap_data.get("sector_2_ms"),
-            sector_3_ms=lap_data.get("sector_3_ms"),
-            is_valid=lap_data.get("is_valid", True),
-            is_personal_best=lap_data.get("is_personal_best", False),
-        )
-        db.add(lap)
-        created.append(lap)
+    # Reject duplicates inside the batch / Rejeita duplicatas dentro do lote
+    keys = {(lap_data["driver_id"], lap_data["lap_number"]) for lap_data in laps}
+    if on_conflict is None and len(keys) != len(laps):
+        raise ConflictException("Duplicate driver/lap number in batch")
 
-    await db.commit()
-    for lap in created:
-        await db.refresh(lap)
-    return created
+    await validate_drivers_and_teams(
+        db,
+        {cast(uuid.UUID, lap_data["driver_id"]) for lap_data in laps},
+        {cast(uuid.UUID, lap_data["team_id"]) for lap_data in laps},
+    )
+    return await insert_lap_times(db, race_id, laps, on_conflict, flag_outliers)
+
+
+async def insert_lap_times(
+    db: AsyncSession,
+    race_id: uuid.UUID,
+    laps: list[dict[str, object]],
+    on_conflict: ConflictMode | None = None,
+    flag_outliers: bool = True,
+) -> list[dict[str, Any]]:
+    """
+    The write half of bulk_create_lap_times, for callers that already checked the race, the driver/team
+    FKs and the batch keys (file imports). Same insert, refreshes and commit.
+    A metade de gravacao de bulk_create_lap_times, para quem ja verificou a corrida, as FKs de piloto/equipe
+    e as chaves do lote (importacoes de arquivo). Mesmo insert, atualizacoes e commit.
+    """
+    if not laps:
+        return []
+    rows: list[dict[str, object]] = [
+        {
+            "race_id": race_id,
+            "driver_id": lap_data["driver_id"],
+            "team_id": lap_data["team_id"],
+            "lap_number": lap_data["lap_number"],
+            "lap_time_ms": lap_data["lap_time_ms"],
+            "sector_1_ms": lap_data.get("sector_1_ms"),
+            "sector_2_ms": lap_data.get("sector_2_ms"),
+            "sector_3_ms": lap_data.get("sector_3_ms"),
+            "is_valid": lap_data.get("is_valid", True),
+            "is_personal_best": False,  # set by _refresh_lap_flags / definido por _refresh_lap_flags
+        }
+        for lap_data in laps
+    ]
+
+    # insertmanyvalues batches this into multi-row VALUES statements with RETURNING
+    # insertmanyvalues agrupa em statements VALUES multi-linha com RETURNING
+    table = cast(Table, LapTime.__table__)
+    if on_conflict is None:
+        stmt = insert(table).returning(*table.c, sort_by_parameter_order=True)
+    else:
+        rows = dedupe_rows(rows, _LAP_KEY)
+        stmt = upsert_statement(db, table, _LAP_KEY, on_conflict).returning(*table.c)
+    try:
+        result = await db.execute(stmt, rows)
+        created = result.all()
+        driver_ids = {cast(uuid.UUID, row["driver_id"]) for row in rows}
+        personal_bests = await _refresh_lap_flags(db, race_id, driver_ids)
+        if on_conflict is ConflictMode.update:
+            # Overwritten laps: their old values are gone / Voltas sobrescritas: valores antigos se perderam
+            await _rebuild_lap_stats(db, race_id, driver_ids)
+        else:
+            await _add_lap_stats(db, race_id, (row._mapping for row in created))
+        outliers = await _flag_outliers(db, race_id, driver_ids) if flag_outliers else {}
+        await db.commit()
+    except IntegrityError as err:
+        await db.rollback()
+        raise ConflictException("Lap time already exists for this driver/race/lap number") from err
+    sector_cache.invalidate(race_id)
+    return [
+        {**row._mapping, "is_personal_best": row.id in personal_bests, "outlier": outliers.get(row.id, row.outlier)}
+        for row in created
+    ]
 
 
 async def delete_lap_time(db: AsyncSession, lap: LapTime) -> None:
     """
-    Delete a lap time.
-    Exclui um tempo de volta.
+    Delete a lap time and refresh its driver's lap flags, lap stats and outlier flags.
+    Exclui um tempo de volta e atualiza os flags, agregados e voltas atipicas do piloto.
     """
     await db.delete(lap)
+    await db.flush()
+    await _refresh_lap_flags(db, lap.race_id, {lap.driver_id})
+    await _rebuild_lap_stats(db, lap.race_id, {lap.driver_id})
+    await _flag_outliers(db, lap.race_id, {lap.driver_id})
     await db.commit()
+    sector_cache.invalidate(lap.race_id)
 
 
 async def get_lap_summary(db: AsyncSession, race_id: uuid.UUID) -> dict[str, object]:
     """
-    Get lap time summary for a race: fastest/avg per driver, overall fastest.
-    Retorna resumo de tempos de volta: mais rapido/media por piloto, mais rapido geral.
+    Get lap time summary for a race in one query: per-driver fastest, average, median, std-dev,
+    lap count, personal best lap and theoretical best (sum of best sectors), plus the overall fastest lap.
+    Retorna resumo de tempos de volta em uma consulta: por piloto mais rapido, media, mediana,
+    desvio padrao, numero de voltas, volta de melhor pessoal e melhor teorico (soma dos melhores
+    setores), alem da volta mais rapida geral.
     """
     await _validate_race(db, race_id)
 
-    # Per-driver aggregates / Agregacoes por piloto
+    table = cast(Table, LapTime.__table__)
+    race_laps = table.c.race_id == race_id
+
+    # Plain per-driver aggregates / Agregacoes simples por piloto
+    stats = (
+        select(
+            table.c.driver_id,
+            func.avg(table.c.lap_time_ms).label("avg_lap_ms"),
+            func.count().label("total_laps"),
+            func.sum(table.c.lap_time_ms).label("sum_ms"),
+            # Squares exceed int4 on Postgres / Quadrados excedem int4 no Postgres
+            func.sum(sa_cast(table.c.lap_time_ms, BigInteger) * table.c.lap_time_ms).label("sum_sq_ms"),
+            func.min(table.c.sector_1_ms).label("best_s1"),
+            func.min(table.c.sector_2_ms).label("best_s2"),
+            func.min(table.c.sector_3_ms).label("best_s3"),
+            func.min(case((table.c.is_personal_best == True, table.c.lap_number))).label(  # noqa: E712
+                "personal_best_lap"
+            ),
+        )
+        .where(race_laps)
+        .group_by(table.c.driver_id)
+        .cte("driver_stats")
+    )
+
+    # Each lap ranked within its driver's laps (window functions: Postgres and SQLite >= 3.25)
+    # Cada volta ranqueada entre as voltas do piloto (window functions: Postgres e SQLite >= 3.25)
+    ranked = (
+        select(
+            table.c.id,
+            table.c.driver_id,
+            table.c.lap_time_ms,
+            func.row_number()
+            .over(partition_by=table.c.driver_id, order_by=(table.c.lap_time_ms, table.c.lap_number))
+            .label("driver_rank"),
+        )
+        .where(race_laps)
+        .cte("ranked_laps")
+    )
+
+    # Median = mean of the middle one/two ranks / Mediana = media do(s) rank(s) do meio
+    medians = (
+        select(ranked.c.driver_id, func.avg(ranked.c.lap_time_ms).label("median_lap_ms"))
+        .join(stats, stats.c.driver_id == ranked.c.driver_id)
+        .where(ranked.c.driver_rank.between((stats.c.total_laps + 1) // 2, (stats.c.total_laps + 2) // 2))
+        .group_by(ranked.c.driver_id)
+        .subquery("driver_medians")
+    )
+
+    # One row per driver: its fastest lap joined to its aggregates
+    # Uma linha por piloto: sua volta mais rapida unida as suas agregacoes
     stmt = (
         select(
-            LapTime.driver_id,
+            *table.c,
+            *(column for column in stats.c if column.name != "driver_id"),
+            medians.c.median_lap_ms,
             Driver.display_name.label("driver_display_name"),
-            func.min(LapTime.lap_time_ms).label("fastest_lap_ms"),
-            func.avg(LapTime.lap_time_ms).label("avg_lap_ms"),
-            func.count(LapTime.id).label("total_laps"),
         )
-        .join(Driver, LapTime.driver_id == Driver.id)
-        .where(LapTime.race_id == race_id)
-        .group_by(LapTime.driver_id, Driver.display_name)
-        .order_by(func.min(LapTime.lap_time_ms))
+        .select_from(ranked)
+        .join(table, table.c.id == ranked.c.id)
+        .join(stats, stats.c.driver_id == ranked.c.driver_id)
+        .join(medians, medians.c.driver_id == ranked.c.driver_id)
+        .join(Driver, Driver.id == ranked.c.driver_id)
+        .where(ranked.c.driver_rank == 1)
+        .order_by(ranked.c.lap_time_ms, table.c.lap_number)
     )
     result = await db.execute(stmt)
-    rows = result.all()
 
-    drivers = []
-    for row in rows:
-        # Find personal best lap number / Encontra numero da volta com melhor tempo pessoal
-        pb_stmt = (
-            select(LapTime.lap_number)
-            .where(
-                LapTime.race_id == race_id,
-                LapTime.driver_id == row.driver_id,
-                LapTime.is_personal_best == True,  # noqa: E712
-            )
-            .limit(1)
-        )
-        pb_result = await db.execute(pb_stmt)
-        pb_lap = pb_result.scalar_one_or_none()
+    drivers: list[dict[str, object]] = []
+    overall_fastest: dict[str, object] | None = None
+    for row in result.mappings():
+        if overall_fastest is None:
+            overall_fastest = {column.name: row[column.name] for column in table.c}
+        n, total, total_sq = row["total_laps"], int(row["sum_ms"]), int(row["sum_sq_ms"])
+        sectors = (row["best_s1"], row["best_s2"], row["best_s3"])
+        drivers.append({
+            "driver_id": row["driver_id"],
+            "driver_display_name": row["driver_display_name"],
+            "fastest_lap_ms": row["lap_time_ms"],
+            "avg_lap_ms": int(row["avg_lap_ms"]),
+            "median_lap_ms": float(row["median_lap_ms"]),
+            "stddev_lap_ms": _sample_stddev(n, total, total_sq),
+            "total_laps": n,
+            "personal_best_lap": row["personal_best_lap"],
+            "theoretical_best_ms": None if None in sectors else sum(sectors),
+        })
+
+    return {"drivers": drivers, "overall_fastest": overall_fastest}
 
+
+async def get_lap_stats(db: AsyncSession, race_id: uuid.UUID) -> list[dict[str, object]]:
+    """
+    Per-driver lap stats from the race_driver_lap_stats rollup: one row per driver, no lap scan.
+    Meant for live timing polled during a session; the median needs the laps, see get_lap_summary.
+    Estatisticas de volta por piloto do agregado race_driver_lap_stats: uma linha por piloto, sem
+    varrer voltas. Pensado para live timing consultado durante a sessao; a mediana exige as voltas,
+    veja get_lap_summary.
+    """
+    await _validate_race(db, race_id)
+    result = await db.execute(
+        select(RaceDriverLapStats, Driver.display_name)
+        .join(Driver, Driver.id == RaceDriverLapStats.driver_id)
+        .where(RaceDriverLapStats.race_id == race_id)
+        .order_by(RaceDriverLapStats.fastest_lap_ms)
+    )
+    drivers: list[dict[str, object]] = []
+    for stats, display_name in result:
+        sectors = (stats.best_sector_1_ms, stats.best_sector_2_ms, stats.best_sector_3_ms)
         drivers.append({
-            "driver_id": row.driver_id,
-            "driver_display_name": row.driver_display_name,
-            "fastest_lap_ms": row.fastest_lap_ms,
-            "avg_lap_ms": int(row.avg_lap_ms),
-            "total_laps": row.total_laps,
-            "personal_best_lap": pb_lap,
+            "driver_id": stats.driver_id,
+            "driver_display_name": display_name,
+            "total_laps": stats.lap_count,
+            "fastest_lap_ms": stats.fastest_lap_ms,
+            "avg_lap_ms": stats.lap_time_sum_ms // stats.lap_count,
+            "stddev_lap_ms": _sample_stddev(stats.lap_count, stats.lap_time_sum_ms, stats.lap_time_sum_sq),
+            "best_sector_1_ms": stats.best_sector_1_ms,
+            "best_sector_2_ms": stats.best_sector_2_ms,
+            "best_sector_3_ms": stats.best_sector_3_ms,
+            "theoretical_best_ms": None if None in sectors else sum(cast(tuple[int, int, int], sectors)),
+            "last_lap_number": stats.last_lap_number,
+            "updated_at": stats.updated_at,
         })
+    return drivers
 
-    # Overall fastest / Volta mais rapida geral
-    fastest_stmt = (
-        select(LapTime)
-        .where(LapTime.race_id == race_id)
-        .order_by(LapTime.lap_time_ms)
-        .limit(1)
+
+# --- Lap outliers / Voltas atipicas ---
+
+
+async def _outlier_pass(
+    db: AsyncSession, race_id: uuid.UUID, driver_ids: set[uuid.UUID] | None = None
+) -> tuple[Sequence[_OutlierLapRow], OutlierPass]:
+    """
+    The race's laps (by driver and lap) and their outlier pass, from three queries. Stints are per driver,
+    so passing driver_ids gives the same flags for those drivers without reading the rest of the field.
+    As voltas da corrida (por piloto e volta) e sua analise de voltas atipicas, com tres consultas. Stints sao
+    por piloto, entao driver_ids da as mesmas marcas para esses pilotos sem ler o resto do grid.
+    """
+    stmt = select(
+        LapTime.id,
+        LapTime.driver_id,
+        LapTime.lap_number,
+        LapTime.lap_time_ms,
+        LapTime.is_valid,
+        LapTime.outlier,
+    ).where(LapTime.race_id == race_id)
+    if driver_ids is not None:
+        stmt = stmt.where(LapTime.driver_id.in_(driver_ids))
+    laps = (await db.execute(stmt.order_by(LapTime.driver_id, LapTime.lap_number))).all()
+    pits = await db.execute(select(PitStop.driver_id, PitStop.lap_number).where(PitStop.race_id == race_id))
+    neutralized = await db.execute(
+        select(RaceEvent.lap_number).where(
+            RaceEvent.race_id == race_id, RaceEvent.event_type.in_(_NEUTRALIZING_EVENTS)
+        )
+    )
+    index = {driver_id: i for i, driver_id in enumerate(dict.fromkeys(lap.driver_id for lap in laps))}
+    pit_stops = [(index[driver_id], lap_number) for driver_id, lap_number in pits if driver_id in index]
+    result = detect_outliers(
+        [index[lap.driver_id] for lap in laps],
+        [lap.lap_number for lap in laps],
+        [lap.lap_time_ms for lap in laps],
+        [lap.is_valid for lap in laps],
+        [driver for driver, _ in pit_stops],
+        [lap_number for _, lap_number in pit_stops],
+        list(neutralized.scalars()),
+        settings.LAP_OUTLIER_THRESHOLD,
+        settings.LAP_OUTLIER_MIN_STINT_LAPS,
     )
-    fastest_result = await db.execute(fastest_stmt)
-    overall_fastest = fastest_result.scalar_one_or_none()
+    return laps, result
 
-    return {"drivers": drivers, "overall_fastest": overall_fastest}
+
+async def _store_outliers(
+    db: AsyncSession, race_id: uuid.UUID, laps: Sequence[_OutlierLapRow], result: OutlierPass
+) -> dict[uuid.UUID, LapOutlier | None]:
+    """Write the reasons that changed, in one executemany / Grava os motivos alterados, num unico executemany."""
+    reasons = dict(zip((lap.id for lap in laps), result.reasons(), strict=True))
+    changed = [{"lap_id": lap.id, "reason": reasons[lap.id]} for lap in laps if lap.outlier != reasons[lap.id]]
+    if changed:
+        table = cast(Table, LapTime.__table__)
+        await db.execute(
+            update(table)
+            .where(table.c.race_id == race_id, table.c.id == bindparam("lap_id"))
+            .values(outlier=bindparam("reason")),
+            changed,
+        )
+    return reasons
+
+
+async def _flag_outliers(
+    db: AsyncSession, race_id: uuid.UUID, driver_ids: set[uuid.UUID] | None = None
+) -> dict[uuid.UUID, LapOutlier | None]:
+    """Re-run the pass and store it; the caller commits / Refaz a analise e a grava; quem chama faz o commit."""
+    laps, result = await _outlier_pass(db, race_id, driver_ids)
+    return await _store_outliers(db, race_id, laps, result)
+
+
+class PendingOutliers:
+    """
+    Drivers whose laps were written with flag_outliers=False, per race. Live writers (UDP ingester,
+    write-behind buffer) re-flag a race at most every LAP_OUTLIER_REFRESH_SECONDS and once more when they
+    stop, so a session pays one pass per interval instead of one per batch.
+    Pilotos cujas voltas foram gravadas com flag_outliers=False, por corrida. Gravadores ao vivo (ingestor
+    UDP, buffer write-behind) reavaliam uma corrida no maximo a cada LAP_OUTLIER_REFRESH_SECONDS e mais uma
+    vez ao parar, entao uma sessao paga uma analise por intervalo em vez de uma por lote.
+    """
+
+    def __init__(self) -> None:
+        self._drivers: dict[uuid.UUID, set[uuid.UUID]] = {}
+        self._flagged_at: dict[uuid.UUID, float] = {}
+
+    def add(self, race_id: uuid.UUID, driver_ids: Iterable[uuid.UUID]) -> None:
+        """Mark drivers of a race as not yet flagged / Marca pilotos de uma corrida como ainda nao avaliados."""
+        self._drivers.setdefault(race_id, set()).update(driver_ids)
+
+    async def flag(self, db: AsyncSession, force: bool = False) -> None:
+        """
+        Run and commit the pass of each race that is due (every pending race with force). A race whose
+        pass fails stays pending for the next call.
+        Executa e confirma a analise de cada corrida vencida (todas as pendentes com force). Uma corrida
+        cuja analise falha continua pendente para a proxima chamada.
+        """
+        now = time.monotonic()
+        for race_id, driver_ids in list(self._drivers.items()):
+            last = self._flagged_at.get(race_id)
+            if not force and last is not None and now - last < settings.LAP_OUTLIER_REFRESH_SECONDS:
+                continue
+            await _flag_outliers(db, race_id, driver_ids)
+            await db.commit()
+            del self._drivers[race_id]
+            self._flagged_at[race_id] = now
+
+
+def _outlier_report(race_id: uuid.UUID, laps: Sequence[_OutlierLapRow], result: OutlierPass) -> dict[str, object]:
+    """Flagged laps with their stint figures / Voltas marcadas com os numeros do stint."""
+    flagged: list[dict[str, object]] = []
+    for i, reason in enumerate(result.reasons()):
+        if reason is None:
+            continue
+        median, score = float(result.stint_median_ms[i]), float(result.score[i])
+        flagged.append({
+            "lap_id": laps[i].id,
+            "driver_id": laps[i].driver_id,
+            "lap_number": laps[i].lap_number,
+            "lap_time_ms": laps[i].lap_time_ms,
+            "is_valid": laps[i].is_valid,
+            "reason": reason,
+            "stint_number": int(result.stint[i]),
+            "stint_median_ms": None if math.isnan(median) else round(median, 1),
+            "score": None if math.isnan(score) else round(score, 2),
+        })
+    return {
+        "race_id": race_id,
+        "threshold": settings.LAP_OUTLIER_THRESHOLD,
+        "min_stint_laps": settings.LAP_OUTLIER_MIN_STINT_LAPS,
+        "total_laps": len(laps),
+        "laps": flagged,
+    }
+
+
+async def get_lap_outliers(db: AsyncSession, race_id: uuid.UUID) -> dict[str, object]:
+    """
+    Review the race's outliers: the pass is recomputed from current laps, pit stops and events, not stored.
+    Revisa as voltas atipicas: a analise e refeita a partir das voltas, pit stops e eventos atuais, sem gravar.
+    """
+    await _validate_race(db, race_id)
+    laps, result = await _outlier_pass(db, race_id)
+    return _outlier_report(race_id, laps, result)
+
+
+async def flag_lap_outliers(db: AsyncSession, race_id: uuid.UUID) -> dict[str, object]:
+    """
+    Recompute and store the race's outlier flags, e.g. after pit stops or safety-car events were entered.
+    Refaz e grava as voltas atipicas da corrida, ex. apos registrar pit stops ou eventos de safety car.
+    """
+    await _validate_race(db, race_id)
+    laps, result = await _outlier_pass(db, race_id)
+    await _store_outliers(db, race_id, laps, result)
+    await db.commit()
+    return _outlier_report(race_id, laps, result)
+
+
+# --- Lap Trace services / Servicos de tracado de volta ---
+
+
+async def _get_lap_id(db: AsyncSession, race_id: uuid.UUID, driver_id: uuid.UUID, lap_number: int) -> uuid.UUID:
+    """Id of a driver's lap by number / Id da volta de um piloto pelo numero."""
+    result = await db.execute(
+        select(LapTime.id).where(
+            LapTime.race_id == race_id, LapTime.driver_id == driver_id, LapTime.lap_number == lap_number
+        )
+    )
+    lap_id = result.scalar_one_or_none()
+    if lap_id is None:
+        raise NotFoundException("Lap time not found / Tempo de volta nao encontrado")
+    return lap_id
+
+
+def _check_channels(channels: list[str] | None) -> None:
+    """Reject unknown channel names / Rejeita nomes de canal desconhecidos."""
+    unknown = set(channels or ()) - CHANNELS.keys()
+    if unknown:
+        raise ValidationException(f"Unknown channels: {', '.join(sorted(unknown))}")
+
+
+def _trace_info(trace: Mapping[Any, Any]) -> dict[str, object]:
+    """Channel metadata without the blob / Metadados do canal sem o blob."""
+    return {
+        "channel": trace["channel"],
+        "unit": CHANNELS[trace["channel"]].unit,
+        "dtype": trace["dtype"],
+        "encoding": trace["encoding"],
+        "sample_rate_hz": trace["sample_rate_hz"],
+        "sample_count": trace["sample_count"],
+        "size_bytes": len(trace["data"]),
+    }
+
+
+async def upload_lap_traces(
+    db: AsyncSession,
+    race_id: uuid.UUID,
+    lap_number: int,
+    driver_id: uuid.UUID,
+    sample_rate_hz: float,
+    channels: dict[str, list[float]],
+) -> list[dict[str, object]]:
+    """
+    Store a lap's channels as compressed typed arrays, replacing channels already stored for the lap.
+    Grava os canais de uma volta como arrays tipados comprimidos, substituindo canais ja gravados da volta.
+    """
+    lap_id = await _get_lap_id(db, race_id, driver_id, lap_number)
+    if any(len(samples) > settings.TRACE_MAX_SAMPLES for samples in channels.values()):
+        raise ValidationException(f"At most {settings.TRACE_MAX_SAMPLES} samples per channel")
+    try:
+        encoded = {
+            channel: encode_channel(channel, samples, settings.TRACE_COMPRESSION_LEVEL)
+            for channel, samples in channels.items()
+        }
+    except ValueError as err:
+        raise ValidationException(str(err)) from err
+
+    rows: list[dict[str, object]] = [
+        {
+            "lap_id": lap_id,
+            "channel": channel,
+            "dtype": trace.dtype,
+            "encoding": trace.encoding.value,
+            "sample_rate_hz": sample_rate_hz,
+            "sample_count": trace.sample_count,
+            "data": trace.data,
+        }
+        for channel, trace in encoded.items()
+    ]
+    table = cast(Table, LapTrace.__table__)
+    await db.execute(upsert_statement(db, table, _TRACE_KEY, ConflictMode.update), rows)
+    await db.commit()
+    downsample_cache.invalidate_where(lambda key: key[0] == lap_id)
+    return [_trace_info(row) for row in rows]
+
+
+async def get_lap_traces(
+    db: AsyncSession,
+    race_id: uuid.UUID,
+    lap_number: int,
+    driver_id: uuid.UUID,
+    channels: list[str] | None = None,
+    start: int = 0,
+    stop: int | None = None,
+) -> dict[str, Any]:
+    """
+    Decode samples [start, stop) of a lap's channels (default all stored) into NumPy arrays.
+    Decodifica as amostras [start, stop) dos canais de uma volta (padrao todos os gravados) em arrays NumPy.
+    """
+    _check_channels(channels)
+    lap_id = await _get_lap_id(db, race_id, driver_id, lap_number)
+    table = cast(Table, LapTrace.__table__)
+    stmt = select(table).where(table.c.lap_id == lap_id).order_by(table.c.channel)
+    if channels:
+        stmt = stmt.where(table.c.channel.in_(channels))
+    traces = (await db.execute(stmt)).mappings().all()
+    if not traces:
+        raise NotFoundException("Lap trace not found / Tracado de volta nao encontrado")
+
+    decoded = [
+        {
+            **_trace_info(trace),
+            "values": decode_channel(trace["dtype"], TraceEncoding(trace["encoding"]), trace["data"], start, stop),
+        }
+        for trace in traces
+    ]
+    longest = max(trace["sample_count"] for trace in traces)
+    end = longest if stop is None else min(stop, longest)
+    return {"lap_id": lap_id, "start": min(start, end), "stop": end, "channels": decoded}
+
+
+async def get_downsampled_traces(
+    db: AsyncSession,
+    race_id: uuid.UUID,
+    lap_number: int,
+    driver_id: uuid.UUID,
+    channels: list[str] | None = None,
+    points: int = 1000,
+    method: DownsampleMethod = DownsampleMethod.lttb,
+) -> dict[str, Any]:
+    """
+    A lap's channels reduced to at most `points` samples each, for charts. Cached series skip the blob read.
+    Canais de uma volta reduzidos a no maximo `points` amostras cada, para graficos. Series em cache evitam ler o blob.
+    """
+    _check_channels(channels)
+    lap_id = await _get_lap_id(db, race_id, driver_id, lap_number)
+    table = cast(Table, LapTrace.__table__)
+    stmt = (
+        select(table.c.channel, table.c.sample_rate_hz, table.c.sample_count)
+        .where(table.c.lap_id == lap_id)
+        .order_by(table.c.channel)
+    )
+    if channels:
+        stmt = stmt.where(table.c.channel.in_(channels))
+    stored = (await db.execute(stmt)).mappings().all()
+    if not stored:
+        raise NotFoundException("Lap trace not found / Tracado de volta nao encontrado")
+
+    series: dict[str, tuple[Indices, npt.NDArray[np.generic]]] = {}
+    for trace in stored:
+        cached = downsample_cache.get((lap_id, trace["channel"], method, points))
+        if cached is not None:
+            series[trace["channel"]] = cached
+    missing = [trace["channel"] for trace in stored if trace["channel"] not in series]
+    if missing:
+        blobs = await db.execute(
+            select(table.c.channel, table.c.dtype, table.c.encoding, table.c.data).where(
+                table.c.lap_id == lap_id, table.c.channel.in_(missing)
+            )
+        )
+        decoded = {
+            trace["channel"]: decode_channel(trace["dtype"], TraceEncoding(trace["encoding"]), trace["data"])
+            for trace in blobs.mappings()
+        }
+        # Channels of a lap share their length, so LTTB handles them together
+        # Canais de uma volta tem o mesmo tamanho, entao o LTTB os trata juntos
+        for (channel, values), kept in zip(
+            decoded.items(), downsample(list(decoded.values()), method, points), strict=True
+        ):
+            series[channel] = (kept, values[kept])
+            downsample_cache.set((lap_id, channel, method, points), series[channel])
+
+    return {
+        "lap_id": lap_id,
+        "method": method.value,
+        "points": points,
+        "channels": [
+            {
+                "channel": trace["channel"],
+                "unit": CHANNELS[trace["channel"]].unit,
+                "sample_rate_hz": trace["sample_rate_hz"],
+                "sample_count": trace["sample_count"],
+                "indices": series[trace["channel"]][0],
+                "values": series[trace["channel"]][1],
+            }
+            for trace in stored
+            if trace["channel"] in series
+        ],
+    }
 
 
 # --- Car Setup services / Servicos de setup de carro ---
@@ -388,8 +1105,8 @@ async def compare_drivers(
     driver_ids: list[uuid.UUID],
 ) -> list[dict[str, object]]:
     """
-    Compare lap times for up to 3 drivers in a race.
-    Compara tempos de volta de ate 3 pilotos em uma corrida.
+    Compare lap times for up to 3 drivers in a race (drivers and laps fetched with one query each).
+    Compara tempos de volta de ate 3 pilotos em uma corrida (pilotos e voltas com uma consulta cada).
     """
     if len(driver_ids) > 3:
         from fastapi import HTTPException, status
@@ -401,20 +1118,179 @@ async def compare_drivers(
 
     await _validate_race(db, race_id)
 
-    comparisons = []
-    for driver_id in driver_ids:
-        driver = await _validate_driver(db, driver_id)
-        laps_stmt = (
-            select(LapTime)
-            .where(LapTime.race_id == race_id, LapTime.driver_id == driver_id)
-            .order_by(LapTime.lap_number)
+    result = await db.execute(select(Driver).where(Driver.id.in_(driver_ids)))
+    drivers = {driver.id: driver for driver in result.scalars()}
+    if set(driver_ids) - drivers.keys():
+        raise NotFoundException("Driver not found / Piloto nao encontrado")
+
+    laps_stmt = (
+        select(LapTime)
+        .where(LapTime.race_id == race_id, LapTime.driver_id.in_(driver_ids))
+        .order_by(LapTime.lap_number)
+    )
+    laps_by_driver: dict[uuid.UUID, list[LapTime]] = {driver_id: [] for driver_id in driver_ids}
+    for lap in (await db.execute(laps_stmt)).scalars():
+        laps_by_driver[lap.driver_id].append(lap)
+
+    return [
+        {
+            "driver_id": driver_id,
+            "driver_display_name": drivers[driver_id].display_name,
+            "laps": laps_by_driver[driver_id],
+        }
+        for driver_id in driver_ids
+    ]
+
+
+async def compare_field(
+    db: AsyncSession,
+    race_id: uuid.UUID,
+    driver_ids: list[uuid.UUID] | None = None,
+    reference_driver_id: uuid.UUID | None = None,
+    window: int = 3,
+) -> dict[str, object]:
+    """
+    Compare any number of drivers (default: every driver with laps) as drivers x laps matrices:
+    lap and cumulative times, gap and lap delta to a reference driver (default: the leader),
+    rolling average pace and sector deltas. Laps and drivers come from one query.
+
+    Compara qualquer numero de pilotos (padrao: todos com voltas) como matrizes pilotos x voltas:
+    tempos de volta e acumulados, gap e delta de volta para um piloto de referencia (padrao: o lider),
+    ritmo medio movel e deltas de setor. Voltas e pilotos vem de uma consulta.
+    """
+    await _validate_race(db, race_id)
+
+    columns = (
+        Driver.id.label("driver_id"),
+        Driver.display_name,
+        LapTime.lap_number,
+        LapTime.lap_time_ms,
+        LapTime.sector_1_ms,
+        LapTime.sector_2_ms,
+        LapTime.sector_3_ms,
+    )
+    if driver_ids:
+        # Outer join keeps requested drivers without laps / Outer join mantem pilotos pedidos sem voltas
+        stmt = (
+            select(*columns)
+            .select_from(Driver)
+            .outerjoin(LapTime, and_(LapTime.driver_id == Driver.id, LapTime.race_id == race_id))
+            .where(Driver.id.in_(driver_ids))
+        )
+    else:
+        stmt = select(*columns).join(Driver, Driver.id == LapTime.driver_id).where(LapTime.race_id == race_id)
+    rows = (await db.execute(stmt.order_by(Driver.display_name, Driver.id))).all()
+
+    drivers: dict[uuid.UUID, str] = {}
+    for row in rows:
+        drivers.setdefault(row.driver_id, row.display_name)
+    if driver_ids and set(driver_ids) - drivers.keys():
+        raise NotFoundException("Driver not found / Piloto nao encontrado")
+    if reference_driver_id is not None and reference_driver_id not in drivers:
+        raise ValidationException("Reference driver is not compared / Piloto de referencia nao esta na comparacao")
+
+    index = {driver_id: i for i, driver_id in enumerate(drivers)}
+    laps = [row for row in rows if row.lap_number is not None]
+    matrix = LapMatrix.build(
+        len(drivers),
+        [index[row.driver_id] for row in laps],
+        [row.lap_number for row in laps],
+        [row.lap_time_ms for row in laps],
+        [[getattr(row, f"sector_{sector}_ms") for row in laps] for sector in _SECTORS],
+    )
+    reference = index[reference_driver_id] if reference_driver_id is not None else matrix.leader_index()
+
+    data: dict[str, object] = {
+        "reference_driver_id": None if reference is None else list(drivers)[reference],
+        "window": window,
+        "lap_numbers": matrix.lap_numbers.tolist(),
+        "drivers": [{"driver_id": driver_id, "driver_display_name": name} for driver_id, name in drivers.items()],
+    }
+    if reference is None:
+        # No laps at all / Nenhuma volta
+        empty: list[list[float | None]] = [[] for _ in drivers]
+        data.update({name: empty for name in _COMPARE_SERIES}, sector_delta_ms=[empty] * SECTORS)
+        return data
+    data.update({name: to_json(series) for name, series in matrix.compare(reference, window).items()})
+    return data
+
+
+# --- Sector analysis / Analise de setores ---
+
+
+def _ms(value: float) -> int | None:
+    """Whole milliseconds, None for NaN / Milissegundos inteiros, None para NaN."""
+    return None if math.isnan(value) else round(value)
+
+
+async def get_sector_heatmap(db: AsyncSession, race_id: uuid.UUID) -> dict[str, object]:
+    """
+    Best sectors and theoretical best per driver, the session-best sectors, and every lap's sector gaps to
+    them as a drivers x laps x sectors heatmap. Laps and drivers come from one query; the result is cached
+    per race until a lap of the race is written.
+    Melhores setores e melhor teorico por piloto, os melhores setores da sessao e os gaps de setor de cada
+    volta para eles como um mapa de calor pilotos x voltas x setores. Voltas e pilotos vem de uma consulta;
+    o resultado fica em cache por corrida ate uma volta da corrida ser gravada.
+    """
+    await _validate_race(db, race_id)
+    cached = sector_cache.get(race_id)
+    if cached is not None:
+        return cached
+
+    stmt = (
+        select(
+            LapTime.driver_id,
+            Driver.display_name,
+            LapTime.lap_number,
+            LapTime.lap_time_ms,
+            LapTime.sector_1_ms,
+            LapTime.sector_2_ms,
+            LapTime.sector_3_ms,
         )
-        result = await db.execute(laps_stmt)
-        laps = list(result.scalars().all())
-        comparisons.append({
-            "driver_id": driver.id,
-            "driver_display_name": driver.display_name,
-            "laps": laps,
-        })
+        .join(Driver, Driver.id == LapTime.driver_id)
+        .where(LapTime.race_id == race_id)
+        .order_by(Driver.display_name, Driver.id)
+    )
+    rows = (await db.execute(stmt)).all()
+    drivers: dict[uuid.UUID, str] = {}
+    for row in rows:
+        drivers.setdefault(row.driver_id, row.display_name)
+    index = {driver_id: i for i, driver_id in enumerate(drivers)}
+    matrix = LapMatrix.build(
+        len(drivers),
+        [index[row.driver_id] for row in rows],
+        [row.lap_number for row in rows],
+        [row.lap_time_ms for row in rows],
+        [[getattr(row, f"sector_{sector}_ms") for row in rows] for sector in _SECTORS],
+    )
+    bests = matrix.sector_bests()
+    driver_ids = list(drivers)
+    ideal = float(bests.session_best_ms.sum())
 
-    return comparisons
+    data: dict[str, object] = {
+        "race_id": race_id,
+        "lap_numbers": matrix.lap_numbers.tolist(),
+        "session_best": [
+            {
+                "sector": sector,
+                "sector_ms": _ms(float(bests.session_best_ms[sector - 1])),
+                "driver_id": driver_ids[driver] if driver >= 0 else None,
+                "lap_number": int(matrix.lap_numbers[lap]) if lap >= 0 else None,
+            }
+            for sector, (driver, lap) in zip(_SECTORS, bests.session_best_at.tolist(), strict=True)
+        ],
+        "ideal_lap_ms": _ms(ideal),
+        "drivers": [
+            {
+                "driver_id": driver_id,
+                "driver_display_name": name,
+                "best_sector_ms": [_ms(value) for value in bests.driver_best_ms[i].tolist()],
+                "theoretical_best_ms": _ms(float(bests.theoretical_best_ms[i])),
+                "gap_to_ideal_ms": _ms(float(bests.theoretical_best_ms[i]) - ideal),
+            }
+            for i, (driver_id, name) in enumerate(drivers.items())
+        ],
+        "gap_to_session_best_ms": to_json(bests.gap_ms),
+    }
+    sector_cache.set(race_id, data)
+    return data
@@ -0,0 +1,126 @@
+"""
+Lap trace codec: per-channel sample arrays packed into compressed, typed blobs (NumPy + zlib).
+Codec de tracados de volta: arrays de amostras por canal empacotados em blobs tipados e comprimidos.
+
+Integer channels (gear, RPM) are delta-encoded: consecutive samples differ little, so the deltas
+compress far better than the values. Float channels are stored as float32 with their bytes shuffled
+(all first bytes, then all second bytes...), which groups the slowly changing exponent bytes together.
+Decoding is vectorized and returns NumPy arrays; no per-sample Python object is created.
+
+Canais inteiros (marcha, RPM) usam codificacao delta: amostras consecutivas diferem pouco, entao os
+deltas comprimem bem melhor que os valores. Canais float sao gravados como float32 com os bytes
+embaralhados (todos os primeiros bytes, depois todos os segundos...), o que agrupa os bytes de expoente,
+que mudam devagar. A decodificacao e vetorizada e retorna arrays NumPy, sem objetos Python por amostra.
+"""
+
+import enum
+import io
+import zlib
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+
+class TraceEncoding(str, enum.Enum):
+    """
+    Byte layout of a stored channel.
+    Layout de bytes de um canal gravado.
+    """
+
+    delta = "delta"
+    shuffle = "shuffle"
+
+
+@dataclass(frozen=True, slots=True)
+class ChannelSpec:
+    """Storage type and unit of a channel / Tipo de armazenamento e unidade de um canal."""
+
+    dtype: str  # little-endian NumPy dtype / dtype NumPy little-endian
+    unit: str
+
+    @property
+    def encoding(self) -> TraceEncoding:
+        """Delta for integers, shuffle for floats / Delta para inteiros, shuffle para floats."""
+        return TraceEncoding.delta if np.dtype(self.dtype).kind == "i" else TraceEncoding.shuffle
+
+
+CHANNELS: dict[str, ChannelSpec] = {
+    "speed": ChannelSpec("<f4", "km/h"),
+    "throttle": ChannelSpec("<f4", "ratio"),
+    "brake": ChannelSpec("<f4", "ratio"),
+    "steering": ChannelSpec("<f4", "deg"),
+    "gear": ChannelSpec("<i2", "gear"),
+    "rpm": ChannelSpec("<i2", "rpm"),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedTrace:
+    """A channel ready to store / Um canal pronto para gravar."""
+
+    dtype: str
+    encoding: TraceEncoding
+    sample_count: int
+    data: bytes
+
+
+def encode_channel(channel: str, values: Sequence[float], level: int = 6) -> EncodedTrace:
+    """
+    Pack one channel's samples. Raises ValueError for unknown channels or values the type cannot hold.
+    Empacota as amostras de um canal. Lanca ValueError para canais desconhecidos ou valores fora do tipo.
+    """
+    spec = CHANNELS.get(channel)
+    if spec is None:
+        raise ValueError(f"Unknown channel: {channel}")
+    dtype = np.dtype(spec.dtype)
+    samples = np.asarray(values, dtype=np.float64)
+    if not np.isfinite(samples).all():
+        raise ValueError(f"Channel {channel} has non-finite samples")
+
+    if spec.encoding is TraceEncoding.delta:
+        info = np.iinfo(dtype)
+        out_of_range = samples.min(initial=0) < info.min or samples.max(initial=0) > info.max
+        if out_of_range or (samples != np.round(samples)).any():
+            raise ValueError(f"Channel {channel} needs integers in [{info.min}, {info.max}]")
+        # Deltas of int16 values can need 17 bits; int32 deltas still compress to almost nothing
+        # Deltas de valores int16 podem exigir 17 bits; deltas int32 ainda comprimem para quase nada
+        payload = np.diff(samples.astype(np.int32), prepend=0).astype("<i4").tobytes()
+    else:
+        typed = samples.astype(dtype)
+        payload = typed.view(np.uint8).reshape(-1, dtype.itemsize).T.tobytes()
+
+    return EncodedTrace(
+        dtype=spec.dtype,
+        encoding=spec.encoding,
+        sample_count=int(samples.size),
+        data=zlib.compress(payload, level),
+    )
+
+
+def decode_channel(
+    dtype: str, encoding: TraceEncoding, data: bytes, start: int = 0, stop: int | None = None
+) -> npt.NDArray[np.generic]:
+    """
+    Unpack a stored channel and return samples [start, stop) in its storage dtype.
+    Desempacota um canal gravado e retorna as amostras [start, stop) no seu dtype de armazenamento.
+    """
+    raw = zlib.decompress(data)
+    target = np.dtype(dtype)
+    if encoding is TraceEncoding.delta:
+        samples: npt.NDArray[np.generic] = np.cumsum(np.frombuffer(raw, dtype="<i4")).astype(target)
+    else:
+        shuffled = np.frombuffer(raw, dtype=np.uint8).reshape(target.itemsize, -1)
+        samples = np.ascontiguousarray(shuffled.T).view(target).ravel()
+    return samples[start:stop]
+
+
+def to_npz(arrays: Mapping[str, npt.NDArray[np.generic]]) -> bytes:
+    """
+    Arrays as an uncompressed .npz archive, readable with numpy.load() without JSON parsing.
+    Arrays como arquivo .npz sem compressao, legivel com numpy.load() sem parsing de JSON.
+    """
+    buffer = io.BytesIO()
+    np.savez(buffer, allow_pickle=False, **arrays)
+    return buffer.getvalue()
@@ -0,0 +1,226 @@
+"""
+Write-behind buffer for live lap ingest: single laps are acknowledged once queued in memory and written
+per race in one bulk statement.
+Buffer write-behind para ingestao de voltas ao vivo: voltas unicas sao confirmadas ao entrar na fila em
+memoria e gravadas por corrida em um unico statement em lote.
+
+Durability: an acknowledged lap lives only in this worker's memory until its flush, at most
+LIVE_LAPS_FLUSH_MS later (sooner once a race has LIVE_LAPS_BATCH_ROWS laps). A graceful shutdown flushes
+every buffer from the FastAPI lifespan; a crash (kill -9, OOM) loses the laps of the last window. A lap
+already stored is kept and the buffered one skipped (first write wins). A flush that fails, on the database
+or unexpectedly, is logged and retried on the next tick; past LIVE_LAPS_MAX_PENDING new laps get 503 with
+Retry-After. Reads see a buffered lap after its flush. Outlier flags of the written drivers are refreshed at
+most every LAP_OUTLIER_REFRESH_SECONDS per race and on shutdown, not on every flush.
+
+Durabilidade: uma volta confirmada vive apenas na memoria deste worker ate o flush, no maximo
+LIVE_LAPS_FLUSH_MS depois (antes, quando uma corrida chega a LIVE_LAPS_BATCH_ROWS voltas). Um encerramento
+normal grava todos os buffers no lifespan do FastAPI; uma queda (kill -9, OOM) perde as voltas da ultima
+janela. Uma volta ja gravada e mantida e a do buffer ignorada (a primeira escrita vence). Um flush que
+falha, no banco ou de forma inesperada, e registrado e repetido no proximo ciclo; acima de
+LIVE_LAPS_MAX_PENDING novas voltas recebem 503 com Retry-After. Leituras veem uma volta do buffer apos o
+flush. As voltas atipicas dos pilotos gravados sao reavaliadas no maximo a cada LAP_OUTLIER_REFRESH_SECONDS
+por corrida e no encerramento, nao a cada flush.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+
+from fastapi import HTTPException
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.exceptions import ConflictException, NotFoundException, ServiceUnavailableException
+from app.db.session import async_session
+from app.db.upsert import ConflictMode
+from app.drivers.models import Driver
+from app.metrics.collectors import LIVE_LAPS_FLUSHED, LIVE_LAPS_PENDING
+from app.races.models import Race
+from app.teams.models import Team
+from app.telemetry.schemas import LapTimeCreateRequest
+from app.telemetry.service import PendingOutliers, bulk_create_lap_times
+
+logger = logging.getLogger("app.telemetry.write_behind")
+
+type _Batch = dict[tuple[uuid.UUID, int], dict[str, object]]  # (driver_id, lap_number) -> lap
+
+# Race / driver / team ids already checked, so a lap needs no query / Ids ja verificados, sem consulta por volta
+_KNOWN_IDS_SIZE = 4096
+_KNOWN_IDS_TTL_SECONDS = 300.0
+
+
+@dataclass
+class LapBufferStats:
+    """Counters of one worker's buffer / Contadores do buffer de um worker."""
+
+    accepted: int = 0
+    written: int = 0
+    skipped: int = 0  # already stored / ja gravadas
+    dropped: int = 0  # rejected at flush, e.g. race deleted / rejeitadas no flush, ex. corrida removida
+    flushes: int = 0
+    failed_flushes: int = 0
+    flush_seconds: float = 0.0
+
+
+class LapWriteBehind:
+    """
+    Per-race in-memory lap queues with one background flusher per event loop.
+    Filas de voltas em memoria por corrida com um flusher em segundo plano por event loop.
+    """
+
+    def __init__(self, sessions: async_sessionmaker[AsyncSession]) -> None:
+        self.sessions = sessions
+        self.stats = LapBufferStats()
+        self._races: dict[uuid.UUID, _Batch] = {}
+        self._pending = 0
+        self._known: TTLCache[uuid.UUID, bool] = TTLCache(_KNOWN_IDS_SIZE, _KNOWN_IDS_TTL_SECONDS)
+        self._outliers = PendingOutliers()
+        self._flusher: asyncio.Task[None] | None = None
+        self._wake = asyncio.Event()
+        self._stopped = False
+
+    @property
+    def pending(self) -> int:
+        """Acknowledged laps not yet written / Voltas confirmadas ainda nao gravadas."""
+        return self._pending
+
+    async def add(self, db: AsyncSession, race_id: uuid.UUID, lap: LapTimeCreateRequest) -> int:
+        """
+        Queue one lap after checking its race, driver and team (cached per id) and that the same
+        driver/lap is not already queued. Returns the race's queued lap count.
+        Enfileira uma volta apos verificar corrida, piloto e equipe (em cache por id) e que o mesmo
+        piloto/volta nao esta na fila. Retorna o numero de voltas na fila da corrida.
+        """
+        if self._pending >= settings.LIVE_LAPS_MAX_PENDING:
+            raise ServiceUnavailableException("Lap buffer full, retry later / Buffer de voltas cheio, tente depois")
+        await self._check_ids(db, race_id, lap.driver_id, lap.team_id)
+        batch = self._races.setdefault(race_id, {})
+        key = (lap.driver_id, lap.lap_number)
+        if key in batch:
+            raise ConflictException("Lap time already pending for this driver/race/lap number")
+        batch[key] = lap.model_dump()
+        self._pending += 1
+        self.stats.accepted += 1
+        LIVE_LAPS_PENDING.inc()
+        self._ensure_flusher()
+        if len(batch) >= settings.LIVE_LAPS_BATCH_ROWS:
+            self._wake.set()
+        return len(batch)
+
+    async def _check_ids(self, db: AsyncSession, race_id: uuid.UUID, driver_id: uuid.UUID, team_id: uuid.UUID) -> None:
+        if all(self._known.get(key) for key in (race_id, driver_id, team_id)):
+            return
+        stmt = union_all(
+            select(literal("race").label("kind")).where(Race.id == race_id),
+            select(literal("driver").label("kind")).where(Driver.id == driver_id),
+            select(literal("team").label("kind")).where(Team.id == team_id),
+        )
+        found = set((await db.execute(stmt)).scalars())
+        for kind, key, message in (
+            ("race", race_id, "Race not found / Corrida nao encontrada"),
+            ("driver", driver_id, "Driver not found / Piloto nao encontrado"),
+            ("team", team_id, "Team not found / Equipe nao encontrada"),
+        ):
+            if kind not in found:
+                raise NotFoundException(message)
+            self._known.set(key, True)
+
+    def _ensure_flusher(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._flusher is None or self._flusher.done() or self._flusher.get_loop() is not loop:
+            self._stopped = False
+            self._wake = asyncio.Event()
+            self._flusher = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._stopped:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), settings.LIVE_LAPS_FLUSH_MS / 1000)
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                # A dead flusher would strand acknowledged laps / Um flusher morto abandonaria voltas confirmadas
+                logger.exception("Lap flush tick failed / Ciclo de flush de voltas falhou")
+
+    async def flush(self, final: bool = False) -> None:
+        """
+        Write every race's queue, one bulk statement per race, then the outlier passes that are due
+        (all of them on final).
+        Grava a fila de cada corrida, um lote por corrida, depois as analises de voltas atipicas vencidas
+        (todas no final).
+        """
+        for race_id in list(self._races):
+            batch = self._races.pop(race_id)
+            self._pending -= len(batch)
+            LIVE_LAPS_PENDING.dec(len(batch))
+            await self._write(race_id, batch)
+        async with self.sessions() as db:
+            try:
+                await self._outliers.flag(db, force=final)
+            except Exception:
+                logger.exception("Outlier pass failed, retrying / Analise de voltas atipicas falhou, repetindo")
+
+    async def _write(self, race_id: uuid.UUID, batch: _Batch) -> None:
+        start = time.perf_counter()
+        async with self.sessions() as db:
+            try:
+                laps = list(batch.values())
+                written = len(await bulk_create_lap_times(db, race_id, laps, ConflictMode.ignore, flag_outliers=False))
+            except (SQLAlchemyError, OSError):
+                logger.exception("Lap flush failed, retrying / Flush de voltas falhou, repetindo")
+                self.stats.failed_flushes += 1
+                self._requeue(race_id, batch)
+                return
+            except HTTPException as err:
+                logger.error("Dropped %d laps of race %s / Voltas descartadas: %s", len(batch), race_id, err.detail)
+                self.stats.dropped += len(batch)
+                LIVE_LAPS_FLUSHED.labels("dropped").inc(len(batch))
+                return
+            except Exception:
+                logger.exception("Unexpected lap flush failure, retrying / Falha inesperada no flush, repetindo")
+                self.stats.failed_flushes += 1
+                self._requeue(race_id, batch)
+                return
+        self._outliers.add(race_id, (driver_id for driver_id, _ in batch))
+        self.stats.flushes += 1
+        self.stats.flush_seconds += time.perf_counter() - start
+        self.stats.written += written
+        self.stats.skipped += len(batch) - written
+        LIVE_LAPS_FLUSHED.labels("written").inc(written)
+        LIVE_LAPS_FLUSHED.labels("skipped").inc(len(batch) - written)
+
+    def _requeue(self, race_id: uuid.UUID, batch: _Batch) -> None:
+        """Put a failed batch back; the older lap wins a key clash / Devolve um lote; a volta mais antiga vence."""
+        newer = self._races.get(race_id, {})
+        merged = {**newer, **batch}
+        self._races[race_id] = merged
+        self._pending += len(merged) - len(newer)
+        LIVE_LAPS_PENDING.inc(len(merged) - len(newer))
+
+    async def close(self) -> None:
+        """
+        Stop the flusher and write what is queued; called on shutdown from the lifespan.
+        Para o flusher e grava o que esta na fila; chamado no encerramento pelo lifespan.
+        """
+        self._stopped = True
+        self._wake.set()
+        flusher, self._flusher = self._flusher, None
+        if flusher is not None and flusher.get_loop() is asyncio.get_running_loop():
+            try:
+                await flusher
+            except Exception:
+                logger.exception("Lap flusher had failed / Flusher de voltas havia falhado")
+        await self.flush(final=True)
+        if self._pending:
+            logger.error("%d buffered laps were not written / voltas do buffer nao gravadas", self._pending)
+
+
+# One buffer per worker process / Um buffer por processo worker
+lap_write_behind = LapWriteBehind(async_session)
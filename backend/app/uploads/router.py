@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import get_current_active_user, require_permissions
 from app.core.exceptions import ForbiddenException
+from app.core.principal import Principal
 from app.db.session import get_db
 from app.drivers.service import get_driver_by_id
 from app.teams.service import get_team_by_id
@@ -70,14 +71,14 @@ async def upload_user_avatar(
 async def upload_team_logo(
     team_id: uuid.UUID,
     file: UploadFile,
-    _current_user: User = Depends(require_permissions("teams:update")),
+    _current_user: Principal = Depends(require_permissions("teams:update")),
     db: AsyncSession = Depends(get_db),
 ) -> UploadResponse:
     """
     Upload a team logo. Requires teams:update permission.
     Upload de logo de equipe. Requer permissao teams:update.
     """
-    team = await get_team_by_id(db, team_id)
+    team = await get_team_by_id(db, team_id, profile="list")
 
     # Delete old logo if exists / Excluir logo antigo se existir
     if team.logo_url:
@@ -96,7 +97,7 @@ async def upload_team_logo(
 async def upload_driver_photo(
     driver_id: uuid.UUID,
     file: UploadFile,
-    _current_user: User = Depends(require_permissions("drivers:update")),
+    _current_user: Principal = Depends(require_permissions("drivers:update")),
     db: AsyncSession = Depends(get_db),
 ) -> UploadResponse:
     """
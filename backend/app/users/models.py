@@ -6,7 +6,7 @@ Modelo de usuario.
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, Uuid, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Uuid, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -26,6 +26,8 @@ class User(Base):
     full_name: Mapped[str] = mapped_column(String(256), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, server_default="true", nullable=False)
     is_superuser: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false", nullable=False)
+    # Bumped on every role/permission/activation change / Incrementado a cada mudanca de papel/permissao/ativacao
+    authz_version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
     avatar_url: Mapped[str | None] = mapped_column(String(2048), nullable=True)
     team_id: Mapped[uuid.UUID | None] = mapped_column(Uuid, ForeignKey("teams.id", ondelete="SET NULL"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -33,16 +35,16 @@ class User(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
-    # Relationships / Relacionamentos
+    # Relationships, loaded via app.db.loaders profiles / Relacionamentos, carregados via perfis de app.db.loaders
     roles: Mapped[list["Role"]] = relationship(  # type: ignore[name-defined]  # noqa: F821
         "Role",
         secondary="user_roles",
         primaryjoin="User.id == user_roles.c.user_id",
         back_populates="users",
-        lazy="selectin",
+        lazy="raise",
     )
     team: Mapped["Team | None"] = relationship(  # type: ignore[name-defined]  # noqa: F821
-        "Team", back_populates="members", lazy="selectin"
+        "Team", back_populates="members", lazy="raise"
     )
 
     def __repr__(self) -> str:
@@ -10,6 +10,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import get_current_active_user, require_permissions
+from app.core.principal import Principal
 from app.db.session import get_db
 from app.users.models import User
 from app.users.schemas import AdminUserCreateRequest, AdminUserUpdate, UserListResponse, UserResponse, UserUpdate
@@ -46,7 +47,7 @@ async def update_current_user(
 async def list_all_users(
     is_active: bool | None = Query(None),
     search: str | None = Query(None),
-    _current_user: User = Depends(require_permissions("users:list")),
+    _current_user: Principal = Depends(require_permissions("users:list")),
     db: AsyncSession = Depends(get_db),
 ) -> Sequence[User]:
     """
@@ -59,7 +60,7 @@ async def list_all_users(
 @router.post("/", response_model=UserResponse, status_code=201)
 async def create_user(
     body: AdminUserCreateRequest,
-    _current_user: User = Depends(require_permissions("users:create")),
+    _current_user: Principal = Depends(require_permissions("users:create")),
     db: AsyncSession = Depends(get_db),
 ) -> User:
     """
@@ -78,7 +79,7 @@ async def create_user(
 @router.get("/{user_id}", response_model=UserResponse)
 async def read_user(
     user_id: uuid.UUID,
-    _current_user: User = Depends(require_permissions("users:read")),
+    _current_user: Principal = Depends(require_permissions("users:read")),
     db: AsyncSession = Depends(get_db),
 ) -> User:
     """
@@ -92,7 +93,7 @@ async def read_user(
 async def admin_update(
     user_id: uuid.UUID,
     body: AdminUserUpdate,
-    _current_user: User = Depends(require_permissions("users:update")),
+    _current_user: Principal = Depends(require_permissions("users:update")),
     db: AsyncSession = Depends(get_db),
 ) -> User:
     """
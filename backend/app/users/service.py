@@ -11,16 +11,18 @@ from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import ConflictException, NotFoundException
-from app.core.security import hash_password
+from app.core.principal import authz_versions, bump_authz_versions, principal_cache
+from app.core.security import hash_password_async
+from app.db.loaders import LoaderProfile, load_profile
 from app.users.models import User
 
 
-async def get_user_by_id(db: AsyncSession, user_id: uuid.UUID) -> User:
+async def get_user_by_id(db: AsyncSession, user_id: uuid.UUID, profile: LoaderProfile = "detail") -> User:
     """
     Get a user by ID. Raises NotFoundException if not found.
     Busca um usuario por ID. Lanca NotFoundException se nao encontrado.
     """
-    result = await db.execute(select(User).where(User.id == user_id))
+    result = await db.execute(select(User).where(User.id == user_id).options(*load_profile(User, profile)))
     user = result.scalar_one_or_none()
     if user is None:
         raise NotFoundException("User not found")
@@ -52,7 +54,7 @@ async def list_users(
     List users ordered by created_at desc. Filter by is_active and search by name/email.
     Lista usuarios ordenados por created_at desc. Filtra por is_active e busca por nome/email.
     """
-    stmt = select(User).order_by(User.created_at.desc())
+    stmt = select(User).options(*load_profile(User, "list")).order_by(User.created_at.desc())
     if is_active is not None:
         stmt = stmt.where(User.is_active == is_active)
     if search:
@@ -84,7 +86,7 @@ async def admin_create_user(
 
     user = User(
         email=email,
-        hashed_password=hash_password(password),
+        hashed_password=await hash_password_async(password),
         full_name=full_name,
         is_active=is_active,
     )
@@ -112,8 +114,14 @@ async def admin_update_user(
         user.email = email
     if full_name is not None:
         user.full_name = full_name
-    if is_active is not None:
+    versions: dict[uuid.UUID, int] = {}
+    if is_active is not None and is_active != user.is_active:
         user.is_active = is_active
+        versions = await bump_authz_versions(db, User.id == user.id)
     await db.commit()
+    if versions:
+        # Deactivation must take effect on the next request / Desativacao vale na proxima requisicao
+        principal_cache.invalidate(user.id)
+        authz_versions.update(versions)
     await db.refresh(user)
     return user
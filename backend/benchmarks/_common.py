@@ -0,0 +1,146 @@
+"""
+Shared helpers for the backend benchmarks (engine setup, synthetic race data, timing).
+Auxiliares compartilhados dos benchmarks do backend (engine, dados sinteticos de corrida, tempo).
+"""
+
+import itertools
+import time
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.championships.models import Championship, championship_entries  # noqa: F401
+from app.db.base import Base
+from app.drivers.models import Driver
+from app.notifications.models import Notification  # noqa: F401
+from app.pitstops.models import PitStop, RaceStrategy  # noqa: F401
+from app.races.models import Race, race_entries  # noqa: F401
+from app.replay.models import LapPosition, RaceEvent  # noqa: F401
+from app.results.models import RaceResult  # noqa: F401
+from app.roles.models import Permission, Role  # noqa: F401
+from app.teams.models import Team
+from app.telemetry.models import CarSetup, LapTime, LapTrace  # noqa: F401
+from app.users.models import User  # noqa: F401
+
+# Default target: in-memory SQLite, same engine the test suite uses
+# Alvo padrao: SQLite em memoria, o mesmo engine da suite de testes
+DEFAULT_URL = "sqlite+aiosqlite://"
+
+# Driver abbreviations are globally unique / Abreviacoes de piloto sao unicas globalmente
+_abbreviations = itertools.count(1)
+
+
+@dataclass
+class RaceFixture:
+    """Synthetic race with its grid / Corrida sintetica com seu grid."""
+
+    race_id: uuid.UUID
+    drivers: list[tuple[uuid.UUID, uuid.UUID]] = field(default_factory=list)  # (driver_id, team_id)
+
+
+@asynccontextmanager
+async def bench_engine(url: str = DEFAULT_URL) -> AsyncIterator[AsyncEngine]:
+    """
+    Create an engine with a fresh schema, dropped on exit.
+    Cria um engine com schema novo, removido ao sair.
+    """
+    engine = create_async_engine(url, echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield engine
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+def sessionmaker_for(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """Session factory matching app.db.session / Fabrica de sessao igual a app.db.session."""
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def seed_race(session: AsyncSession, n_drivers: int = 40, tag: str = "bench") -> RaceFixture:
+    """
+    Seed one championship, one race and a grid of n_drivers (two per team).
+    Popula um campeonato, uma corrida e um grid de n_drivers (dois por equipe).
+    """
+    champ = Championship(name=f"{tag}_champ_{uuid.uuid4().hex[:8]}", display_name="Bench", season_year=2026)
+    session.add(champ)
+    await session.flush()
+    race = Race(
+        championship_id=champ.id,
+        name=f"{tag}_race",
+        display_name="Bench Race",
+        round_number=1,
+        laps_total=70,
+    )
+    teams: list[Team] = []
+    for t in range((n_drivers + 1) // 2):
+        team = Team(name=f"{tag}_team_{uuid.uuid4().hex[:8]}_{t}", display_name=f"Team {t}")
+        teams.append(team)
+    session.add_all([race, *teams])
+    await session.flush()
+
+    fixture = RaceFixture(race_id=race.id)
+
+    drivers = [
+        Driver(
+            name=f"{tag}_driver_{uuid.uuid4().hex[:8]}_{d}",
+            display_name=f"Driver {d}",
+            abbreviation=f"{next(_abbreviations):03X}",
+            number=d + 1,
+            team_id=teams[d // 2].id,
+        )
+        for d in range(n_drivers)
+    ]
+    session.add_all(drivers)
+    await session.flush()
+    fixture.drivers = [(driver.id, driver.team_id) for driver in drivers]
+    await session.commit()
+    return fixture
+
+
+def synthetic_laps(fixture: RaceFixture, n_rows: int) -> list[dict[str, object]]:
+    """
+    Build n_rows lap dicts spread evenly across the grid.
+    Gera n_rows dicts de volta distribuidos igualmente pelo grid.
+    """
+    laps: list[dict[str, object]] = []
+    n_drivers = len(fixture.drivers)
+    for i in range(n_rows):
+        driver_id, team_id = fixture.drivers[i % n_drivers]
+        lap_number = i // n_drivers + 1
+        base = 90_000 + (i % n_drivers) * 37 + (lap_number % 11) * 13
+        laps.append(
+            {
+                "driver_id": driver_id,
+                "team_id": team_id,
+                "lap_number": lap_number,
+                "lap_time_ms": base,
+                "sector_1_ms": base // 3,
+                "sector_2_ms": base // 3,
+                "sector_3_ms": base - 2 * (base // 3),
+                "is_valid": True,
+                "is_personal_best": False,
+            }
+        )
+    return laps
+
+
+@contextmanager
+def stopwatch() -> Iterator[list[float]]:
+    """
+    Measure wall time of a block; elapsed seconds are appended to the yielded list.
+    Mede o tempo de um bloco; segundos decorridos sao adicionados a lista retornada.
+    """
+    elapsed: list[float] = []
+    start = time.perf_counter()
+    try:
+        yield elapsed
+    finally:
+        elapsed.append(time.perf_counter() - start)
@@ -0,0 +1,171 @@
+"""
+Benchmark: queries and rows loaded per request for the user/role/team endpoints.
+Benchmark: queries e linhas carregadas por requisicao nos endpoints de usuario/papel/equipe.
+
+Seeds the system roles and permissions, teams with drivers and championship/race entries, and
+--users users spread over the roles and teams. Each endpoint is called as a non-superuser admin
+(so the permission check runs) and the SQL issued during the request is counted with track_queries.
+
+Popula papeis e permissoes do sistema, equipes com pilotos e inscricoes em campeonato/corridas, e
+--users usuarios distribuidos entre papeis e equipes. Cada endpoint e chamado por um admin nao
+superusuario (para a verificacao de permissao rodar) e o SQL da requisicao e contado com track_queries.
+
+Usage / Uso (from backend/):
+    python -m benchmarks.bench_loader_profiles
+    python -m benchmarks.bench_loader_profiles --users 2000 --teams 20
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import AsyncGenerator
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.championships.models import Championship, championship_entries
+from app.core.security import create_access_token
+from app.db.instrumentation import instrument_engine, track_queries
+from app.db.seed import ROLE_PERMISSIONS, SYSTEM_PERMISSIONS, SYSTEM_ROLES
+from app.db.session import get_db
+from app.drivers.models import Driver
+from app.main import create_app
+from app.races.models import Race, race_entries
+from app.roles.models import Permission, Role, role_permissions, user_roles
+from app.teams.models import Team
+from app.users.models import User
+from benchmarks._common import DEFAULT_URL, bench_engine, sessionmaker_for
+
+N_RACES = 5
+
+
+async def _seed(engine: AsyncEngine, n_users: int, n_teams: int) -> dict[str, str]:
+    """Seed the dataset; return ids used in the request paths / Popula os dados; retorna ids das rotas."""
+    async with sessionmaker_for(engine)() as session:
+        roles = [Role(**data) for data in SYSTEM_ROLES]
+        perms = {p["codename"]: Permission(**p) for p in SYSTEM_PERMISSIONS}
+        champ = Championship(name="bench_champ", display_name="Bench", season_year=2026)
+        teams = [Team(name=f"bench_team_{t}", display_name=f"Team {t}") for t in range(n_teams)]
+        session.add_all([*roles, *perms.values(), champ, *teams])
+        await session.flush()
+        by_name = {role.name: role for role in roles}
+        await session.execute(
+            insert(role_permissions),
+            [
+                {"role_id": by_name[role_name].id, "permission_id": perms[codename].id}
+                for role_name, codenames in ROLE_PERMISSIONS.items()
+                for codename in codenames
+            ],
+        )
+
+        races = [
+            Race(championship_id=champ.id, name=f"bench_race_{r}", display_name=f"Race {r}", round_number=r + 1)
+            for r in range(N_RACES)
+        ]
+        drivers = [
+            Driver(
+                name=f"bench_driver_{d}",
+                display_name=f"Driver {d}",
+                abbreviation=f"{d:03X}",
+                number=d + 1,
+                team_id=teams[d // 2].id,
+            )
+            for d in range(n_teams * 2)
+        ]
+        session.add_all([*races, *drivers])
+        await session.flush()
+        await session.execute(
+            insert(championship_entries), [{"championship_id": champ.id, "team_id": team.id} for team in teams]
+        )
+        await session.execute(
+            insert(race_entries), [{"race_id": race.id, "team_id": team.id} for race in races for team in teams]
+        )
+
+        user_ids = [uuid.uuid4() for _ in range(n_users)]
+        await session.execute(
+            insert(User),
+            [
+                {
+                    "id": user_id,
+                    "email": f"bench{i}@example.com",
+                    "hashed_password": "x",
+                    "full_name": f"Bench User {i}",
+                    "team_id": teams[i % n_teams].id,
+                }
+                for i, user_id in enumerate(user_ids)
+            ],
+        )
+        # Every user gets a role; the first one is the (non-superuser) admin making the requests
+        # Todo usuario recebe um papel; o primeiro e o admin (nao superusuario) que faz as requisicoes
+        await session.execute(
+            insert(user_roles),
+            [
+                {"user_id": user_id, "role_id": (roles[0] if i == 0 else roles[i % len(roles)]).id}
+                for i, user_id in enumerate(user_ids)
+            ],
+        )
+        ids = {
+            "user_id": str(user_ids[0]),
+            "team_id": str(teams[0].id),
+            "role_id": str(by_name["admin"].id),
+        }
+        await session.commit()
+    return ids
+
+
+async def run(url: str, n_users: int, n_teams: int) -> None:
+    """Seed, then measure each endpoint once after a warm-up call / Popula e mede cada endpoint apos aquecimento."""
+    async with bench_engine(url) as engine:
+        instrument_engine(engine)
+        ids = await _seed(engine, n_users, n_teams)
+        session_factory = sessionmaker_for(engine)
+        app = create_app()
+
+        async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        headers = {"Authorization": f"Bearer {create_access_token(subject=ids['user_id'])}"}
+        paths = [
+            "/api/v1/users/me",
+            "/api/v1/users/",
+            "/api/v1/users/{user_id}",
+            "/api/v1/users/{user_id}/roles",
+            "/api/v1/roles/",
+            "/api/v1/roles/{role_id}",
+            "/api/v1/teams/",
+            "/api/v1/teams/{team_id}",
+            "/api/v1/drivers/",
+        ]
+        # Budget warnings would interleave with the table / Avisos de budget se misturariam a tabela
+        logging.getLogger("app.db.queries").setLevel(logging.ERROR)
+
+        print(f"{n_users} users, {n_teams} teams, {n_teams * 2} drivers, {N_RACES} races")
+        print(f"{'endpoint':<36} {'queries':>8} {'rows':>8} {'ms':>8}")
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            for template in paths:
+                path = template.format(**ids)
+                (await client.get(path, headers=headers)).raise_for_status()
+                start = time.perf_counter()
+                with track_queries() as stats:
+                    (await client.get(path, headers=headers)).raise_for_status()
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"GET {template:<32} {stats.queries:>8} {stats.rows:>8} {elapsed:>8.1f}")
+
+
+def main() -> None:
+    """CLI entry point / Ponto de entrada da CLI."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DEFAULT_URL, help="Async DB URL (default: in-memory SQLite)")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--teams", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.users, args.teams))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark: latency of an unrelated endpoint during a burst of concurrent logins.
+Benchmark: latencia de um endpoint nao relacionado durante uma rajada de logins concorrentes.
+
+A probe polls GET /health every 10 ms while --logins concurrent POST /api/v1/auth/login requests run,
+and reports the probe's latency percentiles. It runs once with bcrypt on the event loop (the previous
+behaviour, patched in) and once with the bounded hashing pool, after an idle baseline.
+
+Uma sonda consulta GET /health a cada 10 ms enquanto --logins requisicoes POST /api/v1/auth/login
+concorrentes rodam, e reporta os percentis de latencia da sonda. Roda uma vez com bcrypt no event loop
+(o comportamento anterior, aplicado via patch) e uma vez com o pool de hashing limitado, apos uma linha
+de base ociosa.
+
+Usage / Uso (from backend/):
+    python -m benchmarks.bench_login_burst
+    python -m benchmarks.bench_login_burst --logins 200 --rounds 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from unittest import mock
+
+import bcrypt
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.auth import service as auth_service
+from app.core.security import shutdown_password_hashing, verify_password
+from app.db.session import get_db
+from app.main import create_app
+from app.users.models import User
+from benchmarks._common import bench_engine, sessionmaker_for
+
+EMAIL = "bench@example.com"
+PASSWORD = "benchpass123"
+
+
+async def _verify_on_loop(plain_password: str, hashed_password: str) -> bool:
+    """Previous behaviour: bcrypt inline in the handler / Comportamento anterior: bcrypt no handler."""
+    return verify_password(plain_password, hashed_password)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile / Percentil por posicao mais proxima."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1)]
+
+
+async def _probe(client: AsyncClient, stop: asyncio.Event, interval: float = 0.01) -> list[float]:
+    """
+    Poll /health on a fixed schedule until stopped; latency runs from the scheduled send time, so a
+    blocked event loop shows up as delay. Returns ms.
+    Consulta /health em intervalos fixos ate parar; a latencia conta a partir do envio agendado, entao um
+    event loop bloqueado aparece como atraso. Retorna ms.
+    """
+    latencies: list[float] = []
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        (await client.get("/health")).raise_for_status()
+        done = time.perf_counter()
+        latencies.append((done - scheduled) * 1000)
+        scheduled = max(scheduled + interval, done)
+    return latencies
+
+
+async def _phase(client: AsyncClient, n_logins: int, idle_seconds: float) -> tuple[list[float], float]:
+    """Run the probe alongside n_logins logins (or idle) / Roda a sonda junto de n_logins logins (ou ociosa)."""
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(client, stop))
+    start = time.perf_counter()
+    try:
+        if n_logins:
+            responses = await asyncio.gather(
+                *(
+                    client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+                    for _ in range(n_logins)
+                )
+            )
+            for resp in responses:
+                resp.raise_for_status()
+        else:
+            await asyncio.sleep(idle_seconds)
+        elapsed = time.perf_counter() - start
+    finally:
+        stop.set()
+    return await probe, elapsed
+
+
+async def run(n_logins: int, rounds: int) -> None:
+    """Seed one user, then measure each mode / Popula um usuario e mede cada modo."""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench_login.db'}"
+        async with bench_engine(url) as engine:
+            async with sessionmaker_for(engine)() as session:
+                hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds)).decode()
+                session.add(User(email=EMAIL, hashed_password=hashed, full_name="Bench User"))
+                await session.commit()
+
+            # One connection per login, so pool waits do not mix into the hashing numbers
+            # Uma conexao por login, para esperas do pool nao se misturarem aos numeros de hashing
+            app_engine = create_async_engine(url, pool_size=n_logins + 1, max_overflow=0)
+            session_factory = sessionmaker_for(app_engine)
+            app = create_app()
+
+            async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+                async with session_factory() as session:
+                    yield session
+
+            app.dependency_overrides[get_db] = override_get_db
+
+            print(f"{n_logins} concurrent logins, bcrypt cost {rounds}; probe: GET /health")
+            print(f"{'mode':<14} {'burst s':>8} {'probes':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+                modes: list[tuple[str, int]] = [("idle", 0), ("on-loop", n_logins), ("thread-pool", n_logins)]
+                for mode, logins in modes:
+                    patch = mock.patch.object(auth_service, "verify_password_async", _verify_on_loop)
+                    if mode == "on-loop":
+                        patch.start()
+                    try:
+                        latencies, elapsed = await _phase(client, logins, idle_seconds=1.0)
+                    finally:
+                        if mode == "on-loop":
+                            patch.stop()
+                    print(
+                        f"{mode:<14} {elapsed if logins else 0:>8.2f} {len(latencies):>7} "
+                        f"{statistics.median(latencies):>8.1f} {_percentile(latencies, 99):>8.1f} "
+                        f"{max(latencies):>8.1f}"
+                    )
+            await app_engine.dispose()
+            shutdown_password_hashing()
+
+
+def main() -> None:
+    """CLI entry point / Ponto de entrada da CLI."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor (default: bcrypt.gensalt())")
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
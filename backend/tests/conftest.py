@@ -3,15 +3,18 @@ Test fixtures for the backend test suite.
 Fixtures de teste para a suite de testes do backend.
 """
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
 
 import pytest
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.championships.models import Championship, championship_entries  # noqa: F401
+from app.core.principal import authz_versions, principal_cache
 from app.core.security import create_access_token, hash_password
 from app.db.base import Base
+from app.db.instrumentation import QueryStats, instrument_engine, track_queries
 from app.db.session import get_db
 from app.drivers.models import Driver  # noqa: F401
 from app.main import create_app
@@ -22,7 +25,7 @@ from app.replay.models import LapPosition, RaceEvent  # noqa: F401
 from app.results.models import RaceResult  # noqa: F401
 from app.roles.models import Permission, Role, role_permissions, user_roles  # noqa: F401
 from app.teams.models import Team  # noqa: F401
-from app.telemetry.models import CarSetup, LapTime  # noqa: F401
+from app.telemetry.models import CarSetup, LapTime, LapTrace, RaceDriverLapStats  # noqa: F401
 from app.users.models import User  # noqa: F401
 
 # Use in-memory SQLite for tests / Usa SQLite em memoria para testes
@@ -30,6 +33,7 @@ TEST_DATABASE_URL = "sqlite+aiosqlite://"
 
 test_engine = create_async_engine(TEST_DATABASE_URL, echo=False)
 test_async_session = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+instrument_engine(test_engine)
 
 
 @pytest.fixture(autouse=True)
@@ -45,6 +49,16 @@ async def setup_database() -> AsyncGenerator[None, None]:
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(autouse=True)
+def clear_principal_cache() -> None:
+    """
+    Start each test with a cold principal cache and version map.
+    Inicia cada teste com o cache de principais e o mapa de versoes vazios.
+    """
+    principal_cache.clear()
+    authz_versions.clear()
+
+
 @pytest.fixture
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -75,6 +89,33 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def assert_max_queries(db_session: AsyncSession) -> Callable[[int], AbstractContextManager[QueryStats]]:
+    """
+    Context manager factory failing when the block issues more than `n` SQL statements on `test_engine`.
+    The session identity map is cleared first, so the block runs cold like a real per-request session.
+
+    Fabrica de context manager que falha quando o bloco emite mais de `n` statements SQL no `test_engine`.
+    O identity map da sessao e limpo antes, para o bloco rodar a frio como uma sessao real por requisicao.
+
+    Usage / Uso:
+        with assert_max_queries(5):
+            resp = await client.get(url, headers=admin_headers)
+    """
+
+    @contextmanager
+    def _assert_max_queries(n: int) -> Iterator[QueryStats]:
+        db_session.expunge_all()
+        with track_queries(keep_statements=True) as stats:
+            yield stats
+        statements = stats.statements or []
+        assert stats.queries <= n, f"Expected at most {n} queries, got {stats.queries}:\n" + "\n".join(
+            f"  {i}. {sql}" for i, sql in enumerate(statements, 1)
+        )
+
+    return _assert_max_queries
+
+
 @pytest.fixture
 async def test_user(db_session: AsyncSession) -> User:
     """
@@ -0,0 +1,241 @@
+"""
+Tests for the columnar export endpoints (Arrow IPC / Parquet).
+Testes para os endpoints de exportacao colunar (Arrow IPC / Parquet).
+"""
+
+import uuid
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.championships.models import Championship, ChampionshipStatus
+from app.config import settings
+from app.core.security import create_access_token
+from app.drivers.models import Driver
+from app.pitstops.models import PitStop, TireCompound
+from app.races.models import Race, RaceStatus
+from app.replay.models import LapPosition, RaceEvent, RaceEventType
+from app.roles.models import Permission, Role
+from app.teams.models import Team
+from app.telemetry.models import LapTime
+from app.users.models import User
+
+# --- Fixtures / Fixtures ---
+
+
+@pytest.fixture
+async def test_championship(db_session: AsyncSession) -> Championship:
+    """Create a test championship / Cria um campeonato de teste."""
+    champ = Championship(
+        name="export_champ_2026",
+        display_name="Export Champ 2026",
+        season_year=2026,
+        status=ChampionshipStatus.active,
+    )
+    db_session.add(champ)
+    await db_session.commit()
+    await db_session.refresh(champ)
+    return champ
+
+
+@pytest.fixture
+async def test_team(db_session: AsyncSession) -> Team:
+    """Create a test team / Cria uma equipe de teste."""
+    team = Team(name="export_team", display_name="Export Team")
+    db_session.add(team)
+    await db_session.commit()
+    await db_session.refresh(team)
+    return team
+
+
+@pytest.fixture
+async def test_drivers(db_session: AsyncSession, test_team: Team) -> list[Driver]:
+    """Create two test drivers / Cria dois pilotos de teste."""
+    drivers = [
+        Driver(
+            name=f"exp_driver_{i}", display_name=f"Driver {i}", abbreviation=f"EX{i}", number=i, team_id=test_team.id
+        )
+        for i in (1, 2)
+    ]
+    db_session.add_all(drivers)
+    await db_session.commit()
+    return drivers
+
+
+@pytest.fixture
+async def test_races(db_session: AsyncSession, test_championship: Championship) -> list[Race]:
+    """Create rounds 2 and 1, in that order / Cria as etapas 2 e 1, nessa ordem."""
+    races = [
+        Race(
+            championship_id=test_championship.id,
+            name=f"export_round_{round_number}",
+            display_name=f"Export Round {round_number}",
+            round_number=round_number,
+            status=RaceStatus.finished,
+        )
+        for round_number in (2, 1)
+    ]
+    db_session.add_all(races)
+    await db_session.commit()
+    return races
+
+
+@pytest.fixture
+async def race_data(
+    db_session: AsyncSession, test_races: list[Race], test_drivers: list[Driver], test_team: Team
+) -> None:
+    """Three laps per driver and race, one pit stop and one event per race / Tres voltas por piloto e corrida."""
+    for race in test_races:
+        for driver in test_drivers:
+            for lap_number in (1, 2, 3):
+                db_session.add(
+                    LapTime(
+                        race_id=race.id,
+                        driver_id=driver.id,
+                        team_id=test_team.id,
+                        lap_number=lap_number,
+                        lap_time_ms=90_000 + race.round_number * 1000 + lap_number,
+                        sector_1_ms=30_000 if lap_number != 2 else None,
+                    )
+                )
+                db_session.add(
+                    LapPosition(
+                        race_id=race.id,
+                        driver_id=driver.id,
+                        team_id=test_team.id,
+                        lap_number=lap_number,
+                        position=driver.number,
+                    )
+                )
+        db_session.add(
+            PitStop(
+                race_id=race.id,
+                driver_id=test_drivers[0].id,
+                team_id=test_team.id,
+                lap_number=2,
+                duration_ms=2400,
+                tire_from=TireCompound.soft,
+                tire_to=TireCompound.hard,
+            )
+        )
+        db_session.add(RaceEvent(race_id=race.id, lap_number=1, event_type=RaceEventType.safety_car))
+    await db_session.commit()
+
+
+# --- Race exports / Exportacoes de corrida ---
+
+
+async def test_export_race_laps_parquet(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_races: list[Race],
+    test_drivers: list[Driver],
+    race_data: None,
+) -> None:
+    """Parquet export of one race, typed columns in row order / Exportacao Parquet de uma corrida, tipada e ordenada."""
+    race = test_races[1]
+    resp = await client.get(f"/api/v1/races/{race.id}/export/laps", headers=admin_headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/vnd.apache.parquet"
+    assert resp.headers["content-disposition"] == f'attachment; filename="laps_race_{race.id}.parquet"'
+
+    table = pq.read_table(pa.BufferReader(resp.content))
+    assert table.num_rows == 6
+    assert table.schema.field("lap_time_ms").type == pa.int32()
+    assert table.schema.field("is_valid").type == pa.bool_()
+    assert table.schema.field("created_at").type == pa.timestamp("us", tz="UTC")
+    assert set(table.column("race_id").to_pylist()) == {str(race.id)}
+    assert table.column("sector_1_ms").null_count == 2
+    rows = table.select(["driver_id", "lap_number"]).to_pylist()
+    assert rows == sorted(rows, key=lambda row: (row["driver_id"], row["lap_number"]))
+
+
+async def test_export_race_arrow_in_chunks(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_races: list[Race],
+    race_data: None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Arrow IPC, one record batch per chunk; enums as dictionaries / Um batch por bloco; enums com dicionario."""
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_ROWS", 4)
+    race = test_races[0]
+    resp = await client.get(f"/api/v1/races/{race.id}/export/positions?format=arrow", headers=admin_headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    batches = list(pa.ipc.open_stream(resp.content))
+    assert [batch.num_rows for batch in batches] == [4, 2]
+    assert pa.Table.from_batches(batches).column("position").to_pylist() == [1, 2, 1, 2, 1, 2]
+
+    resp = await client.get(f"/api/v1/races/{race.id}/export/pitstops?format=arrow", headers=admin_headers)
+    pitstops = pa.ipc.open_stream(resp.content).read_all()
+    assert pa.types.is_dictionary(pitstops.schema.field("tire_to").type)
+    assert pitstops.column("tire_to").to_pylist() == ["hard"]
+
+
+async def test_export_race_empty_and_not_found(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_races: list[Race],
+) -> None:
+    """A race without rows gives an empty file; unknown races give 404 / Corrida sem linhas gera arquivo vazio."""
+    resp = await client.get(f"/api/v1/races/{test_races[0].id}/export/events", headers=admin_headers)
+    assert resp.status_code == 200
+    table = pq.read_table(pa.BufferReader(resp.content))
+    assert table.num_rows == 0
+    assert "event_type" in table.schema.names
+
+    resp = await client.get(f"/api/v1/races/{uuid.uuid4()}/export/laps", headers=admin_headers)
+    assert resp.status_code == 404
+    resp = await client.get(f"/api/v1/races/{test_races[0].id}/export/setups", headers=admin_headers)
+    assert resp.status_code == 422
+
+
+# --- Championship exports / Exportacoes de campeonato ---
+
+
+async def test_export_championship_in_round_order(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_championship: Championship,
+    test_races: list[Race],
+    race_data: None,
+) -> None:
+    """Every race of the season, round 1 first / Todas as corridas da temporada, etapa 1 primeiro."""
+    resp = await client.get(
+        f"/api/v1/championships/{test_championship.id}/export/laps?format=arrow", headers=admin_headers
+    )
+    assert resp.status_code == 200
+    table = pa.ipc.open_stream(resp.content).read_all()
+    assert table.num_rows == 12
+    round_1, round_2 = test_races[1], test_races[0]
+    race_ids = table.column("race_id").to_pylist()
+    assert race_ids == [str(round_1.id)] * 6 + [str(round_2.id)] * 6
+
+    resp = await client.get(f"/api/v1/championships/{uuid.uuid4()}/export/laps", headers=admin_headers)
+    assert resp.status_code == 404
+
+
+async def test_export_requires_dataset_permission(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_races: list[Race],
+) -> None:
+    """telemetry:read exports laps but not positions / telemetry:read exporta voltas mas nao posicoes."""
+    read_perm = Permission(codename="telemetry:read", module="telemetry")
+    role = Role(name="export_reader", display_name="Export Reader", is_system=False)
+    role.permissions = [read_perm]
+    user = User(email="export_reader@example.com", hashed_password="hashed", full_name="Export Reader")
+    user.roles = [role]
+    db_session.add_all([read_perm, role, user])
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(subject=str(user.id))}"}
+
+    race_id = test_races[0].id
+    resp = await client.get(f"/api/v1/races/{race_id}/export/laps", headers=headers)
+    assert resp.status_code == 200
+    resp = await client.get(f"/api/v1/races/{race_id}/export/positions", headers=headers)
+    assert resp.status_code == 403
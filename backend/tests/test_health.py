@@ -3,8 +3,16 @@ Tests for health check endpoints.
 Testes para endpoints de verificacao de saude.
 """
 
+from pathlib import Path
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.db.pool import TimedAsyncAdaptedQueuePool, pool_stats
+from app.db.session import _connect_args
 
 
 @pytest.mark.asyncio
@@ -23,3 +31,50 @@ async def test_health_check_db(client: AsyncClient) -> None:
     data = response.json()
     assert data["status"] == "ok"
     assert data["database"] == "connected"
+
+
+@pytest.mark.asyncio
+async def test_health_check_db_pool_stats(client: AsyncClient) -> None:
+    """Test GET /health/db reports pool stats / Testa GET /health/db informa estatisticas do pool."""
+    response = await client.get("/health/db")
+    pool = response.json()["pool"]
+    # The test engine uses SQLite's non-queueing pool / O engine de teste usa o pool sem fila do SQLite
+    assert pool["pool_class"] == "StaticPool"
+    assert pool["checked_out"] is None
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_queue_pool(tmp_path: Path) -> None:
+    """Test pool_stats on the timed queue pool / Testa pool_stats no pool com fila instrumentado."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=2,
+        max_overflow=1,
+    )
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        stats = pool_stats(engine.pool)
+        assert stats["checked_out"] == 1
+    stats = pool_stats(engine.pool)
+    await engine.dispose()
+    assert stats["pool_class"] == "TimedAsyncAdaptedQueuePool"
+    assert stats["size"] == 2
+    assert stats["checked_out"] == 0
+    assert stats["checked_in"] == 1
+    assert stats["checkouts"] == 1
+    assert stats["max_wait_ms"] >= stats["avg_wait_ms"] >= 0
+
+
+@pytest.mark.parametrize("size", [100, 0])
+def test_statement_cache_connect_args(size: int, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test both statement caches follow the setting / Testa que os dois caches seguem a configuracao."""
+    monkeypatch.setattr(settings, "DB_STATEMENT_CACHE_SIZE", size)
+    args = _connect_args()
+    assert args["prepared_statement_cache_size"] == size
+    assert args["statement_cache_size"] == size
+    if size:
+        assert "prepared_statement_name_func" not in args
+    else:
+        name_func = args["prepared_statement_name_func"]
+        assert name_func() != name_func()
@@ -0,0 +1,327 @@
+"""
+Tests for the CSV / Parquet import endpoints.
+Testes para os endpoints de importacao CSV / Parquet.
+"""
+
+import io
+import uuid
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.championships.models import Championship, ChampionshipStatus
+from app.config import settings
+from app.core.security import create_access_token
+from app.drivers.models import Driver
+from app.races.models import Race, RaceStatus
+from app.replay.models import LapPosition
+from app.roles.models import Permission, Role
+from app.teams.models import Team
+from app.telemetry import service as telemetry_service
+from app.telemetry.models import LapOutlier, LapTime, RaceDriverLapStats
+from app.users.models import User
+
+# --- Fixtures / Fixtures ---
+
+
+@pytest.fixture
+async def test_championship(db_session: AsyncSession) -> Championship:
+    """Create a test championship / Cria um campeonato de teste."""
+    champ = Championship(
+        name="import_champ_2026",
+        display_name="Import Champ 2026",
+        season_year=2026,
+        status=ChampionshipStatus.active,
+    )
+    db_session.add(champ)
+    await db_session.commit()
+    await db_session.refresh(champ)
+    return champ
+
+
+@pytest.fixture
+async def test_team(db_session: AsyncSession) -> Team:
+    """Create a test team / Cria uma equipe de teste."""
+    team = Team(name="import_team", display_name="Import Team")
+    db_session.add(team)
+    await db_session.commit()
+    await db_session.refresh(team)
+    return team
+
+
+@pytest.fixture
+async def test_drivers(db_session: AsyncSession, test_team: Team) -> list[Driver]:
+    """Create two test drivers / Cria dois pilotos de teste."""
+    drivers = [
+        Driver(
+            name=f"imp_driver_{i}", display_name=f"Driver {i}", abbreviation=f"IM{i}", number=i, team_id=test_team.id
+        )
+        for i in (1, 2)
+    ]
+    db_session.add_all(drivers)
+    await db_session.commit()
+    return drivers
+
+
+@pytest.fixture
+async def test_races(db_session: AsyncSession, test_championship: Championship) -> list[Race]:
+    """Create rounds 1 and 2 / Cria as etapas 1 e 2."""
+    races = [
+        Race(
+            championship_id=test_championship.id,
+            name=f"import_round_{round_number}",
+            display_name=f"Import Round {round_number}",
+            round_number=round_number,
+            status=RaceStatus.finished,
+        )
+        for round_number in (1, 2)
+    ]
+    db_session.add_all(races)
+    await db_session.commit()
+    return races
+
+
+def _csv(*lines: str) -> bytes:
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _parquet(columns: dict[str, list[object]]) -> bytes:
+    buffer = io.BytesIO()
+    pq.write_table(pa.table(columns), buffer)
+    return buffer.getvalue()
+
+
+# --- Race imports / Importacoes de corrida ---
+
+
+async def test_import_laps_csv_reports_bad_rows(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_races: list[Race],
+    test_drivers: list[Driver],
+    test_team: Team,
+) -> None:
+    """Valid rows are written, each bad row is reported by line / Linhas validas gravadas, invalidas reportadas."""
+    race = test_races[0]
+    d1, d2, team = test_drivers[0].id, test_drivers[1].id, test_team.id
+    content = _csv(
+        "driver_id,team_id,lap_number,lap_time_ms,sector_1_ms,is_valid,tyre",
+        f"{d1},{team},1,91000,30000,true,soft",
+        f"{d1},{team},2,90500,,yes,soft",
+        f"{d1},{team},x,90000,,,soft",  # row 3
+        "",
+        f"{uuid.uuid4()},{team},1,92000,,,soft",  # row 5
+        f"{d2},{team},1,0,,maybe,soft",  # row 6
+        f"{d2},{team},1,93000",  # row 7
+        f"{d2},{team},2,92500,,FALSE,hard",
+        f"{d1},{team},2,89000,,,hard",  # row 9
+    )
+    resp = await client.post(
+        f"/api/v1/races/{race.id}/import/laps",
+        headers=admin_headers,
+        files={"file": ("laps.csv", content, "text/csv")},
+    )
+    assert resp.status_code == 200
+    report = resp.json()
+    assert (report["rows"], report["imported"], report["skipped"], report["failed"]) == (8, 3, 0, 5)
+    errors = [(error["row"], error["field"]) for error in report["errors"]]
+    assert errors == [
+        (3, "lap_number"),
+        (5, "driver_id"),
+        (6, "lap_time_ms"),
+        (6, "is_valid"),
+        (7, None),
+        (9, None),
+    ]
+    assert report["errors"][4]["message"].startswith("Expected 7 columns, got 4")
+    assert report["errors_truncated"] is False
+
+    laps = (await db_session.execute(select(LapTime).where(LapTime.race_id == race.id))).scalars().all()
+    stored = {(lap.driver_id, lap.lap_number): lap for lap in laps}
+    assert set(stored) == {(d1, 1), (d1, 2), (d2, 2)}
+    assert stored[(d1, 2)].lap_time_ms == 90500
+    assert stored[(d1, 2)].sector_1_ms is None
+    assert stored[(d2, 2)].is_valid is False
+    assert stored[(d1, 2)].is_personal_best is True
+    stats = (
+        await db_session.execute(select(RaceDriverLapStats).where(RaceDriverLapStats.driver_id == d1))
+    ).scalar_one()
+    assert stats.lap_count == 2
+
+
+async def test_import_existing_rows_by_conflict_mode(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_races: list[Race],
+    test_drivers: list[Driver],
+    test_team: Team,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Existing rows: error by default, skipped (ignore) or overwritten (update) / Linhas existentes por modo."""
+    race = test_races[0]
+    driver, team = test_drivers[0].id, test_team.id
+    url = f"/api/v1/races/{race.id}/import/laps"
+    first = _csv("driver_id,team_id,lap_number,lap_time_ms", f"{driver},{team},1,91000")
+    resp = await client.post(url, headers=admin_headers, files={"file": ("laps.csv", first)})
+    assert resp.json()["imported"] == 1
+
+    again = _csv("driver_id,team_id,lap_number,lap_time_ms", f"{driver},{team},1,90000", f"{driver},{team},2,90100")
+    resp = await client.post(url, headers=admin_headers, files={"file": ("laps.csv", again)})
+    report = resp.json()
+    assert (report["imported"], report["failed"]) == (1, 1)
+    assert report["errors"] == [{"row": 1, "field": None, "message": "Already exists / Ja existe"}]
+
+    resp = await client.post(f"{url}?on_conflict=ignore", headers=admin_headers, files={"file": ("laps.csv", again)})
+    assert (resp.json()["imported"], resp.json()["skipped"], resp.json()["failed"]) == (0, 2, 0)
+
+    monkeypatch.setattr(settings, "IMPORT_MAX_ERRORS", 0)
+    resp = await client.post(f"{url}?on_conflict=update", headers=admin_headers, files={"file": ("laps.csv", again)})
+    assert (resp.json()["imported"], resp.json()["failed"]) == (2, 0)
+    lap = (await db_session.execute(select(LapTime).where(LapTime.lap_number == 1))).scalar_one()
+    await db_session.refresh(lap)
+    assert lap.lap_time_ms == 90000
+
+    resp = await client.post(url, headers=admin_headers, files={"file": ("laps.csv", again)})
+    assert (resp.json()["failed"], resp.json()["errors"], resp.json()["errors_truncated"]) == (2, [], True)
+
+
+async def test_import_file_errors(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_races: list[Race],
+) -> None:
+    """Unreadable files and missing columns reject the file / Arquivos ilegiveis ou sem colunas sao rejeitados."""
+    url = f"/api/v1/races/{test_races[0].id}/import/laps"
+    resp = await client.post(url, headers=admin_headers, files={"file": ("laps.csv", _csv("driver_id,lap_number"))})
+    assert resp.status_code == 422
+    assert resp.json()["detail"].startswith("Missing columns: lap_time_ms, team_id")
+
+    resp = await client.post(url, headers=admin_headers, files={"file": ("laps.xlsx", b"PK", "application/zip")})
+    assert resp.status_code == 422
+    resp = await client.post(f"{url}?format=parquet", headers=admin_headers, files={"file": ("laps", b"a,b\n")})
+    assert resp.status_code == 422
+
+    resp = await client.post(
+        f"/api/v1/races/{uuid.uuid4()}/import/laps", headers=admin_headers, files={"file": ("laps.csv", b"")}
+    )
+    assert resp.status_code == 404
+
+
+# --- Championship imports / Importacoes de campeonato ---
+
+
+async def test_import_season_positions_parquet_in_chunks(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_championship: Championship,
+    test_races: list[Race],
+    test_drivers: list[Driver],
+    test_team: Team,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Rows go to their race; duplicates across chunks are caught / Duplicatas entre blocos sao detectadas."""
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_ROWS", 2)
+    d1, d2 = str(test_drivers[0].id), str(test_drivers[1].id)
+    r1, r2 = str(test_races[0].id), str(test_races[1].id)
+    content = _parquet(
+        {
+            "race_id": [r1, r1, r2, r1, str(uuid.uuid4()), None],
+            "driver_id": [d1, d2, d1, d1, d1, d2],
+            "team_id": [str(test_team.id)] * 6,
+            "lap_number": [1, 1, 1, 1, 2, 2],
+            "position": [1, 2, 1, 3, 1, 2],
+            "gap_to_leader_ms": [None, 800.0, None, None, None, None],
+        }
+    )
+    resp = await client.post(
+        f"/api/v1/championships/{test_championship.id}/import/positions",
+        headers=admin_headers,
+        files={"file": ("season.parquet", content)},
+    )
+    assert resp.status_code == 200
+    report = resp.json()
+    assert (report["rows"], report["imported"], report["failed"]) == (6, 3, 3)
+    assert [(error["row"], error["field"]) for error in report["errors"]] == [
+        (4, None),
+        (5, "race_id"),
+        (6, "race_id"),
+    ]
+
+    positions = (await db_session.execute(select(LapPosition))).scalars().all()
+    stored = {(p.race_id, str(p.driver_id)): p for p in positions}
+    assert set(stored) == {(test_races[0].id, d1), (test_races[0].id, d2), (test_races[1].id, d1)}
+    assert stored[(test_races[0].id, d2)].gap_to_leader_ms == 800
+
+
+async def test_import_laps_flags_outliers_once(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_races: list[Race],
+    test_drivers: list[Driver],
+    test_team: Team,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Chunks skip the outlier pass; it runs once after the last one / Blocos pulam a analise; roda uma vez no final."""
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_ROWS", 2)
+    monkeypatch.setattr(settings, "LAP_OUTLIER_MIN_STINT_LAPS", 4)
+    passes: list[uuid.UUID] = []
+    flag_outliers = telemetry_service._flag_outliers
+
+    async def counted(db: AsyncSession, race_id: uuid.UUID, driver_ids: set[uuid.UUID] | None = None) -> object:
+        passes.append(race_id)
+        return await flag_outliers(db, race_id, driver_ids)
+
+    monkeypatch.setattr(telemetry_service, "_flag_outliers", counted)
+    race_id, driver = test_races[0].id, test_drivers[0].id
+    content = _csv(
+        "driver_id,team_id,lap_number,lap_time_ms",
+        *(f"{driver},{test_team.id},{lap},{ms}" for lap, ms in enumerate([90000, 90100, 89900, 99000], start=1)),
+    )
+    resp = await client.post(
+        f"/api/v1/races/{race_id}/import/laps",
+        headers=admin_headers,
+        files={"file": ("laps.csv", content, "text/csv")},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["imported"] == 4
+    assert passes == [race_id]
+
+    db_session.expire_all()
+    stored = await db_session.execute(select(LapTime.lap_number, LapTime.outlier).where(LapTime.race_id == race_id))
+    assert {lap: reason for lap, reason in stored if reason is not None} == {4: LapOutlier.slow}
+
+
+async def test_import_requires_dataset_permission(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    test_races: list[Race],
+) -> None:
+    """telemetry:create imports laps but not positions / telemetry:create importa voltas mas nao posicoes."""
+    create_perm = Permission(codename="telemetry:create", module="telemetry")
+    role = Role(name="import_writer", display_name="Import Writer", is_system=False)
+    role.permissions = [create_perm]
+    user = User(email="import_writer@example.com", hashed_password="hashed", full_name="Import Writer")
+    user.roles = [role]
+    db_session.add_all([create_perm, role, user])
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(subject=str(user.id))}"}
+
+    content = _csv("driver_id,team_id,lap_number,lap_time_ms")
+    race_id = test_races[0].id
+    resp = await client.post(
+        f"/api/v1/races/{race_id}/import/laps", headers=headers, files={"file": ("a.csv", content)}
+    )
+    assert resp.status_code == 200
+    assert resp.json()["rows"] == 0
+    resp = await client.post(
+        f"/api/v1/races/{race_id}/import/positions", headers=headers, files={"file": ("a.csv", content)}
+    )
+    assert resp.status_code == 403
@@ -0,0 +1,235 @@
+"""
+Tests for lap outlier detection and its endpoints.
+Testes para a deteccao de voltas atipicas e seus endpoints.
+"""
+
+import math
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.championships.models import Championship, ChampionshipStatus
+from app.config import settings
+from app.drivers.models import Driver
+from app.pitstops.models import PitStop
+from app.races.models import Race, RaceStatus
+from app.replay.models import RaceEvent, RaceEventType
+from app.teams.models import Team
+from app.telemetry.models import LapOutlier, LapTime
+from app.telemetry.outliers import detect_outliers
+
+# --- Fixtures / Fixtures ---
+
+
+@pytest.fixture
+async def test_driver(db_session: AsyncSession) -> Driver:
+    """Create a test driver and team / Cria um piloto e equipe de teste."""
+    team = Team(name="outlier_team", display_name="Outlier Team")
+    db_session.add(team)
+    await db_session.flush()
+    driver = Driver(name="outlier_driver", display_name="Outlier Driver", abbreviation="OUT", number=9, team_id=team.id)
+    db_session.add(driver)
+    await db_session.commit()
+    return driver
+
+
+@pytest.fixture
+async def test_race(db_session: AsyncSession) -> Race:
+    """Create a test race / Cria uma corrida de teste."""
+    champ = Championship(
+        name="outlier_champ_2026", display_name="Outlier Champ 2026", season_year=2026, status=ChampionshipStatus.active
+    )
+    db_session.add(champ)
+    await db_session.flush()
+    race = Race(
+        championship_id=champ.id,
+        name="outlier_round_1",
+        display_name="Outlier Round 1",
+        round_number=1,
+        status=RaceStatus.active,
+    )
+    db_session.add(race)
+    await db_session.commit()
+    return race
+
+
+# Pit stop on lap 4, safety car on lap 8, lap 10 lost behind traffic
+# Pit stop na volta 4, safety car na volta 8, volta 10 perdida no trafego
+_LAP_TIMES = [90_000, 90_100, 89_900, 110_000, 116_000, 90_000, 90_100, 131_000, 90_050, 99_000]
+_EXPECTED = {
+    4: LapOutlier.in_lap,
+    5: LapOutlier.out_lap,
+    8: LapOutlier.safety_car,
+    10: LapOutlier.slow,
+}
+
+
+async def _pit_and_safety_car(db: AsyncSession, race: Race, driver: Driver) -> None:
+    db.add(PitStop(race_id=race.id, driver_id=driver.id, team_id=driver.team_id, lap_number=4, duration_ms=2_400))
+    db.add(RaceEvent(race_id=race.id, lap_number=8, event_type=RaceEventType.safety_car))
+    await db.commit()
+
+
+def _bulk(driver: Driver) -> dict[str, object]:
+    return {
+        "laps": [
+            {
+                "driver_id": str(driver.id),
+                "team_id": str(driver.team_id),
+                "lap_number": lap_number,
+                "lap_time_ms": lap_time_ms,
+            }
+            for lap_number, lap_time_ms in enumerate(_LAP_TIMES, start=1)
+        ]
+    }
+
+
+# --- Detection / Deteccao ---
+
+
+def test_detect_outliers_per_stint() -> None:
+    """In / out / neutralized laps, then robust z-score per stint / In / out / neutralizadas, depois z-score."""
+    times = [90_000, 90_100, 89_900, 95_000, 90_050, 110_000]  # stint 1, pit on lap 6 / pit na volta 6
+    times += [115_000, 91_000, 130_000, 91_100, 90_900, 87_000, 91_050, 90_950]  # stint 2, safety car on lap 9
+    laps = list(range(1, len(times) + 1))
+    result = detect_outliers(
+        driver_index=[0] * len(times) + [1] * 3,
+        lap_numbers=laps + [1, 2, 3],
+        lap_time_ms=times + [90_000, 120_000, 90_000],
+        is_valid=[True] * (len(times) + 3),
+        pit_driver_index=[0],
+        pit_laps=[6],
+        neutralized_laps=[9],
+        threshold=3.5,
+        min_laps=5,
+    )
+
+    reasons = result.reasons()
+    flagged = {lap: reason for lap, reason in zip(laps, reasons, strict=False) if reason is not None}
+    assert flagged == {
+        4: LapOutlier.slow,
+        6: LapOutlier.in_lap,
+        7: LapOutlier.out_lap,
+        9: LapOutlier.safety_car,
+        12: LapOutlier.fast,
+    }
+    assert result.stint.tolist()[: len(times)] == [1] * 6 + [2] * 8
+    assert result.stint_median_ms[0] == 90_050
+    assert result.stint_median_ms[6] == 90_975
+    # Spread floored at 0.2% of the median / Desvio com piso de 0,2% da mediana
+    assert result.score[3] == pytest.approx(4_950 / (90_050 * 0.002))
+    # Three laps are too few to score the second driver / Tres voltas sao poucas para avaliar o segundo piloto
+    assert reasons[len(times) :] == [None, None, None]
+    assert all(math.isnan(score) for score in result.score[len(times) :])
+
+
+def test_detect_outliers_empty() -> None:
+    """No laps, no result / Sem voltas, sem resultado."""
+    result = detect_outliers([], [], [], [], [], [], [], threshold=3.5, min_laps=5)
+    assert result.reasons() == []
+
+
+# --- Ingest and endpoints / Ingestao e endpoints ---
+
+
+async def test_bulk_ingest_flags_outliers(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_race: Race,
+    test_driver: Driver,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Bulk ingest stores the flags; stint analysis leaves them out / Lote grava as marcas; stints as ignoram."""
+    monkeypatch.setattr(settings, "LAP_OUTLIER_MIN_STINT_LAPS", 3)
+    race_id = test_race.id
+    await _pit_and_safety_car(db_session, test_race, test_driver)
+
+    resp = await client.post(f"/api/v1/races/{race_id}/laps/bulk", json=_bulk(test_driver), headers=admin_headers)
+    assert resp.status_code == 201
+    returned = {lap["lap_number"]: lap["outlier"] for lap in resp.json()}
+    assert {lap: reason for lap, reason in returned.items() if reason} == _EXPECTED
+    assert all(lap["is_valid"] for lap in resp.json())
+
+    db_session.expire_all()
+    stored = await db_session.execute(select(LapTime.lap_number, LapTime.outlier).where(LapTime.race_id == race_id))
+    assert {lap: reason for lap, reason in stored if reason is not None} == _EXPECTED
+
+    resp = await client.get(f"/api/v1/races/{race_id}/analysis/stints", headers=admin_headers)
+    assert resp.status_code == 200
+    stints = resp.json()["drivers"][0]["stints"]
+    assert [stint["avg_pace_ms"] for stint in stints] == [90_000, 90_050]
+
+
+async def test_review_and_reflag_outliers(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_race: Race,
+    test_driver: Driver,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """GET recomputes without storing; POST stores / GET recalcula sem gravar; POST grava."""
+    monkeypatch.setattr(settings, "LAP_OUTLIER_MIN_STINT_LAPS", 3)
+    race_id = test_race.id
+    url = f"/api/v1/races/{race_id}/laps/outliers"
+    bulk_url = f"/api/v1/races/{race_id}/laps/bulk"
+    assert (await client.post(bulk_url, json=_bulk(test_driver), headers=admin_headers)).status_code == 201
+    await _pit_and_safety_car(db_session, test_race, test_driver)  # entered after the laps / registrados depois
+
+    resp = await client.get(url, headers=admin_headers)
+    assert resp.status_code == 200
+    report = resp.json()
+    assert (report["total_laps"], report["min_stint_laps"]) == (10, 3)
+    assert {lap["lap_number"]: lap["reason"] for lap in report["laps"]} == _EXPECTED
+    slow = report["laps"][-1]
+    assert (slow["stint_number"], slow["stint_median_ms"]) == (2, 90_075.0)
+    assert slow["score"] > report["threshold"]
+    db_session.expire_all()
+    stored = await db_session.execute(select(LapTime.outlier).where(LapTime.race_id == race_id))
+    assert LapOutlier.in_lap not in set(stored.scalars())
+
+    resp = await client.post(url, headers=admin_headers)
+    assert resp.status_code == 200
+    assert {lap["lap_number"]: lap["reason"] for lap in resp.json()["laps"]} == _EXPECTED
+    db_session.expire_all()
+    stored = await db_session.execute(select(LapTime.lap_number, LapTime.outlier).where(LapTime.race_id == race_id))
+    assert {lap: reason for lap, reason in stored if reason is not None} == _EXPECTED
+
+    unknown = f"/api/v1/races/{uuid.uuid4()}/laps/outliers"
+    assert (await client.get(unknown, headers=admin_headers)).status_code == 404
+
+
+async def test_single_lap_writes_refresh_outliers(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_race: Race,
+    test_driver: Driver,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A posted slow lap is flagged; deleting a lap re-scores the stint / Volta lenta e marcada; exclusao reavalia."""
+    monkeypatch.setattr(settings, "LAP_OUTLIER_MIN_STINT_LAPS", 4)
+    race_id = test_race.id
+    url = f"/api/v1/races/{race_id}/laps"
+    lap_ids = []
+    for lap_number, lap_time_ms in enumerate([90_000, 90_100, 89_900, 99_000], start=1):
+        payload = {
+            "driver_id": str(test_driver.id),
+            "team_id": str(test_driver.team_id),
+            "lap_number": lap_number,
+            "lap_time_ms": lap_time_ms,
+        }
+        resp = await client.post(url, json=payload, headers=admin_headers)
+        assert resp.status_code == 201
+        lap_ids.append(resp.json()["id"])
+    assert resp.json()["outlier"] == LapOutlier.slow
+
+    # Three laps are too few to score the stint / Tres voltas sao poucas para avaliar o stint
+    assert (await client.delete(f"/api/v1/laps/{lap_ids[1]}", headers=admin_headers)).status_code == 204
+    db_session.expire_all()
+    stored = await db_session.execute(select(LapTime.outlier).where(LapTime.race_id == race_id))
+    assert set(stored.scalars()) == {None}
@@ -0,0 +1,235 @@
+"""
+Tests for the live lap endpoint and its write-behind buffer.
+Testes para o endpoint de voltas ao vivo e seu buffer write-behind.
+"""
+
+import asyncio
+import uuid
+from collections.abc import AsyncGenerator
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.championships.models import Championship, ChampionshipStatus
+from app.config import settings
+from app.drivers.models import Driver
+from app.races.models import Race, RaceStatus
+from app.teams.models import Team
+from app.telemetry import write_behind
+from app.telemetry.models import LapOutlier, LapTime
+from app.telemetry.service import PendingOutliers
+from app.telemetry.write_behind import LapWriteBehind, lap_write_behind
+
+# --- Fixtures / Fixtures ---
+
+
+@pytest.fixture
+async def test_team(db_session: AsyncSession) -> Team:
+    """Create a test team / Cria uma equipe de teste."""
+    team = Team(name="live_team", display_name="Live Team")
+    db_session.add(team)
+    await db_session.commit()
+    return team
+
+
+@pytest.fixture
+async def test_driver(db_session: AsyncSession, test_team: Team) -> Driver:
+    """Create a test driver / Cria um piloto de teste."""
+    driver = Driver(name="live_driver", display_name="Live Driver", abbreviation="LIV", number=7, team_id=test_team.id)
+    db_session.add(driver)
+    await db_session.commit()
+    return driver
+
+
+@pytest.fixture
+async def test_race(db_session: AsyncSession) -> Race:
+    """Create a test race / Cria uma corrida de teste."""
+    champ = Championship(
+        name="live_champ_2026", display_name="Live Champ 2026", season_year=2026, status=ChampionshipStatus.active
+    )
+    db_session.add(champ)
+    await db_session.flush()
+    race = Race(
+        championship_id=champ.id,
+        name="live_round_1",
+        display_name="Live Round 1",
+        round_number=1,
+        status=RaceStatus.active,
+    )
+    db_session.add(race)
+    await db_session.commit()
+    return race
+
+
+@pytest.fixture
+async def buffer(db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[LapWriteBehind, None]:
+    """The app's buffer writing to the test database, closed after the test / Buffer da app no banco de teste."""
+    monkeypatch.setattr(settings, "LIVE_LAPS_FLUSH_MS", 60_000)  # flushes only on demand / flush apenas sob demanda
+    sessions = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(lap_write_behind, "sessions", sessions)
+    monkeypatch.setattr(lap_write_behind, "stats", type(lap_write_behind.stats)())
+    monkeypatch.setattr(lap_write_behind, "_outliers", PendingOutliers())
+    yield lap_write_behind
+    await lap_write_behind.close()
+
+
+def _lap(driver: Driver, lap_number: int, lap_time_ms: int = 91_000) -> dict[str, object]:
+    return {
+        "driver_id": str(driver.id),
+        "team_id": str(driver.team_id),
+        "lap_number": lap_number,
+        "lap_time_ms": lap_time_ms,
+    }
+
+
+async def _stored(db: AsyncSession, race_id: uuid.UUID) -> list[LapTime]:
+    db.expire_all()
+    result = await db.execute(select(LapTime).where(LapTime.race_id == race_id).order_by(LapTime.lap_number))
+    return list(result.scalars())
+
+
+# --- Live laps / Voltas ao vivo ---
+
+
+async def test_live_lap_is_written_on_flush(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_race: Race,
+    test_driver: Driver,
+    buffer: LapWriteBehind,
+) -> None:
+    """Accepted laps are stored by the next flush, with personal bests / Gravadas no proximo flush."""
+    race_id = test_race.id
+    url = f"/api/v1/races/{race_id}/laps/live"
+    for lap_number, lap_time_ms in ((1, 92_000), (2, 90_500), (3, 91_000)):
+        resp = await client.post(url, json=_lap(test_driver, lap_number, lap_time_ms), headers=admin_headers)
+        assert resp.status_code == 202
+        assert resp.json()["pending"] == lap_number
+    assert await _stored(db_session, race_id) == []
+
+    await buffer.flush()
+    laps = await _stored(db_session, race_id)
+    assert [lap.lap_time_ms for lap in laps] == [92_000, 90_500, 91_000]
+    assert [lap.is_personal_best for lap in laps] == [False, True, False]
+    assert (buffer.pending, buffer.stats.accepted, buffer.stats.written) == (0, 3, 3)
+
+
+async def test_live_lap_rejections(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    buffer: LapWriteBehind,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Pending duplicates 409, unknown ids 404, full buffer 503 / Duplicada 409, ids 404, buffer cheio 503."""
+    url = f"/api/v1/races/{test_race.id}/laps/live"
+    assert (await client.post(url, json=_lap(test_driver, 1), headers=admin_headers)).status_code == 202
+    assert (await client.post(url, json=_lap(test_driver, 1), headers=admin_headers)).status_code == 409
+
+    unknown_race = f"/api/v1/races/{uuid.uuid4()}/laps/live"
+    assert (await client.post(unknown_race, json=_lap(test_driver, 2), headers=admin_headers)).status_code == 404
+    unknown_team = {**_lap(test_driver, 2), "team_id": str(uuid.uuid4())}
+    assert (await client.post(url, json=unknown_team, headers=admin_headers)).status_code == 404
+
+    monkeypatch.setattr(settings, "LIVE_LAPS_MAX_PENDING", 1)
+    resp = await client.post(url, json=_lap(test_driver, 2), headers=admin_headers)
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "1"
+    assert buffer.pending == 1
+
+
+async def test_live_lap_stored_lap_wins_and_batch_wakes_flusher(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_race: Race,
+    test_driver: Driver,
+    buffer: LapWriteBehind,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A lap already stored is kept; a full batch flushes early / Volta ja gravada mantida; lote cheio antecipa."""
+    race_id = test_race.id
+    url = f"/api/v1/races/{race_id}/laps"
+    assert (await client.post(url, json=_lap(test_driver, 1, 95_000), headers=admin_headers)).status_code == 201
+
+    monkeypatch.setattr(settings, "LIVE_LAPS_BATCH_ROWS", 2)
+    for lap_number in (1, 2):
+        resp = await client.post(f"{url}/live", json=_lap(test_driver, lap_number), headers=admin_headers)
+        assert resp.status_code == 202
+    for _ in range(200):
+        if buffer.stats.flushes:
+            break
+        await asyncio.sleep(0.01)
+
+    assert (buffer.stats.written, buffer.stats.skipped) == (1, 1)
+    assert [lap.lap_time_ms for lap in await _stored(db_session, race_id)] == [95_000, 91_000]
+
+
+async def test_live_lap_outliers_refreshed_per_interval(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_race: Race,
+    test_driver: Driver,
+    buffer: LapWriteBehind,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Flushes skip the outlier pass until the interval or close / Flushes pulam a analise ate o intervalo ou close."""
+    monkeypatch.setattr(settings, "LAP_OUTLIER_MIN_STINT_LAPS", 3)
+    monkeypatch.setattr(settings, "LAP_OUTLIER_REFRESH_SECONDS", 3600.0)
+    race_id = test_race.id
+    url = f"/api/v1/races/{race_id}/laps/live"
+    for lap_number, lap_time_ms in ((1, 90_000), (2, 90_100), (3, 89_900)):
+        assert (
+            await client.post(url, json=_lap(test_driver, lap_number, lap_time_ms), headers=admin_headers)
+        ).status_code == 202
+    await buffer.flush()  # first pass of the race runs at once / primeira analise da corrida roda na hora
+
+    resp = await client.post(url, json=_lap(test_driver, 4, 99_000), headers=admin_headers)
+    assert resp.status_code == 202
+    await buffer.flush()
+    assert [lap.outlier for lap in await _stored(db_session, race_id)] == [None] * 4
+
+    await buffer.close()
+    assert [lap.outlier for lap in await _stored(db_session, race_id)] == [None, None, None, LapOutlier.slow]
+
+
+async def test_live_lap_unexpected_flush_error_requeues(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_race: Race,
+    test_driver: Driver,
+    buffer: LapWriteBehind,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A non-database error keeps the lap and the flusher / Erro fora do banco mantem a volta e o flusher."""
+    bulk_create = write_behind.bulk_create_lap_times
+    calls = 0
+
+    async def fail_once(*args: object, **kwargs: object) -> list[dict[str, object]]:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("boom")
+        return await bulk_create(*args, **kwargs)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(write_behind, "bulk_create_lap_times", fail_once)
+    monkeypatch.setattr(settings, "LIVE_LAPS_BATCH_ROWS", 1)
+    race_id = test_race.id
+    resp = await client.post(f"/api/v1/races/{race_id}/laps/live", json=_lap(test_driver, 1), headers=admin_headers)
+    assert resp.status_code == 202
+    for _ in range(200):
+        if buffer.stats.failed_flushes:
+            break
+        await asyncio.sleep(0.01)
+
+    assert (buffer.stats.failed_flushes, buffer.pending, buffer.stats.dropped) == (1, 1, 0)
+    assert buffer._flusher is not None and not buffer._flusher.done()
+    await buffer.close()
+    assert (buffer.pending, buffer.stats.written) == (0, 1)
+    assert [lap.lap_number for lap in await _stored(db_session, race_id)] == [1]
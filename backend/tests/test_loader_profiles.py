@@ -0,0 +1,79 @@
+"""
+Tests for the lazy="raise" relationship defaults and named loader profiles.
+Testes para os padroes lazy="raise" dos relacionamentos e perfis de carregamento nomeados.
+"""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import create_access_token
+from app.db.instrumentation import track_queries
+from app.db.loaders import load_profile, refresh_profile
+from app.roles.models import Permission, Role
+from app.teams.models import Team
+from app.users.models import User
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def member(db_session: AsyncSession) -> User:
+    """Team member holding one role with one permission / Membro de equipe com um papel e uma permissao."""
+    perm = Permission(codename="teams:read", module="teams")
+    role = Role(name="viewer", display_name="Viewer")
+    role.permissions = [perm]
+    team = Team(name="loader_team", display_name="Loader Team")
+    db_session.add_all([perm, role, team])
+    await db_session.flush()
+    user = User(email="member@example.com", hashed_password="hashed", full_name="Member", team_id=team.id)
+    user.roles = [role]
+    db_session.add(user)
+    await db_session.commit()
+    db_session.expunge_all()
+    return user
+
+
+async def test_unloaded_relationship_raises(db_session: AsyncSession, member: User) -> None:
+    """List profile loads columns only / Perfil list carrega apenas colunas."""
+    result = await db_session.execute(select(User).where(User.id == member.id).options(*load_profile(User, "list")))
+    user = result.scalar_one()
+    assert user.email == "member@example.com"
+    with pytest.raises(InvalidRequestError):
+        _ = user.roles
+    with pytest.raises(InvalidRequestError):
+        _ = user.team
+
+
+async def test_auth_profile_loads_permissions_only(db_session: AsyncSession, member: User) -> None:
+    """Auth profile stops at permissions / Perfil auth para nas permissoes."""
+    with track_queries() as stats:
+        result = await db_session.execute(select(User).where(User.id == member.id).options(*load_profile(User, "auth")))
+        user = result.scalar_one()
+    # user + roles + permissions / usuario + papeis + permissoes
+    assert stats.queries == 3
+    assert [p.codename for role in user.roles for p in role.permissions] == ["teams:read"]
+    with pytest.raises(InvalidRequestError):
+        _ = user.roles[0].users
+
+
+async def test_refresh_profile_loads_relationships(db_session: AsyncSession, member: User) -> None:
+    """refresh_profile reloads the profile's relationships / refresh_profile recarrega os relacionamentos."""
+    result = await db_session.execute(select(Team).where(Team.name == "loader_team"))
+    team = result.scalar_one()
+    await refresh_profile(db_session, team, "detail")
+    assert [m.email for m in team.members] == ["member@example.com"]
+    with pytest.raises(InvalidRequestError):
+        _ = team.drivers
+
+
+async def test_authenticated_request_query_count(client: AsyncClient, member: User) -> None:
+    """Permission-checked request loads only auth data / Requisicao com permissao carrega so dados de auth."""
+    headers = {"Authorization": f"Bearer {create_access_token(subject=str(member.id))}"}
+    with track_queries() as stats:
+        resp = await client.get("/api/v1/teams/", headers=headers)
+    assert resp.status_code == 200
+    # auth (user, roles, permissions) + team list / auth (usuario, papeis, permissoes) + lista de equipes
+    assert stats.queries == 4
@@ -0,0 +1,110 @@
+"""
+Tests for the Prometheus /metrics endpoint and collectors.
+Testes para o endpoint /metrics do Prometheus e coletores.
+"""
+
+import uuid
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.pool import TimedAsyncAdaptedQueuePool
+from app.notifications.websocket import ConnectionManager
+
+pytestmark = pytest.mark.asyncio
+
+
+def _sample(name: str, labels: dict[str, str] | None = None) -> float:
+    """Current value of a sample, 0 when absent / Valor atual de uma amostra, 0 quando ausente."""
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+async def test_metrics_endpoint_format(client: AsyncClient) -> None:
+    """Endpoint serves the Prometheus text format / Endpoint serve o formato texto do Prometheus."""
+    resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert "# TYPE http_request_duration_seconds histogram" in resp.text
+    assert "# TYPE db_pool_checkout_wait_seconds histogram" in resp.text
+
+
+async def test_request_latency_by_route_template(client: AsyncClient) -> None:
+    """Latency is labelled with the route template / Latencia e rotulada pelo template da rota."""
+    labels = {"method": "GET", "route": "/api/v1/races/{race_id}", "status": "401"}
+    before = _sample("http_request_duration_seconds_count", labels)
+    await client.get(f"/api/v1/races/{uuid.uuid4()}")
+    await client.get(f"/api/v1/races/{uuid.uuid4()}")
+    assert _sample("http_request_duration_seconds_count", labels) == before + 2
+    assert _sample("http_requests_total", labels) >= 2
+
+
+async def test_unmatched_route_label(client: AsyncClient) -> None:
+    """Unknown paths share one label / Caminhos desconhecidos compartilham um label."""
+    labels = {"method": "GET", "route": "<unmatched>", "status": "404"}
+    before = _sample("http_request_duration_seconds_count", labels)
+    await client.get(f"/no-such-path/{uuid.uuid4()}")
+    assert _sample("http_request_duration_seconds_count", labels) == before + 1
+
+
+async def test_response_size_and_in_progress(client: AsyncClient) -> None:
+    """Response bytes are observed; in-flight gauge returns to zero / Bytes observados; gauge volta a zero."""
+    labels = {"method": "GET", "route": "/health"}
+    before = _sample("http_response_size_bytes_sum", labels)
+    resp = await client.get("/health")
+    assert _sample("http_response_size_bytes_sum", labels) == before + len(resp.content)
+    assert _sample("http_requests_in_progress", {"method": "GET"}) == 0
+
+
+async def test_metrics_endpoint_not_self_recorded(client: AsyncClient) -> None:
+    """Scrapes are not recorded as traffic / Coletas nao sao registradas como trafego."""
+    await client.get("/metrics")
+    labels = {"method": "GET", "route": "/metrics", "status": "200"}
+    assert _sample("http_request_duration_seconds_count", labels) == 0
+
+
+async def test_websocket_connection_gauge() -> None:
+    """Gauge follows connect/disconnect / Gauge acompanha connect/disconnect."""
+    mgr = ConnectionManager()
+    user_id = uuid.uuid4()
+
+    class FakeWS:
+        async def accept(self) -> None:
+            pass
+
+    before = _sample("websocket_connections")
+    ws_a, ws_b = FakeWS(), FakeWS()
+    await mgr.connect(user_id, ws_a)  # type: ignore[arg-type]
+    await mgr.connect(user_id, ws_b)  # type: ignore[arg-type]
+    assert _sample("websocket_connections") == before + 2
+
+    mgr.disconnect(user_id, ws_a)  # type: ignore[arg-type]
+    mgr.disconnect(user_id, ws_a)  # type: ignore[arg-type]
+    assert _sample("websocket_connections") == before + 1
+    mgr.disconnect(user_id, ws_b)  # type: ignore[arg-type]
+    assert _sample("websocket_connections") == before
+
+
+async def test_pool_checkout_wait_observed() -> None:
+    """Every pool checkout is timed / Todo checkout do pool e medido."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=TimedAsyncAdaptedQueuePool)
+    before = _sample("db_pool_checkout_wait_seconds_count")
+    for _ in range(3):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    await engine.dispose()
+    assert _sample("db_pool_checkout_wait_seconds_count") == before + 3
+
+
+async def test_metrics_multiprocess_registry(
+    client: AsyncClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Multiprocess mode reads the shared directory / Modo multiprocesso le o diretorio compartilhado."""
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    # No worker has written to the empty directory yet / Nenhum worker gravou no diretorio vazio
+    assert "http_request_duration_seconds" not in resp.text
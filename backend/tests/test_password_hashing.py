@@ -0,0 +1,63 @@
+"""
+Tests for off-loop password hashing.
+Testes para hashing de senha fora do event loop.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core import security
+from app.core.security import hash_password, hash_password_async, verify_password, verify_password_async
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_async_round_trip() -> None:
+    """Async hash verifies with both helpers / Hash assincrono verifica com ambos os helpers."""
+    hashed = await hash_password_async("s3cret-pass")
+    assert verify_password("s3cret-pass", hashed)
+    assert await verify_password_async("s3cret-pass", hashed)
+    assert not await verify_password_async("wrong-pass", hashed)
+
+
+async def test_verify_runs_off_the_event_loop() -> None:
+    """A ticker keeps running while bcrypt works / Um ticker continua rodando enquanto o bcrypt trabalha."""
+    hashed = hash_password("s3cret-pass")
+    ticks = 0
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while not done.is_set():
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    task = asyncio.create_task(ticker())
+    assert await verify_password_async("s3cret-pass", hashed)
+    done.set()
+    await task
+    assert ticks > 1
+
+
+async def test_concurrency_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """At most PASSWORD_HASH_WORKERS hashes run at once / No maximo PASSWORD_HASH_WORKERS hashes por vez."""
+    active = peak = 0
+    lock = threading.Lock()
+
+    def slow_verify(plain_password: str, hashed_password: str) -> bool:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return True
+
+    monkeypatch.setattr(security, "verify_password", slow_verify)
+    results = await asyncio.gather(*(verify_password_async("p", "h") for _ in range(10)))
+    assert all(results)
+    assert peak == security.settings.PASSWORD_HASH_WORKERS
@@ -170,6 +170,99 @@ async def test_create_pit_stop_duplicate(
     assert resp.status_code == 409
 
 
+async def test_bulk_create_pit_stops(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_team: Team,
+) -> None:
+    """Bulk create pit stops / Cria pit stops em lote."""
+    payload = {
+        "pit_stops": [
+            {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": lap, "duration_ms": 2400}
+            for lap in (12, 30)
+        ]
+    }
+    resp = await client.post(f"/api/v1/races/{test_race.id}/pitstops/bulk", json=payload, headers=admin_headers)
+    assert resp.status_code == 201
+    assert [p["lap_number"] for p in resp.json()] == [12, 30]
+
+
+async def test_bulk_create_pit_stops_conflict(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_team: Team,
+    test_pit_stop: PitStop,
+) -> None:
+    """Bulk create without on_conflict rejects existing stop / Lote sem on_conflict rejeita existente."""
+    race_id = test_race.id
+    payload = {
+        "pit_stops": [
+            {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": 15, "duration_ms": 2600},
+        ]
+    }
+    resp = await client.post(f"/api/v1/races/{race_id}/pitstops/bulk", json=payload, headers=admin_headers)
+    assert resp.status_code == 409
+
+
+async def test_bulk_create_pit_stops_upsert_update(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_team: Team,
+    test_pit_stop: PitStop,
+) -> None:
+    """Replayed batch overwrites existing stop / Lote reenviado sobrescreve pit stop existente."""
+    payload = {
+        "pit_stops": [
+            {
+                "driver_id": str(test_driver.id),
+                "team_id": str(test_team.id),
+                "lap_number": 15,
+                "duration_ms": 2600,
+                "tire_to": "hard",
+            },
+            {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": 40, "duration_ms": 2300},
+        ]
+    }
+    resp = await client.post(
+        f"/api/v1/races/{test_race.id}/pitstops/bulk?on_conflict=update", json=payload, headers=admin_headers
+    )
+    assert resp.status_code == 201
+    data = {p["lap_number"]: p for p in resp.json()}
+    assert data[15]["id"] == str(test_pit_stop.id)
+    assert data[15]["duration_ms"] == 2600
+    assert data[15]["tire_to"] == "hard"
+    assert data[40]["duration_ms"] == 2300
+
+
+async def test_bulk_create_pit_stops_upsert_ignore(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_team: Team,
+    test_pit_stop: PitStop,
+) -> None:
+    """Replayed batch skips existing stop / Lote reenviado ignora pit stop existente."""
+    payload = {
+        "pit_stops": [
+            {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": 15, "duration_ms": 2600},
+            {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": 40, "duration_ms": 2300},
+        ]
+    }
+    resp = await client.post(
+        f"/api/v1/races/{test_race.id}/pitstops/bulk?on_conflict=ignore", json=payload, headers=admin_headers
+    )
+    assert resp.status_code == 201
+    data = resp.json()
+    assert [p["lap_number"] for p in data] == [40]
+
+
 async def test_create_pit_stop_invalid_race(
     client: AsyncClient,
     admin_headers: dict[str, str],
@@ -0,0 +1,179 @@
+"""
+Tests for the authenticated-principal cache and its invalidation.
+Testes para o cache de principais autenticados e sua invalidacao.
+"""
+
+import uuid
+from dataclasses import dataclass
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import cache as cache_module
+from app.core.principal import Principal, PrincipalCache, authz_versions, principal_cache
+from app.core.security import create_access_token
+from app.db.instrumentation import track_queries
+from app.roles.models import Permission, Role
+from app.users.models import User
+
+pytestmark = pytest.mark.asyncio
+
+TEAMS = "/api/v1/teams/"
+
+
+@dataclass
+class Viewer:
+    """Non-superuser holding one role with teams:read / Usuario com um papel com teams:read."""
+
+    user_id: uuid.UUID
+    role_id: uuid.UUID
+    permission_id: uuid.UUID
+    headers: dict[str, str]
+
+
+@pytest.fixture
+async def viewer(db_session: AsyncSession, admin_user: User) -> Viewer:
+    """Viewer sharing the admin's teams:read permission / Viewer com a permissao teams:read do admin."""
+    perm = (await db_session.execute(select(Permission).where(Permission.codename == "teams:read"))).scalar_one()
+    role = Role(name="viewer", display_name="Viewer")
+    role.permissions = [perm]
+    user = User(email="viewer@example.com", hashed_password="hashed", full_name="Viewer")
+    user.roles = [role]
+    db_session.add_all([role, user])
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(subject=str(user.id))}"}
+    return Viewer(user_id=user.id, role_id=role.id, permission_id=perm.id, headers=headers)
+
+
+def _principal(**overrides: object) -> Principal:
+    """Principal with defaults / Principal com valores padrao."""
+    values: dict[str, object] = {
+        "id": uuid.uuid4(),
+        "is_active": True,
+        "is_superuser": False,
+        "permissions": frozenset(),
+        "roles": frozenset(),
+    }
+    values.update(overrides)
+    return Principal(**values)  # type: ignore[arg-type]
+
+
+# --- PrincipalCache unit tests / Testes unitarios do PrincipalCache ---
+
+
+async def test_cache_evicts_least_recently_used() -> None:
+    """Oldest untouched entry is evicted / Entrada mais antiga sem uso e removida."""
+    cache = PrincipalCache(maxsize=2, ttl_seconds=60)
+    a, b, c = _principal(), _principal(), _principal()
+    cache.put(a)
+    cache.put(b)
+    assert cache.get(a.id) == a
+    cache.put(c)
+    assert cache.get(b.id) is None
+    assert cache.get(a.id) == a
+    assert len(cache) == 2
+
+
+async def test_cache_entries_expire(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Entries expire after the TTL / Entradas expiram apos o TTL."""
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+    cache = PrincipalCache(maxsize=10, ttl_seconds=30)
+    p = _principal()
+    cache.put(p)
+    now += 29
+    assert cache.get(p.id) == p
+    now += 2
+    assert cache.get(p.id) is None
+    assert len(cache) == 0
+
+
+async def test_cache_disabled_with_zero_ttl() -> None:
+    """TTL 0 disables caching / TTL 0 desativa o cache."""
+    cache = PrincipalCache(maxsize=10, ttl_seconds=0)
+    p = _principal()
+    cache.put(p)
+    assert cache.get(p.id) is None
+
+
+# --- Request path / Caminho da requisicao ---
+
+
+async def test_warm_permission_check_issues_no_queries(client: AsyncClient, viewer: Viewer) -> None:
+    """Second request authorizes from the cache / Segunda requisicao autoriza pelo cache."""
+    resp = await client.get(TEAMS, headers=viewer.headers)
+    assert resp.status_code == 200
+    cached = principal_cache.get(viewer.user_id)
+    assert cached is not None
+    assert cached.permissions == frozenset({"teams:read"})
+    assert cached.roles == frozenset({"viewer"})
+
+    with track_queries() as stats:
+        resp = await client.get(TEAMS, headers=viewer.headers)
+    assert resp.status_code == 200
+    # Only the team list itself / Apenas a propria lista de equipes
+    assert stats.queries == 1
+
+
+async def test_revoke_role_invalidates(client: AsyncClient, admin_headers: dict[str, str], viewer: Viewer) -> None:
+    """Revoking a role takes effect immediately / Revogar papel vale imediatamente."""
+    assert (await client.get(TEAMS, headers=viewer.headers)).status_code == 200
+    resp = await client.delete(f"/api/v1/users/{viewer.user_id}/roles/{viewer.role_id}", headers=admin_headers)
+    assert resp.status_code == 200
+    assert (await client.get(TEAMS, headers=viewer.headers)).status_code == 403
+
+
+async def test_assign_role_invalidates(
+    client: AsyncClient, admin_headers: dict[str, str], viewer: Viewer, db_session: AsyncSession
+) -> None:
+    """Assigning a role takes effect immediately / Atribuir papel vale imediatamente."""
+    await client.delete(f"/api/v1/users/{viewer.user_id}/roles/{viewer.role_id}", headers=admin_headers)
+    assert (await client.get(TEAMS, headers=viewer.headers)).status_code == 403
+    resp = await client.post(
+        f"/api/v1/users/{viewer.user_id}/roles", json={"role_id": str(viewer.role_id)}, headers=admin_headers
+    )
+    assert resp.status_code == 200
+    assert (await client.get(TEAMS, headers=viewer.headers)).status_code == 200
+
+
+async def test_revoke_permission_invalidates(
+    client: AsyncClient, admin_headers: dict[str, str], viewer: Viewer
+) -> None:
+    """Removing a permission from a role reaches its holders / Remover permissao do papel alcanca portadores."""
+    assert (await client.get(TEAMS, headers=viewer.headers)).status_code == 200
+    resp = await client.delete(
+        f"/api/v1/roles/{viewer.role_id}/permissions/{viewer.permission_id}", headers=admin_headers
+    )
+    assert resp.status_code == 200
+    assert (await client.get(TEAMS, headers=viewer.headers)).status_code == 403
+
+
+async def test_deactivation_invalidates(client: AsyncClient, admin_headers: dict[str, str], viewer: Viewer) -> None:
+    """Deactivated users are blocked on the next request / Usuarios desativados bloqueados na proxima."""
+    assert (await client.get(TEAMS, headers=viewer.headers)).status_code == 200
+    resp = await client.patch(f"/api/v1/users/{viewer.user_id}", json={"is_active": False}, headers=admin_headers)
+    assert resp.status_code == 200
+    resp = await client.get(TEAMS, headers=viewer.headers)
+    assert resp.status_code == 403
+    assert resp.json()["detail"] == "Inactive user"
+
+
+async def test_other_worker_change_applies_after_version_ttl(
+    client: AsyncClient, db_session: AsyncSession, viewer: Viewer
+) -> None:
+    """A change committed by another worker applies once the version map expires /
+    Mudanca gravada por outro worker vale quando o mapa de versoes expira."""
+    assert (await client.get(TEAMS, headers=viewer.headers)).status_code == 200
+    user = await db_session.get(User, viewer.user_id)
+    assert user is not None
+    user.is_active = False
+    user.authz_version += 1
+    await db_session.commit()
+    # This worker's cached principal still holds within the version TTL / Principal em cache vale dentro do TTL
+    assert (await client.get(TEAMS, headers=viewer.headers)).status_code == 200
+    authz_versions.clear()
+    resp = await client.get(TEAMS, headers=viewer.headers)
+    assert resp.status_code == 403
+    assert resp.json()["detail"] == "Inactive user"
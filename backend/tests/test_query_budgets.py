@@ -0,0 +1,206 @@
+"""
+Query-budget tests for hot endpoints (N+1 regression guard).
+Testes de orcamento de queries para endpoints criticos (protecao contra N+1).
+
+Budgets are the statement counts measured on a race weekend with several teams, drivers and laps
+(auth lookup and `selectin` cascades included): a per-row query loop grows with the seeded data and
+blows the budget. Lower a budget when an endpoint gets cheaper; never raise one to make a test pass.
+
+Orcamentos sao as contagens de statements medidas em um fim de semana com varias equipes, pilotos e
+voltas (incluindo autenticacao e cascatas `selectin`): um loop de query por linha cresce com os dados
+e estoura o orcamento. Reduza um orcamento quando o endpoint ficar mais barato; nunca aumente para
+fazer um teste passar.
+"""
+
+import uuid
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.championships.models import Championship, ChampionshipStatus, championship_entries
+from app.core.security import hash_password
+from app.db.instrumentation import QueryStats
+from app.drivers.models import Driver
+from app.races.models import Race, RaceStatus, race_entries
+from app.replay.models import LapPosition, RaceEvent, RaceEventType
+from app.results.models import RaceResult
+from app.teams.models import Team
+from app.telemetry.models import LapTime
+from app.users.models import User
+
+QueryBudget = Callable[[int], AbstractContextManager[QueryStats]]
+
+N_TEAMS = 3
+DRIVERS_PER_TEAM = 2
+N_LAPS = 5
+
+
+@dataclass
+class RaceWeekend:
+    """Ids of the seeded data / Ids dos dados criados."""
+
+    championship_id: uuid.UUID
+    race_id: uuid.UUID
+
+
+# ── Fixtures / Fixtures ──────────────────────────────────────────
+
+
+@pytest.fixture
+async def race_weekend(db_session: AsyncSession) -> RaceWeekend:
+    """
+    Seed an active championship with a finished race, results, laps, positions and events.
+    Cria um campeonato ativo com uma corrida finalizada, resultados, voltas, posicoes e eventos.
+    """
+    champ = Championship(
+        name="budget_2026", display_name="Budget 2026", season_year=2026, status=ChampionshipStatus.active
+    )
+    db_session.add(champ)
+    await db_session.flush()
+
+    race = Race(
+        championship_id=champ.id,
+        name="round_01",
+        display_name="Round 1",
+        round_number=1,
+        status=RaceStatus.finished,
+        scheduled_at=datetime(2026, 1, 15, 14, 0, tzinfo=UTC),
+    )
+    upcoming = Race(
+        championship_id=champ.id,
+        name="round_02",
+        display_name="Round 2",
+        round_number=2,
+        status=RaceStatus.scheduled,
+        scheduled_at=datetime(2099, 1, 15, 14, 0, tzinfo=UTC),
+    )
+    db_session.add_all([race, upcoming])
+    await db_session.flush()
+
+    drivers: list[Driver] = []
+    for t in range(N_TEAMS):
+        team = Team(name=f"budget_team_{t}", display_name=f"Budget Team {t}")
+        db_session.add(team)
+        await db_session.flush()
+        await db_session.execute(championship_entries.insert().values(championship_id=champ.id, team_id=team.id))
+        await db_session.execute(race_entries.insert().values(race_id=race.id, team_id=team.id))
+        for d in range(DRIVERS_PER_TEAM):
+            driver = Driver(
+                name=f"budget_driver_{t}_{d}",
+                display_name=f"Budget Driver {t}.{d}",
+                abbreviation=f"B{t}{d}",
+                number=t * 10 + d,
+                team_id=team.id,
+            )
+            db_session.add(driver)
+            drivers.append(driver)
+    await db_session.flush()
+
+    for pos, driver in enumerate(drivers, 1):
+        # One classified result per team / Um resultado classificado por equipe
+        if pos % DRIVERS_PER_TEAM == 1:
+            db_session.add(
+                RaceResult(
+                    race_id=race.id, team_id=driver.team_id, driver_id=driver.id, position=pos, points=float(26 - pos)
+                )
+            )
+        for lap in range(1, N_LAPS + 1):
+            db_session.add(
+                LapTime(
+                    race_id=race.id,
+                    driver_id=driver.id,
+                    team_id=driver.team_id,
+                    lap_number=lap,
+                    lap_time_ms=90000 + pos * 100 + lap,
+                    is_personal_best=lap == 1,
+                )
+            )
+            db_session.add(
+                LapPosition(race_id=race.id, driver_id=driver.id, team_id=driver.team_id, lap_number=lap, position=pos)
+            )
+    db_session.add(RaceEvent(race_id=race.id, lap_number=2, event_type=RaceEventType.safety_car))
+    db_session.add(RaceEvent(race_id=race.id, lap_number=3, event_type=RaceEventType.overtake, driver_id=drivers[0].id))
+
+    for i in range(5):
+        db_session.add(
+            User(email=f"budget{i}@example.com", hashed_password=hash_password("budgetpass123"), full_name=f"B {i}")
+        )
+    await db_session.commit()
+    return RaceWeekend(championship_id=champ.id, race_id=race.id)
+
+
+# ── Tests / Testes ────────────────────────────────────────────────
+
+
+async def test_lap_summary_query_budget(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    race_weekend: RaceWeekend,
+    assert_max_queries: QueryBudget,
+) -> None:
+    """Lap summary stays within budget / Resumo de voltas dentro do orcamento."""
+    with assert_max_queries(5):
+        resp = await client.get(f"/api/v1/races/{race_weekend.race_id}/laps/summary", headers=admin_headers)
+    assert resp.status_code == 200
+    assert len(resp.json()["drivers"]) == N_TEAMS * DRIVERS_PER_TEAM
+
+
+async def test_replay_query_budget(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    race_weekend: RaceWeekend,
+    assert_max_queries: QueryBudget,
+) -> None:
+    """Full replay stays within budget / Replay completo dentro do orcamento."""
+    with assert_max_queries(35):
+        resp = await client.get(f"/api/v1/races/{race_weekend.race_id}/replay", headers=admin_headers)
+    assert resp.status_code == 200
+
+
+async def test_dashboard_query_budget(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    race_weekend: RaceWeekend,
+    assert_max_queries: QueryBudget,
+) -> None:
+    """Dashboard stays within budget / Dashboard dentro do orcamento."""
+    with assert_max_queries(26):
+        resp = await client.get("/api/v1/dashboard/summary", headers=admin_headers)
+    assert resp.status_code == 200
+    assert len(resp.json()["active_championships"]) == 1
+
+
+@pytest.mark.parametrize(
+    ("suffix", "budget"),
+    [("standings", 13), ("driver-standings", 13), ("standings/breakdown", 27)],
+)
+async def test_standings_query_budget(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    race_weekend: RaceWeekend,
+    assert_max_queries: QueryBudget,
+    suffix: str,
+    budget: int,
+) -> None:
+    """Standings endpoints stay within budget / Endpoints de classificacao dentro do orcamento."""
+    with assert_max_queries(budget):
+        resp = await client.get(f"/api/v1/championships/{race_weekend.championship_id}/{suffix}", headers=admin_headers)
+    assert resp.status_code == 200
+
+
+async def test_users_list_query_budget(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    race_weekend: RaceWeekend,
+    assert_max_queries: QueryBudget,
+) -> None:
+    """User list stays within budget / Lista de usuarios dentro do orcamento."""
+    with assert_max_queries(4):
+        resp = await client.get("/api/v1/users/", headers=admin_headers)
+    assert resp.status_code == 200
+    assert len(resp.json()) == 6
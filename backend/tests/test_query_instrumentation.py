@@ -0,0 +1,104 @@
+"""
+Tests for per-request SQL instrumentation.
+Testes para instrumentacao SQL por requisicao.
+"""
+
+import logging
+from collections.abc import AsyncGenerator, Callable
+from contextlib import AbstractContextManager
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.instrumentation import QueryStats, current_query_stats, track_queries
+from app.db.session import get_db
+from app.main import create_app
+from app.users.models import User
+
+
+@pytest.fixture
+async def strict_client(db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[AsyncClient, None]:
+    """
+    Client whose app has a zero-query budget.
+    Cliente cuja aplicacao tem orcamento de zero queries.
+    """
+    monkeypatch.setattr(settings, "SQL_QUERY_BUDGET", 0)
+    app = create_app()
+
+    async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_headers_without_queries(client: AsyncClient) -> None:
+    """Endpoint without SQL reports zero queries / Endpoint sem SQL informa zero queries."""
+    response = await client.get("/health")
+    assert response.headers["X-DB-Queries"] == "0"
+    assert response.headers["Server-Timing"].startswith("db;dur=0.00")
+
+
+@pytest.mark.asyncio
+async def test_headers_count_queries(client: AsyncClient) -> None:
+    """Endpoint with SQL reports its statements / Endpoint com SQL informa seus statements."""
+    response = await client.get("/health/db")
+    assert response.status_code == 200
+    assert response.headers["X-DB-Queries"] == "1"
+    assert 'desc="1 queries, 1 rows"' in response.headers["Server-Timing"]
+
+
+@pytest.mark.asyncio
+async def test_track_queries_counts_rows(db_session: AsyncSession, test_user: User) -> None:
+    """Collector counts statements and fetched rows / Coletor conta statements e linhas lidas."""
+    with track_queries(keep_statements=True) as stats:
+        result = await db_session.execute(select(User.id))
+        assert len(result.all()) == 1
+    assert stats.queries == 1
+    assert stats.rows == 1
+    assert stats.db_time_ms > 0
+    assert stats.statements is not None and "FROM users" in stats.statements[0]
+    assert current_query_stats() is None
+
+
+@pytest.mark.asyncio
+async def test_no_collection_outside_context(db_session: AsyncSession) -> None:
+    """Statements outside a tracked block are ignored / Statements fora de bloco rastreado sao ignorados."""
+    await db_session.execute(select(User.id))
+    assert current_query_stats() is None
+
+
+@pytest.mark.asyncio
+async def test_budget_exceeded_logs_warning(strict_client: AsyncClient, caplog: pytest.LogCaptureFixture) -> None:
+    """Requests over budget are logged / Requisicoes acima do orcamento sao registradas."""
+    with caplog.at_level(logging.WARNING, logger="app.db.queries"):
+        await strict_client.get("/health/db")
+        await strict_client.get("/health")
+    assert len(caplog.records) == 1
+    assert "GET /health/db issued 1 queries" in caplog.records[0].getMessage()
+
+
+@pytest.mark.asyncio
+async def test_nested_tracking_rolls_up(db_session: AsyncSession) -> None:
+    """Inner collector totals are added to the outer one / Totais internos somam ao coletor externo."""
+    with track_queries() as outer:
+        await db_session.execute(select(User.id))
+        with track_queries() as inner:
+            await db_session.execute(select(User.id))
+        assert inner.queries == 1
+    assert outer.queries == 2
+
+
+@pytest.mark.asyncio
+async def test_assert_max_queries_fails_over_budget(
+    client: AsyncClient,
+    assert_max_queries: Callable[[int], AbstractContextManager[QueryStats]],
+) -> None:
+    """Budget helper fails and lists the SQL / Helper de orcamento falha e lista o SQL."""
+    with pytest.raises(AssertionError, match="Expected at most 0 queries, got 1"), assert_max_queries(0):
+        await client.get("/health/db")
@@ -7,7 +7,9 @@ import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.principal import Principal
 from app.core.security import create_access_token, hash_password
+from app.db.loaders import refresh_profile
 from app.roles.models import Permission, Role
 from app.users.models import User
 
@@ -157,11 +159,12 @@ async def test_require_role_or_logic(db_session: AsyncSession) -> None:
     user.roles = [role_pilot]
     db_session.add(user)
     await db_session.commit()
-    await db_session.refresh(user)
+    # Load roles like get_current_user does / Carrega papeis como get_current_user
+    await refresh_profile(db_session, user, "auth")
 
     # require_role("admin", "pilot") should pass because user has "pilot"
     checker = require_role("admin", "pilot")
-    result = await checker(current_user=user)
+    result = await checker(current_user=Principal.from_user(user))
     assert result.id == user.id
 
 
@@ -179,11 +182,12 @@ async def test_require_role_rejects_without_match(db_session: AsyncSession) -> N
     )
     db_session.add(user)
     await db_session.commit()
-    await db_session.refresh(user)
+    # Load roles like get_current_user does / Carrega papeis como get_current_user
+    await refresh_profile(db_session, user, "auth")
 
     checker = require_role("admin")
     with pytest.raises(ForbiddenException):
-        await checker(current_user=user)
+        await checker(current_user=Principal.from_user(user))
 
 
 # --- Inactive user blocked / Usuario inativo bloqueado ---
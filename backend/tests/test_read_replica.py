@@ -0,0 +1,201 @@
+"""
+Tests for read-replica session routing (two SQLite files stand in for primary and replica).
+Testes para roteamento de sessao na replica de leitura (dois arquivos SQLite fazem papel de primario e replica).
+"""
+
+import uuid
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.calendar.router import router as calendar_router
+from app.championships.models import Championship, ChampionshipStatus
+from app.config import settings
+from app.core.security import create_access_token
+from app.dashboard.router import router as dashboard_router
+from app.db import replica, session
+from app.db.base import Base
+from app.db.session import get_db, get_read_db
+from app.exports.router import router as exports_router
+from app.replay.router import router as replay_router
+from app.results.router import router as results_router
+from app.teams.models import Team
+from app.telemetry.router import router as telemetry_router
+
+
+@pytest.fixture(autouse=True)
+def reset_replica_state() -> None:
+    """Start every test with a healthy replica and no write windows / Inicia com replica saudavel e sem janelas."""
+    replica.reset()
+
+
+async def _file_engine(path: Path) -> AsyncEngine:
+    """SQLite file engine with the schema / Engine SQLite em arquivo com o schema."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+@pytest.fixture
+async def databases(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[None, None]:
+    """
+    Point the primary and replica session factories at two SQLite files.
+    Aponta as fabricas de sessao primaria e replica para dois arquivos SQLite.
+    """
+    primary = await _file_engine(tmp_path / "primary.db")
+    read = await _file_engine(tmp_path / "replica.db")
+    monkeypatch.setattr(session, "async_session", async_sessionmaker(primary, expire_on_commit=False))
+    monkeypatch.setattr(session, "read_async_session", async_sessionmaker(read, expire_on_commit=False))
+    yield
+    await primary.dispose()
+    await read.dispose()
+
+
+@pytest.fixture
+async def probe() -> AsyncGenerator[AsyncClient, None]:
+    """
+    Minimal app reporting which database served a read, plus a write endpoint.
+    App minima que informa qual banco atendeu a leitura, mais um endpoint de escrita.
+    """
+    app = FastAPI()
+
+    @app.get("/which")
+    async def which(db: AsyncSession = Depends(get_read_db)) -> str:
+        return Path(str(db.get_bind().engine.url.database)).stem
+
+    @app.post("/write")
+    async def write(db: AsyncSession = Depends(get_db)) -> None:
+        db.add(Team(name=f"team_{uuid.uuid4().hex[:8]}", display_name="Team"))
+        await db.commit()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+def _auth(user_id: uuid.UUID) -> dict[str, str]:
+    """Bearer header for a user id / Header bearer para um id de usuario."""
+    return {"Authorization": f"Bearer {create_access_token(subject=str(user_id))}"}
+
+
+async def test_reads_use_replica(databases: None, probe: AsyncClient) -> None:
+    """Reads go to the replica when configured / Leituras vao a replica quando configurada."""
+    resp = await probe.get("/which")
+    assert resp.json() == "replica"
+
+
+async def test_no_replica_uses_primary(databases: None, probe: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without a replica reads use the primary / Sem replica as leituras usam o primario."""
+    monkeypatch.setattr(session, "read_async_session", None)
+    resp = await probe.get("/which")
+    assert resp.json() == "primary"
+
+
+async def test_read_your_writes_window(databases: None, probe: AsyncClient) -> None:
+    """After a write, only that user reads from the primary / Apos escrita, apenas o autor le do primario."""
+    writer, other = _auth(uuid.uuid4()), _auth(uuid.uuid4())
+    assert (await probe.get("/which", headers=writer)).json() == "replica"
+
+    await probe.post("/write", headers=writer)
+    assert (await probe.get("/which", headers=writer)).json() == "primary"
+    assert (await probe.get("/which", headers=other)).json() == "replica"
+
+
+async def test_read_only_request_opens_no_window(databases: None, probe: AsyncClient) -> None:
+    """Primary reads without writes do not pin the user / Leituras sem escrita nao fixam o usuario."""
+    user = _auth(uuid.uuid4())
+    await probe.get("/which", headers={**user, replica.READ_PRIMARY_HEADER: "true"})
+    assert (await probe.get("/which", headers=user)).json() == "replica"
+
+
+async def test_write_window_expires(databases: None, probe: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Reads return to the replica after the window / Leituras voltam a replica apos a janela."""
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 0.0)
+    writer = _auth(uuid.uuid4())
+    await probe.post("/write", headers=writer)
+    assert (await probe.get("/which", headers=writer)).json() == "replica"
+
+
+async def test_read_primary_header(databases: None, probe: AsyncClient) -> None:
+    """Explicit header forces the primary / Header explicito forca o primario."""
+    resp = await probe.get("/which", headers={replica.READ_PRIMARY_HEADER: "true"})
+    assert resp.json() == "primary"
+
+
+async def test_unreachable_replica_falls_back(
+    databases: None, probe: AsyncClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Unreachable replica falls back and cools down / Replica inacessivel volta ao primario e aguarda."""
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    monkeypatch.setattr(session, "read_async_session", async_sessionmaker(broken, expire_on_commit=False))
+
+    resp = await probe.get("/which")
+    assert resp.status_code == 200
+    assert resp.json() == "primary"
+    assert not replica.replica_available()
+    await broken.dispose()
+
+
+async def test_dashboard_served_by_replica(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Routed endpoints read from the replica / Endpoints roteados leem da replica."""
+    db_session.add(
+        Championship(name="primary_only", display_name="Primary", season_year=2026, status=ChampionshipStatus.active)
+    )
+    await db_session.commit()
+
+    resp = await client.get("/api/v1/dashboard/summary", headers=admin_headers)
+    assert len(resp.json()["active_championships"]) == 1
+
+    read = await _file_engine(tmp_path / "empty_replica.db")
+    monkeypatch.setattr(session, "read_async_session", async_sessionmaker(read, expire_on_commit=False))
+    resp = await client.get("/api/v1/dashboard/summary", headers=admin_headers)
+    assert resp.json()["active_championships"] == []
+    await read.dispose()
+
+
+def _depends_on(dependant: Dependant, target: object) -> bool:
+    """Whether a dependency tree contains target / Se a arvore de dependencias contem o alvo."""
+    return any(dep.call is target or _depends_on(dep, target) for dep in dependant.dependencies)
+
+
+def test_heavy_reads_routed_to_replica() -> None:
+    """Heavy read endpoints depend on get_read_db / Endpoints de leitura pesada dependem de get_read_db."""
+    routed = {
+        route.path
+        for module_router in (
+            calendar_router,
+            dashboard_router,
+            exports_router,
+            replay_router,
+            results_router,
+            telemetry_router,
+        )
+        for route in module_router.routes
+        if isinstance(route, APIRoute) and _depends_on(route.dependant, get_read_db)
+    }
+    assert routed == {
+        "/api/v1/races/{race_id}/replay",
+        "/api/v1/races/{race_id}/analysis/stints",
+        "/api/v1/races/{race_id}/analysis/gaps",
+        "/api/v1/championships/{championship_id}/standings/breakdown",
+        "/api/v1/races/{race_id}/laps/outliers",
+        "/api/v1/races/{race_id}/laps/summary",
+        "/api/v1/races/{race_id}/telemetry/compare/field",
+        "/api/v1/races/{race_id}/laps/{lap_number}/traces",
+        "/api/v1/races/{race_id}/export/{dataset}",
+        "/api/v1/championships/{championship_id}/export/{dataset}",
+        "/api/v1/dashboard/summary",
+        "/api/v1/calendar/races",
+    }
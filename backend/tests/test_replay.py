@@ -444,6 +444,58 @@ async def test_bulk_create_positions(
     assert len(data) == 2
 
 
+async def test_bulk_create_positions_upsert_update(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_team: Team,
+) -> None:
+    """Replayed position batch is upserted / Lote de posicoes reenviado e atualizado."""
+    url = f"/api/v1/races/{test_race.id}/positions/bulk"
+    driver_id, team_id = str(test_driver.id), str(test_team.id)
+    first = {
+        "positions": [
+            {"driver_id": driver_id, "team_id": team_id, "lap_number": 1, "position": 3},
+        ]
+    }
+    resp = await client.post(url, json=first, headers=admin_headers)
+    assert resp.status_code == 201
+    original_id = resp.json()[0]["id"]
+
+    resp = await client.post(url, json=first, headers=admin_headers)
+    assert resp.status_code == 409
+
+    replay = {
+        "positions": [
+            {"driver_id": driver_id, "team_id": team_id, "lap_number": 1, "position": 2},
+            {"driver_id": driver_id, "team_id": team_id, "lap_number": 2, "position": 1},
+        ]
+    }
+    resp = await client.post(f"{url}?on_conflict=update", json=replay, headers=admin_headers)
+    assert resp.status_code == 201
+    data = {p["lap_number"]: p for p in resp.json()}
+    assert data[1]["id"] == original_id
+    assert data[1]["position"] == 2
+    assert data[2]["position"] == 1
+
+
+async def test_bulk_create_positions_invalid_team(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+) -> None:
+    """Bulk create rejects unknown team / Lote rejeita equipe inexistente."""
+    payload = {
+        "positions": [
+            {"driver_id": str(test_driver.id), "team_id": str(uuid.uuid4()), "lap_number": 1, "position": 1},
+        ]
+    }
+    resp = await client.post(f"/api/v1/races/{test_race.id}/positions/bulk", json=payload, headers=admin_headers)
+    assert resp.status_code == 404
+
+
 async def test_bulk_create_positions_invalid_race(
     client: AsyncClient,
     admin_headers: dict[str, str],
@@ -660,7 +712,7 @@ async def test_summary_with_data(
         )
     )
 
-    # Fastest lap / Volta mais rapida
+    # Fastest lap, flagged as lap ingest would / Volta mais rapida, marcada como a ingestao faria
     db_session.add(
         LapTime(
             race_id=test_race.id,
@@ -668,6 +720,7 @@ async def test_summary_with_data(
             team_id=test_team_b.id,
             lap_number=5,
             lap_time_ms=88000,
+            is_personal_best=True,
         )
     )
 
@@ -711,6 +764,81 @@ async def test_overtakes_empty(
     assert data["overtakes"] == []
 
 
+
+async def _gap_laps(db: AsyncSession, race: Race, driver: Driver, driver_b: Driver) -> None:
+    """Leader change on lap 2, driver B misses lap 3 / Troca de lider na volta 2, piloto B sem a volta 3."""
+    times = {driver: [90_000, 91_000, 90_000], driver_b: [90_500, 90_000]}
+    for lap_driver, lap_times in times.items():
+        for lap_number, lap_time_ms in enumerate(lap_times, start=1):
+            db.add(
+                LapTime(
+                    race_id=race.id,
+                    driver_id=lap_driver.id,
+                    team_id=lap_driver.team_id,
+                    lap_number=lap_number,
+                    lap_time_ms=lap_time_ms,
+                )
+            )
+    await db.commit()
+
+
+async def test_gap_chart(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_race: Race,
+    test_driver: Driver,
+    test_driver_b: Driver,
+) -> None:
+    """Gap chart from cumulative lap times / Grafico de gaps a partir dos tempos acumulados."""
+    await _gap_laps(db_session, test_race, test_driver, test_driver_b)
+
+    resp = await client.get(f"/api/v1/races/{test_race.id}/analysis/gaps", headers=admin_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["lap_numbers"] == [1, 2, 3]
+    # Ordered by display name: Norris, Hamilton / Ordenado pelo nome: Norris, Hamilton
+    assert [driver["driver_id"] for driver in data["drivers"]] == [str(test_driver_b.id), str(test_driver.id)]
+    assert data["cumulative_ms"] == [[90_500, 180_500, None], [90_000, 181_000, 271_000]]
+    assert data["position"] == [[2, 1, None], [1, 2, 1]]
+    assert data["gap_to_leader_ms"] == [[500, 0, None], [0, 500, 0]]
+    assert data["interval_ms"] == [[500, 0, None], [0, 500, 0]]
+
+    resp = await client.get(f"/api/v1/races/{uuid.uuid4()}/analysis/gaps", headers=admin_headers)
+    assert resp.status_code == 404
+
+
+async def test_derive_positions(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_race: Race,
+    test_driver: Driver,
+    test_driver_b: Driver,
+    test_position: LapPosition,
+) -> None:
+    """Derived positions replace the stored ones / Posicoes derivadas substituem as gravadas."""
+    await _gap_laps(db_session, test_race, test_driver, test_driver_b)
+
+    resp = await client.post(f"/api/v1/races/{test_race.id}/positions/derive", headers=admin_headers)
+    assert resp.status_code == 201
+    derived = {(p["lap_number"], p["driver_id"]): p for p in resp.json()}
+    assert len(derived) == 5
+    leader = derived[(1, str(test_driver.id))]
+    assert (leader["position"], leader["gap_to_leader_ms"], leader["interval_ms"]) == (1, None, None)
+    second = derived[(2, str(test_driver.id))]
+    assert (second["position"], second["gap_to_leader_ms"], second["interval_ms"]) == (2, 500, 500)
+    assert (3, str(test_driver_b.id)) not in derived
+
+    resp = await client.get(f"/api/v1/races/{test_race.id}/positions", headers=admin_headers)
+    assert resp.status_code == 200
+    stored = {(p["lap_number"], p["driver_id"]): p["position"] for p in resp.json()}
+    assert stored == {key: p["position"] for key, p in derived.items()}
+
+    resp = await client.post(f"/api/v1/races/{uuid.uuid4()}/positions/derive", headers=admin_headers)
+    assert resp.status_code == 404
+
+
 # =============================================================================
 # Auth tests / Testes de autenticacao
 # =============================================================================
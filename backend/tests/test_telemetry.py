@@ -1,21 +1,30 @@
 """
-Tests for telemetry endpoints (lap times, car setups, driver comparison).
-Testes para endpoints de telemetria (tempos de volta, setups de carro, comparacao de pilotos).
+Tests for telemetry endpoints (lap times, lap traces, car setups, driver comparison).
+Testes para endpoints de telemetria (tempos de volta, tracados, setups de carro, comparacao de pilotos).
 """
 
+import io
+import statistics
 import uuid
+from typing import Any
 
+import numpy as np
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.championships.models import Championship, ChampionshipStatus
 from app.core.security import create_access_token
+from app.db.instrumentation import track_queries
 from app.drivers.models import Driver
 from app.races.models import Race, RaceStatus
+from app.results.models import RaceResult
 from app.roles.models import Permission, Role
 from app.teams.models import Team
+from app.telemetry.downsample import lttb, minmax
 from app.telemetry.models import CarSetup, LapTime
+from app.telemetry.traces import TraceEncoding, decode_channel, encode_channel
 from app.users.models import User
 
 # --- Fixtures / Fixtures ---
@@ -175,7 +184,8 @@ async def test_create_lap_time(
     assert data["lap_number"] == 1
     assert data["lap_time_ms"] == 91234
     assert data["is_valid"] is True
-    assert data["is_personal_best"] is False
+    # Only lap so far, so it is the personal best / Unica volta ate agora, entao e o melhor pessoal
+    assert data["is_personal_best"] is True
 
 
 async def test_create_lap_time_with_sectors(
@@ -264,6 +274,150 @@ async def test_bulk_create_lap_times(
     assert resp.status_code == 201
     data = resp.json()
     assert len(data) == 3
+    assert [lap["lap_number"] for lap in data] == [1, 2, 3]
+    assert all(lap["id"] and lap["created_at"] for lap in data)
+
+
+async def test_bulk_create_lap_times_invalid_driver(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_team: Team,
+) -> None:
+    """Bulk create rejects unknown driver in batch / Lote rejeita piloto inexistente."""
+    payload = {
+        "laps": [
+            {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": 1, "lap_time_ms": 90000},
+            {"driver_id": str(uuid.uuid4()), "team_id": str(test_team.id), "lap_number": 1, "lap_time_ms": 90500},
+        ]
+    }
+    resp = await client.post(f"/api/v1/races/{test_race.id}/laps/bulk", json=payload, headers=admin_headers)
+    assert resp.status_code == 404
+
+    resp = await client.get(f"/api/v1/races/{test_race.id}/laps", headers=admin_headers)
+    assert resp.json() == []
+
+
+async def test_bulk_create_lap_times_invalid_team(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+) -> None:
+    """Bulk create rejects unknown team in batch / Lote rejeita equipe inexistente."""
+    payload = {
+        "laps": [
+            {"driver_id": str(test_driver.id), "team_id": str(uuid.uuid4()), "lap_number": 1, "lap_time_ms": 90000},
+        ]
+    }
+    resp = await client.post(f"/api/v1/races/{test_race.id}/laps/bulk", json=payload, headers=admin_headers)
+    assert resp.status_code == 404
+
+
+async def test_bulk_create_lap_times_duplicate_in_batch(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_team: Team,
+) -> None:
+    """Bulk create rejects repeated lap in batch / Lote rejeita volta repetida."""
+    lap = {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": 1, "lap_time_ms": 90000}
+    resp = await client.post(
+        f"/api/v1/races/{test_race.id}/laps/bulk", json={"laps": [lap, lap]}, headers=admin_headers
+    )
+    assert resp.status_code == 409
+
+
+async def test_bulk_create_lap_times_existing_lap(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_team: Team,
+    test_lap: LapTime,
+) -> None:
+    """Bulk create conflicts with stored lap / Lote conflita com volta existente."""
+    race_id = test_race.id
+    payload = {
+        "laps": [
+            {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": 2, "lap_time_ms": 90000},
+            {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": 1, "lap_time_ms": 90000},
+        ]
+    }
+    resp = await client.post(f"/api/v1/races/{race_id}/laps/bulk", json=payload, headers=admin_headers)
+    assert resp.status_code == 409
+
+    resp = await client.get(f"/api/v1/races/{race_id}/laps", headers=admin_headers)
+    assert len(resp.json()) == 1
+
+
+async def test_bulk_create_lap_times_upsert_update(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_team: Team,
+    test_lap: LapTime,
+) -> None:
+    """Replayed batch upserts existing laps / Lote reenviado atualiza voltas existentes."""
+    race_id = test_race.id
+    lap_id = test_lap.id
+    payload = {
+        "laps": [
+            {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": 1, "lap_time_ms": 91000},
+            {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": 2, "lap_time_ms": 90500},
+            {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": 2, "lap_time_ms": 90400},
+        ]
+    }
+    resp = await client.post(
+        f"/api/v1/races/{race_id}/laps/bulk?on_conflict=update", json=payload, headers=admin_headers
+    )
+    assert resp.status_code == 201
+    data = {lap["lap_number"]: lap for lap in resp.json()}
+    assert len(data) == 2
+    assert data[1]["id"] == str(lap_id)
+    assert data[1]["lap_time_ms"] == 91000
+    assert data[2]["lap_time_ms"] == 90400
+
+    resp = await client.get(f"/api/v1/races/{race_id}/laps", headers=admin_headers)
+    assert len(resp.json()) == 2
+
+
+async def test_bulk_create_lap_times_upsert_ignore(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_team: Team,
+    test_lap: LapTime,
+) -> None:
+    """Replayed batch skips existing laps / Lote reenviado ignora voltas existentes."""
+    payload = {
+        "laps": [
+            {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": 1, "lap_time_ms": 91000},
+            {"driver_id": str(test_driver.id), "team_id": str(test_team.id), "lap_number": 2, "lap_time_ms": 90500},
+        ]
+    }
+    resp = await client.post(
+        f"/api/v1/races/{test_race.id}/laps/bulk?on_conflict=ignore", json=payload, headers=admin_headers
+    )
+    assert resp.status_code == 201
+    data = resp.json()
+    assert [lap["lap_number"] for lap in data] == [2]
+
+
+async def test_bulk_create_lap_times_invalid_conflict_mode(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+) -> None:
+    """Unknown on_conflict mode is rejected / Modo on_conflict desconhecido e rejeitado."""
+    resp = await client.post(
+        f"/api/v1/races/{test_race.id}/laps/bulk?on_conflict=merge", json={"laps": []}, headers=admin_headers
+    )
+    assert resp.status_code == 422
 
 
 async def test_list_laps_empty(
@@ -368,6 +522,52 @@ async def test_lap_summary_empty_race(
     assert data["overall_fastest"] is None
 
 
+async def test_lap_summary_statistics(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_race: Race,
+    test_driver: Driver,
+    test_driver_b: Driver,
+    test_team: Team,
+    test_team_b: Team,
+) -> None:
+    """Median, std-dev and theoretical best per driver / Mediana, desvio e melhor teorico por piloto."""
+    times_a = [91000, 90500, 92000, 90800]
+    sectors_a = [(30000, 30500, 30500), (30200, 30000, 30300), (30100, 31000, 30900), (30300, 30200, 30300)]
+    for i, (lap_ms, (s1, s2, s3)) in enumerate(zip(times_a, sectors_a, strict=True), start=1):
+        db_session.add(LapTime(
+            race_id=test_race.id, driver_id=test_driver.id, team_id=test_team.id, lap_number=i,
+            lap_time_ms=lap_ms, sector_1_ms=s1, sector_2_ms=s2, sector_3_ms=s3, is_personal_best=(i == 2),
+        ))
+    # Driver B: one lap, no sectors / Piloto B: uma volta, sem setores
+    db_session.add(LapTime(
+        race_id=test_race.id, driver_id=test_driver_b.id, team_id=test_team_b.id, lap_number=1, lap_time_ms=90400,
+    ))
+    await db_session.commit()
+
+    resp = await client.get(f"/api/v1/races/{test_race.id}/laps/summary", headers=admin_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    # Ordered by fastest lap / Ordenado pela volta mais rapida
+    driver_b, driver_a = data["drivers"]
+    assert driver_a["driver_id"] == str(test_driver.id)
+    assert driver_a["fastest_lap_ms"] == 90500
+    assert driver_a["avg_lap_ms"] == int(statistics.mean(times_a))
+    assert driver_a["median_lap_ms"] == statistics.median(times_a)
+    assert driver_a["stddev_lap_ms"] == pytest.approx(statistics.stdev(times_a))
+    assert driver_a["total_laps"] == 4
+    assert driver_a["personal_best_lap"] == 2
+    assert driver_a["theoretical_best_ms"] == 30000 + 30000 + 30300
+
+    assert driver_b["median_lap_ms"] == 90400
+    assert driver_b["stddev_lap_ms"] is None
+    assert driver_b["personal_best_lap"] is None
+    assert driver_b["theoretical_best_ms"] is None
+    assert data["overall_fastest"]["driver_id"] == str(test_driver_b.id)
+    assert data["overall_fastest"]["lap_time_ms"] == 90400
+
+
 async def test_delete_lap_time(
     client: AsyncClient,
     admin_headers: dict[str, str],
@@ -387,6 +587,225 @@ async def test_delete_lap_time_not_found(
     assert resp.status_code == 404
 
 
+# --- Lap flag tests / Testes de flags de volta ---
+
+
+def _lap(driver: Driver, team: Team, lap_number: int, lap_time_ms: int, **extra: object) -> dict[str, object]:
+    """Lap payload / Payload de volta."""
+    return {
+        "driver_id": str(driver.id),
+        "team_id": str(team.id),
+        "lap_number": lap_number,
+        "lap_time_ms": lap_time_ms,
+        **extra,
+    }
+
+
+async def _personal_bests(client: AsyncClient, headers: dict[str, str], race: Race) -> dict[str, int]:
+    """Personal-best lap number per driver / Numero da volta de melhor pessoal por piloto."""
+    resp = await client.get(f"/api/v1/races/{race.id}/laps", headers=headers)
+    assert resp.status_code == 200
+    return {lap["driver_id"]: lap["lap_number"] for lap in resp.json() if lap["is_personal_best"]}
+
+
+async def test_personal_best_moves_to_faster_lap(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_team: Team,
+) -> None:
+    """A faster valid lap takes the flag; invalid laps never do / Volta valida mais rapida assume; invalidas nunca."""
+    url = f"/api/v1/races/{test_race.id}/laps"
+    await client.post(url, json=_lap(test_driver, test_team, 1, 91000), headers=admin_headers)
+    resp = await client.post(url, json=_lap(test_driver, test_team, 2, 90000), headers=admin_headers)
+    assert resp.json()["is_personal_best"] is True
+    resp = await client.post(url, json=_lap(test_driver, test_team, 3, 89000, is_valid=False), headers=admin_headers)
+    assert resp.json()["is_personal_best"] is False
+    assert await _personal_bests(client, admin_headers, test_race) == {str(test_driver.id): 2}
+
+
+async def test_bulk_create_sets_personal_bests(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_driver_b: Driver,
+    test_team: Team,
+    test_team_b: Team,
+) -> None:
+    """Bulk response carries the recomputed flags / Resposta em lote traz as flags recalculadas."""
+    await client.post(
+        f"/api/v1/races/{test_race.id}/laps", json=_lap(test_driver, test_team, 1, 90000), headers=admin_headers
+    )
+    payload = {
+        "laps": [
+            _lap(test_driver, test_team, 2, 89500),
+            _lap(test_driver, test_team, 3, 89900),
+            _lap(test_driver_b, test_team_b, 1, 91000),
+            # Tie on time: earliest lap wins / Empate no tempo: vence a volta mais cedo
+            _lap(test_driver_b, test_team_b, 2, 91000),
+        ]
+    }
+    resp = await client.post(f"/api/v1/races/{test_race.id}/laps/bulk", json=payload, headers=admin_headers)
+    assert resp.status_code == 201
+    assert [lap["is_personal_best"] for lap in resp.json()] == [True, False, True, False]
+    assert await _personal_bests(client, admin_headers, test_race) == {
+        str(test_driver.id): 2,
+        str(test_driver_b.id): 1,
+    }
+
+
+async def test_delete_personal_best_promotes_next(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_team: Team,
+) -> None:
+    """Deleting the PB lap flags the next fastest / Excluir a volta PB marca a proxima mais rapida."""
+    payload = {"laps": [_lap(test_driver, test_team, i, ms) for i, ms in enumerate((90500, 90000, 90200), start=1)]}
+    resp = await client.post(f"/api/v1/races/{test_race.id}/laps/bulk", json=payload, headers=admin_headers)
+    best = next(lap for lap in resp.json() if lap["is_personal_best"])
+    assert (await client.delete(f"/api/v1/laps/{best['id']}", headers=admin_headers)).status_code == 204
+    assert await _personal_bests(client, admin_headers, test_race) == {str(test_driver.id): 3}
+
+
+async def test_fastest_lap_result_flag(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    test_race: Race,
+    test_driver: Driver,
+    test_driver_b: Driver,
+    test_team: Team,
+    test_team_b: Team,
+) -> None:
+    """RaceResult.fastest_lap follows the race-fastest driver / RaceResult.fastest_lap segue o piloto mais rapido."""
+    db_session.add_all([
+        RaceResult(race_id=test_race.id, team_id=test_team.id, driver_id=test_driver.id, position=1),
+        RaceResult(race_id=test_race.id, team_id=test_team_b.id, driver_id=test_driver_b.id, position=2),
+    ])
+    await db_session.commit()
+    race_id, driver_a, driver_b = test_race.id, test_driver.id, test_driver_b.id
+    lap_a, lap_b = _lap(test_driver, test_team, 1, 90000), _lap(test_driver_b, test_team_b, 1, 89000)
+    url = f"/api/v1/races/{race_id}/laps"
+
+    async def fastest_lap_holders() -> set[uuid.UUID | None]:
+        rows = await db_session.execute(
+            select(RaceResult.driver_id).where(RaceResult.race_id == race_id, RaceResult.fastest_lap.is_(True))
+        )
+        return set(rows.scalars())
+
+    await client.post(url, json=lap_a, headers=admin_headers)
+    assert await fastest_lap_holders() == {driver_a}
+    resp = await client.post(url, json=lap_b, headers=admin_headers)
+    assert await fastest_lap_holders() == {driver_b}
+    await client.delete(f"/api/v1/laps/{resp.json()['id']}", headers=admin_headers)
+    assert await fastest_lap_holders() == {driver_a}
+
+
+# --- Lap stats rollup tests / Testes do agregado de voltas ---
+
+
+async def _expected_stats(client: AsyncClient, headers: dict[str, str], race: Race) -> dict[str, dict[str, object]]:
+    """Stats recomputed from the lap list / Estatisticas recalculadas a partir da lista de voltas."""
+    resp = await client.get(f"/api/v1/races/{race.id}/laps", headers=headers)
+    by_driver: dict[str, list[dict[str, int]]] = {}
+    for lap in resp.json():
+        by_driver.setdefault(lap["driver_id"], []).append(lap)
+    expected: dict[str, dict[str, object]] = {}
+    for driver_id, laps in by_driver.items():
+        times = [lap["lap_time_ms"] for lap in laps]
+        sectors = [
+            min((lap[f"sector_{i}_ms"] for lap in laps if lap[f"sector_{i}_ms"] is not None), default=None)
+            for i in (1, 2, 3)
+        ]
+        expected[driver_id] = {
+            "total_laps": len(laps),
+            "fastest_lap_ms": min(times),
+            "avg_lap_ms": int(statistics.mean(times)),
+            "stddev_lap_ms": pytest.approx(statistics.stdev(times)) if len(times) > 1 else None,
+            "best_sector_1_ms": sectors[0],
+            "best_sector_2_ms": sectors[1],
+            "best_sector_3_ms": sectors[2],
+            "last_lap_number": max(lap["lap_number"] for lap in laps),
+        }
+    return expected
+
+
+async def _rollup_stats(client: AsyncClient, headers: dict[str, str], race: Race) -> dict[str, dict[str, object]]:
+    """Stats served from the rollup / Estatisticas servidas pelo agregado."""
+    resp = await client.get(f"/api/v1/races/{race.id}/laps/stats", headers=headers)
+    assert resp.status_code == 200
+    return {
+        row["driver_id"]: {
+            key: row[key]
+            for key in (
+                "total_laps",
+                "fastest_lap_ms",
+                "avg_lap_ms",
+                "stddev_lap_ms",
+                "best_sector_1_ms",
+                "best_sector_2_ms",
+                "best_sector_3_ms",
+                "last_lap_number",
+            )
+        }
+        for row in resp.json()
+    }
+
+
+async def test_lap_stats_follow_ingest(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_driver_b: Driver,
+    test_team: Team,
+    test_team_b: Team,
+) -> None:
+    """Rollup matches the laps after every write path / Agregado bate com as voltas apos cada escrita."""
+    laps_url = f"/api/v1/races/{test_race.id}/laps"
+    sectors = {"sector_1_ms": 30100, "sector_2_ms": 30200, "sector_3_ms": 30300}
+    await client.post(laps_url, json=_lap(test_driver, test_team, 1, 91000, **sectors), headers=admin_headers)
+    payload = {
+        "laps": [
+            _lap(test_driver, test_team, 2, 90500, sector_1_ms=29900, sector_2_ms=30500, sector_3_ms=30100),
+            _lap(test_driver, test_team, 3, 92000),
+            _lap(test_driver_b, test_team_b, 1, 90800),
+        ]
+    }
+    await client.post(f"{laps_url}/bulk", json=payload, headers=admin_headers)
+    assert await _rollup_stats(client, admin_headers, test_race) == await _expected_stats(
+        client, admin_headers, test_race
+    )
+
+    # Skipped laps add nothing, overwritten laps are recomputed / Ignoradas nao somam, sobrescritas recalculam
+    payload = {"laps": [_lap(test_driver, test_team, 3, 95000), _lap(test_driver, test_team, 4, 90000)]}
+    await client.post(f"{laps_url}/bulk?on_conflict=ignore", json=payload, headers=admin_headers)
+    payload = {"laps": [_lap(test_driver, test_team, 1, 93000)]}
+    await client.post(f"{laps_url}/bulk?on_conflict=update", json=payload, headers=admin_headers)
+    assert await _rollup_stats(client, admin_headers, test_race) == await _expected_stats(
+        client, admin_headers, test_race
+    )
+
+    laps = (await client.get(laps_url, headers=admin_headers)).json()
+    for lap in laps:
+        if lap["driver_id"] == str(test_driver_b.id) or lap["lap_number"] == 4:
+            await client.delete(f"/api/v1/laps/{lap['id']}", headers=admin_headers)
+    stats = await _rollup_stats(client, admin_headers, test_race)
+    assert list(stats) == [str(test_driver.id)]
+    assert stats == await _expected_stats(client, admin_headers, test_race)
+    assert stats[str(test_driver.id)]["last_lap_number"] == 3
+
+
+async def test_lap_stats_race_not_found(client: AsyncClient, admin_headers: dict[str, str]) -> None:
+    """Stats for non-existent race / Estatisticas de corrida inexistente."""
+    resp = await client.get(f"/api/v1/races/{uuid.uuid4()}/laps/stats", headers=admin_headers)
+    assert resp.status_code == 404
+
+
 async def test_create_lap_unauthorized(
     client: AsyncClient,
     test_race: Race,
@@ -725,3 +1144,360 @@ async def test_compare_max_three_enforced(
         headers=admin_headers,
     )
     assert resp.status_code == 400
+
+
+async def test_compare_field(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_driver_b: Driver,
+    test_team: Team,
+    test_team_b: Team,
+) -> None:
+    """Whole-field matrices against the leader / Matrizes do grid inteiro contra o lider."""
+    sectors = {"sector_1_ms": 30000, "sector_2_ms": 30000}
+    payload = {
+        "laps": [
+            *(_lap(test_driver, test_team, i, ms, **sectors) for i, ms in enumerate((90000, 91000, 92000), start=1)),
+            # B misses lap 2 / B perde a volta 2
+            _lap(test_driver_b, test_team_b, 1, 90500, sector_1_ms=30500),
+            _lap(test_driver_b, test_team_b, 3, 91000),
+        ]
+    }
+    await client.post(f"/api/v1/races/{test_race.id}/laps/bulk", json=payload, headers=admin_headers)
+
+    resp = await client.get(f"/api/v1/races/{test_race.id}/telemetry/compare/field?window=2", headers=admin_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    rows = {driver["driver_id"]: i for i, driver in enumerate(data["drivers"])}
+    a, b = rows[str(test_driver.id)], rows[str(test_driver_b.id)]
+    assert data["reference_driver_id"] == str(test_driver.id)
+    assert data["lap_numbers"] == [1, 2, 3]
+    assert data["lap_time_ms"][b] == [90500, None, 91000]
+    assert data["cumulative_ms"][a] == [90000, 181000, 273000]
+    assert data["cumulative_ms"][b] == [90500, None, None]
+    assert data["gap_to_reference_ms"][a] == [0, 0, 0]
+    assert data["gap_to_reference_ms"][b] == [500, None, None]
+    assert data["lap_delta_ms"][b] == [500, None, -1000]
+    assert data["rolling_avg_ms"][a] == [None, 90500, 91500]
+    assert data["sector_delta_ms"][0][b] == [500, None, None]
+    assert data["sector_delta_ms"][2][a] == [None, None, None]
+
+
+async def test_compare_field_selection(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_driver_b: Driver,
+    test_team: Team,
+) -> None:
+    """Requested drivers without laps, explicit reference / Pilotos pedidos sem voltas, referencia explicita."""
+    await client.post(
+        f"/api/v1/races/{test_race.id}/laps", json=_lap(test_driver, test_team, 1, 90000), headers=admin_headers
+    )
+    url = f"/api/v1/races/{test_race.id}/telemetry/compare/field"
+    ids = f"{test_driver.id},{test_driver_b.id}"
+    resp = await client.get(f"{url}?driver_ids={ids}&reference_driver_id={test_driver_b.id}", headers=admin_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert {driver["driver_id"] for driver in data["drivers"]} == {str(test_driver.id), str(test_driver_b.id)}
+    assert data["gap_to_reference_ms"] == [[None], [None]]
+
+    resp = await client.get(
+        f"{url}?driver_ids={test_driver.id}&reference_driver_id={test_driver_b.id}", headers=admin_headers
+    )
+    assert resp.status_code == 422
+    resp = await client.get(f"{url}?driver_ids={uuid.uuid4()}", headers=admin_headers)
+    assert resp.status_code == 404
+    resp = await client.get(f"{url}?driver_ids={test_driver.id},bad", headers=admin_headers)
+    assert resp.status_code == 422
+
+
+async def test_compare_field_empty_race(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+) -> None:
+    """No laps: empty matrices / Sem voltas: matrizes vazias."""
+    resp = await client.get(f"/api/v1/races/{test_race.id}/telemetry/compare/field", headers=admin_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["reference_driver_id"] is None
+    assert data["drivers"] == []
+    assert data["lap_numbers"] == []
+
+
+# --- Sector heatmap tests / Testes do mapa de setores ---
+
+
+def _sectors(s1: int, s2: int, s3: int | None) -> dict[str, int | None]:
+    return {"sector_1_ms": s1, "sector_2_ms": s2, "sector_3_ms": s3}
+
+
+async def test_sector_heatmap(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_driver_b: Driver,
+    test_team: Team,
+    test_team_b: Team,
+) -> None:
+    """Bests, theoretical best and gaps; cached until a lap is written / Melhores, teorico e gaps; cache."""
+    payload = {
+        "laps": [
+            _lap(test_driver, test_team, 1, 90000, **_sectors(30000, 30500, 29500)),
+            _lap(test_driver, test_team, 2, 90000, **_sectors(29800, 30600, 29600)),
+            _lap(test_driver, test_team, 3, 92000, **_sectors(30100, 30400, None)),
+            # B misses lap 2 / B perde a volta 2
+            _lap(test_driver_b, test_team_b, 1, 90400, **_sectors(30200, 30300, 29900)),
+            _lap(test_driver_b, test_team_b, 3, 90300, **_sectors(29900, 30700, 29700)),
+        ]
+    }
+    resp = await client.post(f"/api/v1/races/{test_race.id}/laps/bulk", json=payload, headers=admin_headers)
+    lap_2_id = {(lap["driver_id"], lap["lap_number"]): lap["id"] for lap in resp.json()}[(str(test_driver.id), 2)]
+
+    url = f"/api/v1/races/{test_race.id}/laps/sectors"
+    with track_queries() as cold:
+        resp = await client.get(url, headers=admin_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["lap_numbers"] == [1, 2, 3]
+    a_id, b_id = str(test_driver.id), str(test_driver_b.id)
+    assert [(best["sector_ms"], best["driver_id"], best["lap_number"]) for best in data["session_best"]] == [
+        (29800, a_id, 2),
+        (30300, b_id, 1),
+        (29500, a_id, 1),
+    ]
+    assert data["ideal_lap_ms"] == 89600
+    rows = {driver["driver_id"]: i for i, driver in enumerate(data["drivers"])}
+    a, b = data["drivers"][rows[a_id]], data["drivers"][rows[b_id]]
+    assert (a["best_sector_ms"], a["theoretical_best_ms"], a["gap_to_ideal_ms"]) == ([29800, 30400, 29500], 89700, 100)
+    assert (b["best_sector_ms"], b["theoretical_best_ms"], b["gap_to_ideal_ms"]) == ([29900, 30300, 29700], 89900, 300)
+    heatmap = data["gap_to_session_best_ms"]
+    assert heatmap[rows[a_id]] == [[200, 200, 0], [0, 300, 100], [300, 100, None]]
+    assert heatmap[rows[b_id]] == [[400, 0, 400], [None, None, None], [100, 400, 200]]
+
+    with track_queries() as warm:
+        resp = await client.get(url, headers=admin_headers)
+    assert resp.json() == data
+    assert warm.queries == cold.queries - 1  # only the race check / apenas a verificacao da corrida
+
+    assert (await client.delete(f"/api/v1/laps/{lap_2_id}", headers=admin_headers)).status_code == 204
+    data = (await client.get(url, headers=admin_headers)).json()
+    assert (data["session_best"][0]["sector_ms"], data["session_best"][0]["driver_id"]) == (29900, b_id)
+    assert data["ideal_lap_ms"] == 89700
+
+
+async def test_sector_heatmap_without_sectors(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_driver: Driver,
+    test_team: Team,
+) -> None:
+    """Empty race, laps without sectors, unknown race / Corrida vazia, voltas sem setores, corrida inexistente."""
+    url = f"/api/v1/races/{test_race.id}/laps/sectors"
+    data = (await client.get(url, headers=admin_headers)).json()
+    assert (data["drivers"], data["lap_numbers"], data["ideal_lap_ms"]) == ([], [], None)
+    assert [best["sector_ms"] for best in data["session_best"]] == [None, None, None]
+
+    await client.post(
+        f"/api/v1/races/{test_race.id}/laps", json=_lap(test_driver, test_team, 1, 90000), headers=admin_headers
+    )
+    data = (await client.get(url, headers=admin_headers)).json()
+    assert data["drivers"][0]["best_sector_ms"] == [None, None, None]
+    assert data["drivers"][0]["theoretical_best_ms"] is None
+    assert data["gap_to_session_best_ms"] == [[[None, None, None]]]
+
+    resp = await client.get(f"/api/v1/races/{uuid.uuid4()}/laps/sectors", headers=admin_headers)
+    assert resp.status_code == 404
+
+
+# --- Lap trace tests / Testes de tracado de volta ---
+
+
+def _trace_payload(driver: Driver, n_samples: int = 600) -> dict[str, Any]:
+    """Synthetic 60 Hz trace / Tracado sintetico a 60 Hz."""
+    t = np.arange(n_samples) / 60
+    speed = 200 + 80 * np.sin(t)
+    return {
+        "driver_id": str(driver.id),
+        "sample_rate_hz": 60,
+        "channels": {
+            "speed": speed.tolist(),
+            "throttle": np.clip(np.cos(t), 0, 1).tolist(),
+            "gear": np.clip(speed // 40, 1, 8).tolist(),
+            "rpm": np.round(9000 + 3000 * np.sin(3 * t)).tolist(),
+        },
+    }
+
+
+async def test_trace_codec_round_trip() -> None:
+    """Floats keep float32 precision, integers are exact / Floats mantem precisao float32, inteiros exatos."""
+    speed = np.linspace(80, 320, 1000)
+    encoded = encode_channel("speed", speed.tolist())
+    assert encoded.encoding is TraceEncoding.shuffle
+    decoded = decode_channel(encoded.dtype, encoded.encoding, encoded.data)
+    np.testing.assert_array_equal(decoded, speed.astype(np.float32))
+
+    rpm = np.round(9000 + 3000 * np.sin(np.arange(1000) / 10))
+    encoded = encode_channel("rpm", rpm.tolist())
+    assert encoded.encoding is TraceEncoding.delta
+    assert len(encoded.data) < rpm.size * 2
+    np.testing.assert_array_equal(decode_channel(encoded.dtype, encoded.encoding, encoded.data, 100, 200), rpm[100:200])
+
+    with pytest.raises(ValueError):
+        encode_channel("gear", [1.5])
+    with pytest.raises(ValueError):
+        encode_channel("rpm", [40000])
+
+
+async def test_upload_and_read_traces(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_lap: LapTime,
+    test_driver: Driver,
+) -> None:
+    """Upload, read a range as JSON and as .npz / Envia, le um intervalo em JSON e em .npz."""
+    url = f"/api/v1/races/{test_race.id}/laps/{test_lap.lap_number}/traces"
+    payload = _trace_payload(test_driver)
+    resp = await client.put(url, json=payload, headers=admin_headers)
+    assert resp.status_code == 200
+    stored = {channel["channel"]: channel for channel in resp.json()}
+    assert stored.keys() == {"speed", "throttle", "gear", "rpm"}
+    assert stored["gear"]["sample_count"] == 600
+    assert stored["gear"]["size_bytes"] < 100
+
+    params: dict[str, str | int] = {
+        "driver_id": str(test_driver.id),
+        "channels": "gear,speed",
+        "start": 100,
+        "stop": 160,
+    }
+    resp = await client.get(url, params=params, headers=admin_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["start"], data["stop"]) == (100, 160)
+    channels = {channel["channel"]: channel["values"] for channel in data["channels"]}
+    assert channels.keys() == {"gear", "speed"}
+    assert channels["gear"] == payload["channels"]["gear"][100:160]
+    assert channels["speed"] == pytest.approx(payload["channels"]["speed"][100:160], rel=1e-6)
+
+    resp = await client.get(url, params={**params, "format": "npz"}, headers=admin_headers)
+    assert resp.status_code == 200
+    arrays = np.load(io.BytesIO(resp.content))
+    assert arrays["gear"].dtype == np.int16
+    assert arrays["gear"].tolist() == channels["gear"]
+
+
+async def test_upload_traces_replaces_channels(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_lap: LapTime,
+    test_driver: Driver,
+) -> None:
+    """Re-uploading a channel overwrites it / Reenviar um canal o sobrescreve."""
+    url = f"/api/v1/races/{test_race.id}/laps/{test_lap.lap_number}/traces"
+    await client.put(url, json=_trace_payload(test_driver), headers=admin_headers)
+    payload = {"driver_id": str(test_driver.id), "sample_rate_hz": 10, "channels": {"gear": [3, 4, 5]}}
+    await client.put(url, json=payload, headers=admin_headers)
+    resp = await client.get(url, params={"driver_id": str(test_driver.id)}, headers=admin_headers)
+    channels = {channel["channel"]: channel for channel in resp.json()["channels"]}
+    assert len(channels) == 4
+    assert channels["gear"]["values"] == [3, 4, 5]
+    assert channels["gear"]["sample_rate_hz"] == 10
+    assert resp.json()["stop"] == 600
+
+
+async def test_upload_traces_validation(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_lap: LapTime,
+    test_driver: Driver,
+) -> None:
+    """Unknown channels, ragged lengths, bad values and missing laps / Canais desconhecidos, tamanhos, valores."""
+    url = f"/api/v1/races/{test_race.id}/laps/{test_lap.lap_number}/traces"
+    driver = str(test_driver.id)
+    for channels in ({"boost": [1.0]}, {"speed": [1.0, 2.0], "gear": [1]}, {"gear": [2.5]}):
+        resp = await client.put(
+            url, json={"driver_id": driver, "sample_rate_hz": 60, "channels": channels}, headers=admin_headers
+        )
+        assert resp.status_code == 422
+
+    missing = f"/api/v1/races/{test_race.id}/laps/99/traces"
+    resp = await client.put(
+        missing, json={"driver_id": driver, "sample_rate_hz": 60, "channels": {"gear": [1]}}, headers=admin_headers
+    )
+    assert resp.status_code == 404
+    resp = await client.get(url, params={"driver_id": driver}, headers=admin_headers)
+    assert resp.status_code == 404
+
+
+async def test_downsample_algorithms() -> None:
+    """Point budget, endpoints and extremes / Limite de pontos, extremos e pontas."""
+    rng = np.random.default_rng(3)
+    values = np.sin(np.arange(5000) / 80) + rng.normal(0, 0.05, 5000)
+    values[1234] = 9.0  # brake spike / pico de freio
+
+    kept = lttb(values, 200)
+    assert kept.size == 200
+    assert (kept[0], kept[-1]) == (0, 4999)
+    assert (np.diff(kept) > 0).all()
+    assert 1234 in kept
+
+    kept = minmax(values, 200)
+    assert kept.size <= 200
+    assert (kept[0], kept[-1]) == (0, 4999)
+    assert {int(values.argmin()), int(values.argmax())} <= set(kept.tolist())
+
+    assert lttb(values[:50], 200).tolist() == list(range(50))
+    assert minmax(values[:50], 200).tolist() == list(range(50))
+
+
+async def test_read_downsampled_traces(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    test_race: Race,
+    test_lap: LapTime,
+    test_driver: Driver,
+) -> None:
+    """Series match the full trace, are cached, uploads invalidate / Series batem, ficam em cache, uploads invalidam."""
+    url = f"/api/v1/races/{test_race.id}/laps/{test_lap.lap_number}/traces"
+    payload = _trace_payload(test_driver, n_samples=3000)
+    await client.put(url, json=payload, headers=admin_headers)
+
+    params: dict[str, str | int] = {"driver_id": str(test_driver.id), "channels": "speed,rpm", "points": 300}
+    with track_queries() as cold:
+        resp = await client.get(f"{url}/downsampled", params=params, headers=admin_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["method"], data["points"]) == ("lttb", 300)
+    series = {channel["channel"]: channel for channel in data["channels"]}
+    assert series.keys() == {"rpm", "speed"}
+    rpm = series["rpm"]
+    assert rpm["sample_count"] == 3000
+    assert len(rpm["indices"]) == len(rpm["values"]) == 300
+    assert rpm["values"] == [payload["channels"]["rpm"][i] for i in rpm["indices"]]
+
+    with track_queries() as warm:
+        resp = await client.get(f"{url}/downsampled", params=params, headers=admin_headers)
+    assert resp.json() == data
+    assert warm.queries == cold.queries - 1  # no blob read / sem leitura do blob
+
+    replaced = {"driver_id": str(test_driver.id), "sample_rate_hz": 60, "channels": {"rpm": [8000] * 1000}}
+    await client.put(url, json=replaced, headers=admin_headers)
+    resp = await client.get(f"{url}/downsampled", params=params, headers=admin_headers)
+    rpm = {channel["channel"]: channel for channel in resp.json()["channels"]}["rpm"]
+    assert rpm["sample_count"] == 1000
+    assert set(rpm["values"]) == {8000}
+
+    resp = await client.get(
+        f"{url}/downsampled", params={**params, "method": "minmax", "points": 2}, headers=admin_headers
+    )
+    assert resp.status_code == 422
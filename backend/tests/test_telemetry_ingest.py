@@ -0,0 +1,257 @@
+"""
+Tests for the UDP telemetry ingester and its packet-capture tools.
+Testes para o ingestor de telemetria UDP e suas ferramentas de captura de pacotes.
+"""
+
+import asyncio
+import io
+import uuid
+from pathlib import Path
+from typing import cast
+
+import numpy as np
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.championships.models import Championship, ChampionshipStatus
+from app.config import settings
+from app.drivers.models import Driver
+from app.pitstops.models import PitStop, TireCompound
+from app.races.models import Race, RaceStatus, race_entries
+from app.replay.models import LapPosition
+from app.teams.models import Team
+from app.telemetry import ingest
+from app.telemetry.capture import replay, synthesize
+from app.telemetry.ingest import Ingester, LapAggregator, listen, load_entries
+from app.telemetry.models import LapTime
+from app.telemetry.packets import (
+    CAR_RECORDS,
+    PacketError,
+    PacketKind,
+    decode,
+    encode,
+    read_capture,
+    write_capture_header,
+    write_capture_record,
+)
+
+# --- Fixtures / Fixtures ---
+
+
+@pytest.fixture
+async def test_race(db_session: AsyncSession) -> Race:
+    """Create a test race / Cria uma corrida de teste."""
+    champ = Championship(
+        name="ingest_champ_2026",
+        display_name="Ingest Champ 2026",
+        season_year=2026,
+        status=ChampionshipStatus.active,
+    )
+    db_session.add(champ)
+    await db_session.flush()
+    race = Race(
+        championship_id=champ.id,
+        name="ingest_round_1",
+        display_name="Ingest Round 1",
+        round_number=1,
+        status=RaceStatus.active,
+    )
+    db_session.add(race)
+    await db_session.commit()
+    return race
+
+
+@pytest.fixture
+async def test_grid(db_session: AsyncSession, test_race: Race) -> list[Driver]:
+    """Two entered teams with cars 1-4, and a team not entered / Duas equipes inscritas e uma nao inscrita."""
+    teams = [Team(name=f"ingest_team_{i}", display_name=f"Ingest Team {i}") for i in range(3)]
+    db_session.add_all(teams)
+    await db_session.flush()
+    drivers = [
+        Driver(
+            name=f"ingest_driver_{number}",
+            display_name=f"Driver {number}",
+            abbreviation=f"IN{number}",
+            number=number,
+            team_id=teams[(number - 1) // 2].id,
+        )
+        for number in (1, 2, 3, 4)
+    ]
+    outsider = Driver(
+        name="ingest_outsider", display_name="Outsider", abbreviation="OUT", number=1, team_id=teams[2].id
+    )
+    db_session.add_all([*drivers, outsider])
+    await db_session.execute(
+        insert(race_entries), [{"race_id": test_race.id, "team_id": team.id} for team in teams[:2]]
+    )
+    await db_session.commit()
+    return drivers
+
+
+def _entries(count: int) -> dict[int, tuple[uuid.UUID, uuid.UUID]]:
+    return {number: (uuid.UUID(int=number), uuid.UUID(int=100 + number)) for number in range(1, count + 1)}
+
+
+# --- Packets / Pacotes ---
+
+
+def test_packet_round_trip_and_errors() -> None:
+    """Packets and capture files decode what was encoded; bad input raises / Entrada invalida gera erro."""
+    cars = np.zeros(3, dtype=CAR_RECORDS[PacketKind.lap_data])
+    cars["position"] = [2, 1, 3]
+    cars["last_lap_time_ms"] = 91_234
+    data = encode(PacketKind.lap_data, 7, 12.5, cars)
+    packet = decode(data)
+    assert (packet.kind, packet.frame, packet.session_time) == (PacketKind.lap_data, 7, 12.5)
+    assert packet.cars["position"].tolist() == [2, 1, 3]
+    assert packet.cars["last_lap_time_ms"].tolist() == [91_234] * 3
+
+    for bad in (data[:5], data[:-1], b"\x00\x00" + data[2:], data[:2] + b"\x09" + data[3:]):
+        with pytest.raises(PacketError):
+            decode(bad)
+    with pytest.raises(PacketError):
+        encode(PacketKind.car_status, 0, 0.0, cars)
+
+    buffer = io.BytesIO()
+    write_capture_header(buffer)
+    write_capture_record(buffer, 0.25, data)
+    assert list(read_capture(io.BytesIO(buffer.getvalue()))) == [(0.25, data)]
+    with pytest.raises(PacketError):
+        list(read_capture(io.BytesIO(buffer.getvalue()[:-1])))
+
+
+# --- Aggregation / Agregacao ---
+
+
+def test_aggregator_builds_rows_from_synthetic_race(tmp_path: Path) -> None:
+    """Laps, positions and pit stops of matched cars; car 4 has no driver / Carro 4 nao tem piloto."""
+    path = tmp_path / "race.cap"
+    synthesize(path, cars=4, laps=3, lap_time_s=30.0, rate_hz=10)
+    aggregator = LapAggregator(_entries(3))
+    with path.open("rb") as file:
+        for _, data in read_capture(file):
+            aggregator.feed(decode(data))
+
+    assert len(aggregator.laps) == len(aggregator.positions) == 9
+    assert aggregator.stats.unmatched_rows == 4
+    for lap in aggregator.laps:
+        sectors = [lap["sector_1_ms"], lap["sector_2_ms"], lap["sector_3_ms"]]
+        assert None not in sectors
+        assert sum(sectors) == lap["lap_time_ms"]  # type: ignore[arg-type]
+    assert any(lap["is_valid"] is False for lap in aggregator.laps)
+
+    for position in aggregator.positions:
+        if position["position"] == 1:
+            assert position["gap_to_leader_ms"] is position["interval_ms"] is None
+        else:
+            assert 0 <= cast(int, position["interval_ms"]) <= cast(int, position["gap_to_leader_ms"])
+
+    assert len(aggregator.pit_stops) == 3
+    for stop in aggregator.pit_stops:
+        assert stop["duration_ms"] == 22_000
+        assert stop["tire_to"] is TireCompound.hard
+        assert stop["tire_from"] in (TireCompound.soft, TireCompound.medium)
+
+    laps, positions, pit_stops = aggregator.take()
+    assert aggregator.pending == 0
+    aggregator.restore(laps, positions, pit_stops)
+    assert aggregator.pending == 21
+
+
+# --- Ingester / Ingestor ---
+
+
+async def test_load_entries_skips_shared_numbers(
+    db_session: AsyncSession, test_race: Race, test_grid: list[Driver]
+) -> None:
+    """Only drivers of entered teams; the outsider's number 1 does not clash / Apenas equipes inscritas."""
+    entries = await load_entries(db_session, test_race.id)
+    assert entries == {driver.number: (driver.id, driver.team_id) for driver in test_grid}
+
+    test_grid[3].number = 1
+    await db_session.commit()
+    assert set(await load_entries(db_session, test_race.id)) == {2, 3}
+    with pytest.raises(LookupError):
+        await load_entries(db_session, uuid.uuid4())
+
+
+async def test_ingester_writes_replayed_capture(
+    db_session: AsyncSession,
+    test_race: Race,
+    test_grid: list[Driver],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A capture replayed over UDP lands in the race; a second replay writes nothing / Segunda reproducao nao grava."""
+    monkeypatch.setattr(settings, "TELEMETRY_INGEST_FLUSH_MS", 20)
+    path = tmp_path / "race.cap"
+    synthesize(path, cars=4, laps=3, lap_time_s=30.0, rate_hz=10)
+    sessions = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    entries = await load_entries(db_session, test_race.id)
+
+    for expected_laps in (12, 0):
+        ingester = Ingester(sessions, test_race.id, entries)
+        async with listen(ingester, "127.0.0.1", 0) as (host, port):
+            sent = await asyncio.to_thread(replay, path, host, port, 0)
+            for _ in range(200):
+                if ingester.stats.packets == sent.packets:
+                    break
+                await asyncio.sleep(0.01)
+        assert ingester.stats.packets == sent.packets
+        assert ingester.stats.laps == expected_laps
+
+    counts = [
+        (
+            await db_session.execute(select(func.count()).select_from(model).where(model.race_id == test_race.id))
+        ).scalar_one()
+        for model in (LapTime, LapPosition, PitStop)
+    ]
+    assert counts == [12, 12, 4]
+    winner = (
+        await db_session.execute(
+            select(LapPosition).where(
+                LapPosition.race_id == test_race.id, LapPosition.lap_number == 3, LapPosition.position == 1
+            )
+        )
+    ).scalar_one()
+    assert winner.gap_to_leader_ms is None
+
+
+async def test_ingester_retries_after_unexpected_error(
+    db_session: AsyncSession,
+    test_race: Race,
+    test_grid: list[Driver],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A non-database error keeps the rows and the flush loop / Erro fora do banco mantem linhas e loop."""
+    bulk_create = ingest.bulk_create_lap_times
+    calls = 0
+
+    async def fail_once(*args: object, **kwargs: object) -> list[dict[str, object]]:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("boom")
+        return await bulk_create(*args, **kwargs)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(ingest, "bulk_create_lap_times", fail_once)
+    monkeypatch.setattr(settings, "TELEMETRY_INGEST_FLUSH_MS", 20)
+    path = tmp_path / "race.cap"
+    synthesize(path, cars=4, laps=3, lap_time_s=30.0, rate_hz=10)
+    sessions = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    ingester = Ingester(sessions, test_race.id, await load_entries(db_session, test_race.id))
+    async with listen(ingester, "127.0.0.1", 0) as (host, port):
+        sent = await asyncio.to_thread(replay, path, host, port, 0)
+        for _ in range(200):
+            if calls > 1 and ingester.stats.packets == sent.packets:
+                break
+            await asyncio.sleep(0.01)
+
+    assert calls > 1
+    assert ingester.stats.laps == 12
+    stored = (
+        await db_session.execute(select(func.count()).select_from(LapTime).where(LapTime.race_id == test_race.id))
+    ).scalar_one()
+    assert stored == 12
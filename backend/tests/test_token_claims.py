@@ -0,0 +1,174 @@
+"""
+Tests for permission claims in access tokens and authz_version revocation.
+Testes para claims de permissao nos tokens de acesso e revogacao por authz_version.
+"""
+
+import uuid
+from dataclasses import dataclass
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.principal import PERMISSION_BITS, Principal, authz_versions, decode_permissions, encode_permissions
+from app.core.security import decode_token, hash_password
+from app.db.instrumentation import track_queries
+from app.roles.models import Permission, Role
+from app.users.models import User
+
+pytestmark = pytest.mark.asyncio
+
+TEAMS = "/api/v1/teams/"
+PASSWORD = "viewerpass123"
+
+
+@dataclass
+class Viewer:
+    """Non-superuser holding one role with teams:read / Usuario com um papel com teams:read."""
+
+    user_id: uuid.UUID
+    role_id: uuid.UUID
+    permission_id: uuid.UUID
+
+
+@pytest.fixture(autouse=True)
+def permission_claims(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Issue tokens with permission claims / Emite tokens com claims de permissao."""
+    monkeypatch.setattr(settings, "JWT_PERMISSION_CLAIMS", True)
+
+
+@pytest.fixture
+async def viewer(db_session: AsyncSession, admin_user: User) -> Viewer:
+    """Viewer sharing the admin's teams:read permission / Viewer com a permissao teams:read do admin."""
+    perm = (await db_session.execute(select(Permission).where(Permission.codename == "teams:read"))).scalar_one()
+    role = Role(name="viewer", display_name="Viewer")
+    role.permissions = [perm]
+    user = User(email="viewer@example.com", hashed_password=hash_password(PASSWORD), full_name="Viewer")
+    user.roles = [role]
+    db_session.add_all([role, user])
+    await db_session.commit()
+    return Viewer(user_id=user.id, role_id=role.id, permission_id=perm.id)
+
+
+async def _login(client: AsyncClient) -> dict[str, str]:
+    """Log the viewer in / Faz login do viewer."""
+    resp = await client.post("/api/v1/auth/login", json={"email": "viewer@example.com", "password": PASSWORD})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+# --- Bitset / Bitset ---
+
+
+async def test_bitset_round_trip() -> None:
+    """System codenames survive encoding / Codenames de sistema sobrevivem a codificacao."""
+    codenames = frozenset({"teams:read", "races:update", "auth:register"})
+    bitset = encode_permissions(codenames)
+    assert bitset is not None
+    assert decode_permissions(bitset) == codenames
+    assert encode_permissions(frozenset()) == "0"
+
+
+async def test_unindexed_permission_disables_claims() -> None:
+    """Custom permissions cannot be encoded / Permissoes customizadas nao podem ser codificadas."""
+    assert "custom:thing" not in PERMISSION_BITS
+    principal = Principal(
+        id=uuid.uuid4(),
+        is_active=True,
+        is_superuser=False,
+        permissions=frozenset({"teams:read", "custom:thing"}),
+        roles=frozenset(),
+    )
+    assert principal.to_claims() is None
+
+
+# --- Request path / Caminho da requisicao ---
+
+
+async def test_login_embeds_claims(client: AsyncClient, viewer: Viewer) -> None:
+    """Access token carries the bitset and version / Token de acesso carrega bitset e versao."""
+    headers = await _login(client)
+    payload = decode_token(headers["Authorization"].removeprefix("Bearer "))
+    assert payload is not None
+    assert payload["av"] == 1
+    assert payload["su"] is False
+    assert decode_permissions(str(payload["perms"])) == frozenset({"teams:read"})
+
+
+async def test_permission_check_uses_claims(client: AsyncClient, viewer: Viewer) -> None:
+    """Warm claim check issues no auth queries / Checagem por claims quente nao consulta auth."""
+    headers = await _login(client)
+    authz_versions.clear()
+    with track_queries() as stats:
+        assert (await client.get(TEAMS, headers=headers)).status_code == 200
+    # authz_version + team list / authz_version + lista de equipes
+    assert stats.queries == 2
+
+    with track_queries() as stats:
+        assert (await client.get(TEAMS, headers=headers)).status_code == 200
+    assert stats.queries == 1
+
+
+async def test_missing_permission_rejected(client: AsyncClient, viewer: Viewer) -> None:
+    """Bitset without the permission is forbidden / Bitset sem a permissao e proibido."""
+    headers = await _login(client)
+    resp = await client.post(TEAMS, json={"name": "x", "display_name": "X"}, headers=headers)
+    assert resp.status_code == 403
+
+
+async def test_role_revocation_rejects_old_token(
+    client: AsyncClient, admin_headers: dict[str, str], viewer: Viewer
+) -> None:
+    """Revoking a role makes existing tokens stale / Revogar papel torna tokens existentes obsoletos."""
+    headers = await _login(client)
+    resp = await client.delete(f"/api/v1/users/{viewer.user_id}/roles/{viewer.role_id}", headers=admin_headers)
+    assert resp.status_code == 200
+    resp = await client.get(TEAMS, headers=headers)
+    assert resp.status_code == 401
+    assert resp.json()["detail"] == "Token permissions are outdated"
+    # A fresh token reflects the change / Um token novo reflete a mudanca
+    assert (await client.get(TEAMS, headers=await _login(client))).status_code == 403
+
+
+async def test_role_permission_change_reaches_holders(
+    client: AsyncClient, admin_headers: dict[str, str], viewer: Viewer
+) -> None:
+    """Changing a role's permissions bumps its holders / Mudar permissoes do papel incrementa portadores."""
+    headers = await _login(client)
+    resp = await client.delete(
+        f"/api/v1/roles/{viewer.role_id}/permissions/{viewer.permission_id}", headers=admin_headers
+    )
+    assert resp.status_code == 200
+    assert (await client.get(TEAMS, headers=headers)).status_code == 401
+
+
+async def test_version_checked_after_cache_expiry(
+    client: AsyncClient, db_session: AsyncSession, viewer: Viewer
+) -> None:
+    """Another worker's bump is read back from the DB / Incremento de outro worker e lido do banco."""
+    headers = await _login(client)
+    user = await db_session.get(User, viewer.user_id)
+    assert user is not None
+    user.authz_version += 1
+    await db_session.commit()
+    # Stale map entry still accepts the token / Entrada antiga do mapa ainda aceita o token
+    assert (await client.get(TEAMS, headers=headers)).status_code == 200
+    authz_versions.clear()
+    assert (await client.get(TEAMS, headers=headers)).status_code == 401
+
+
+async def test_refresh_issues_current_claims(
+    client: AsyncClient, admin_headers: dict[str, str], viewer: Viewer
+) -> None:
+    """Refreshed tokens carry the new version / Tokens atualizados carregam a nova versao."""
+    resp = await client.post("/api/v1/auth/login", json={"email": "viewer@example.com", "password": PASSWORD})
+    refresh_token = resp.json()["refresh_token"]
+    await client.delete(f"/api/v1/users/{viewer.user_id}/roles/{viewer.role_id}", headers=admin_headers)
+    resp = await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert resp.status_code == 200
+    payload = decode_token(resp.json()["access_token"])
+    assert payload is not None
+    assert payload["av"] == 2
+    assert decode_permissions(str(payload["perms"])) == frozenset()
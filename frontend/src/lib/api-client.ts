@@ -555,7 +555,10 @@ import type {
   LapTimeSummary,
   CarSetup,
   CarSetupDetail,
+  DownsampledLapTraces,
   DriverComparison,
+  FieldComparison,
+  TraceChannel,
 } from "@/types/telemetry";
 
 export const telemetryApi = {
@@ -579,7 +582,6 @@ export const telemetryApi = {
       sector_2_ms?: number;
       sector_3_ms?: number;
       is_valid?: boolean;
-      is_personal_best?: boolean;
     },
   ) =>
     apiRequest<LapTime>(`/races/${raceId}/laps`, {
@@ -599,7 +601,6 @@ export const telemetryApi = {
       sector_2_ms?: number;
       sector_3_ms?: number;
       is_valid?: boolean;
-      is_personal_best?: boolean;
     }>,
   ) =>
     apiRequest<LapTime[]>(`/races/${raceId}/laps/bulk`, {
@@ -682,6 +683,40 @@ export const telemetryApi = {
       {},
       token,
     ),
+
+  compareField: (
+    token: string,
+    raceId: string,
+    params?: { driver_ids?: string[]; reference_driver_id?: string; window?: number },
+  ) => {
+    const query = new URLSearchParams();
+    if (params?.driver_ids?.length) query.set("driver_ids", params.driver_ids.join(","));
+    if (params?.reference_driver_id) query.set("reference_driver_id", params.reference_driver_id);
+    if (params?.window) query.set("window", String(params.window));
+    const qs = query.toString();
+    return apiRequest<FieldComparison>(
+      `/races/${raceId}/telemetry/compare/field${qs ? `?${qs}` : ""}`,
+      {},
+      token,
+    );
+  },
+
+  downsampledTraces: (
+    token: string,
+    raceId: string,
+    lapNumber: number,
+    params: { driver_id: string; channels?: TraceChannel[]; points?: number; method?: "lttb" | "minmax" },
+  ) => {
+    const query = new URLSearchParams({ driver_id: params.driver_id });
+    if (params.channels?.length) query.set("channels", params.channels.join(","));
+    if (params.points) query.set("points", String(params.points));
+    if (params.method) query.set("method", params.method);
+    return apiRequest<DownsampledLapTraces>(
+      `/races/${raceId}/laps/${lapNumber}/traces/downsampled?${query.toString()}`,
+      {},
+      token,
+    );
+  },
 };
 
 /**
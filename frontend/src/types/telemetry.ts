@@ -77,3 +77,38 @@ export interface DriverComparison {
   driver_display_name: string;
   laps: LapTime[];
 }
+
+/** drivers x laps, null where a lap is missing / pilotos x voltas, null onde falta a volta */
+export type LapSeries = (number | null)[][];
+
+export interface FieldComparison {
+  reference_driver_id: string | null;
+  window: number;
+  lap_numbers: number[];
+  drivers: { driver_id: string; driver_display_name: string }[];
+  lap_time_ms: LapSeries;
+  cumulative_ms: LapSeries;
+  gap_to_reference_ms: LapSeries;
+  lap_delta_ms: LapSeries;
+  rolling_avg_ms: LapSeries;
+  sector_delta_ms: LapSeries[];
+}
+
+export type TraceChannel = "speed" | "throttle" | "brake" | "steering" | "gear" | "rpm";
+
+/** Downsampled channel; time of a point = index / sample_rate_hz / Canal reduzido; tempo = indice / taxa */
+export interface LapTraceSeries {
+  channel: TraceChannel;
+  unit: string;
+  sample_rate_hz: number;
+  sample_count: number;
+  indices: number[];
+  values: number[];
+}
+
+export interface DownsampledLapTraces {
+  lap_id: string;
+  method: "lttb" | "minmax";
+  points: number;
+  channels: LapTraceSeries[];
+}